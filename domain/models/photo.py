@@ -0,0 +1,126 @@
+"""
+写真モデル - PhotoMap Explorer
+
+1枚の写真のメタデータを保持する軽量レコード
+EXIFの値は表示用文字列ではなく数値として保持し、
+表示用の文字列はプロパティで都度整形する
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+# 撮影日時の基準（EXIFの日時はタイムゾーンを持たないため、壁時計時刻をそのまま秒数にする）
+_EPOCH = datetime(1970, 1, 1)
+
+
+class Photo:
+    """
+    写真1枚分のメタデータ
+
+    __slots__ により属性辞書を持たず、大量に生成してもメモリを圧迫しない
+    未取得の値は数値なら0（緯度・経度・撮影日時はNone）とする
+    """
+
+    __slots__ = (
+        'file_path', 'file_size', 'modified_time', 'taken_at',
+        'latitude', 'longitude', 'width', 'height', 'orientation',
+        'camera', 'iso', 'f_number', 'exposure_time', 'focal_length',
+    )
+
+    def __init__(self, file_path: str, file_size: int = 0, modified_time: float = 0.0,
+                 taken_at: Optional[float] = None,
+                 latitude: Optional[float] = None, longitude: Optional[float] = None,
+                 width: int = 0, height: int = 0, orientation: int = 1,
+                 camera: str = "", iso: int = 0, f_number: float = 0.0,
+                 exposure_time: float = 0.0, focal_length: float = 0.0):
+        self.file_path = file_path
+        self.file_size = file_size            # バイト
+        self.modified_time = modified_time    # ファイル更新日時（epoch秒）
+        self.taken_at = taken_at              # 撮影日時（壁時計時刻をUTCとみなしたepoch秒）
+        self.latitude = latitude
+        self.longitude = longitude
+        self.width = width
+        self.height = height
+        self.orientation = orientation
+        self.camera = camera
+        self.iso = iso
+        self.f_number = f_number
+        self.exposure_time = exposure_time    # 秒
+        self.focal_length = focal_length      # mm
+
+    def __repr__(self):
+        return f"Photo({self.file_path!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, Photo) and self.file_path == other.file_path
+
+    def __hash__(self):
+        return hash(self.file_path)
+
+    @property
+    def file_name(self) -> str:
+        return os.path.basename(self.file_path)
+
+    @property
+    def file_extension(self) -> str:
+        return os.path.splitext(self.file_path)[1].lower()
+
+    @property
+    def directory(self) -> str:
+        return os.path.dirname(self.file_path)
+
+    @property
+    def has_gps_data(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+    @property
+    def taken_date(self) -> Optional[datetime]:
+        """撮影日時（タイムゾーンなし）"""
+        if self.taken_at is None:
+            return None
+        return _EPOCH + timedelta(seconds=self.taken_at)
+
+    @property
+    def megapixels(self) -> float:
+        return self.width * self.height / 1000000
+
+    # 表示用の整形
+
+    @property
+    def taken_text(self) -> str:
+        taken = self.taken_date
+        return taken.strftime("%Y/%m/%d %H:%M:%S") if taken else ""
+
+    @property
+    def aperture_text(self) -> str:
+        return f"F/{self.f_number:.1f}" if self.f_number > 0 else ""
+
+    @property
+    def shutter_text(self) -> str:
+        if self.exposure_time <= 0:
+            return ""
+        if self.exposure_time >= 1:
+            return f"{self.exposure_time:.1f}秒"
+        return f"1/{round(1 / self.exposure_time)}"
+
+    @property
+    def focal_length_text(self) -> str:
+        return f"{self.focal_length:.0f}mm" if self.focal_length > 0 else ""
+
+    @property
+    def iso_text(self) -> str:
+        return str(self.iso) if self.iso > 0 else ""
+
+
+def timestamp_from_exif(value: str) -> Optional[float]:
+    """
+    EXIFの日時文字列（"YYYY:MM:DD HH:MM:SS"）をepoch秒へ変換
+
+    不正な値（"0000:00:00 00:00:00" 等）はNone
+    """
+    try:
+        taken = datetime.strptime(value.strip()[:19], "%Y:%m:%d %H:%M:%S")
+    except (ValueError, AttributeError):
+        return None
+    return (taken - _EPOCH).total_seconds()
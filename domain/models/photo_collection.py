@@ -0,0 +1,352 @@
+"""
+写真コレクション - PhotoMap Explorer
+
+大量の写真メタデータを列指向（カラムごとのNumPy配列）で保持する
+Photoオブジェクトを写真枚数分保持しないため、100万枚規模でも
+数十MBに収まり、ソート・絞り込みをベクトル演算で行える
+
+- 数値列: NumPy配列（欠損値は浮動小数点ならNaN、整数なら0）
+- パス: ディレクトリ表 + ファイル名を連結したUTF-8バイト列とオフセット
+- カメラ名: 名前表への番号
+"""
+
+import os
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from domain.models.photo import Photo
+
+# 列名 -> dtype
+COLUMNS = {
+    'taken_at': np.float64,
+    'latitude': np.float64,
+    'longitude': np.float64,
+    'file_size': np.int64,
+    'modified_time': np.float64,
+    'width': np.uint32,
+    'height': np.uint32,
+    'iso': np.uint32,
+    'f_number': np.float32,
+    'exposure_time': np.float32,
+    'focal_length': np.float32,
+    'orientation': np.uint8,
+    'camera_id': np.int32,
+    'directory_id': np.int32,
+}
+
+_INITIAL_CAPACITY = 1024
+
+
+class PhotoCollection:
+    """
+    列指向の写真コレクション
+
+    行番号（0始まり）で写真を参照する。絞り込み・ソートは行番号の配列を返し、
+    必要な行だけを Photo として取り出す
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._size = 0
+        self._capacity = 0
+        self._columns: Dict[str, np.ndarray] = {
+            column: np.empty(0, dtype=dtype) for column, dtype in COLUMNS.items()
+        }
+        self._name_blob = bytearray()
+        self._name_offsets = np.zeros(1, dtype=np.int64)
+        self._directories: List[str] = []
+        self._directory_ids: Dict[str, int] = {}
+        self._cameras: List[str] = [""]
+        self._camera_ids: Dict[str, int] = {"": 0}
+        self._path_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_photos(cls, photos: Iterable[Photo], name: str = "") -> "PhotoCollection":
+        """Photoの列からコレクションを作成"""
+        collection = cls(name)
+        collection.extend(photos)
+        return collection
+
+    # 追加
+
+    def append(self, photo: Photo) -> int:
+        """写真を追加して行番号を返す"""
+        if self._size == self._capacity:
+            self._reserve(max(_INITIAL_CAPACITY, self._capacity * 2))
+        row = self._size
+        columns = self._columns
+        columns['taken_at'][row] = np.nan if photo.taken_at is None else photo.taken_at
+        columns['latitude'][row] = np.nan if photo.latitude is None else photo.latitude
+        columns['longitude'][row] = np.nan if photo.longitude is None else photo.longitude
+        columns['file_size'][row] = photo.file_size
+        columns['modified_time'][row] = photo.modified_time
+        columns['width'][row] = photo.width
+        columns['height'][row] = photo.height
+        columns['iso'][row] = photo.iso
+        columns['f_number'][row] = photo.f_number
+        columns['exposure_time'][row] = photo.exposure_time
+        columns['focal_length'][row] = photo.focal_length
+        columns['orientation'][row] = photo.orientation
+        columns['camera_id'][row] = self._intern_camera(photo.camera)
+
+        directory, file_name = os.path.split(photo.file_path)
+        columns['directory_id'][row] = self._intern_directory(directory)
+        self._name_blob += file_name.encode('utf-8')
+        self._name_offsets[row + 1] = len(self._name_blob)
+
+        self._size += 1
+        if self._path_index is not None:
+            self._path_index[photo.file_path] = row
+        return row
+
+    def extend(self, photos: Iterable[Photo]):
+        """複数の写真を追加"""
+        for photo in photos:
+            self.append(photo)
+
+    def _reserve(self, capacity: int):
+        """各列の容量を確保（倍々で拡張して追加を償却O(1)にする）"""
+        for column, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[column] = grown
+        self._name_offsets = np.resize(self._name_offsets, capacity + 1)
+        self._capacity = capacity
+
+    def shrink_to_fit(self):
+        """読み込み完了後に余剰容量を解放"""
+        if self._capacity > self._size:
+            for column, values in self._columns.items():
+                self._columns[column] = values[:self._size].copy()
+            self._name_offsets = self._name_offsets[:self._size + 1].copy()
+            self._capacity = self._size
+
+    def _intern_directory(self, directory: str) -> int:
+        directory_id = self._directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = len(self._directories)
+            self._directories.append(directory)
+            self._directory_ids[directory] = directory_id
+        return directory_id
+
+    def _intern_camera(self, camera: str) -> int:
+        camera_id = self._camera_ids.get(camera)
+        if camera_id is None:
+            camera_id = len(self._cameras)
+            self._cameras.append(camera)
+            self._camera_ids[camera] = camera_id
+        return camera_id
+
+    # 参照
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Photo]:
+        for row in range(self._size):
+            yield self.photo(row)
+
+    def __getitem__(self, row: int) -> Photo:
+        return self.photo(row)
+
+    def __contains__(self, path: str) -> bool:
+        return self.index_of(path) is not None
+
+    def column(self, name: str) -> np.ndarray:
+        """列を取得（読み取り専用ビュー、コピーなし）"""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def file_name(self, row: int) -> str:
+        start, end = self._name_offsets[row], self._name_offsets[row + 1]
+        return self._name_blob[start:end].decode('utf-8')
+
+    def path(self, row: int) -> str:
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        directory = self._directories[self._columns['directory_id'][row]]
+        return os.path.join(directory, self.file_name(row))
+
+    def paths(self, rows: Iterable[int] = None) -> List[str]:
+        """指定行（省略時は全行）のパス一覧"""
+        if rows is None:
+            rows = range(self._size)
+        return [self.path(int(row)) for row in rows]
+
+    def camera(self, row: int) -> str:
+        return self._cameras[self._columns['camera_id'][row]]
+
+    @property
+    def cameras(self) -> List[str]:
+        """カメラ名表（camera_id列の番号に対応、0は不明）"""
+        return list(self._cameras)
+
+    def index_of(self, path: str) -> Optional[int]:
+        """パスから行番号を取得（初回呼び出し時に索引を構築）"""
+        if self._path_index is None:
+            self._path_index = {self.path(row): row for row in range(self._size)}
+        return self._path_index.get(path)
+
+    def photo(self, row: int) -> Photo:
+        """指定行を Photo として取り出す"""
+        path = self.path(row)
+        columns = self._columns
+        taken_at = float(columns['taken_at'][row])
+        latitude = float(columns['latitude'][row])
+        longitude = float(columns['longitude'][row])
+        return Photo(
+            file_path=path,
+            file_size=int(columns['file_size'][row]),
+            modified_time=float(columns['modified_time'][row]),
+            taken_at=None if np.isnan(taken_at) else taken_at,
+            latitude=None if np.isnan(latitude) else latitude,
+            longitude=None if np.isnan(longitude) else longitude,
+            width=int(columns['width'][row]),
+            height=int(columns['height'][row]),
+            orientation=int(columns['orientation'][row]),
+            camera=self._cameras[columns['camera_id'][row]],
+            iso=int(columns['iso'][row]),
+            f_number=float(columns['f_number'][row]),
+            exposure_time=float(columns['exposure_time'][row]),
+            focal_length=float(columns['focal_length'][row]),
+        )
+
+    # ベクトル演算による絞り込み・ソート
+
+    def gps_mask(self) -> np.ndarray:
+        """GPS座標を持つ行のマスク"""
+        return ~(np.isnan(self.column('latitude')) | np.isnan(self.column('longitude')))
+
+    def date_mask(self, start: float = None, end: float = None) -> np.ndarray:
+        """撮影日時が [start, end) の行のマスク（撮影日時なしの行は除外）"""
+        taken = self.column('taken_at')
+        mask = ~np.isnan(taken)
+        if start is not None:
+            mask &= taken >= start
+        if end is not None:
+            mask &= taken < end
+        return mask
+
+    def bbox_mask(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """緯度経度の矩形内にある行のマスク（日付変更線をまたぐ場合は west > east）"""
+        latitude = self.column('latitude')
+        longitude = self.column('longitude')
+        mask = (latitude >= south) & (latitude <= north)
+        if west <= east:
+            mask &= (longitude >= west) & (longitude <= east)
+        else:
+            mask &= (longitude >= west) | (longitude <= east)
+        return mask
+
+    def camera_mask(self, text: str) -> np.ndarray:
+        """カメラ名に text を含む行のマスク（大文字小文字を区別しない）"""
+        text = text.lower()
+        matching = np.array([text in camera.lower() for camera in self._cameras], dtype=bool)
+        return matching[self.column('camera_id')]
+
+    def directory_mask(self, directory: str, recursive: bool = True) -> np.ndarray:
+        """指定フォルダ（recursive なら配下を含む）にある行のマスク"""
+        directory = os.path.normpath(directory)
+        prefix = os.path.join(directory, "")
+        matching = np.array([path == directory or (recursive and path.startswith(prefix))
+                             for path in self._directories], dtype=bool)
+        if not len(matching):
+            return np.zeros(self._size, dtype=bool)
+        return matching[self.column('directory_id')]
+
+    def _lower_names(self) -> np.ndarray:
+        """ファイル名ブロブを小文字化したバイト配列（ASCIIのみ小文字化）"""
+        return np.frombuffer(bytes(self._name_blob).lower(), dtype=np.uint8)
+
+    def name_mask(self, text: str) -> np.ndarray:
+        """ファイル名に text を含む行のマスク（大文字小文字を区別しない）"""
+        needle = text.lower().encode('utf-8')
+        mask = np.zeros(self._size, dtype=bool)
+        if not needle:
+            mask[:] = True
+            return mask
+        # 全ファイル名を連結したブロブ上で検索し、見つかった位置を行番号へ変換する
+        blob = bytes(self._name_blob).lower()
+        offsets = self._name_offsets[:self._size + 1]
+        position = blob.find(needle)
+        while position >= 0:
+            row = int(np.searchsorted(offsets, position, side='right')) - 1
+            if position + len(needle) <= offsets[row + 1]:
+                mask[row] = True
+                position = blob.find(needle, int(offsets[row + 1]))
+            else:
+                # ファイル名の境界をまたいだ一致なので1バイト進めて再検索
+                position = blob.find(needle, position + 1)
+        return mask
+
+    def extension_mask(self, extensions: Iterable[str]) -> np.ndarray:
+        """拡張子（".jpg" など）が一致する行のマスク"""
+        names = self._lower_names()
+        ends = self._name_offsets[1:self._size + 1]
+        lengths = ends - self._name_offsets[:self._size]
+        mask = np.zeros(self._size, dtype=bool)
+        for extension in extensions:
+            suffix = np.frombuffer(extension.lower().encode('utf-8'), dtype=np.uint8)
+            candidates = np.flatnonzero(lengths > len(suffix))
+            if not len(suffix) or not len(candidates):
+                continue
+            tails = names[ends[candidates, None] - len(suffix) + np.arange(len(suffix))]
+            mask[candidates[(tails == suffix).all(axis=1)]] = True
+        return mask
+
+    def argsort(self, column: str, descending: bool = False, rows: np.ndarray = None) -> np.ndarray:
+        """
+        列の値で行番号をソート
+
+        安定ソートのため同値の行は元の順序を保つ。欠損値（NaN）は昇順・降順とも末尾
+        """
+        values = self.column(column)
+        if rows is not None:
+            values = values[rows]
+        if descending:
+            keys = -values if values.dtype.kind == 'f' else -values.astype(np.int64)
+        else:
+            keys = values
+        order = np.argsort(keys, kind='stable')
+        return order if rows is None else np.asarray(rows)[order]
+
+    def select(self, rows, name: str = None) -> "PhotoCollection":
+        """
+        マスクまたは行番号配列で指定した行を新しいコレクションとして取り出す
+        """
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        # 空リストは float64 になり添字に使えないため行番号の型へそろえる
+        rows = rows.astype(np.intp, copy=False)
+        subset = PhotoCollection(self.name if name is None else name)
+        subset._reserve(max(1, len(rows)))
+        for column, values in self._columns.items():
+            subset._columns[column][:len(rows)] = values[:self._size][rows]
+        # ディレクトリ表・カメラ名表は番号をそのまま使えるよう複製する
+        subset._directories = list(self._directories)
+        subset._directory_ids = dict(self._directory_ids)
+        subset._cameras = list(self._cameras)
+        subset._camera_ids = dict(self._camera_ids)
+
+        starts = self._name_offsets[rows]
+        ends = self._name_offsets[rows + 1]
+        lengths = ends - starts
+        blob = bytearray()
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            blob += self._name_blob[start:end]
+        subset._name_blob = blob
+        subset._name_offsets[0] = 0
+        subset._name_offsets[1:len(rows) + 1] = np.cumsum(lengths)
+        subset._size = len(rows)
+        return subset
+
+    @property
+    def nbytes(self) -> int:
+        """列データが使用しているバイト数（確保済み容量を含む）"""
+        total = sum(values.nbytes for values in self._columns.values())
+        total += self._name_offsets.nbytes + len(self._name_blob)
+        total += sum(len(directory) for directory in self._directories)
+        return total
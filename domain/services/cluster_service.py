@@ -0,0 +1,284 @@
+"""
+時空間クラスタリング - PhotoMap Explorer
+
+撮影位置（緯度・経度）と撮影日時によるDBSCAN型クラスタリング
+「同じ場所・同じ時間帯に撮った写真のまとまり」を抽出する
+
+- 近傍判定: 地表距離 <= eps_meters かつ 撮影時刻の差 <= eps_seconds
+- 近傍探索: 地心直交座標（ECEF）と時刻を eps 幅の格子に分け、
+  隣接セルの点だけを候補としてNumPyでまとめて距離計算する
+- 連結成分: コア点同士の辺をベクトル化したUnion-Findで統合
+- 追加分のみ再計算: 点の追加ではクラスタは統合・拡大しかしないため、
+  新しい点とその近傍だけを処理すれば全件再計算と同じクラスタになる
+  （複数のクラスタに接する境界点の所属のみ、処理順により異なりうる）
+
+結果はPhotoCollectionの行番号の配列として返す
+"""
+
+import itertools
+from typing import List, Optional
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+DEFAULT_EPS_METERS = 500.0
+DEFAULT_EPS_SECONDS = 6 * 3600
+DEFAULT_MIN_SAMPLES = 3
+
+_NOISE = -1
+
+
+def _to_ecef(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """緯度経度（度）を地心直交座標（m）へ変換（球体近似）"""
+    lat = np.radians(latitude)
+    lon = np.radians(longitude)
+    cos_lat = np.cos(lat)
+    return np.column_stack((
+        EARTH_RADIUS_M * cos_lat * np.cos(lon),
+        EARTH_RADIUS_M * cos_lat * np.sin(lon),
+        EARTH_RADIUS_M * np.sin(lat),
+    ))
+
+
+def _find_roots(parent: np.ndarray) -> np.ndarray:
+    """親配列を根まで圧縮（ポインタジャンプ）"""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+
+def _union_edges(parent: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """辺 (left, right) で結ばれた点を統合（小さい番号の根へ付け替え）"""
+    while len(left):
+        parent = _find_roots(parent)
+        root_left, root_right = parent[left], parent[right]
+        differs = root_left != root_right
+        if not differs.any():
+            break
+        left, right = left[differs], right[differs]
+        low = np.minimum(root_left[differs], root_right[differs])
+        high = np.maximum(root_left[differs], root_right[differs])
+        np.minimum.at(parent, high, low)
+    return _find_roots(parent)
+
+
+class SpatioTemporalClusterer:
+    """
+    PhotoCollection の時空間クラスタリング
+
+    fit() で全件を処理し、コレクションに写真を追加した後は update() で
+    追加分だけを処理する。GPS座標のない写真（時間条件を使う場合は
+    撮影日時のない写真も）はノイズ扱い
+    """
+
+    def __init__(self, eps_meters: float = DEFAULT_EPS_METERS,
+                 eps_seconds: Optional[float] = DEFAULT_EPS_SECONDS,
+                 min_samples: int = DEFAULT_MIN_SAMPLES):
+        self.eps_meters = float(eps_meters)
+        self.eps_seconds = None if eps_seconds is None else float(eps_seconds)
+        self.min_samples = max(1, int(min_samples))
+        # 弧長 eps に対応する弦長（ECEF上のユークリッド距離で比較する）
+        self._eps_chord = 2 * EARTH_RADIUS_M * np.sin(min(self.eps_meters / (2 * EARTH_RADIUS_M), np.pi / 2))
+        dimensions = 3 if self.eps_seconds is None else 4
+        self._offsets = np.array(list(itertools.product((-1, 0, 1), repeat=dimensions)), dtype=np.int64)
+        self._reset()
+
+    def _reset(self):
+        self._collection = None
+        self._size = 0
+        self._points = np.empty((0, 3))
+        self._times = np.empty(0)
+        self._valid = np.empty(0, dtype=bool)
+        self._cells = np.empty((0, 4), dtype=np.int64)
+        self._neighbor_counts = np.empty(0, dtype=np.int64)
+        self._parent = np.empty(0, dtype=np.int64)
+        self._anchor = np.empty(0, dtype=np.int64)   # 境界点が属するコア点（なければ-1）
+        self._sorted_keys = np.empty(0, dtype=np.int64)
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._unique_keys = np.empty(0, dtype=np.int64)  # セルキー（重複なし）
+        self._key_starts = np.empty(0, dtype=np.int64)   # 各セルの _sorted_rows 上の範囲
+        self._key_ends = np.empty(0, dtype=np.int64)
+
+    # 公開API
+
+    def fit(self, collection) -> np.ndarray:
+        """コレクション全体をクラスタリングしてラベル配列を返す"""
+        self._reset()
+        return self.update(collection)
+
+    def update(self, collection) -> np.ndarray:
+        """
+        前回以降に追加された行だけを処理してラベル配列を返す
+
+        別のコレクションや行数が減ったコレクションの場合は全件を処理する
+        """
+        if collection is not self._collection or len(collection) < self._size:
+            self._reset()
+            self._collection = collection
+        start, end = self._size, len(collection)
+        if end > start:
+            self._add_rows(collection, start, end)
+        return self.labels()
+
+    def labels(self) -> np.ndarray:
+        """行ごとのクラスタ番号（0始まり・大きい順、ノイズは-1）"""
+        if self._size == 0:
+            return np.empty(0, dtype=np.int32)
+        roots = _find_roots(self._parent)
+        core = self._neighbor_counts >= self.min_samples
+        owner = np.full(self._size, _NOISE, dtype=np.int64)
+        owner[core] = roots[core]
+        border = ~core & (self._anchor >= 0)
+        owner[border] = roots[self._anchor[border]]
+
+        labels = np.full(self._size, _NOISE, dtype=np.int32)
+        clustered = owner >= 0
+        if clustered.any():
+            unique_roots, inverse, counts = np.unique(owner[clustered], return_inverse=True,
+                                                      return_counts=True)
+            # 大きいクラスタから番号を振る（同数なら根の行番号順）
+            rank = np.empty(len(unique_roots), dtype=np.int32)
+            rank[np.lexsort((unique_roots, -counts))] = np.arange(len(unique_roots), dtype=np.int32)
+            labels[clustered] = rank[inverse]
+        return labels
+
+    def clusters(self) -> List[np.ndarray]:
+        """クラスタごとの行番号配列（大きい順、各配列は行番号昇順）"""
+        labels = self.labels()
+        clustered = np.flatnonzero(labels >= 0)
+        if not len(clustered):
+            return []
+        order = clustered[np.argsort(labels[clustered], kind='stable')]
+        boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+        return np.split(order, boundaries)
+
+    # 内部処理
+
+    def _add_rows(self, collection, start: int, end: int):
+        latitude = collection.column('latitude')[start:end]
+        longitude = collection.column('longitude')[start:end]
+        times = collection.column('taken_at')[start:end]
+        valid = ~(np.isnan(latitude) | np.isnan(longitude))
+        if self.eps_seconds is not None:
+            valid &= ~np.isnan(times)
+
+        points = np.zeros((end - start, 3))
+        points[valid] = _to_ecef(latitude[valid], longitude[valid])
+        cells = np.zeros((end - start, 4), dtype=np.int64)
+        cells[:, :3] = np.floor(points / self._eps_chord)
+        if self.eps_seconds is not None:
+            cells[valid, 3] = np.floor(times[valid] / self.eps_seconds)
+
+        old_core = self._neighbor_counts >= self.min_samples
+        self._points = np.concatenate((self._points, points))
+        self._times = np.concatenate((self._times, times))
+        self._valid = np.concatenate((self._valid, valid))
+        self._cells = np.concatenate((self._cells, cells))
+        self._neighbor_counts = np.concatenate((self._neighbor_counts, np.zeros(end - start, dtype=np.int64)))
+        self._parent = np.concatenate((self._parent, np.arange(start, end, dtype=np.int64)))
+        self._anchor = np.concatenate((self._anchor, np.full(end - start, -1, dtype=np.int64)))
+        self._size = end
+
+        # 格子索引を再構築（有効な点のみ、セルキー順）
+        valid_rows = np.flatnonzero(self._valid)
+        keys = self._cell_keys(self._cells[valid_rows])
+        order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[order]
+        self._sorted_rows = valid_rows[order]
+        self._unique_keys, self._key_starts = np.unique(self._sorted_keys, return_index=True)
+        self._key_ends = np.append(self._key_starts[1:], len(self._sorted_keys))
+
+        # 新しい点の近傍（新しい点同士を含む）
+        new_rows = start + np.flatnonzero(valid)
+        query, neighbor = self._neighbor_pairs(new_rows)
+        # 既存点には近傍に加わった新しい点の数を、新しい点には近傍全体の数を加算する
+        # （新しい点同士は neighbor 側で、既存点の分は query 側で数える）
+        self._neighbor_counts += np.bincount(neighbor, minlength=self._size)
+        from_old = neighbor < start
+        self._neighbor_counts += np.bincount(query[from_old], minlength=self._size)
+
+        # コアになった既存点は近傍全体を辿り直す
+        core = self._neighbor_counts >= self.min_samples
+        promoted = np.flatnonzero(core[:start] & ~old_core)
+        if len(promoted):
+            promoted_query, promoted_neighbor = self._neighbor_pairs(promoted)
+            query = np.concatenate((query, promoted_query))
+            neighbor = np.concatenate((neighbor, promoted_neighbor))
+
+        # コア同士を統合
+        core_edge = core[query] & core[neighbor]
+        self._parent = _union_edges(self._parent, query[core_edge], neighbor[core_edge])
+
+        # 境界点の所属コアを設定（未設定の点のみ）
+        for border, anchor in ((neighbor, query), (query, neighbor)):
+            assign = core[anchor] & ~core[border] & (self._anchor[border] < 0)
+            self._anchor[border[assign]] = anchor[assign]
+
+    @staticmethod
+    def _cell_keys(cells: np.ndarray) -> np.ndarray:
+        """セル座標をハッシュ値へ変換（衝突は候補の照合で除外する）"""
+        mixed = cells.astype(np.uint64) * np.array(
+            [0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93],
+            dtype=np.uint64)
+        keys = mixed[:, 0] ^ mixed[:, 1] ^ mixed[:, 2] ^ mixed[:, 3]
+        return keys.view(np.int64)
+
+    def _neighbor_pairs(self, rows: np.ndarray):
+        """
+        指定点の近傍（自身を含む）を (点, 近傍点) の行番号配列で返す
+        """
+        query_parts, neighbor_parts = [], []
+        if not len(rows) or not len(self._unique_keys):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        # 近傍セルの検索は点ごとではなくセルごとに行う
+        query_cells, inverse = np.unique(self._cells[rows], axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        chord_sq = self._eps_chord ** 2
+        last = len(self._unique_keys) - 1
+        for offset in self._offsets:
+            target = query_cells.copy()
+            target[:, :len(offset)] += offset
+            keys = self._cell_keys(target)
+            position = np.minimum(np.searchsorted(self._unique_keys, keys), last)
+            found = self._unique_keys[position] == keys
+            cell_low = self._key_starts[position]
+            cell_counts = np.where(found, self._key_ends[position] - cell_low, 0)
+            low = cell_low[inverse]
+            counts = cell_counts[inverse]
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            point_index = np.repeat(np.arange(len(rows)), counts)
+            # 各点の [low, high) を連結した位置
+            starts = np.repeat(low - np.cumsum(counts) + counts, counts)
+            neighbor = self._sorted_rows[starts + np.arange(total)]
+            query = rows[point_index]
+
+            # 距離判定
+            delta = self._points[query] - self._points[neighbor]
+            keep = np.einsum('ij,ij->i', delta, delta) <= chord_sq
+            if self.eps_seconds is not None:
+                keep &= np.abs(self._times[query] - self._times[neighbor]) <= self.eps_seconds
+            query, neighbor, point_index = query[keep], neighbor[keep], point_index[keep]
+
+            # ハッシュ衝突で別のセルから拾った候補を除外（他のオフセットとの重複を防ぐ）
+            keep = (self._cells[neighbor] == target[inverse[point_index]]).all(axis=1)
+            query_parts.append(query[keep])
+            neighbor_parts.append(neighbor[keep])
+        if not query_parts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        return np.concatenate(query_parts), np.concatenate(neighbor_parts)
+
+
+def cluster_collection(collection, eps_meters: float = DEFAULT_EPS_METERS,
+                       eps_seconds: Optional[float] = DEFAULT_EPS_SECONDS,
+                       min_samples: int = DEFAULT_MIN_SAMPLES) -> List[np.ndarray]:
+    """コレクションを一度だけクラスタリングして行番号配列のリストを返す"""
+    clusterer = SpatioTemporalClusterer(eps_meters, eps_seconds, min_samples)
+    clusterer.fit(collection)
+    return clusterer.clusters()
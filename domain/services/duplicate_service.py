@@ -0,0 +1,365 @@
+"""
+重複写真検出 - PhotoMap Explorer
+
+完全一致（バイト単位で同一）と、見た目がほぼ同じ写真（再圧縮・リサイズ等）を検出する
+
+完全一致は段階的に候補を絞り込む：
+1. ファイルサイズでバケット分け（読み込みなし）
+2. 先頭64KBのBLAKE2ハッシュで比較
+3. 残りの部分のBLAKE2ハッシュで比較（先頭64KBは読み直さない）
+各ファイルのバイトは高々1回しか読まない
+
+類似画像はサムネイルキャッシュの画像から dHash / pHash（64bit）を計算し、
+BK木に格納してハミング距離で検索する（インデクサーが特徴ベクトルと一緒に計算して
+写真インデックスへ保存するため、元画像をデコードし直さない）
+"""
+
+import hashlib
+import os
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+HEAD_BYTES = 64 * 1024
+READ_CHUNK = 1024 * 1024
+DIGEST_SIZE = 16
+
+# 類似とみなすハミング距離の既定値（64bit中）
+DEFAULT_MAX_DISTANCE = 6
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+# 完全一致の検出
+
+def _head_digest(path: str, size: int) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(min(size, HEAD_BYTES)), digest_size=DIGEST_SIZE).digest()
+    except OSError:
+        return None
+
+
+def _tail_digest(path: str) -> Optional[bytes]:
+    """先頭64KBより後ろの部分をストリーミングでハッシュ"""
+    hasher = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with open(path, 'rb') as f:
+            f.seek(HEAD_BYTES)
+            for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+                hasher.update(chunk)
+    except OSError:
+        return None
+    return hasher.digest()
+
+
+def _regroup(groups: Iterable[List[Tuple[str, int]]], key_func) -> List[List[Tuple[str, int]]]:
+    """各グループをキーで細分化し、2件以上残ったものだけを返す"""
+    refined = []
+    for group in groups:
+        buckets = defaultdict(list)
+        for entry in group:
+            key = key_func(entry)
+            if key is not None:
+                buckets[key].append(entry)
+        refined.extend(bucket for bucket in buckets.values() if len(bucket) > 1)
+    return refined
+
+
+def find_exact_duplicates(paths: Iterable[str],
+                          progress: Callable[[str, int, int], None] = None) -> List[List[str]]:
+    """
+    バイト単位で同一のファイルをグループ化
+
+    Args:
+        paths: 対象ファイルのパス
+        progress: 進捗通知 (段階名, 処理済み数, 対象数)
+
+    Returns:
+        List[List[str]]: 重複グループ（各グループ2件以上、パス昇順）
+    """
+    # 1. サイズでバケット分け（同一inodeのハードリンクは1つにまとめる）
+    by_size = defaultdict(list)
+    links = defaultdict(list)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size == 0:
+            continue
+        inode = (stat.st_dev, stat.st_ino)
+        if stat.st_ino and inode in links:
+            links[inode].append(path)
+            continue
+        links[inode].append(path)
+        by_size[stat.st_size].append((path, stat.st_size))
+
+    candidates = [group for group in by_size.values() if len(group) > 1]
+
+    # 2. 先頭64KB
+    total = sum(len(group) for group in candidates)
+    done = [0]
+
+    def head_key(entry):
+        done[0] += 1
+        if progress and done[0] % 256 == 0:
+            progress('head', done[0], total)
+        return _head_digest(*entry)
+
+    candidates = _regroup(candidates, head_key)
+
+    # 3. 残りの部分（64KB以下のファイルは先頭ハッシュで確定済み）
+    total = sum(len(group) for group in candidates if group[0][1] > HEAD_BYTES)
+    done[0] = 0
+
+    def tail_key(entry):
+        path, size = entry
+        if size <= HEAD_BYTES:
+            return b''
+        done[0] += 1
+        if progress:
+            progress('full', done[0], total)
+        return _tail_digest(path)
+
+    candidates = _regroup(candidates, tail_key)
+
+    # ハードリンクは代表パスの位置に展開する
+    aliases = {inode_paths[0]: inode_paths for inode_paths in links.values() if len(inode_paths) > 1}
+    groups = []
+    for group in candidates:
+        members = []
+        for path, _ in group:
+            members.extend(aliases.pop(path, [path]))
+        groups.append(sorted(members))
+
+    # ハードリンクのみで構成される重複も報告
+    groups.extend(sorted(inode_paths) for inode_paths in aliases.values())
+    return sorted(groups)
+
+
+# 知覚ハッシュ
+
+def _grayscale(image: QImage, width: int, height: int) -> np.ndarray:
+    """指定サイズのグレースケール配列（float32）へ変換"""
+    small = image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format_Grayscale8)
+    buffer = small.constBits()
+    buffer.setsize(small.sizeInBytes())
+    rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, small.bytesPerLine())
+    return rows[:, :width].astype(np.float32)
+
+
+def _pack_bits(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.ravel():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def dhash(image: QImage) -> int:
+    """差分ハッシュ（隣接画素の明暗関係、64bit）"""
+    pixels = _grayscale(image, 9, 8)
+    return _pack_bits(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def phash(image: QImage) -> int:
+    """DCTハッシュ（32x32の低周波8x8成分を中央値で2値化、64bit）"""
+    pixels = _grayscale(image, 32, 32)
+    coefficients = (_DCT32 @ pixels @ _DCT32.T)[:8, :8].ravel()
+    median = np.median(coefficients[1:])  # 直流成分は除外
+    return _pack_bits(coefficients > median)
+
+
+def compute_perceptual_hashes(image: QImage) -> Optional[Tuple[int, int]]:
+    """デコード済みの画像（サムネイル）の (dHash, pHash)。画像がなければ None"""
+    if image is None or image.isNull():
+        return None
+    return dhash(image), phash(image)
+
+
+def compute_perceptual_hash(path: str, method: str = 'dhash', image: QImage = None) -> Optional[int]:
+    """
+    画像ファイルの知覚ハッシュを計算
+
+    インデックスに保存されるハッシュと同じく、サムネイルキャッシュの画像から計算する
+
+    Args:
+        path: 画像ファイルのパス
+        method: 'dhash' または 'phash'
+        image: デコード済みのサムネイル（なければサムネイルキャッシュから取得）
+    """
+    if image is None or image.isNull():
+        from logic.thumbnail_cache import get_thumbnail_cache
+        image = get_thumbnail_cache().get_or_create(path)
+    if image.isNull():
+        return None
+    return phash(image) if method == 'phash' else dhash(image)
+
+
+class BKTree:
+    """
+    ハミング距離のBK木
+
+    三角不等式により、距離 d の子のうち |d - 検索距離| が許容範囲の子だけを辿る
+    """
+
+    __slots__ = ('_root', '_size')
+
+    def __init__(self):
+        self._root = None  # [hash, items, {距離: 子ノード}]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, value: int, item):
+        """ハッシュ値と対応する項目を追加（同じハッシュ値は同じノードにまとめる）"""
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, object]]:
+        """距離 max_distance 以内の項目を (距離, 項目) の距離昇順で返す"""
+        results = []
+        if self._root is None:
+            return results
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node[1])
+            low, high = distance - max_distance, distance + max_distance
+            for child_distance, child in node[2].items():
+                if low <= child_distance <= high:
+                    stack.append(child)
+        results.sort(key=lambda result: result[0])
+        return results
+
+
+class PerceptualIndex:
+    """
+    類似画像検索インデックス
+
+    ファイルの知覚ハッシュをBK木に格納し、ハミング距離で近傍を検索する
+    """
+
+    def __init__(self, method: str = 'dhash'):
+        self.method = method
+        self._tree = BKTree()
+        self._hashes: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, path: str):
+        return path in self._hashes
+
+    def add(self, path: str, image: QImage = None) -> Optional[int]:
+        """画像を登録してハッシュ値を返す（計算できない場合はNone）"""
+        if path in self._hashes:
+            return self._hashes[path]
+        value = compute_perceptual_hash(path, self.method, image)
+        if value is not None:
+            self.add_hash(path, value)
+        return value
+
+    def add_hash(self, path: str, value: int):
+        """計算済みのハッシュ値を登録"""
+        if self._hashes.get(path) == value:
+            return
+        self._hashes[path] = value
+        self._tree.add(value, path)
+
+    def add_many(self, items: Iterable[Tuple[str, int]]):
+        """計算済みの (パス, ハッシュ値) をまとめて登録"""
+        for path, value in items:
+            self.add_hash(path, value)
+
+    def remove(self, paths: Iterable[str]):
+        """
+        登録を取り消す
+
+        BK木からは削除せず、検索結果から除外する（再登録で古いハッシュ値になった項目も同様）
+        """
+        for path in paths:
+            self._hashes.pop(path, None)
+
+    def hash_of(self, path: str) -> Optional[int]:
+        return self._hashes.get(path)
+
+    def search(self, value: int, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Tuple[int, str]]:
+        """ハッシュ値から距離 max_distance 以内の登録画像を (距離, パス) の距離昇順で返す"""
+        hashes = self._hashes
+        results, seen = [], set()
+        for distance, path in self._tree.search(value, max_distance):
+            if path in seen or path not in hashes or hamming_distance(value, hashes[path]) != distance:
+                continue
+            seen.add(path)
+            results.append((distance, path))
+        return results
+
+    def find_similar(self, path: str, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Tuple[int, str]]:
+        """指定画像に似た画像を (距離, パス) の距離昇順で返す（自身は除く）"""
+        value = self._hashes.get(path)
+        if value is None:
+            value = compute_perceptual_hash(path, self.method)
+            if value is None:
+                return []
+        return [(distance, other) for distance, other in self.search(value, max_distance)
+                if other != path]
+
+    def groups(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[List[str]]:
+        """
+        類似画像をグループ化（距離 max_distance 以内の連結成分）
+
+        Returns:
+            List[List[str]]: 2件以上のグループ（パス昇順）
+        """
+        parent = {path: path for path in self._hashes}
+
+        def find(path):
+            while parent[path] != path:
+                parent[path] = parent[parent[path]]
+                path = parent[path]
+            return path
+
+        for path, value in self._hashes.items():
+            for _, other in self.search(value, max_distance):
+                root_a, root_b = find(path), find(other)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+
+        components = defaultdict(list)
+        for path in self._hashes:
+            components[find(path)].append(path)
+        return sorted(sorted(group) for group in components.values() if len(group) > 1)
@@ -0,0 +1,160 @@
+"""
+写真ドメインサービス
+
+複数の写真にまたがる処理（重複検出・クラスタリングなど）を提供します。
+重い計算は各エンジンモジュールに委譲します。
+"""
+
+import threading
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+from domain.models.photo import Photo
+from domain.services.cluster_service import (
+    DEFAULT_EPS_METERS, DEFAULT_EPS_SECONDS, DEFAULT_MIN_SAMPLES, SpatioTemporalClusterer,
+)
+from domain.services.duplicate_service import (
+    DEFAULT_MAX_DISTANCE, PerceptualIndex, compute_perceptual_hash, find_exact_duplicates,
+)
+from domain.services.query_service import PhotoQuery
+
+
+def _paths_of(photos: Iterable[Union[Photo, str]]) -> List[str]:
+    return [photo.file_path if isinstance(photo, Photo) else photo for photo in photos]
+
+
+class PhotoDomainService:
+    """
+    写真ドメインサービス
+
+    写真に関する複雑なビジネスロジックを提供します。
+    """
+
+    def __init__(self, perceptual_method: str = 'dhash'):
+        self._perceptual_method = perceptual_method
+        self._perceptual_index = None
+        self._perceptual_lock = threading.RLock()
+        self._clusterer = None
+
+    def _perceptual(self) -> PerceptualIndex:
+        """
+        知覚ハッシュのBK木
+
+        初回呼び出し時に写真インデックスに保存済みのハッシュを読み込み、以後は写真の削除に追従する
+        """
+        with self._perceptual_lock:
+            if self._perceptual_index is None:
+                from infrastructure.photo_index import get_photo_index
+                photo_index = get_photo_index()
+                perceptual_index = PerceptualIndex(self._perceptual_method)
+                perceptual_index.add_many(photo_index.perceptual_hashes(self._perceptual_method))
+                photo_index.add_listener(lambda added, updated, removed: self._forget(removed))
+                self._perceptual_index = perceptual_index
+            return self._perceptual_index
+
+    def _forget(self, removed: List[Photo]):
+        with self._perceptual_lock:
+            self._perceptual_index.remove(photo.file_path for photo in removed)
+
+    def find_duplicate_photos(self, photos: Iterable[Union[Photo, str]], progress=None) -> List[List[str]]:
+        """
+        内容が完全に一致する写真を検出
+
+        Args:
+            photos: 対象の写真（Photo またはパス）
+            progress: 進捗通知 (段階名, 処理済み数, 対象数)
+
+        Returns:
+            List[List[str]]: 重複グループ（パスのリスト）
+        """
+        return find_exact_duplicates(_paths_of(photos), progress)
+
+    def find_similar_photos(self, photos: Iterable[Union[Photo, str]],
+                            max_distance: int = DEFAULT_MAX_DISTANCE) -> List[List[str]]:
+        """
+        見た目がほぼ同じ写真（再圧縮・リサイズ等）を検出
+
+        知覚ハッシュはインデクサーが登録済みのものを再利用し、未登録の写真だけサムネイルから計算する
+
+        Returns:
+            List[List[str]]: 類似グループ（パスのリスト）
+        """
+        paths = _paths_of(photos)
+        perceptual_index = self._perceptual()
+        with self._perceptual_lock:
+            known = {path: perceptual_index.hash_of(path) for path in paths}
+        index = PerceptualIndex(self._perceptual_method)
+        for path in paths:
+            value = known[path]
+            if value is None:
+                value = compute_perceptual_hash(path, self._perceptual_method)
+            if value is not None:
+                index.add_hash(path, value)
+        return index.groups(max_distance)
+
+    def register_perceptual_hashes(self, items: Iterable[Tuple[str, int, int]]) -> None:
+        """インデクサーがサムネイルから計算した (パス, dHash, pHash) を登録（再デコードを避ける）"""
+        column = 2 if self._perceptual_method == 'phash' else 1
+        perceptual_index = self._perceptual()
+        with self._perceptual_lock:
+            perceptual_index.add_many((item[0], item[column]) for item in items)
+
+    def find_similar_to(self, path: str, max_distance: int = DEFAULT_MAX_DISTANCE):
+        """登録済みの写真の中から指定写真に似たものを (距離, パス) で返す"""
+        perceptual_index = self._perceptual()
+        with self._perceptual_lock:
+            value = perceptual_index.hash_of(path)
+        if value is None:
+            value = compute_perceptual_hash(path, self._perceptual_method)
+            if value is None:
+                return []
+        with self._perceptual_lock:
+            return [(distance, other) for distance, other in perceptual_index.search(value, max_distance)
+                    if other != path]
+
+    def suggest_photo_clusters(self, collection,
+                               eps_meters: float = DEFAULT_EPS_METERS,
+                               eps_seconds: float = DEFAULT_EPS_SECONDS,
+                               min_samples: int = DEFAULT_MIN_SAMPLES):
+        """
+        撮影場所・撮影時間の近い写真をクラスタリング
+
+        同じコレクション・同じ条件での再呼び出しは、前回以降に追加された写真だけを処理する
+
+        Args:
+            collection: PhotoCollection
+            eps_meters: 同じ場所とみなす距離（m）
+            eps_seconds: 同じ時間帯とみなす時間差（秒、Noneで時間を考慮しない）
+            min_samples: クラスタの核となるのに必要な近傍の写真数（自身を含む）
+
+        Returns:
+            List[np.ndarray]: クラスタごとの行番号配列（大きい順）
+        """
+        clusterer = self._clusterer
+        if (clusterer is None or clusterer.eps_meters != eps_meters
+                or clusterer.eps_seconds != eps_seconds or clusterer.min_samples != min_samples):
+            clusterer = SpatioTemporalClusterer(eps_meters, eps_seconds, min_samples)
+            self._clusterer = clusterer
+        clusterer.update(collection)
+        return clusterer.clusters()
+
+    def filter_photos(self, collection, query: str):
+        """
+        検索式に一致する行番号を返す（列のベクトル演算のみで判定）
+
+        Raises:
+            QueryError: 検索式の書式エラー
+        """
+        return np.flatnonzero(PhotoQuery(query).mask(collection))
+
+
+# グローバル写真ドメインサービス
+_photo_domain_service = None
+
+def get_photo_domain_service() -> PhotoDomainService:
+    """グローバル写真ドメインサービス取得"""
+    global _photo_domain_service
+    if _photo_domain_service is None:
+        _photo_domain_service = PhotoDomainService()
+    return _photo_domain_service
@@ -0,0 +1,337 @@
+"""
+写真検索クエリ - PhotoMap Explorer
+
+フィルターバーに入力された検索式を解析し、写真インデックス（SQLite）の
+WHERE句、または列指向コレクションのマスクへ変換する
+
+書式（空白区切りの条件をすべて満たす写真に一致、先頭に "-" を付けると否定）:
+    camera:"X100V"              カメラ名に含む
+    date:2024-05..2024-06       撮影日（年・年月・年月日、".." で範囲、片側省略可）
+    date>=2024  date<2024-06    撮影日の比較
+    iso>1600  f<=2.8  focal:35..50  shutter<1/250  size>5MB  width>=4000
+    bbox:南,西,北,東             撮影地の緯度経度の矩形
+    gps:yes / gps:no            GPS座標の有無
+    ext:jpg,heic                拡張子
+    in:"D:/Photos/2024"         フォルダ（配下を含む）
+    name:IMG_ / IMG_            ファイル名に含む（フィールド名なしの語も同じ）
+"""
+
+import os
+import re
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.photo import _EPOCH
+
+# 数値フィールド（検索式の名前 -> 列名）
+NUMERIC_FIELDS = {
+    'iso': 'iso',
+    'f': 'f_number',
+    'aperture': 'f_number',
+    'focal': 'focal_length',
+    'shutter': 'exposure_time',
+    'exposure': 'exposure_time',
+    'width': 'width',
+    'height': 'height',
+    'size': 'file_size',
+    'lat': 'latitude',
+    'lon': 'longitude',
+}
+
+# 0 が「記録なし」を意味する列（数値条件には一致させない）
+_ZERO_IS_MISSING = {'iso', 'f_number', 'focal_length', 'exposure_time', 'width', 'height'}
+
+_SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2,
+               'g': 1024 ** 3, 'gb': 1024 ** 3}
+
+_TERM_PATTERN = re.compile(r'''
+    (?P<negated>-)?
+    (?:(?P<field>[A-Za-z_]+)(?P<operator>>=|<=|!=|:|=|>(?!=)|<(?!=)))?
+    (?:"(?P<quoted>[^"]*)"?|(?P<word>\S+))
+''', re.VERBOSE)
+
+# 値のないフィールド（"iso:" など）はフィールド名なしの語として一致する
+_EMPTY_FIELD_PATTERN = re.compile(r'[A-Za-z_]+(?:>=|<=|!=|:|=|>|<)')
+
+# 数値の単位表記（列名 -> 数値部分を取り出すパターン）
+_NUMBER_PATTERNS = {
+    'f_number': re.compile(r'(?:f/?)?\s*(?P<number>.+)'),
+    'focal_length': re.compile(r'(?P<number>.+?)\s*(?:mm)?'),
+    'exposure_time': re.compile(r'(?P<number>.+?)\s*s?'),
+}
+
+
+class QueryError(ValueError):
+    """検索式の書式エラー"""
+
+
+class Term:
+    """検索式の1条件"""
+
+    __slots__ = ('field', 'operator', 'value', 'negated')
+
+    def __init__(self, field: str, operator: str, value: str, negated: bool = False):
+        self.field = field
+        self.operator = operator
+        self.value = value
+        self.negated = negated
+
+    def __repr__(self):
+        return f"Term({'-' if self.negated else ''}{self.field}{self.operator}{self.value!r})"
+
+
+def parse_query(text: str) -> List[Term]:
+    """検索式を条件のリストへ分解（フィールド名なしの語はファイル名条件）"""
+    terms = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        if text[position].isspace():
+            position += 1
+            continue
+        match = _TERM_PATTERN.match(text, position)
+        position = match.end()
+        quoted = match.group('quoted')
+        value = quoted if quoted is not None else match.group('word')
+        # 値のないフィールド（"iso:" や 'camera:""'）は不明なフィールドと同じく書式エラー
+        if match.group('field') is not None and not value:
+            raise QueryError(f"値がありません: {match.group('field')}{match.group('operator')}")
+        if quoted is None and _EMPTY_FIELD_PATTERN.fullmatch(value):
+            raise QueryError(f"値がありません: {value}")
+        field = (match.group('field') or 'name').lower()
+        operator = match.group('operator') or ':'
+        if operator == '=':
+            operator = ':'
+        terms.append(Term(field, operator, value, bool(match.group('negated'))))
+    return terms
+
+
+# 値の解析
+
+def _parse_number(text: str, column: str) -> float:
+    text = text.strip().lower()
+    try:
+        if column == 'file_size':
+            number, unit = re.fullmatch(r'([\d.]+)\s*([a-z]*)', text).groups()
+            return float(number) * _SIZE_UNITS[unit]
+        # 単位付き（f/2.8, 35mm, 1/250s, 0.5s）も受け付ける
+        pattern = _NUMBER_PATTERNS.get(column)
+        number = text if pattern is None else pattern.fullmatch(text).group('number')
+        if column == 'exposure_time' and '/' in number:
+            numerator, denominator = number.split('/', 1)
+            return float(numerator) / float(denominator)
+        return float(number)
+    except (AttributeError, KeyError, ValueError, ZeroDivisionError):
+        raise QueryError(f"数値として解釈できません: {text}")
+
+
+def _parse_date(text: str) -> Tuple[float, float]:
+    """年・年月・年月日を [開始, 終了) のepoch秒へ変換"""
+    text = text.strip().replace('/', '-')
+    try:
+        parts = [int(part) for part in text.split('-')]
+        if len(parts) == 1:
+            start, end = datetime(parts[0], 1, 1), datetime(parts[0] + 1, 1, 1)
+        elif len(parts) == 2:
+            start = datetime(parts[0], parts[1], 1)
+            end = datetime(parts[0] + parts[1] // 12, parts[1] % 12 + 1, 1)
+        elif len(parts) == 3:
+            start = datetime(*parts)
+            end = datetime.fromordinal(start.toordinal() + 1)
+        else:
+            raise ValueError(text)
+    except ValueError:
+        raise QueryError(f"日付として解釈できません: {text}（例: 2024, 2024-05, 2024-05-03）")
+    return (start - _EPOCH).total_seconds(), (end - _EPOCH).total_seconds()
+
+
+def _range(text: str, parse) -> Tuple[Optional[float], Optional[float], bool]:
+    """"a..b" を (下限, 上限, 上限を含むか) へ。日付は上限の単位の終わりまで含める"""
+    if '..' in text:
+        low, high = text.split('..', 1)
+    else:
+        low = high = text
+    if parse is _parse_date:
+        return (_parse_date(low)[0] if low else None, _parse_date(high)[1] if high else None, False)
+    return (parse(low) if low else None, parse(high) if high else None, True)
+
+
+def _bounds(term: Term, column: str):
+    """条件を (下限, 下限を含むか, 上限, 上限を含むか) へ変換"""
+    if column == 'taken_at':
+        if term.operator == ':':
+            low, high, _ = _range(term.value, _parse_date)
+            return low, True, high, False
+        start, end = _parse_date(term.value)
+        return {
+            '>': (end, True, None, False),
+            '>=': (start, True, None, False),
+            '<': (None, False, start, False),
+            '<=': (None, False, end, False),
+        }.get(term.operator) or _unsupported(term)
+
+    parse = lambda text: _parse_number(text, column)
+    if term.operator == ':':
+        low, high, inclusive = _range(term.value, parse)
+        return low, True, high, inclusive
+    value = parse(term.value)
+    return {
+        '>': (value, False, None, False),
+        '>=': (value, True, None, False),
+        '<': (None, False, value, False),
+        '<=': (None, False, value, True),
+    }.get(term.operator) or _unsupported(term)
+
+
+def _unsupported(term: Term):
+    raise QueryError(f"{term.field} では {term.operator} を使用できません")
+
+
+def _parse_bbox(text: str) -> Tuple[float, float, float, float]:
+    try:
+        south, west, north, east = (float(part) for part in text.split(','))
+    except ValueError:
+        raise QueryError(f"bbox は 南,西,北,東 の4つの数値で指定してください: {text}")
+    return south, west, north, east
+
+
+def _parse_flag(term: Term) -> bool:
+    value = term.value.lower()
+    if value in ('yes', 'true', '1', 'on', 'あり'):
+        return True
+    if value in ('no', 'false', '0', 'off', 'なし'):
+        return False
+    raise QueryError(f"{term.field} は yes / no で指定してください: {term.value}")
+
+
+def _extensions(text: str) -> List[str]:
+    return ['.' + extension.strip().lower().lstrip('.') for extension in text.split(',') if extension.strip()]
+
+
+def _like_pattern(text: str) -> str:
+    """LIKE の部分一致パターン（% _ \\ をエスケープ）"""
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+class PhotoQuery:
+    """
+    解析済みの検索式
+
+    to_sql() はインデックスの索引付き列（撮影日時・緯度・経度・フォルダ）を
+    そのまま範囲条件として使えるよう、列に対する比較の形で出力する
+    """
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.terms = parse_query(text)
+        # 書式エラーは入力時点で知らせる
+        self.to_sql()
+
+    def is_empty(self) -> bool:
+        return not self.terms
+
+    # SQL
+
+    def to_sql(self) -> Tuple[str, tuple]:
+        """WHERE句（"WHERE" は含まない）とバインド値。条件なしは "1" """
+        clauses = []
+        parameters = []
+        for term in self.terms:
+            clause, values = self._term_sql(term)
+            if term.negated:
+                clause = f"NOT COALESCE(({clause}), 0)"
+            clauses.append(clause)
+            parameters.extend(values)
+        return (" AND ".join(clauses) or "1"), tuple(parameters)
+
+    def _term_sql(self, term: Term) -> Tuple[str, list]:
+        field = term.field
+        if field == 'date' or field in NUMERIC_FIELDS:
+            column = 'taken_at' if field == 'date' else NUMERIC_FIELDS[field]
+            if term.operator == '!=':
+                _unsupported(term)
+            low, low_inclusive, high, high_inclusive = _bounds(term, column)
+            clauses, values = [], []
+            if column in _ZERO_IS_MISSING:
+                clauses.append(f"{column} > 0")
+            if low is not None:
+                clauses.append(f"{column} {'>=' if low_inclusive else '>'} ?")
+                values.append(low)
+            if high is not None:
+                clauses.append(f"{column} {'<=' if high_inclusive else '<'} ?")
+                values.append(high)
+            if not values:
+                clauses.append(f"{column} IS NOT NULL")
+            return " AND ".join(clauses), values
+        if term.operator != ':':
+            _unsupported(term)
+        if field == 'camera':
+            return "camera LIKE ? ESCAPE '\\'", [_like_pattern(term.value)]
+        if field == 'name':
+            # ファイル名部分（フォルダ部分を除く）のみを対象にする
+            # substr は1行ごとのコストが大きいため、パス全体の LIKE で先に候補を絞る
+            pattern = _like_pattern(term.value)
+            return ("path LIKE ? ESCAPE '\\' AND substr(path, length(directory) + 2) LIKE ? ESCAPE '\\'",
+                    [pattern, pattern])
+        if field in ('ext', 'type'):
+            extensions = _extensions(term.value)
+            return f"extension IN ({', '.join('?' * len(extensions))})", extensions
+        if field in ('in', 'dir', 'folder'):
+            # 配下のフォルダは「区切り文字で始まる範囲」として比較し、フォルダ列の索引を使う
+            directory = os.path.normpath(term.value)
+            clauses, values = ["directory = ?"], [directory]
+            for separator in ('/', '\\'):
+                prefix = directory.rstrip(separator) + separator
+                clauses.append("(directory >= ? AND directory < ?)")
+                values.extend([prefix, prefix[:-1] + chr(ord(separator) + 1)])
+            return f"({' OR '.join(clauses)})", values
+        if field == 'gps':
+            return ("latitude IS NOT NULL AND longitude IS NOT NULL" if _parse_flag(term)
+                    else "(latitude IS NULL OR longitude IS NULL)"), []
+        if field == 'bbox':
+            south, west, north, east = _parse_bbox(term.value)
+            longitude = "longitude BETWEEN ? AND ?" if west <= east else "(longitude >= ? OR longitude <= ?)"
+            return f"latitude BETWEEN ? AND ? AND {longitude}", [south, north, west, east]
+        raise QueryError(f"不明なフィールドです: {field}")
+
+    # 列指向コレクション
+
+    def mask(self, collection) -> np.ndarray:
+        """PhotoCollection の各行が条件に一致するかのマスク"""
+        mask = np.ones(len(collection), dtype=bool)
+        for term in self.terms:
+            term_mask = self._term_mask(term, collection)
+            mask &= ~term_mask if term.negated else term_mask
+        return mask
+
+    def _term_mask(self, term: Term, collection) -> np.ndarray:
+        field = term.field
+        if field == 'date' or field in NUMERIC_FIELDS:
+            column = 'taken_at' if field == 'date' else NUMERIC_FIELDS[field]
+            values = collection.column(column)
+            low, low_inclusive, high, high_inclusive = _bounds(term, column)
+            # NaN（記録なし）はどの比較にも一致しない
+            mask = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(len(values), dtype=bool)
+            if column in _ZERO_IS_MISSING:
+                mask &= values > 0
+            if low is not None:
+                mask &= (values >= low) if low_inclusive else (values > low)
+            if high is not None:
+                mask &= (values <= high) if high_inclusive else (values < high)
+            return mask
+        if field == 'camera':
+            return collection.camera_mask(term.value)
+        if field == 'name':
+            return collection.name_mask(term.value)
+        if field in ('ext', 'type'):
+            return collection.extension_mask(_extensions(term.value))
+        if field in ('in', 'dir', 'folder'):
+            return collection.directory_mask(term.value)
+        if field == 'gps':
+            return collection.gps_mask() if _parse_flag(term) else ~collection.gps_mask()
+        if field == 'bbox':
+            return collection.bbox_mask(*_parse_bbox(term.value))
+        raise QueryError(f"不明なフィールドです: {field}")
@@ -0,0 +1,227 @@
+"""
+類似画像検索 - PhotoMap Explorer
+
+キャッシュ済みのサムネイルから色と構図の特徴ベクトルを計算し、
+選択した写真に見た目が近い写真をCPUのみで検索する
+
+特徴ベクトル（107次元、色・構図それぞれL2正規化して重み付け）:
+- 色: HSV色空間のヒストグラム（色相8×彩度3×明度3）の平方根（Hellinger距離に対応）
+- 構図: 32x32グレースケールのDCT低周波成分（6x6から直流成分を除いた35個）
+
+内積がそのままコサイン類似度になるため、k近傍は全件との行列積1回と
+argpartition で求める（10万枚で数ミリ秒）
+"""
+
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from domain.services.duplicate_service import _DCT32, _grayscale
+
+HUE_BINS = 8
+SATURATION_BINS = 3
+VALUE_BINS = 3
+DCT_SIZE = 6
+
+COLOR_DIM = HUE_BINS * SATURATION_BINS * VALUE_BINS
+TEXTURE_DIM = DCT_SIZE * DCT_SIZE - 1
+FEATURE_DIM = COLOR_DIM + TEXTURE_DIM
+
+# 色と構図の重み（二乗和が1なので連結後も単位ベクトル）
+COLOR_WEIGHT = 0.8
+TEXTURE_WEIGHT = 0.6
+
+# 構図成分の最小エネルギー（これ未満のほぼ単色の画像はJPEGノイズを拾わないよう構図成分を0とする）
+TEXTURE_MIN_ENERGY = 32.0
+
+# 特徴計算に使う縮小サイズ（サムネイルからさらに縮小）
+FEATURE_SAMPLE_EDGE = 64
+
+DEFAULT_NEIGHBORS = 60
+
+
+def _rgb_array(image: QImage, edge: int) -> np.ndarray:
+    """edge×edge に縮小した画像を (画素数, 3) のfloat32配列（0..1、R, G, B）へ変換"""
+    small = image.scaled(edge, edge, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    small = small.convertToFormat(QImage.Format_RGB32)
+    buffer = small.constBits()
+    buffer.setsize(small.sizeInBytes())
+    rows = np.frombuffer(buffer, dtype=np.uint8).reshape(edge, small.bytesPerLine())
+    bgra = rows[:, :edge * 4].reshape(-1, 4)
+    return bgra[:, 2::-1].astype(np.float32) / 255.0
+
+
+def color_histogram(rgb: np.ndarray) -> np.ndarray:
+    """HSVヒストグラム（合計1に正規化）"""
+    maximum = rgb.max(axis=1)
+    minimum = rgb.min(axis=1)
+    chroma = maximum - minimum
+    red, green, blue = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+
+    safe_chroma = np.where(chroma > 0, chroma, 1.0)
+    hue = np.where(maximum == red, ((green - blue) / safe_chroma) % 6.0,
+                   np.where(maximum == green, (blue - red) / safe_chroma + 2.0,
+                            (red - green) / safe_chroma + 4.0)) / 6.0
+    saturation = np.where(maximum > 0, chroma / np.where(maximum > 0, maximum, 1.0), 0.0)
+
+    hue_bin = np.minimum((hue * HUE_BINS).astype(np.int64), HUE_BINS - 1)
+    saturation_bin = np.minimum((saturation * SATURATION_BINS).astype(np.int64), SATURATION_BINS - 1)
+    value_bin = np.minimum((maximum * VALUE_BINS).astype(np.int64), VALUE_BINS - 1)
+    bins = (hue_bin * SATURATION_BINS + saturation_bin) * VALUE_BINS + value_bin
+    histogram = np.bincount(bins, minlength=COLOR_DIM).astype(np.float32)
+    return histogram / max(1.0, float(histogram.sum()))
+
+
+def texture_signature(image: QImage) -> np.ndarray:
+    """DCT低周波成分（直流成分を除き、L2正規化。ほぼ単色の画像は0ベクトル）"""
+    pixels = _grayscale(image, 32, 32)
+    coefficients = (_DCT32 @ pixels @ _DCT32.T)[:DCT_SIZE, :DCT_SIZE].ravel()[1:]
+    norm = float(np.linalg.norm(coefficients))
+    if norm < TEXTURE_MIN_ENERGY:
+        return np.zeros_like(coefficients)
+    return coefficients / norm
+
+
+def compute_features(image: QImage) -> Optional[np.ndarray]:
+    """
+    デコード済み画像（サムネイル）から特徴ベクトルを計算
+
+    Returns:
+        np.ndarray: FEATURE_DIM 次元のfloat32ベクトル（画像が無効な場合はNone）
+    """
+    if image is None or image.isNull():
+        return None
+    color = np.sqrt(color_histogram(_rgb_array(image, FEATURE_SAMPLE_EDGE)))
+    texture = texture_signature(image)
+    return np.concatenate((COLOR_WEIGHT * color, TEXTURE_WEIGHT * texture)).astype(np.float32)
+
+
+class SimilarityIndex:
+    """
+    特徴ベクトルのk近傍検索
+
+    ベクトルは行列にまとめて保持し（容量を倍々で確保）、検索は行列積と argpartition で行う
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths: List[str] = []
+        self._rows = {}
+        self._matrix = np.zeros((0, FEATURE_DIM), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._rows
+
+    def add_many(self, items: Iterable[Tuple[str, np.ndarray]]):
+        """(パス, 特徴ベクトル) をまとめて追加（登録済みのパスは置き換え）"""
+        with self._lock:
+            for path, vector in items:
+                row = self._rows.get(path)
+                if row is None:
+                    if self._size == len(self._matrix):
+                        grown = np.zeros((max(1024, 2 * len(self._matrix)), FEATURE_DIM), dtype=np.float32)
+                        grown[:self._size] = self._matrix[:self._size]
+                        self._matrix = grown
+                    row = self._size
+                    self._size += 1
+                    self._paths.append(path)
+                    self._rows[path] = row
+                self._matrix[row] = vector
+
+    def add(self, path: str, vector: np.ndarray):
+        self.add_many([(path, vector)])
+
+    def remove(self, paths: Iterable[str]):
+        """指定パスを削除（最終行を空いた行へ移す）"""
+        with self._lock:
+            for path in paths:
+                row = self._rows.pop(path, None)
+                if row is None:
+                    continue
+                last = self._size - 1
+                if row != last:
+                    moved = self._paths[last]
+                    self._matrix[row] = self._matrix[last]
+                    self._paths[row] = moved
+                    self._rows[moved] = row
+                self._paths.pop()
+                self._size = last
+
+    def vector(self, path: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(path)
+            return None if row is None else self._matrix[row].copy()
+
+    def search(self, vector: np.ndarray, k: int = DEFAULT_NEIGHBORS,
+               exclude: str = None) -> List[Tuple[float, str]]:
+        """
+        特徴ベクトルに近い写真を類似度の高い順に返す
+
+        Returns:
+            List[Tuple[float, str]]: (コサイン類似度, パス)
+        """
+        with self._lock:
+            if not self._size:
+                return []
+            scores = self._matrix[:self._size] @ vector.astype(np.float32)
+            excluded = self._rows.get(exclude) if exclude is not None else None
+            if excluded is not None:
+                scores[excluded] = -np.inf
+            count = min(k, self._size - (excluded is not None))
+            if count <= 0:
+                return []
+            # 上位k件だけを部分ソートしてから並べる
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(float(scores[row]), self._paths[row]) for row in top.tolist()]
+
+
+def _vectors_from_blobs(rows) -> Iterable[Tuple[str, np.ndarray]]:
+    """保存されたバイト列を特徴ベクトルへ戻す（次元の合わないものは捨てる）"""
+    return ((path, np.frombuffer(blob, dtype=np.float32)) for path, blob in rows if len(blob) == FEATURE_DIM * 4)
+
+
+def _follow_changes(similarity_index: SimilarityIndex, photo_index, updated, removed):
+    """
+    削除された写真と、内容が変わった（サイズ・更新日時が変わった）写真の古い特徴ベクトルを破棄
+
+    変わった写真のうち新しい内容で計算済みのもの（インデックス登録より先に特徴ベクトルを
+    計算した場合）はその場で置き換え、それ以外は特徴ベクトルインデクサーの再計算を待つ
+    """
+    changed = [after for before, after in updated
+               if (before.file_size, before.modified_time) != (after.file_size, after.modified_time)]
+    similarity_index.remove([photo.file_path for photo in changed] + [photo.file_path for photo in removed])
+    if changed:
+        similarity_index.add_many(_vectors_from_blobs(photo_index.current_feature_vectors(
+            (photo.file_path, photo.modified_time) for photo in changed)))
+
+
+# グローバル類似画像インデックス
+_similarity_index: Optional[SimilarityIndex] = None
+_similarity_index_lock = threading.Lock()
+
+def get_similarity_index() -> SimilarityIndex:
+    """
+    グローバル類似画像インデックス取得
+
+    初回呼び出し時に写真インデックスに保存済みの特徴ベクトルを読み込み、
+    以後は写真の削除・変更に追従する（GUIスレッドからは呼ばない。logic.similarity_search を使う）
+    """
+    global _similarity_index
+    with _similarity_index_lock:
+        if _similarity_index is None:
+            from infrastructure.photo_index import get_photo_index
+            photo_index = get_photo_index()
+            similarity_index = SimilarityIndex()
+            similarity_index.add_many(_vectors_from_blobs(photo_index.feature_vectors()))
+            photo_index.add_listener(
+                lambda added, updated, removed: _follow_changes(similarity_index, photo_index, updated, removed))
+            _similarity_index = similarity_index
+        return _similarity_index
@@ -0,0 +1,36 @@
+"""
+並べ替え方法の定義 - PhotoMap Explorer
+
+並べ替え方法の定数とファイル名の自然順キー
+NumPy に依存しないため、起動時（並べ替えコンボボックスの作成時）や
+フォルダ内容一覧からも sort_service を読み込まずに使える
+"""
+
+import re
+
+SORT_NAME = 'name'
+SORT_TAKEN_AT = 'taken_at'
+SORT_SIZE = 'size'
+SORT_DISTANCE = 'distance'
+
+# 並べ替え方法と表示名
+SORT_MODES = {
+    SORT_NAME: "ファイル名",
+    SORT_TAKEN_AT: "撮影日時",
+    SORT_SIZE: "サイズ",
+    SORT_DISTANCE: "距離",
+}
+
+_DIGITS = re.compile(r'\d+')
+
+# 数字列をこの桁数にゼロ埋めして文字列のまま比較する（タプルより比較が速い）
+_NUMBER_WIDTH = 20
+
+
+def _pad_number(match) -> str:
+    return match.group().zfill(_NUMBER_WIDTH)
+
+
+def natural_key(name: str) -> str:
+    """自然順の比較キー（数字列をゼロ埋めした小文字のファイル名）"""
+    return _DIGITS.sub(_pad_number, name.casefold())
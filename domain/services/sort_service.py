@@ -0,0 +1,154 @@
+"""
+写真の並べ替え - PhotoMap Explorer
+
+並べ替えに使う値（撮影日時・ファイルサイズ・ファイル名の自然順位・緯度経度）を
+表示中の写真について一度だけ配列に展開しておき、並べ替え方法の切り替えは
+NumPy の argsort だけで行う（ファイルやEXIFを読み直さない）
+
+- ファイル名は自然順（"IMG_2" < "IMG_10"、大文字小文字を区別しない）
+- 値のない写真（撮影日時なし・GPSなし・未登録）は昇順・降順とも末尾
+- 同じ値の写真はファイル名の自然順
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from domain.models.photo import Photo
+from domain.services.cluster_service import EARTH_RADIUS_M
+
+from domain.services.sort_modes import (SORT_NAME, SORT_TAKEN_AT, SORT_SIZE, SORT_DISTANCE,  # noqa: F401
+                                        SORT_MODES, natural_key)
+
+# 並べ替えキーに使うインデックスの列（SortKeys.from_values の値の順序）
+SORT_COLUMNS = ('taken_at', 'file_size', 'latitude', 'longitude')
+
+
+def haversine_meters(latitude: np.ndarray, longitude: np.ndarray,
+                     point_latitude: float, point_longitude: float) -> np.ndarray:
+    """各点から指定地点までの大円距離（m、座標がNaNの点はNaN）"""
+    lat = np.radians(latitude)
+    point_lat = np.radians(point_latitude)
+    half_dlat = (lat - point_lat) / 2
+    half_dlon = np.radians(longitude - point_longitude) / 2
+    a = np.sin(half_dlat) ** 2 + np.cos(lat) * np.cos(point_lat) * np.sin(half_dlon) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SortKeys:
+    """
+    表示中の写真の並べ替えキー配列
+
+    Args:
+        paths: 写真のパス（この順序が行番号になる）
+        photos: パス -> Photo（インデックスから取得したメタデータ、未登録は省略可）
+    """
+
+    def __init__(self, paths: Iterable[str], photos: Dict[str, Photo] = None):
+        self.paths: List[str] = list(paths)
+        self.positions = {path: row for row, path in enumerate(self.paths)}
+        photos = photos or {}
+        count = len(self.paths)
+
+        self.taken_at = np.full(count, np.nan)
+        self.file_size = np.full(count, np.nan)
+        self.latitude = np.full(count, np.nan)
+        self.longitude = np.full(count, np.nan)
+        for row, path in enumerate(self.paths):
+            photo = photos.get(path)
+            if photo is None:
+                continue
+            if photo.taken_at is not None:
+                self.taken_at[row] = photo.taken_at
+            self.file_size[row] = photo.file_size
+            if photo.has_gps_data:
+                self.latitude[row] = photo.latitude
+                self.longitude[row] = photo.longitude
+
+        self._rank_names([os.path.basename(path) for path in self.paths])
+
+    def _rank_names(self, names: List[str]):
+        """ファイル名の自然順の順位（比較キーの作成は一度だけ）"""
+        keys = [natural_key(name) for name in names]
+        self.name_order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.int64)
+        self.name_rank = np.empty(len(keys), dtype=np.int64)
+        self.name_rank[self.name_order] = np.arange(len(keys))
+
+    @classmethod
+    def from_values(cls, paths: Iterable[str], values: Dict[str, tuple]) -> "SortKeys":
+        """
+        インデックスから列だけを取得した値から作成（Photo を組み立てない）
+
+        Args:
+            paths: 写真のパス（この順序が行番号になる）
+            values: パス -> SORT_COLUMNS の順の値（未登録は省略可、値のない列は None）
+        """
+        keys = cls.__new__(cls)
+        keys.paths = list(paths)
+        keys.positions = {path: row for row, path in enumerate(keys.paths)}
+        missing = (None,) * len(SORT_COLUMNS)
+        # None は NaN に変換される
+        table = np.array([values.get(path, missing) for path in keys.paths], dtype=np.float64)
+        table = table.reshape(len(keys.paths), len(SORT_COLUMNS))
+        keys.taken_at, keys.file_size, keys.latitude, keys.longitude = table.T.copy()
+        keys._rank_names([os.path.basename(path) for path in keys.paths])
+        return keys
+
+    @classmethod
+    def from_collection(cls, collection) -> "SortKeys":
+        """PhotoCollection の列から作成"""
+        keys = cls.__new__(cls)
+        keys.paths = collection.paths()
+        keys.positions = {path: row for row, path in enumerate(keys.paths)}
+        keys.taken_at = np.array(collection.column('taken_at'), dtype=np.float64)
+        keys.file_size = np.array(collection.column('file_size'), dtype=np.float64)
+        keys.latitude = np.array(collection.column('latitude'), dtype=np.float64)
+        keys.longitude = np.array(collection.column('longitude'), dtype=np.float64)
+        keys._rank_names([collection.file_name(row) for row in range(len(collection))])
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def covers(self, paths: List[str]) -> bool:
+        """paths がこのキーの対象と同じ写真の集合か（順序は問わない）"""
+        return len(paths) == len(self.paths) and all(path in self.positions for path in paths)
+
+    def values(self, mode: str, point: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """並べ替え方法に対応するキー配列"""
+        if mode == SORT_NAME:
+            return self.name_rank
+        if mode == SORT_TAKEN_AT:
+            return self.taken_at
+        if mode == SORT_SIZE:
+            return self.file_size
+        if mode == SORT_DISTANCE:
+            if point is None:
+                raise ValueError("距離順には基準地点（緯度, 経度）が必要です")
+            return haversine_meters(self.latitude, self.longitude, point[0], point[1])
+        raise ValueError(f"不明な並べ替え方法です: {mode}")
+
+    def order(self, mode: str, descending: bool = False,
+              point: Optional[Tuple[float, float]] = None) -> np.ndarray:
+        """
+        並べ替え後の行番号の配列
+
+        Args:
+            mode: SORT_NAME / SORT_TAKEN_AT / SORT_SIZE / SORT_DISTANCE
+            descending: 降順
+            point: 距離順の基準地点（緯度, 経度）
+        """
+        values = self.values(mode, point)
+        if mode == SORT_NAME:
+            return self.name_order[::-1].copy() if descending else self.name_order.copy()
+        # ファイル名順に並べた上で安定ソートし、同値はファイル名順にする
+        keys = values[self.name_order]
+        if descending:
+            keys = -keys
+        return self.name_order[np.argsort(keys, kind='stable')]
+
+    def sorted_paths(self, mode: str, descending: bool = False,
+                     point: Optional[Tuple[float, float]] = None) -> List[str]:
+        paths = self.paths
+        return [paths[row] for row in self.order(mode, descending, point).tolist()]
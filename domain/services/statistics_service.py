@@ -0,0 +1,193 @@
+"""
+ライブラリ統計 - PhotoMap Explorer
+
+写真インデックスの追加・更新・削除の通知を受けて集計値を差分更新する
+（枚数・合計サイズ・GPS付きの割合・撮影期間・撮影範囲・形式別/カメラ別の枚数）
+
+写真を1枚ずつ数え直すことはしないため、50万枚規模でも統計は即座に取得できる
+撮影期間・撮影範囲の端の写真が削除された場合のみ、インデックス（索引付き列）に
+最小値・最大値を問い合わせ直す
+"""
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+_EPOCH = datetime(1970, 1, 1)
+
+# 範囲を管理する列（Photoの属性名 = インデックスの列名）
+_RANGE_COLUMNS = ('taken_at', 'latitude', 'longitude')
+
+
+class StatisticsService(QObject):
+    """
+    ライブラリ統計の差分集計
+
+    インデックスへの書き込みスレッドから通知されるため、集計はロックで保護し、
+    変更は statistics_changed シグナル（受信側のスレッドへキューイング）で知らせる
+    """
+
+    # 統計変更シグナル（snapshot() の辞書）
+    statistics_changed = pyqtSignal(dict)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._index = None
+        self._reset()
+
+    def _reset(self):
+        self._total_count = 0
+        self._gps_count = 0
+        self._dated_count = 0
+        self._total_size = 0
+        self._formats = Counter()
+        self._cameras = Counter()
+        self._minimum = dict.fromkeys(_RANGE_COLUMNS)
+        self._maximum = dict.fromkeys(_RANGE_COLUMNS)
+
+    # インデックスとの接続
+
+    def attach(self, index):
+        """
+        インデックスに接続し、現在の内容で初期集計を行う
+
+        初期集計はSQLの集計クエリで行い、以後は通知による差分更新のみ
+        """
+        if self._index is not None:
+            self._index.remove_listener(self._on_index_changed)
+        self._index = index
+        with self._lock:
+            self._reset()
+            row = index.query_rows(
+                "SELECT COUNT(*), COALESCE(SUM(file_size), 0), "
+                "SUM(latitude IS NOT NULL AND longitude IS NOT NULL), "
+                "SUM(taken_at IS NOT NULL) FROM photos")[0]
+            self._total_count, self._total_size = row[0], row[1]
+            self._gps_count, self._dated_count = row[2] or 0, row[3] or 0
+            self._formats.update(dict(index.query_rows(
+                "SELECT extension, COUNT(*) FROM photos GROUP BY extension")))
+            self._cameras.update(dict(index.query_rows(
+                "SELECT camera, COUNT(*) FROM photos WHERE camera != '' GROUP BY camera")))
+            for column in _RANGE_COLUMNS:
+                self._refresh_range(column)
+        index.add_listener(self._on_index_changed)
+        self.statistics_changed.emit(self.snapshot())
+
+    def _refresh_range(self, column: str):
+        """列の最小値・最大値をインデックスから取得し直す（ロック取得済みで呼び出す）"""
+        if self._index is None:
+            return
+        self._minimum[column] = self._index.query_value(f"SELECT MIN({column}) FROM photos")
+        self._maximum[column] = self._index.query_value(f"SELECT MAX({column}) FROM photos")
+
+    # 差分更新
+
+    def _add(self, photo, sign: int, stale_ranges: set):
+        self._total_count += sign
+        self._total_size += sign * photo.file_size
+        if photo.has_gps_data:
+            self._gps_count += sign
+        if photo.taken_at is not None:
+            self._dated_count += sign
+        self._formats[photo.file_extension] += sign
+        if self._formats[photo.file_extension] <= 0:
+            del self._formats[photo.file_extension]
+        if photo.camera:
+            self._cameras[photo.camera] += sign
+            if self._cameras[photo.camera] <= 0:
+                del self._cameras[photo.camera]
+
+        for column in _RANGE_COLUMNS:
+            value = getattr(photo, column)
+            if value is None:
+                continue
+            minimum, maximum = self._minimum[column], self._maximum[column]
+            if sign > 0:
+                if minimum is None or value < minimum:
+                    self._minimum[column] = value
+                if maximum is None or value > maximum:
+                    self._maximum[column] = value
+            elif value == minimum or value == maximum:
+                # 端の値が消えたので次の端は問い合わせないとわからない
+                stale_ranges.add(column)
+
+    def _on_index_changed(self, added, updated, removed):
+        """インデックス変更通知（書き込みスレッドで実行）"""
+        stale_ranges = set()
+        with self._lock:
+            for old, new in updated:
+                self._add(old, -1, stale_ranges)
+                self._add(new, 1, stale_ranges)
+            for photo in added:
+                self._add(photo, 1, stale_ranges)
+            for photo in removed:
+                self._add(photo, -1, stale_ranges)
+            for column in stale_ranges:
+                self._refresh_range(column)
+        self.statistics_changed.emit(self.snapshot())
+
+    # 取得
+
+    def snapshot(self) -> dict:
+        """
+        現在の統計を取得
+
+        Returns:
+            dict: total_count, with_gps_count, without_gps_count, gps_coverage,
+                  dated_count, date_range, geographic_bounds, file_formats, cameras, total_size_mb
+        """
+        with self._lock:
+            total = self._total_count
+            date_range = None
+            if self._minimum['taken_at'] is not None:
+                date_range = (_EPOCH + timedelta(seconds=self._minimum['taken_at']),
+                              _EPOCH + timedelta(seconds=self._maximum['taken_at']))
+            geographic_bounds = None
+            if self._minimum['latitude'] is not None and self._minimum['longitude'] is not None:
+                # ((南, 西), (北, 東))
+                geographic_bounds = ((self._minimum['latitude'], self._minimum['longitude']),
+                                     (self._maximum['latitude'], self._maximum['longitude']))
+            return {
+                'total_count': total,
+                'with_gps_count': self._gps_count,
+                'without_gps_count': total - self._gps_count,
+                'gps_coverage': self._gps_count / total if total else 0.0,
+                'dated_count': self._dated_count,
+                'date_range': date_range,
+                'geographic_bounds': geographic_bounds,
+                'file_formats': dict(self._formats),
+                'cameras': dict(self._cameras),
+                'total_size_mb': self._total_size / (1024 * 1024),
+            }
+
+
+def format_statistics(statistics: dict) -> str:
+    """ステータスバー表示用の1行テキスト"""
+    total = statistics.get('total_count', 0)
+    if not total:
+        return "📚 ライブラリ: 0枚"
+    parts = [f"📚 ライブラリ: {total:,}枚",
+             f"GPS {statistics['gps_coverage'] * 100:.0f}%"]
+    date_range = statistics.get('date_range')
+    if date_range:
+        parts.append(f"{date_range[0]:%Y/%m/%d}〜{date_range[1]:%Y/%m/%d}")
+    size_mb = statistics.get('total_size_mb', 0.0)
+    parts.append(f"{size_mb / 1024:.1f} GB" if size_mb >= 1024 else f"{size_mb:.0f} MB")
+    return " | ".join(parts)
+
+
+# グローバル統計サービス
+_statistics_service: Optional[StatisticsService] = None
+
+def get_statistics_service() -> StatisticsService:
+    """グローバル統計サービス取得（グローバル写真インデックスに接続済み）"""
+    global _statistics_service
+    if _statistics_service is None:
+        from infrastructure.photo_index import get_photo_index
+        _statistics_service = StatisticsService()
+        _statistics_service.attach(get_photo_index())
+    return _statistics_service
@@ -0,0 +1,232 @@
+"""
+撮影日タイムライン - PhotoMap Explorer
+
+表示中の写真（フォルダ・ライブラリ・検索結果）の撮影日ごとの枚数を集計する
+
+- 集計の単位は日。月・年の枚数は日ごとの枚数配列から求める（写真数ではなく日数に比例）
+- 写真の追加は撮影日の bincount を足し込むだけ（スキャン中も差分更新）
+- インデックスの更新通知を受け、メタデータの登録が済んだ写真から順に反映する
+- インデックスから削除された写真は行を削除済み扱いにし、枚数・合計から除く
+"""
+
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+
+GRANULARITY_DAY = 'day'
+GRANULARITY_MONTH = 'month'
+GRANULARITY_YEAR = 'year'
+
+# 集計単位と表示名
+GRANULARITIES = {
+    GRANULARITY_DAY: "日",
+    GRANULARITY_MONTH: "月",
+    GRANULARITY_YEAR: "年",
+}
+
+_SECONDS_PER_DAY = 86400
+
+# 撮影日なし
+_NO_DAY = np.iinfo(np.int64).min
+
+# 削除済みの行（撮影日なしとしても数えない）
+_REMOVED_DAY = _NO_DAY + 1
+
+_NUMPY_UNITS = {GRANULARITY_DAY: 'D', GRANULARITY_MONTH: 'M', GRANULARITY_YEAR: 'Y'}
+
+
+def day_numbers(timestamps: np.ndarray) -> np.ndarray:
+    """epoch秒（NaNは撮影日なし）を1970-01-01からの日数へ変換"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    days = np.full(len(timestamps), _NO_DAY, dtype=np.int64)
+    valid = ~np.isnan(timestamps)
+    days[valid] = np.floor(timestamps[valid] / _SECONDS_PER_DAY).astype(np.int64)
+    return days
+
+
+def bucket_numbers(days: np.ndarray, granularity: str) -> np.ndarray:
+    """日数を集計単位の番号（1970年からの日数・月数・年数）へ変換"""
+    if granularity == GRANULARITY_DAY:
+        return np.asarray(days, dtype=np.int64)
+    unit = _NUMPY_UNITS[granularity]
+    return np.asarray(days, dtype='datetime64[D]').astype(f'datetime64[{unit}]').astype(np.int64)
+
+
+def bucket_bounds(bucket: int, granularity: str) -> Tuple[float, float]:
+    """集計単位の番号を [開始, 終了) のepoch秒へ変換"""
+    unit = _NUMPY_UNITS[granularity]
+    start = np.datetime64(int(bucket), unit)
+    end = np.datetime64(int(bucket) + 1, unit)
+    return (float(start.astype('datetime64[D]').astype(np.int64)) * _SECONDS_PER_DAY,
+            float(end.astype('datetime64[D]').astype(np.int64)) * _SECONDS_PER_DAY)
+
+
+def bucket_label(bucket: int, granularity: str) -> str:
+    """集計単位の表示用ラベル（2024 / 2024-05 / 2024-05-03）"""
+    return str(np.datetime64(int(bucket), _NUMPY_UNITS[granularity]))
+
+
+class TimelineService(QObject):
+    """
+    表示中の写真の撮影日ごとの枚数
+
+    集計はロックで保護し、変更は timeline_changed シグナルで知らせる
+    （インデックスの更新通知は書き込みスレッドから届く）
+    """
+
+    timeline_changed = pyqtSignal()
+
+    def __init__(self, index=None):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._index = None
+        self._clear()
+        if index is not None:
+            self.attach(index)
+
+    def _clear(self):
+        self._paths: List[str] = []
+        self._rows = {}
+        self._days = np.empty(0, dtype=np.int64)
+        self._first_day = 0
+        self._day_counts = np.zeros(0, dtype=np.int64)
+        self._undated = 0
+        self._removed = 0
+
+    def attach(self, index):
+        """インデックスに接続（撮影日の取得と更新通知の受信）"""
+        if self._index is not None:
+            self._index.remove_listener(self._on_index_changed)
+        self._index = index
+        index.add_listener(self._on_index_changed)
+
+    # 対象の写真
+
+    def set_paths(self, paths: Iterable[str]):
+        """対象の写真を置き換え"""
+        with self._lock:
+            self._clear()
+        self.add_paths(paths)
+
+    def add_paths(self, paths: Iterable[str]):
+        """対象の写真を追加（スキャン結果・検索結果のストリーミング用）"""
+        paths = [path for path in paths if path not in self._rows]
+        if not paths:
+            self.timeline_changed.emit()
+            return
+        taken = self._index.column_values(paths, 'taken_at') if self._index is not None else {}
+        timestamps = np.array([taken.get(path) for path in paths], dtype=np.float64)
+        days = day_numbers(timestamps)
+        with self._lock:
+            first = len(self._paths)
+            self._paths.extend(paths)
+            for offset, path in enumerate(paths):
+                self._rows[path] = first + offset
+            self._days = np.concatenate((self._days, days))
+            self._count(days, 1)
+        self.timeline_changed.emit()
+
+    def _count(self, days: np.ndarray, sign: int):
+        """日ごとの枚数に足し込む（ロック取得済みで呼び出す。削除済みの行は数えない）"""
+        days = days[days != _REMOVED_DAY]
+        dated = days[days != _NO_DAY]
+        self._undated += sign * (len(days) - len(dated))
+        if not len(dated):
+            return
+        low, high = int(dated.min()), int(dated.max())
+        if not len(self._day_counts):
+            self._first_day = low
+        last_day = self._first_day + len(self._day_counts) - 1
+        if low < self._first_day or high > last_day:
+            # 範囲外の日が来たら配列を両側へ広げる
+            new_first = min(low, self._first_day)
+            new_last = max(high, last_day) if len(self._day_counts) else high
+            grown = np.zeros(new_last - new_first + 1, dtype=np.int64)
+            grown[self._first_day - new_first:self._first_day - new_first + len(self._day_counts)] = self._day_counts
+            self._day_counts = grown
+            self._first_day = new_first
+        self._day_counts += sign * np.bincount(dated - self._first_day, minlength=len(self._day_counts))
+
+    def _on_index_changed(self, added, updated, removed):
+        """インデックス変更通知（書き込みスレッドで実行）。対象の写真の撮影日だけを反映"""
+        changed = [(photo.file_path, photo.taken_at) for photo in added]
+        changed.extend((new.file_path, new.taken_at) for _, new in updated)
+        with self._lock:
+            rows = []
+            timestamps = []
+            for path, taken_at in changed:
+                row = self._rows.get(path)
+                if row is not None:
+                    rows.append(row)
+                    timestamps.append(np.nan if taken_at is None else taken_at)
+            # 削除された写真は行を削除済みにする（行番号は詰めない）
+            removed_rows = [row for row in (self._rows.pop(photo.file_path, None) for photo in removed)
+                            if row is not None]
+            if not rows and not removed_rows:
+                return
+            if rows:
+                rows = np.array(rows, dtype=np.int64)
+                days = day_numbers(np.array(timestamps))
+                self._count(self._days[rows], -1)
+                self._days[rows] = days
+                self._count(days, 1)
+            if removed_rows:
+                removed_rows = np.array(removed_rows, dtype=np.int64)
+                self._count(self._days[removed_rows], -1)
+                self._days[removed_rows] = _REMOVED_DAY
+                self._removed += len(removed_rows)
+        self.timeline_changed.emit()
+
+    # 取得
+
+    def counts(self, granularity: str) -> Tuple[int, np.ndarray]:
+        """
+        集計単位ごとの枚数
+
+        Returns:
+            (最初の単位の番号, 枚数の配列)。撮影日のある写真がなければ (0, 空配列)
+        """
+        with self._lock:
+            first_day, day_counts = self._first_day, self._day_counts.copy()
+        nonzero = np.flatnonzero(day_counts)
+        if not len(nonzero):
+            return 0, np.zeros(0, dtype=np.int64)
+        day_counts = day_counts[nonzero[0]:nonzero[-1] + 1]
+        first_day += int(nonzero[0])
+        if granularity == GRANULARITY_DAY:
+            return first_day, day_counts
+        buckets = bucket_numbers(np.arange(first_day, first_day + len(day_counts)), granularity)
+        first_bucket = int(buckets[0])
+        return first_bucket, np.bincount(buckets - first_bucket, weights=day_counts).astype(np.int64)
+
+    @property
+    def total(self) -> int:
+        """対象の写真の枚数（削除済みを除く）"""
+        return len(self._paths) - self._removed
+
+    @property
+    def undated(self) -> int:
+        return self._undated
+
+    def paths_between(self, start: float, end: float) -> List[str]:
+        """撮影日時が [start, end) の対象写真（追加順、削除済みは含まない）"""
+        first_day = int(np.floor(start / _SECONDS_PER_DAY))
+        end_day = int(np.ceil(end / _SECONDS_PER_DAY))
+        with self._lock:
+            days = self._days
+            rows = np.flatnonzero((days >= first_day) & (days < end_day))
+            return [self._paths[row] for row in rows.tolist()]
+
+
+# グローバルタイムラインサービス
+_timeline_service: Optional[TimelineService] = None
+
+def get_timeline_service() -> TimelineService:
+    """グローバルタイムラインサービス取得（グローバル写真インデックスに接続済み）"""
+    global _timeline_service
+    if _timeline_service is None:
+        from infrastructure.photo_index import get_photo_index
+        _timeline_service = TimelineService(get_photo_index())
+    return _timeline_service
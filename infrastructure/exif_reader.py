@@ -0,0 +1,128 @@
+"""
+EXIF読み込み - PhotoMap Explorer
+
+画像ファイルのEXIFを1回だけ解析し、数値化したメタデータを Photo として返す
+（GPSも同じ解析結果から取り出すため、ファイルを重ねて開かない）
+"""
+
+import logging
+import os
+from typing import Optional
+
+import exifread
+
+from domain.models.photo import Photo, timestamp_from_exif
+from utils.profiler import traced
+
+_DATETIME_TAGS = ('EXIF DateTimeOriginal', 'Image DateTime', 'EXIF DateTime')
+
+
+def _ratio(tag, index: int = 0) -> float:
+    """Ratio値を浮動小数点へ変換（取得できなければ0.0）"""
+    try:
+        value = tag.values[index]
+        if hasattr(value, 'num'):
+            return float(value.num) / float(value.den) if value.den else 0.0
+        return float(value)
+    except (AttributeError, IndexError, TypeError, ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def _integer(tag) -> int:
+    try:
+        return int(tag.values[0])
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return 0
+
+
+def _degrees(tag, ref_tag, negative_ref: str) -> Optional[float]:
+    """度分秒のGPS値を十進の度へ変換"""
+    if tag is None or ref_tag is None or len(tag.values) < 3:
+        return None
+    degrees = _ratio(tag, 0) + _ratio(tag, 1) / 60.0 + _ratio(tag, 2) / 3600.0
+    ref = str(ref_tag.values[0] if ref_tag.values else "").upper()
+    return -degrees if ref == negative_ref else degrees
+
+
+def _camera_name(tags) -> str:
+    """メーカー名と機種名を統合（機種名にメーカー名が含まれる場合は機種名のみ）"""
+    make = str(tags['Image Make']).strip() if 'Image Make' in tags else ""
+    model = str(tags['Image Model']).strip() if 'Image Model' in tags else ""
+    if make and model:
+        return model if make.lower() in model.lower() else f"{make} {model}"
+    return model or make
+
+
+def apply_exif_tags(photo: Photo, tags) -> Photo:
+    """exifreadのタグ辞書の値を Photo に設定"""
+    for name in _DATETIME_TAGS:
+        if name in tags:
+            photo.taken_at = timestamp_from_exif(str(tags[name]))
+            if photo.taken_at is not None:
+                break
+
+    photo.camera = _camera_name(tags)
+
+    if 'EXIF ExifImageWidth' in tags and 'EXIF ExifImageLength' in tags:
+        photo.width = _integer(tags['EXIF ExifImageWidth'])
+        photo.height = _integer(tags['EXIF ExifImageLength'])
+    elif 'Image ImageWidth' in tags and 'Image ImageLength' in tags:
+        photo.width = _integer(tags['Image ImageWidth'])
+        photo.height = _integer(tags['Image ImageLength'])
+
+    if 'Image Orientation' in tags:
+        photo.orientation = _integer(tags['Image Orientation']) or 1
+
+    for name in ('EXIF ISOSpeedRatings', 'EXIF PhotographicSensitivity'):
+        if name in tags:
+            photo.iso = _integer(tags[name])
+            break
+
+    if 'EXIF FNumber' in tags:
+        photo.f_number = _ratio(tags['EXIF FNumber'])
+    elif 'EXIF ApertureValue' in tags:
+        # APEX値からF値を計算
+        photo.f_number = 2 ** (_ratio(tags['EXIF ApertureValue']) / 2)
+
+    if 'EXIF ExposureTime' in tags:
+        photo.exposure_time = _ratio(tags['EXIF ExposureTime'])
+    elif 'EXIF ShutterSpeedValue' in tags:
+        # APEX値から露出時間を計算
+        photo.exposure_time = 1 / (2 ** _ratio(tags['EXIF ShutterSpeedValue']))
+
+    if 'EXIF FocalLength' in tags:
+        photo.focal_length = _ratio(tags['EXIF FocalLength'])
+
+    latitude = _degrees(tags.get('GPS GPSLatitude'), tags.get('GPS GPSLatitudeRef'), 'S')
+    longitude = _degrees(tags.get('GPS GPSLongitude'), tags.get('GPS GPSLongitudeRef'), 'W')
+    if latitude is not None and longitude is not None:
+        photo.latitude, photo.longitude = latitude, longitude
+    return photo
+
+
+@traced("exif.read_photo", "exif")
+def read_photo(image_path: str) -> Optional[Photo]:
+    """
+    画像ファイルのメタデータを読み込む
+
+    Args:
+        image_path: 画像ファイルのパス
+
+    Returns:
+        Photo: メタデータ（EXIFが読めない場合はファイル情報のみ）。
+               ファイルにアクセスできない場合はNone
+    """
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    photo = Photo(image_path, file_size=stat.st_size, modified_time=stat.st_mtime)
+
+    try:
+        with open(image_path, 'rb') as f:
+            tags = exifread.process_file(f, details=False, strict=True)
+        if tags:
+            apply_exif_tags(photo, tags)
+    except Exception as e:
+        logging.debug(f"EXIF読み込みエラー ({image_path}): {e}")
+    return photo
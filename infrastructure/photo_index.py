@@ -0,0 +1,471 @@
+"""
+写真メタデータインデックス - PhotoMap Explorer
+
+読み込んだ写真のメタデータ（Photo）をSQLiteに保存し、
+フォルダを開き直すたびにEXIFを再解析しないようにする
+
+- ファイルサイズ・更新日時で変更を検出し、変わったファイルだけを再読み込み
+- 追加・更新・削除をリスナーへ通知（統計の差分更新などに使用）
+- 書き込みはバッチ単位の1トランザクション
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from domain.models.photo import Photo
+
+# SQLiteのバインド変数の上限を超えないための分割数
+_QUERY_CHUNK = 500
+
+_PHOTO_COLUMNS = (
+    'path', 'file_size', 'modified_time', 'taken_at', 'latitude', 'longitude',
+    'width', 'height', 'orientation', 'camera', 'iso', 'f_number',
+    'exposure_time', 'focal_length',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    extension TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    modified_time REAL NOT NULL,
+    taken_at REAL,
+    latitude REAL,
+    longitude REAL,
+    width INTEGER NOT NULL DEFAULT 0,
+    height INTEGER NOT NULL DEFAULT 0,
+    orientation INTEGER NOT NULL DEFAULT 1,
+    camera TEXT NOT NULL DEFAULT '',
+    iso INTEGER NOT NULL DEFAULT 0,
+    f_number REAL NOT NULL DEFAULT 0,
+    exposure_time REAL NOT NULL DEFAULT 0,
+    focal_length REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_photos_directory ON photos(directory);
+CREATE INDEX IF NOT EXISTS idx_photos_taken_at ON photos(taken_at);
+CREATE INDEX IF NOT EXISTS idx_photos_latitude ON photos(latitude);
+CREATE INDEX IF NOT EXISTS idx_photos_longitude ON photos(longitude);
+CREATE TABLE IF NOT EXISTS features (
+    path TEXT PRIMARY KEY,
+    modified_time REAL NOT NULL,
+    vector BLOB NOT NULL,
+    dhash INTEGER,
+    phash INTEGER
+);
+"""
+
+# 後から追加した列（既存のデータベースへは ALTER TABLE で追加する）
+_ADDED_COLUMNS = (
+    ('features', 'dhash', 'INTEGER'),
+    ('features', 'phash', 'INTEGER'),
+)
+
+# 保存できる知覚ハッシュの方式（列名）
+_HASH_COLUMNS = ('dhash', 'phash')
+
+_SELECT_PHOTOS = f"SELECT {', '.join(_PHOTO_COLUMNS)} FROM photos"
+
+# 変更通知リスナー: (追加, [(更新前, 更新後)], 削除) を受け取る
+IndexListener = Callable[[List[Photo], List[Tuple[Photo, Photo]], List[Photo]], None]
+
+
+def _photo_from_row(row) -> Photo:
+    return Photo(*row)
+
+
+def _row_from_photo(photo: Photo) -> tuple:
+    """INSERT文の列順（path, directory, extension, 以降は _PHOTO_COLUMNS 順）"""
+    return (
+        photo.file_path, os.path.dirname(photo.file_path), photo.file_extension,
+        photo.file_size, photo.modified_time, photo.taken_at, photo.latitude, photo.longitude,
+        photo.width, photo.height, photo.orientation, photo.camera, photo.iso,
+        photo.f_number, photo.exposure_time, photo.focal_length,
+    )
+
+
+_INSERT_PHOTO = (
+    f"INSERT OR REPLACE INTO photos (path, directory, extension, {', '.join(_PHOTO_COLUMNS[1:])}) "
+    f"VALUES ({', '.join('?' * (len(_PHOTO_COLUMNS) + 2))})"
+)
+
+
+def _to_signed64(value: Optional[int]) -> Optional[int]:
+    """64bitの知覚ハッシュを SQLite の INTEGER（符号付き64bit）に収める"""
+    if value is None:
+        return None
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _from_signed64(value: int) -> int:
+    return value & 0xFFFFFFFFFFFFFFFF
+
+
+def _chunks(items: List, size: int = _QUERY_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class PhotoIndex:
+    """
+    SQLiteによる写真メタデータインデックス
+
+    複数スレッドから利用できる（内部でロックして1接続を共有）
+    """
+
+    def __init__(self, db_path: str = ":memory:"):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._listeners: List[IndexListener] = []
+        # 変更通知はコミット順に積み、1スレッドずつ順番に配信する
+        self._pending_notifications = deque()
+        self._notify_lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._add_missing_columns()
+
+    def _add_missing_columns(self):
+        """古いバージョンで作成したデータベースに後から追加した列を追加"""
+        for table, column, column_type in _ADDED_COLUMNS:
+            columns = {row[1] for row in self._connection.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+        self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # リスナー
+
+    def add_listener(self, listener: IndexListener):
+        """変更通知リスナーを登録"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: IndexListener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _queue_notification(self, added, updated, removed):
+        """変更通知をコミット順に積む（書き込みロック取得済みで呼び出す）"""
+        if added or updated or removed:
+            self._pending_notifications.append((added, updated, removed))
+
+    def _notify(self):
+        """
+        積まれた変更通知をコミット順に配信
+
+        リスナーは書き込みロックの外で呼ぶ（リスナー側のロックとの順序の逆転を避ける）。
+        別スレッドが配信中なら、そのスレッドが続けてこちらの分も配信する
+        """
+        while self._pending_notifications:
+            if not self._notify_lock.acquire(blocking=False):
+                return
+            try:
+                while self._pending_notifications:
+                    added, updated, removed = self._pending_notifications.popleft()
+                    for listener in list(self._listeners):
+                        try:
+                            listener(added, updated, removed)
+                        except Exception as e:
+                            logging.error(f"インデックス通知エラー: {e}")
+            finally:
+                self._notify_lock.release()
+
+    # 書き込み
+
+    def upsert(self, photos: Iterable[Photo]):
+        """写真を追加または更新（1トランザクション）"""
+        photos = list({photo.file_path: photo for photo in photos}.values())
+        if not photos:
+            return
+        with self._lock:
+            existing = self._fetch(photo.file_path for photo in photos)
+            with self._connection:
+                self._connection.executemany(_INSERT_PHOTO, [_row_from_photo(photo) for photo in photos])
+            added = [photo for photo in photos if photo.file_path not in existing]
+            updated = [(existing[photo.file_path], photo) for photo in photos if photo.file_path in existing]
+            self._queue_notification(added, updated, [])
+        self._notify()
+
+    def remove(self, paths: Iterable[str]):
+        """指定パスの写真を削除"""
+        paths = list(dict.fromkeys(paths))
+        if not paths:
+            return
+        with self._lock:
+            existing = self._fetch(paths)
+            with self._connection:
+                for chunk in _chunks(list(existing)):
+                    self._connection.execute(
+                        f"DELETE FROM photos WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+                    self._connection.execute(
+                        f"DELETE FROM features WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+            self._queue_notification([], [], list(existing.values()))
+        self._notify()
+
+    def sync_directory(self, directory: str, present_paths: Iterable[str]):
+        """フォルダ内に存在しなくなった写真を削除（サブフォルダは対象外）"""
+        present = set(present_paths)
+        with self._lock:
+            indexed = [row[0] for row in self._connection.execute(
+                "SELECT path FROM photos WHERE directory = ?", (directory,))]
+        self.remove(path for path in indexed if path not in present)
+
+    # 読み込み
+
+    def _fetch(self, paths: Iterable[str]) -> Dict[str, Photo]:
+        result = {}
+        for chunk in _chunks(list(paths)):
+            cursor = self._connection.execute(
+                f"{_SELECT_PHOTOS} WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+            for row in cursor:
+                result[row[0]] = _photo_from_row(row)
+        return result
+
+    def get(self, path: str) -> Optional[Photo]:
+        with self._lock:
+            row = self._connection.execute(f"{_SELECT_PHOTOS} WHERE path = ?", (path,)).fetchone()
+        return _photo_from_row(row) if row else None
+
+    def get_many(self, paths: Iterable[str]) -> Dict[str, Photo]:
+        """複数パスの写真をまとめて取得"""
+        with self._lock:
+            return self._fetch(paths)
+
+    def column_values(self, paths: Iterable[str], column: str) -> Dict[str, object]:
+        """複数パスの1列だけを取得（Photoを組み立てないため大量のパスでも軽い）"""
+        if column not in _PHOTO_COLUMNS:
+            raise ValueError(f"不明な列です: {column}")
+        result = {}
+        with self._lock:
+            for chunk in _chunks(list(paths)):
+                cursor = self._connection.execute(
+                    f"SELECT path, {column} FROM photos WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+                result.update(cursor)
+        return result
+
+    def columns_values(self, paths: Iterable[str], columns: Iterable[str]) -> Dict[str, tuple]:
+        """複数パスの指定列だけを取得（パス -> 列の値のタプル、未登録のパスは含まない）"""
+        columns = list(columns)
+        for column in columns:
+            if column not in _PHOTO_COLUMNS:
+                raise ValueError(f"不明な列です: {column}")
+        result = {}
+        with self._lock:
+            for chunk in _chunks(list(paths)):
+                cursor = self._connection.execute(
+                    f"SELECT path, {', '.join(columns)} FROM photos "
+                    f"WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+                for row in cursor:
+                    result[row[0]] = row[1:]
+        return result
+
+    def stale_paths(self, paths: Iterable[str]) -> List[str]:
+        """
+        未登録、またはサイズ・更新日時が変わったファイルのパスを返す
+        """
+        paths = list(paths)
+        with self._lock:
+            known = {}
+            for chunk in _chunks(paths):
+                cursor = self._connection.execute(
+                    f"SELECT path, file_size, modified_time FROM photos "
+                    f"WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+                known.update((row[0], (row[1], row[2])) for row in cursor)
+        stale = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) != (stat.st_size, stat.st_mtime):
+                stale.append(path)
+        return stale
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
+
+    def photos(self, directory: str = None) -> List[Photo]:
+        """全写真（またはフォルダ直下の写真）を取得"""
+        with self._lock:
+            if directory is None:
+                cursor = self._connection.execute(_SELECT_PHOTOS)
+            else:
+                cursor = self._connection.execute(f"{_SELECT_PHOTOS} WHERE directory = ?", (directory,))
+            return [_photo_from_row(row) for row in cursor]
+
+    def collection(self, directory: str = None, name: str = "") -> "PhotoCollection":
+        """列指向コレクションとして取得"""
+        # 列指向コレクション（NumPy）は使うときに読み込む（統計表示のための起動時の読み込みを軽くする）
+        from domain.models.photo_collection import PhotoCollection
+        with self._lock:
+            if directory is None:
+                cursor = self._connection.execute(_SELECT_PHOTOS)
+            else:
+                cursor = self._connection.execute(f"{_SELECT_PHOTOS} WHERE directory = ?", (directory,))
+            collection = PhotoCollection(name)
+            for row in cursor:
+                collection.append(_photo_from_row(row))
+        collection.shrink_to_fit()
+        return collection
+
+    # 類似画像検索の特徴ベクトル
+
+    def upsert_features(self, items: Iterable[Tuple]):
+        """
+        特徴ベクトルと知覚ハッシュを保存
+
+        Args:
+            items: (パス, 元ファイルの更新日時, ベクトルのバイト列, dHash, pHash)。ハッシュは None 可
+        """
+        rows = [(path, modified_time, vector, _to_signed64(dhash), _to_signed64(phash))
+                for path, modified_time, vector, dhash, phash in items]
+        if not rows:
+            return
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO features (path, modified_time, vector, dhash, phash) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+
+    def feature_vectors(self) -> List[Tuple[str, bytes]]:
+        """保存済みの全特徴ベクトル（パス, ベクトルのバイト列）"""
+        with self._lock:
+            return self._connection.execute("SELECT path, vector FROM features").fetchall()
+
+    def current_feature_vectors(self, items: Iterable[Tuple[str, float]]) -> List[Tuple[str, bytes]]:
+        """(パス, 元ファイルの更新日時) のうち、その更新日時で計算済みの特徴ベクトル（パス, バイト列）"""
+        modified_times = dict(items)
+        result = []
+        with self._lock:
+            for chunk in _chunks(list(modified_times)):
+                cursor = self._connection.execute(
+                    f"SELECT path, modified_time, vector FROM features "
+                    f"WHERE path IN ({', '.join('?' * len(chunk))})", chunk)
+                result.extend((path, vector) for path, modified_time, vector in cursor
+                              if modified_times[path] == modified_time)
+        return result
+
+    def perceptual_hashes(self, method: str = 'dhash') -> List[Tuple[str, int]]:
+        """保存済みの全知覚ハッシュ（パス, 64bitのハッシュ値）"""
+        if method not in _HASH_COLUMNS:
+            raise ValueError(f"不明な知覚ハッシュです: {method}")
+        with self._lock:
+            cursor = self._connection.execute(f"SELECT path, {method} FROM features WHERE {method} IS NOT NULL")
+            return [(path, _from_signed64(value)) for path, value in cursor]
+
+    def stale_feature_paths(self, paths: Iterable[str]) -> List[str]:
+        """特徴ベクトル・知覚ハッシュが未計算、または元ファイルが更新されたパスを返す"""
+        paths = list(paths)
+        with self._lock:
+            known = {}
+            for chunk in _chunks(paths):
+                # 知覚ハッシュの列を追加する前に保存したものは計算し直す
+                cursor = self._connection.execute(
+                    f"SELECT path, modified_time FROM features "
+                    f"WHERE path IN ({', '.join('?' * len(chunk))}) AND dhash IS NOT NULL", chunk)
+                known.update(cursor)
+        stale = []
+        for path in paths:
+            try:
+                modified_time = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if known.get(path) != modified_time:
+                stale.append(path)
+        return stale
+
+    def iter_paths(self, where: str = "1", parameters: tuple = (), page_size: int = 500) -> Iterator[List[str]]:
+        """
+        条件に一致する写真のパスをページ単位で順に返す
+
+        ファイル上のインデックスでは読み取り専用の別接続のカーソルから取り出すため、
+        全件の取得を待たずに最初のページを返し、読み込み中も書き込みを妨げない
+
+        Args:
+            where: WHERE句（PhotoQuery.to_sql() の出力）
+            parameters: バインド値
+            page_size: 1ページの件数
+        """
+        for rows in self.iter_rows(('path',), where, parameters, page_size=page_size):
+            yield [row[0] for row in rows]
+
+    def iter_rows(self, columns: Iterable[str], where: str = "1", parameters: tuple = (),
+                  order_by: str = None, page_size: int = 500) -> Iterator[List[tuple]]:
+        """
+        条件に一致する写真の指定列をページ単位で順に返す（iter_paths と同じく別接続のカーソル）
+
+        Args:
+            columns: 取得する列（_PHOTO_COLUMNS の列名）
+            order_by: 並び順の列（撮影日時など索引付きの列を推奨）
+        """
+        columns = list(columns)
+        for column in columns + ([order_by] if order_by else []):
+            if column not in _PHOTO_COLUMNS:
+                raise ValueError(f"不明な列です: {column}")
+        sql = f"SELECT {', '.join(columns)} FROM photos WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        if self.db_path == ":memory:":
+            # メモリ上のインデックスは接続を共有できないため一括取得
+            with self._lock:
+                rows = self._connection.execute(sql, parameters).fetchall()
+            for start in range(0, len(rows), page_size):
+                yield rows[start:start + page_size]
+            return
+
+        connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        try:
+            connection.execute("PRAGMA query_only=1")
+            cursor = connection.execute(sql, parameters)
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            connection.close()
+
+    def query_value(self, sql: str, parameters: tuple = ()):
+        """集計クエリの単一値を取得（統計の境界値の再計算などに使用）"""
+        with self._lock:
+            row = self._connection.execute(sql, parameters).fetchone()
+        return row[0] if row else None
+
+    def query_rows(self, sql: str, parameters: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+
+def _get_index_path() -> str:
+    """インデックスファイルパス取得（テーマ設定と同じsettingsフォルダ）"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    settings_dir = os.path.join(app_dir, "settings")
+    os.makedirs(settings_dir, exist_ok=True)
+    return os.path.join(settings_dir, "photo_index.db")
+
+
+# グローバル写真インデックス
+_photo_index = None
+_photo_index_lock = threading.Lock()
+
+def get_photo_index() -> PhotoIndex:
+    """グローバル写真インデックス取得"""
+    global _photo_index
+    with _photo_index_lock:
+        if _photo_index is None:
+            try:
+                _photo_index = PhotoIndex(_get_index_path())
+            except (OSError, sqlite3.Error) as e:
+                logging.error(f"写真インデックスを開けません（メモリ上で動作します）: {e}")
+                _photo_index = PhotoIndex()
+        return _photo_index
@@ -0,0 +1,125 @@
+"""
+特徴ベクトルインデクサー - PhotoMap Explorer
+
+表示中の画像のサムネイルから類似画像検索用の特徴ベクトルと知覚ハッシュ（dHash / pHash）を
+バックグラウンドで計算し、写真インデックスと類似画像インデックス・知覚ハッシュのBK木へ登録する
+計算済みで更新日時が変わっていないファイルは計算し直さない
+"""
+
+import logging
+import os
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from domain.services.duplicate_service import compute_perceptual_hashes
+from domain.services.photo_domain_service import get_photo_domain_service
+from domain.services.similarity_service import compute_features, get_similarity_index
+from infrastructure.photo_index import get_photo_index
+from logic.thumbnail_cache import get_thumbnail_cache
+
+# インデックスへ書き込む単位（1トランザクション）
+FEATURE_BATCH_SIZE = 200
+
+
+class _FeatureSignals(QObject):
+    """特徴ベクトル計算タスクの通知"""
+    progress = pyqtSignal(int, int, int)  # generation, 処理済み数, 対象数
+    finished = pyqtSignal(int, int)       # generation, 計算数
+
+
+class _FeatureTask(QRunnable):
+    """サムネイルから特徴ベクトルと知覚ハッシュを計算して登録するタスク"""
+
+    def __init__(self, generation: int, paths, index, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.paths = list(paths)
+        self.index = index
+        self.cancel_event = cancel_event
+        self.signals = _FeatureSignals()
+
+    def run(self):
+        computed = 0
+        try:
+            cache = get_thumbnail_cache()
+            similarity_index = get_similarity_index()
+            domain_service = get_photo_domain_service()
+            stale = self.index.stale_feature_paths(self.paths)
+            batch = []
+            for position, path in enumerate(stale, 1):
+                if self.cancel_event.is_set():
+                    break
+                image = cache.get_or_create(path)
+                vector = compute_features(image)
+                if vector is not None:
+                    try:
+                        batch.append((path, os.stat(path).st_mtime, vector, compute_perceptual_hashes(image)))
+                    except OSError:
+                        pass
+                if len(batch) >= FEATURE_BATCH_SIZE or position == len(stale):
+                    self.index.upsert_features(
+                        (path, modified_time, vector.tobytes()) + hashes
+                        for path, modified_time, vector, hashes in batch)
+                    similarity_index.add_many((path, vector) for path, _, vector, _ in batch)
+                    domain_service.register_perceptual_hashes(
+                        (path,) + hashes for path, _, _, hashes in batch)
+                    computed += len(batch)
+                    batch = []
+                    self.signals.progress.emit(self.generation, position, len(stale))
+        except Exception as e:
+            logging.error(f"特徴ベクトル計算エラー: {e}")
+        self.signals.finished.emit(self.generation, computed)
+
+
+class FeatureIndexer(QObject):
+    """
+    バックグラウンドの特徴ベクトル計算管理
+
+    新しい要求が来たら実行中の計算は打ち切る
+    """
+
+    progress = pyqtSignal(int, int)  # 処理済み数, 対象数
+    finished = pyqtSignal(int)       # 計算数
+
+    def __init__(self, index=None):
+        super().__init__()
+        self.index = index if index is not None else get_photo_index()
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        # 表示中のサムネイル読み込みを妨げないよう1スレッドの専用プール
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def index_paths(self, paths):
+        """画像パスの特徴ベクトルを計算して登録"""
+        self.cancel()
+        self._cancel_event = threading.Event()
+        task = _FeatureTask(self._generation, paths, self.index, self._cancel_event)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.finished.connect(self._on_finished)
+        self._pool.start(task)
+
+    def cancel(self):
+        """実行中の計算を打ち切る（登録済みのバッチは残る）"""
+        self._cancel_event.set()
+        self._generation += 1
+
+    def _on_progress(self, generation, done, total):
+        if generation == self._generation:
+            self.progress.emit(done, total)
+
+    def _on_finished(self, generation, computed):
+        if generation == self._generation:
+            self.finished.emit(computed)
+
+
+# グローバル特徴ベクトルインデクサー
+_feature_indexer = None
+
+def get_feature_indexer() -> FeatureIndexer:
+    """グローバル特徴ベクトルインデクサー取得"""
+    global _feature_indexer
+    if _feature_indexer is None:
+        _feature_indexer = FeatureIndexer()
+    return _feature_indexer
@@ -0,0 +1,307 @@
+"""
+撮影地点のエクスポート - PhotoMap Explorer
+
+GPS座標のある写真を GeoJSON / GPX / KML へ書き出す
+写真インデックスのカーソルからページ単位で読みながら書き込むため、
+100万地点でもメモリ使用量は一定（写真の一覧を作らない）
+
+撮影順の軌跡（撮影日時のある写真を撮影日時順に結んだ線）も出力できる
+GPXでは仕様の要素順（wpt → trk）に合わせ、地点と軌跡をカーソル2回で書き出す
+
+コマンドラインから（GUIなし）:
+    python -m logic.geo_export 出力ファイル [--folder フォルダ] [--query 検索式] [--track]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+from json.encoder import encode_basestring
+from typing import Callable, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from domain.models.photo import _EPOCH
+from domain.services.query_service import PhotoQuery
+from infrastructure.photo_index import get_photo_index
+
+FORMAT_GEOJSON = 'geojson'
+FORMAT_GPX = 'gpx'
+FORMAT_KML = 'kml'
+
+# 形式と（表示名, 拡張子）
+FORMATS = {
+    FORMAT_GEOJSON: ("GeoJSON", ".geojson"),
+    FORMAT_GPX: ("GPX", ".gpx"),
+    FORMAT_KML: ("KML", ".kml"),
+}
+
+# カーソルから1回に読む件数
+EXPORT_PAGE_SIZE = 5000
+
+_POINT_COLUMNS = ('path', 'latitude', 'longitude', 'taken_at', 'camera')
+_TRACK_COLUMNS = ('latitude', 'longitude', 'taken_at')
+
+_GEOTAGGED = "latitude IS NOT NULL AND longitude IS NOT NULL"
+
+
+def format_from_path(path: str) -> Optional[str]:
+    """出力ファイルの拡張子から形式を判定（.json も GeoJSON とみなす）"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return FORMAT_GEOJSON
+    for name, (_, format_extension) in FORMATS.items():
+        if extension == format_extension:
+            return name
+    return None
+
+
+def export_condition(query_text: str = "", directory: str = None,
+                     recursive: bool = True) -> Tuple[str, tuple]:
+    """
+    エクスポート対象のWHERE句とバインド値
+
+    Args:
+        query_text: 検索式（フィルターバーと同じ書式）
+        directory: 対象フォルダ（省略時はインデックス全体）
+        recursive: サブフォルダを含めるか
+    """
+    clauses = [_GEOTAGGED]
+    parameters = []
+    if directory:
+        if recursive:
+            clause, values = PhotoQuery(f'in:"{directory}"').to_sql()
+        else:
+            clause, values = "directory = ?", (os.path.normpath(directory),)
+        clauses.append(clause)
+        parameters.extend(values)
+    query = PhotoQuery(query_text)
+    if not query.is_empty():
+        clause, values = query.to_sql()
+        clauses.append(f"({clause})")
+        parameters.extend(values)
+    return " AND ".join(clauses), tuple(parameters)
+
+
+def _time_text(taken_at: Optional[float]) -> Optional[str]:
+    """撮影日時（カメラの壁時計時刻のためタイムゾーンなし）"""
+    if taken_at is None:
+        return None
+    return (_EPOCH + timedelta(seconds=taken_at)).isoformat()
+
+
+class ExportCancelled(Exception):
+    """エクスポートの中断"""
+
+
+class _PointSource:
+    """インデックスのカーソルから地点を読み出す（書き出し中の進捗通知と中断）"""
+
+    def __init__(self, index, where: str, parameters: tuple,
+                 progress: Callable[[int], None] = None, cancel_event: threading.Event = None):
+        self.index = index
+        self.where = where
+        self.parameters = parameters
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.written = 0
+
+    def _rows(self, columns, where, order_by=None) -> Iterator[tuple]:
+        for rows in self.index.iter_rows(columns, where, self.parameters,
+                                         order_by=order_by, page_size=EXPORT_PAGE_SIZE):
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise ExportCancelled()
+            yield from rows
+
+    def points(self) -> Iterator[tuple]:
+        """(パス, 緯度, 経度, 撮影日時, カメラ)"""
+        for row in self._rows(_POINT_COLUMNS, self.where):
+            yield row
+            self.written += 1
+            if self.progress is not None and self.written % EXPORT_PAGE_SIZE == 0:
+                self.progress(self.written)
+
+    def track(self) -> Iterator[tuple]:
+        """撮影日時順の (緯度, 経度, 撮影日時)（撮影日時のない写真は除く）"""
+        return self._rows(_TRACK_COLUMNS, f"{self.where} AND taken_at IS NOT NULL", order_by='taken_at')
+
+
+# GeoJSONの地点（json.dumps を1件ずつ呼ぶと遅いため文字列だけをエンコードして埋め込む）
+_GEOJSON_POINT = ('{"type": "Feature", "geometry": {"type": "Point", "coordinates": [%.7f, %.7f]}, '
+                  '"properties": {"name": %s, "path": %s, "taken_at": %s, "camera": %s}}')
+
+
+def _write_geojson(stream, source: _PointSource, track: bool):
+    stream.write('{"type": "FeatureCollection", "features": [\n')
+    separator = ""
+    for path, latitude, longitude, taken_at, camera in source.points():
+        time_text = _time_text(taken_at)
+        stream.write(separator + _GEOJSON_POINT % (
+            longitude, latitude, encode_basestring(os.path.basename(path)), encode_basestring(path),
+            encode_basestring(time_text) if time_text else 'null', encode_basestring(camera)))
+        separator = ",\n"
+    if track:
+        stream.write(separator + '{"type": "Feature", "properties": {"name": "撮影順の軌跡"}, '
+                     '"geometry": {"type": "LineString", "coordinates": [')
+        coordinate_separator = ""
+        for latitude, longitude, _ in source.track():
+            stream.write(f"{coordinate_separator}[{longitude:.7f}, {latitude:.7f}]")
+            coordinate_separator = ", "
+        stream.write(']}}')
+    stream.write('\n]}\n')
+
+
+def _write_gpx(stream, source: _PointSource, track: bool):
+    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<gpx version="1.1" creator="PhotoMap Explorer" xmlns="http://www.topografix.com/GPX/1/1">\n')
+    for path, latitude, longitude, taken_at, camera in source.points():
+        stream.write(f'  <wpt lat="{latitude:.7f}" lon="{longitude:.7f}">')
+        time_text = _time_text(taken_at)
+        if time_text:
+            stream.write(f'<time>{time_text}</time>')
+        # GPX 1.1 の要素順（time → name → cmt → desc）
+        stream.write(f'<name>{escape(os.path.basename(path))}</name>')
+        if camera:
+            stream.write(f'<cmt>{escape(camera)}</cmt>')
+        stream.write(f'<desc>{escape(path)}</desc></wpt>\n')
+    if track:
+        stream.write('  <trk><name>撮影順の軌跡</name><trkseg>\n')
+        for latitude, longitude, taken_at in source.track():
+            stream.write(f'    <trkpt lat="{latitude:.7f}" lon="{longitude:.7f}">'
+                         f'<time>{_time_text(taken_at)}</time></trkpt>\n')
+        stream.write('  </trkseg></trk>\n')
+    stream.write('</gpx>\n')
+
+
+def _write_kml(stream, source: _PointSource, track: bool):
+    stream.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                 '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+                 '<name>PhotoMap Explorer</name>\n')
+    for path, latitude, longitude, taken_at, camera in source.points():
+        stream.write(f'<Placemark><name>{escape(os.path.basename(path))}</name>'
+                     f'<description>{escape(path)}</description>')
+        time_text = _time_text(taken_at)
+        if time_text:
+            stream.write(f'<TimeStamp><when>{time_text}</when></TimeStamp>')
+        stream.write(f'<Point><coordinates>{longitude:.7f},{latitude:.7f}</coordinates></Point></Placemark>\n')
+    if track:
+        stream.write('<Placemark><name>撮影順の軌跡</name><LineString><tessellate>1</tessellate><coordinates>\n')
+        for latitude, longitude, _ in source.track():
+            stream.write(f'{longitude:.7f},{latitude:.7f}\n')
+        stream.write('</coordinates></LineString></Placemark>\n')
+    stream.write('</Document></kml>\n')
+
+
+_WRITERS = {
+    FORMAT_GEOJSON: _write_geojson,
+    FORMAT_GPX: _write_gpx,
+    FORMAT_KML: _write_kml,
+}
+
+
+def export_locations(output_path: str, export_format: str = None, query_text: str = "",
+                     directory: str = None, recursive: bool = True, track: bool = False,
+                     index=None, progress: Callable[[int], None] = None,
+                     cancel_event: threading.Event = None) -> int:
+    """
+    撮影地点をファイルへ書き出す
+
+    一時ファイルへ書いてから置き換えるため、中断・失敗時に既存のファイルを壊さない
+
+    Args:
+        output_path: 出力ファイル
+        export_format: 形式（省略時は拡張子から判定）
+        query_text / directory / recursive: 対象の写真（export_condition を参照）
+        track: 撮影順の軌跡も出力するか
+        progress: 書き出した地点数を受け取るコールバック
+        cancel_event: セットされたら中断（ExportCancelled を送出）
+
+    Returns:
+        int: 書き出した地点数
+    """
+    export_format = export_format or format_from_path(output_path)
+    if export_format not in _WRITERS:
+        raise ValueError(f"対応していない形式です: {export_format or output_path}")
+    where, parameters = export_condition(query_text, directory, recursive)
+    source = _PointSource(index if index is not None else get_photo_index(),
+                          where, parameters, progress, cancel_event)
+    temporary_path = f"{output_path}.tmp"
+    try:
+        with open(temporary_path, 'w', encoding='utf-8', newline='\n') as stream:
+            _WRITERS[export_format](stream, source, track)
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
+        raise
+    return source.written
+
+
+class _ExportSignals(QObject):
+    """エクスポートタスクの通知"""
+    progress = pyqtSignal(int)              # 書き出した地点数
+    finished = pyqtSignal(int, str, float)  # 地点数, 出力ファイル, 所要秒数
+    failed = pyqtSignal(str)                # エラーメッセージ
+
+
+class GeoExportTask(QRunnable):
+    """撮影地点をバックグラウンドで書き出すタスク（引数は export_locations と同じ）"""
+
+    def __init__(self, output_path: str, **options):
+        super().__init__()
+        self.output_path = output_path
+        self.options = options
+        self.cancel_event = threading.Event()
+        self.signals = _ExportSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            written = export_locations(self.output_path, progress=self.signals.progress.emit,
+                                       cancel_event=self.cancel_event, **self.options)
+        except ExportCancelled:
+            self.signals.failed.emit("中断しました")
+            return
+        except Exception as e:
+            logging.error(f"エクスポートエラー: {e}")
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(written, self.output_path, time.perf_counter() - start)
+
+
+def main(argv=None) -> int:
+    """コマンドラインからのエクスポート（インデックス登録済みの写真が対象）"""
+    parser = argparse.ArgumentParser(
+        prog="photomap-export", description="GPS座標のある写真の撮影地点を GeoJSON / GPX / KML へ書き出す")
+    parser.add_argument("output", help="出力ファイル（拡張子で形式を判定: .geojson .json .gpx .kml）")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="出力形式（拡張子より優先）")
+    parser.add_argument("--folder", help="対象フォルダ（省略時はインデックス全体）")
+    parser.add_argument("--no-recursive", action="store_true", help="サブフォルダを含めない")
+    parser.add_argument("--query", default="", help="検索式（例: 'date:2024 camera:X100V'）")
+    parser.add_argument("--track", action="store_true", help="撮影順の軌跡も出力する")
+    arguments = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        written = export_locations(
+            arguments.output, arguments.format, arguments.query,
+            os.path.abspath(arguments.folder) if arguments.folder else None,
+            not arguments.no_recursive, arguments.track)
+    except (ValueError, OSError) as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 1
+    print(f"{written:,}地点を書き出しました: {arguments.output}（{time.perf_counter() - start:.1f}秒）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+ヘッドレスインデクサー - PhotoMap Explorer
+
+画面のないサーバーで、フォルダツリーの写真のメタデータ・サムネイル・類似画像検索用の
+特徴ベクトルを事前に作成する（夜間バッチなど）
+
+    photomap-explorer index <root>
+    photomap-index <root> --workers 8
+
+- フォルダの走査は ParallelScanner、EXIF読み取り・サムネイル作成・特徴ベクトル計算は
+  プロセスプールで並列に行う（デコードはGILを離さない処理が多いためスレッドでは伸びない）
+- 書き込み先はGUIと同じ写真インデックス（SQLite）とサムネイルキャッシュ
+  インデックスへの書き込みはメインプロセスだけが行い、一定件数ごとにコミットする
+- 登録済みで更新日時が変わっていないファイルは処理しないため、中断しても
+  同じコマンドを再実行すれば続きから処理される
+- PyQt のウィジェット（QtWidgets）は読み込まない（QImage のみ使用）
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+from multiprocessing import Pool
+from typing import Iterable, List, Optional, Tuple
+
+from logic.scanner import DEFAULT_EXCLUDE_PATTERNS, DEFAULT_SCAN_WORKERS, ParallelScanner
+
+# インデックスへ書き込む単位（1トランザクション）
+COMMIT_BATCH_SIZE = 200
+
+# 進捗を表示する間隔（秒）
+PROGRESS_INTERVAL = 5.0
+
+# ワーカーへまとめて渡す件数
+TASK_CHUNK_SIZE = 8
+
+# 処理内容のフラグ
+NEED_METADATA = 1
+NEED_THUMBNAIL = 2
+NEED_FEATURES = 4
+
+
+class IndexingStats:
+    """処理結果の集計"""
+
+    __slots__ = ('scanned', 'up_to_date', 'processed', 'failed', 'metadata', 'thumbnails', 'features',
+                 'scan_seconds', 'elapsed', 'interrupted')
+
+    def __init__(self):
+        self.scanned = 0
+        self.up_to_date = 0
+        self.processed = 0
+        self.failed = 0
+        self.metadata = 0
+        self.thumbnails = 0
+        self.features = 0
+        self.scan_seconds = 0.0
+        self.elapsed = 0.0
+        self.interrupted = False
+
+    def rate(self) -> float:
+        """処理速度（件/秒、走査時間を除く）"""
+        seconds = self.elapsed - self.scan_seconds
+        return self.processed / seconds if seconds > 0 else 0.0
+
+
+# ワーカープロセス
+
+_worker_cache = None
+
+
+def _init_worker(cache_dir: str):
+    """ワーカープロセスの初期化（中断はメインプロセスだけが受け取る）"""
+    global _worker_cache
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from logic.thumbnail_cache import ThumbnailCache
+    _worker_cache = ThumbnailCache(cache_dir)
+
+
+def _process_file(task: Tuple[str, int]):
+    """
+    1ファイル分の処理（ワーカープロセスで実行）
+
+    Returns:
+        Tuple: (パス, Photo または None, サムネイルを作成したか,
+                (更新日時, 特徴ベクトルのバイト列, dHash, pHash) または None, 失敗したか)
+    """
+    path, needs = task
+    photo = None
+    thumbnail_created = False
+    features = None
+    try:
+        if needs & NEED_METADATA:
+            from infrastructure.exif_reader import read_photo
+            photo = read_photo(path)
+            if photo is None:
+                return path, None, False, None, True
+        if needs & (NEED_THUMBNAIL | NEED_FEATURES):
+            cached = _worker_cache.contains(path)
+            image = _worker_cache.get_or_create(path)
+            if image.isNull():
+                return path, photo, False, None, True
+            thumbnail_created = not cached
+            if needs & NEED_FEATURES:
+                from domain.services.duplicate_service import compute_perceptual_hashes
+                from domain.services.similarity_service import compute_features
+                vector = compute_features(image)
+                if vector is not None:
+                    features = (os.stat(path).st_mtime, vector.tobytes()) + compute_perceptual_hashes(image)
+    except Exception:
+        return path, photo, thumbnail_created, features, True
+    return path, photo, thumbnail_created, features, False
+
+
+# メインプロセス
+
+def scan_tree(root: str, exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS,
+              max_depth: Optional[int] = None, workers: int = DEFAULT_SCAN_WORKERS) -> List[str]:
+    """フォルダツリーの画像パス（並び順は走査順）"""
+    paths = []
+    scanner = ParallelScanner(max_depth=max_depth, exclude_patterns=exclude_patterns, workers=workers)
+    # コールバックはワーカースレッドから呼ばれるが list.extend は1回の呼び出しが不可分
+    scanner.scan(root, paths.extend)
+    return paths
+
+
+def plan_tasks(paths: List[str], index, cache, thumbnails: bool = True,
+               features: bool = True) -> List[Tuple[str, int]]:
+    """
+    処理が必要なファイルと処理内容（登録済み・作成済みのものは除く）
+
+    Returns:
+        List[Tuple[str, int]]: (パス, NEED_* フラグ)
+    """
+    needs = dict.fromkeys(index.stale_paths(paths), NEED_METADATA)
+    if features:
+        for path in index.stale_feature_paths(paths):
+            needs[path] = needs.get(path, 0) | NEED_FEATURES
+    if thumbnails:
+        for path in paths:
+            if not cache.contains(path):
+                needs[path] = needs.get(path, 0) | NEED_THUMBNAIL
+    return [(path, needs[path]) for path in paths if path in needs]
+
+
+def _print_progress(stats: IndexingStats, total: int, started: float, stream):
+    elapsed = time.perf_counter() - started
+    rate = stats.processed / elapsed if elapsed > 0 else 0.0
+    remaining = (total - stats.processed) / rate if rate > 0 else 0.0
+    print(f"  {stats.processed:,}/{total:,} ({stats.processed / max(total, 1):.1%})  "
+          f"{rate:.1f}件/秒  残り約{remaining / 60:.1f}分", file=stream, flush=True)
+
+
+def run_indexing(root: str, workers: int = None, thumbnails: bool = True, features: bool = True,
+                 exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS, max_depth: Optional[int] = None,
+                 index=None, cache_dir: str = None, stream=sys.stdout) -> IndexingStats:
+    """
+    フォルダツリーを走査してインデックス・サムネイルキャッシュを作成
+
+    Args:
+        root: 起点フォルダ
+        workers: ワーカープロセス数（省略時はCPU数）
+        thumbnails: サムネイルを作成するか
+        features: 類似画像検索用の特徴ベクトルと知覚ハッシュを計算するか（サムネイルから計算）
+        exclude_patterns: 除外するフォルダ名・ファイル名のパターン
+        max_depth: 走査する深さ（Noneは無制限）
+        index: 書き込み先の PhotoIndex（省略時はGUIと同じインデックス）
+        cache_dir: サムネイルキャッシュフォルダ（省略時はGUIと同じフォルダ）
+        stream: 進捗の出力先（Noneなら出力しない）
+
+    Returns:
+        IndexingStats: 集計結果（Ctrl+C で中断した場合は interrupted=True）
+    """
+    from infrastructure.photo_index import get_photo_index
+    from logic.thumbnail_cache import ThumbnailCache, get_thumbnail_cache_dir
+
+    stats = IndexingStats()
+    started = time.perf_counter()
+    index = index if index is not None else get_photo_index()
+    cache_dir = cache_dir or get_thumbnail_cache_dir()
+
+    paths = scan_tree(root, exclude_patterns, max_depth)
+    stats.scanned = len(paths)
+    tasks = plan_tasks(paths, index, ThumbnailCache(cache_dir), thumbnails, features)
+    stats.up_to_date = stats.scanned - len(tasks)
+    stats.scan_seconds = time.perf_counter() - started
+    if stream is not None:
+        print(f"{stats.scanned:,}枚を検出（{stats.scan_seconds:.1f}秒）、処理済み {stats.up_to_date:,}枚、"
+              f"処理対象 {len(tasks):,}枚", file=stream, flush=True)
+
+    photos, vectors = [], []
+
+    def commit():
+        if photos:
+            index.upsert(photos)
+        if vectors:
+            index.upsert_features(vectors)
+        photos.clear()
+        vectors.clear()
+
+    if tasks:
+        processing_started = time.perf_counter()
+        last_report = processing_started
+        pool = Pool(workers or os.cpu_count() or 1, _init_worker, (cache_dir,))
+        try:
+            for path, photo, thumbnail_created, vector, failed in pool.imap_unordered(
+                    _process_file, tasks, TASK_CHUNK_SIZE):
+                stats.processed += 1
+                if photo is not None:
+                    photos.append(photo)
+                    stats.metadata += 1
+                if vector is not None:
+                    vectors.append((path,) + vector)
+                    stats.features += 1
+                if thumbnail_created:
+                    stats.thumbnails += 1
+                if failed:
+                    stats.failed += 1
+                if len(photos) + len(vectors) >= COMMIT_BATCH_SIZE:
+                    commit()
+                now = time.perf_counter()
+                if stream is not None and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    _print_progress(stats, len(tasks), processing_started, stream)
+            pool.close()
+        except KeyboardInterrupt:
+            # 処理済みの分は書き込んでから終了（再実行すると続きから処理する）
+            stats.interrupted = True
+            pool.terminate()
+        finally:
+            pool.join()
+            commit()
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def format_summary(stats: IndexingStats) -> str:
+    """処理結果の表示用文字列"""
+    lines = [
+        f"{'中断しました' if stats.interrupted else '完了しました'}（{stats.elapsed:.1f}秒）",
+        f"  検出 {stats.scanned:,}枚 / 処理済みで省略 {stats.up_to_date:,}枚 / 処理 {stats.processed:,}枚"
+        f" / 失敗 {stats.failed:,}枚",
+        f"  メタデータ {stats.metadata:,}件 / サムネイル {stats.thumbnails:,}件 / 特徴ベクトル {stats.features:,}件",
+        f"  処理速度 {stats.rate():.1f}件/秒（走査 {stats.scan_seconds:.1f}秒を除く）",
+    ]
+    if stats.interrupted:
+        lines.append("  同じコマンドを再実行すると続きから処理します")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    """コマンドラインからのインデックス作成"""
+    parser = argparse.ArgumentParser(
+        prog="photomap-explorer index",
+        description="フォルダツリーの写真のメタデータ・サムネイル・特徴ベクトルを事前に作成する（画面不要）")
+    parser.add_argument("root", help="起点フォルダ")
+    parser.add_argument("--workers", type=int, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--exclude", action="append", metavar="PATTERN",
+                        help="除外するフォルダ名・ファイル名のパターン（複数指定可、既定の除外パターンに追加）")
+    parser.add_argument("--max-depth", type=int, help="走査する深さ（0はルート直下のみ）")
+    parser.add_argument("--no-thumbnails", action="store_true", help="サムネイルを作成しない（特徴ベクトルの計算に使う分は作成される）")
+    parser.add_argument("--no-features", action="store_true", help="類似画像検索用の特徴ベクトルと知覚ハッシュを計算しない")
+    parser.add_argument("--quiet", action="store_true", help="進捗を表示しない")
+    arguments = parser.parse_args(argv)
+
+    root = os.path.abspath(arguments.root)
+    if not os.path.isdir(root):
+        print(f"エラー: フォルダがありません: {root}", file=sys.stderr)
+        return 1
+    try:
+        stats = run_indexing(
+            root, arguments.workers, not arguments.no_thumbnails, not arguments.no_features,
+            DEFAULT_EXCLUDE_PATTERNS + tuple(arguments.exclude or ()), arguments.max_depth,
+            stream=None if arguments.quiet else sys.stdout)
+    except KeyboardInterrupt:
+        # 走査中の中断（まだ何も書き込んでいない）
+        print("中断しました", file=sys.stderr)
+        return 130
+    print(format_summary(stats))
+    return 130 if stats.interrupted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
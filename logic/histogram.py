@@ -0,0 +1,164 @@
+"""
+ヒストグラム・露出統計 - PhotoMap Explorer
+
+デコード済みのプレビュー／サムネイル画像（QImage）のバッファを
+NumPyでコピーせずに参照し、間引いた画素からRGB・輝度ヒストグラムと
+白飛び・黒つぶれの割合を計算する（再デコードは行わない）
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtGui import QImage
+
+# ヒストグラム計算に使う最大辺（px）。これを超える画像はストライドで間引く
+HISTOGRAM_SAMPLE_EDGE = 512
+
+# ストライドでビューを取れる32bitフォーマット（メモリ上はB, G, R, Aの順）
+_BGRA_FORMATS = (
+    QImage.Format_RGB32,
+    QImage.Format_ARGB32,
+    QImage.Format_ARGB32_Premultiplied,
+)
+
+
+class HistogramData:
+    """ヒストグラム計算結果"""
+
+    __slots__ = ('red', 'green', 'blue', 'luma',
+                 'highlight_clip', 'shadow_clip', 'sample_count')
+
+    def __init__(self, red, green, blue, luma, highlight_clip, shadow_clip, sample_count):
+        self.red = red
+        self.green = green
+        self.blue = blue
+        self.luma = luma
+        self.highlight_clip = highlight_clip  # いずれかのチャンネルが255の画素の割合（%）
+        self.shadow_clip = shadow_clip        # 全チャンネルが0の画素の割合（%）
+        self.sample_count = sample_count
+
+
+def qimage_to_array(image: QImage) -> np.ndarray:
+    """
+    32bit QImageのバッファを (height, width, 4) のuint8配列として参照
+
+    コピーは行わない。返した配列の利用中は image を保持しておくこと
+    """
+    if image.format() not in _BGRA_FORMATS:
+        raise ValueError(f"未対応の画像フォーマットです: {image.format()}")
+    height, width = image.height(), image.width()
+    bytes_per_line = image.bytesPerLine()
+    buffer = image.constBits()
+    buffer.setsize(image.sizeInBytes())
+    rows = np.frombuffer(buffer, dtype=np.uint8).reshape(height, bytes_per_line)
+    return rows[:, :width * 4].reshape(height, width, 4)
+
+
+def compute_histogram(image: QImage, sample_edge: int = HISTOGRAM_SAMPLE_EDGE) -> Optional[HistogramData]:
+    """
+    デコード済み画像からヒストグラムを計算
+
+    Args:
+        image: プレビューまたはサムネイルとしてデコード済みの画像
+        sample_edge: 間引き後の最大辺（px）
+
+    Returns:
+        HistogramData: 計算結果（画像が無効な場合はNone）
+    """
+    if image is None or image.isNull():
+        return None
+    if image.format() not in _BGRA_FORMATS:
+        image = image.convertToFormat(QImage.Format_RGB32)
+
+    pixels = qimage_to_array(image)
+    step = max(1, -(-max(image.width(), image.height()) // sample_edge))
+    if step > 1:
+        pixels = pixels[::step, ::step]  # ストライドによる間引き（ビューのまま）
+
+    blue = pixels[..., 0].ravel()
+    green = pixels[..., 1].ravel()
+    red = pixels[..., 2].ravel()
+    count = red.size
+    if count == 0:
+        return None
+
+    # Rec.709 の輝度（整数近似）
+    luma = ((54 * red.astype(np.uint16) + 183 * green.astype(np.uint16)
+             + 19 * blue.astype(np.uint16)) >> 8).astype(np.uint8)
+
+    highlight = np.count_nonzero((red == 255) | (green == 255) | (blue == 255))
+    shadow = np.count_nonzero((red == 0) & (green == 0) & (blue == 0))
+
+    return HistogramData(
+        red=np.bincount(red, minlength=256),
+        green=np.bincount(green, minlength=256),
+        blue=np.bincount(blue, minlength=256),
+        luma=np.bincount(luma, minlength=256),
+        highlight_clip=highlight * 100.0 / count,
+        shadow_clip=shadow * 100.0 / count,
+        sample_count=count,
+    )
+
+
+class HistogramCache:
+    """
+    ファイル単位のヒストグラムキャッシュ
+
+    ファイルの更新（mtime・サイズの変化）で自動的に無効化される
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.normcase(os.path.abspath(path)), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, path: str) -> Optional[HistogramData]:
+        """キャッシュ済みのヒストグラムを取得"""
+        key = self._key(path)
+        if key is None:
+            return None
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def get_or_compute(self, path: str, image: QImage) -> Optional[HistogramData]:
+        """キャッシュ済みならそれを、なければ画像から計算して格納"""
+        key = self._key(path)
+        if key is not None:
+            with self._lock:
+                data = self._entries.get(key)
+                if data is not None:
+                    self._entries.move_to_end(key)
+                    return data
+
+        data = compute_histogram(image)
+        if data is not None and key is not None:
+            with self._lock:
+                self._entries[key] = data
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return data
+
+
+# グローバルヒストグラムキャッシュ
+_histogram_cache = None
+
+def get_histogram_cache() -> HistogramCache:
+    """グローバルヒストグラムキャッシュ取得"""
+    global _histogram_cache
+    if _histogram_cache is None:
+        _histogram_cache = HistogramCache()
+    return _histogram_cache
@@ -0,0 +1,253 @@
+"""
+デコード済み画像キャッシュ - PhotoMap Explorer
+
+プレビュー・比較表示で共有するQImageのLRUキャッシュ
+デコードはQThreadPool上で行い、GUIスレッドをブロックしない
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from PyQt5.QtCore import (Qt, QObject, QRunnable, QThreadPool, QSize, QBuffer, QByteArray,
+                          QIODevice, pyqtSignal)
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler, QTransform
+
+from logic.raw_preview import is_raw_file, read_embedded_jpeg
+from utils.profiler import span
+
+
+def _file_signature(path: str):
+    """ファイル変更検出用のシグネチャ（mtime, size）を取得"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+def apply_orientation(image: QImage, orientation: int) -> QImage:
+    """EXIF/TIFFのOrientation値（1〜8）に従って画像を回転・反転"""
+    if orientation in (2, 4, 5, 7):
+        # 2,4: 反転のみ / 5,7: 反転してから回転
+        image = image.mirrored(orientation in (2, 5, 7), orientation == 4)
+    angle = {3: 180, 5: 270, 6: 90, 7: 90, 8: 270}.get(orientation)
+    if angle:
+        image = image.transformed(QTransform().rotate(angle))
+    return image
+
+
+def decode_image(path: str, target_size: QSize = None) -> QImage:
+    """
+    画像ファイルを描画向けフォーマットでデコード
+
+    ワーカースレッドから呼び出し可能（QPixmapは使用しない）
+
+    Args:
+        path: 画像ファイルのパス
+        target_size: 指定時はこのサイズに収まるよう縮小デコード
+                     （JPEGはデコーダ側で縮小されるため大きな画像ほど高速）
+    """
+    orientation = 1
+    if is_raw_file(path):
+        # RAWは最大の埋め込みJPEGのみを読み出してデコード（センサーデータは読まない）
+        data, orientation = read_embedded_jpeg(path)
+        if not data:
+            return QImage()
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        reader = QImageReader(buffer, b"jpg")
+        reader.setAutoTransform(False)
+        rotated = orientation in (5, 6, 7, 8)
+    else:
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        rotated = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+
+    if target_size is not None and target_size.isValid():
+        source_size = reader.size()
+        if source_size.isValid():
+            # 回転付き画像は回転前のサイズで縮小指定する
+            if rotated:
+                target_size = target_size.transposed()
+            if source_size.width() > target_size.width() or source_size.height() > target_size.height():
+                reader.setScaledSize(source_size.scaled(target_size, Qt.KeepAspectRatio))
+
+    image = reader.read()
+    if image.isNull():
+        return QImage()
+    if orientation != 1:
+        image = apply_orientation(image, orientation)
+
+    # QPainterで高速に描画できるフォーマットへ変換
+    if image.hasAlphaChannel():
+        target = QImage.Format_ARGB32_Premultiplied
+    else:
+        target = QImage.Format_RGB32
+    if image.format() != target:
+        image = image.convertToFormat(target)
+    return image
+
+
+class _DecodeSignals(QObject):
+    """デコードタスク完了通知（QRunnableはシグナルを持てないため分離）"""
+    finished = pyqtSignal(str, object, QImage)  # path, signature, image
+
+
+class _DecodeTask(QRunnable):
+    """バックグラウンドデコードタスク"""
+
+    def __init__(self, path: str, signature):
+        super().__init__()
+        self.path = path
+        self.signature = signature
+        self.signals = _DecodeSignals()
+
+    def run(self):
+        try:
+            with span("preview.decode", "preview", path=self.path, background=True):
+                image = decode_image(self.path)
+        except Exception:
+            image = QImage()
+        self.signals.finished.emit(self.path, self.signature, image)
+
+
+class DecodedImageCache(QObject):
+    """
+    デコード済み画像キャッシュ
+
+    バイト数上限付きのLRUでQImageを保持し、
+    同じ画像の再デコードを避ける
+    """
+
+    # デコード完了シグナル（失敗時はnull QImage）
+    image_ready = pyqtSignal(str, QImage)
+
+    def __init__(self, max_bytes: int = 768 * 1024 * 1024, max_threads: int = 2):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # path -> (signature, QImage)
+        self._total_bytes = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+
+        # デコード専用プール（グローバルプールはサムネイル等と共有しない）
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str) -> Optional[QImage]:
+        """キャッシュ済みの画像を取得（未キャッシュ・ファイル変更時はNone）"""
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        signature, image = entry
+        if signature != _file_signature(path):
+            self.discard(path)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return image
+
+    def contains(self, path: str) -> bool:
+        """キャッシュ済みかどうか"""
+        return self.get(path) is not None
+
+    def load(self, path: str) -> QImage:
+        """画像を同期的に取得（キャッシュミス時は呼び出しスレッドでデコード）"""
+        image = self.get(path)
+        if image is not None:
+            return image
+        signature = _file_signature(path)
+        with span("preview.decode", "preview", path=path, background=False):
+            image = decode_image(path)
+        if not image.isNull():
+            self._store(self._key(path), signature, image)
+        return image
+
+    def request(self, path: str):
+        """
+        画像を非同期で要求
+
+        キャッシュ済みの場合も含め、準備完了時に image_ready を発行する
+        """
+        image = self.get(path)
+        if image is not None:
+            self.image_ready.emit(path, image)
+            return
+
+        key = self._key(path)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+
+        task = _DecodeTask(path, _file_signature(path))
+        task.signals.finished.connect(self._on_decoded)
+        self._pool.start(task)
+
+    def prefetch(self, paths):
+        """複数の画像を先読み"""
+        for path in paths:
+            if not self.contains(path):
+                self.request(path)
+
+    def discard(self, path: str):
+        """指定画像をキャッシュから削除"""
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._total_bytes -= entry[1].sizeInBytes()
+
+    def clear(self):
+        """キャッシュを全削除"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def _store(self, key: str, signature, image: QImage):
+        """画像を格納し、上限を超えた分を古い順に破棄"""
+        size = image.sizeInBytes()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1].sizeInBytes()
+            self._entries[key] = (signature, image)
+            self._total_bytes += size
+            # 直近に格納した1枚は上限を超えていても保持する
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted.sizeInBytes()
+
+    def _on_decoded(self, path: str, signature, image: QImage):
+        """デコード完了（GUIスレッドで実行）"""
+        key = self._key(path)
+        with self._lock:
+            self._pending.discard(key)
+        if not image.isNull():
+            self._store(key, signature, image)
+        self.image_ready.emit(path, image)
+
+
+# グローバル画像キャッシュ
+_image_cache = None
+
+def get_image_cache() -> DecodedImageCache:
+    """グローバル画像キャッシュ取得"""
+    global _image_cache
+    if _image_cache is None:
+        _image_cache = DecodedImageCache()
+    return _image_cache
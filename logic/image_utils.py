@@ -1,19 +1,22 @@
 from PyQt5.QtGui import QPixmap
 import os
-import folium
-import exifread
+from utils.constants import IMAGE_EXTENSIONS
 
 def load_pixmap(image_path):
+    from logic.raw_preview import is_raw_file
+    if is_raw_file(image_path):
+        # RAWは埋め込みJPEGプレビューを表示
+        from logic.image_cache import decode_image
+        return QPixmap.fromImage(decode_image(image_path))
     return QPixmap(image_path)
 
 def find_images_in_directory(folder_path, recursive=False):
-    valid_extensions = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+    valid_extensions = tuple(IMAGE_EXTENSIONS)
     image_paths = []
     if recursive:
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file.lower().endswith(valid_extensions):
-                    image_paths.append(os.path.abspath(os.path.join(root, file)))
+        # サブフォルダは並列スキャン（除外パターンなし＝os.walkと同じ対象）
+        from logic.scanner import scan_images
+        image_paths = scan_images(folder_path, exclude_patterns=())
     else:
         try:
             for file in os.listdir(folder_path):
@@ -22,10 +25,13 @@ def find_images_in_directory(folder_path, recursive=False):
                     image_paths.append(os.path.abspath(full_path))
         except Exception:
             pass
-    # ファイル名昇順でソートして返す
-    return sorted(image_paths, key=lambda x: os.path.basename(x).lower())
+    # ファイル名の自然順（IMG_2 < IMG_10）でソートして返す
+    from domain.services.sort_modes import natural_key
+    return sorted(image_paths, key=lambda x: natural_key(os.path.basename(x)))
 
 def extract_gps_coords(image_path):
+    # exifread・folium は最初に使うときに読み込む（モジュールの読み込みで起動を遅らせない）
+    import exifread
     try:
         with open(image_path, 'rb') as f:
             tags = exifread.process_file(f, details=False, strict=True)
@@ -57,6 +63,7 @@ def extract_gps_coords(image_path):
         return None
 
 def generate_map_html(lat, lon):
+    import folium
     map_obj = folium.Map(location=[lat, lon], zoom_start=15)
     folium.Marker([lat, lon], tooltip="画像の位置").add_to(map_obj)
     output_path = os.path.abspath("map.html")
@@ -85,6 +92,7 @@ def extract_image_info(image_path):
         
         # exifreadを使用してEXIF情報を取得
         try:
+            import exifread
             with open(image_path, 'rb') as f:
                 tags = exifread.process_file(f, details=False, strict=True)
             
@@ -0,0 +1,119 @@
+"""
+ライブラリインデクサー - PhotoMap Explorer
+
+表示中の画像のメタデータをバックグラウンドで読み込み、写真インデックスへ登録する
+登録済みでサイズ・更新日時が変わっていないファイルはEXIFを読み直さない
+"""
+
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from infrastructure.photo_index import get_photo_index
+
+# インデックスへ書き込む単位（1トランザクション・1通知）
+INDEX_BATCH_SIZE = 200
+
+
+class _IndexSignals(QObject):
+    """インデックス登録タスクの通知"""
+    progress = pyqtSignal(int, int, int)  # generation, 処理済み数, 対象数
+    finished = pyqtSignal(int, int)       # generation, 登録数
+
+
+class _IndexTask(QRunnable):
+    """メタデータを読み込んでインデックスへ登録するタスク"""
+
+    def __init__(self, generation: int, paths, directory, index, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.paths = list(paths)
+        self.directory = directory
+        self.index = index
+        self.cancel_event = cancel_event
+        self.signals = _IndexSignals()
+
+    def run(self):
+        # EXIF読み取り（exifread）は最初の登録時に読み込む
+        from infrastructure.exif_reader import read_photo
+        indexed = 0
+        try:
+            if self.directory is not None:
+                # フォルダから消えたファイルをインデックスからも削除
+                self.index.sync_directory(self.directory, self.paths)
+            stale = self.index.stale_paths(self.paths)
+            batch = []
+            for position, path in enumerate(stale, 1):
+                if self.cancel_event.is_set():
+                    break
+                photo = read_photo(path)
+                if photo is not None:
+                    batch.append(photo)
+                if len(batch) >= INDEX_BATCH_SIZE or position == len(stale):
+                    self.index.upsert(batch)
+                    indexed += len(batch)
+                    batch = []
+                    self.signals.progress.emit(self.generation, position, len(stale))
+        except Exception as e:
+            logging.error(f"インデックス登録エラー: {e}")
+        self.signals.finished.emit(self.generation, indexed)
+
+
+class LibraryIndexer(QObject):
+    """
+    バックグラウンドのインデックス登録管理
+
+    新しい要求が来たら実行中の登録は打ち切る（フォルダを次々に移動しても溜まらない）
+    """
+
+    progress = pyqtSignal(int, int)  # 処理済み数, 対象数
+    finished = pyqtSignal(int)       # 登録数
+
+    def __init__(self, index=None):
+        super().__init__()
+        self.index = index if index is not None else get_photo_index()
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        # EXIF読み込みはI/O主体のため専用プール（サムネイル処理と取り合わない）
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def index_paths(self, paths, directory: str = None):
+        """
+        画像パスをインデックスへ登録
+
+        Args:
+            paths: 画像ファイルのパス
+            directory: 指定時はこのフォルダ直下の登録内容を paths と同期する
+        """
+        self.cancel()
+        self._cancel_event = threading.Event()
+        task = _IndexTask(self._generation, paths, directory, self.index, self._cancel_event)
+        task.signals.progress.connect(self._on_progress)
+        task.signals.finished.connect(self._on_finished)
+        self._pool.start(task)
+
+    def cancel(self):
+        """実行中の登録を打ち切る（登録済みのバッチは残る）"""
+        self._cancel_event.set()
+        self._generation += 1
+
+    def _on_progress(self, generation, done, total):
+        if generation == self._generation:
+            self.progress.emit(done, total)
+
+    def _on_finished(self, generation, indexed):
+        if generation == self._generation:
+            self.finished.emit(indexed)
+
+
+# グローバルインデクサー
+_library_indexer = None
+
+def get_library_indexer() -> LibraryIndexer:
+    """グローバルライブラリインデクサー取得"""
+    global _library_indexer
+    if _library_indexer is None:
+        _library_indexer = LibraryIndexer()
+    return _library_indexer
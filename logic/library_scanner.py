@@ -0,0 +1,125 @@
+"""
+ライブラリスキャナー - PhotoMap Explorer
+
+ParallelScanner をバックグラウンドスレッドで実行し、見つかった画像パスを
+GUIスレッドへまとめて届ける（フォルダごとにシグナルを送るとイベントループが詰まるため、
+一定間隔でタイマーが溜まった分をまとめて取り出す）
+"""
+
+import logging
+import threading
+from typing import Iterable, Optional
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from logic.scanner import DEFAULT_EXCLUDE_PATTERNS, DEFAULT_SCAN_WORKERS, ParallelScanner
+
+# 見つかった画像をGUIへ渡す間隔（ミリ秒）
+DELIVERY_INTERVAL_MS = 80
+
+
+class LibraryScanner(QObject):
+    """
+    フォルダツリーの再帰スキャン管理
+
+    新しいスキャンを開始すると実行中のスキャンは打ち切る
+    """
+
+    files_found = pyqtSignal(list)        # 新たに見つかった画像パス
+    progress = pyqtSignal(int, int)       # 画像のあったフォルダ数, 画像数
+    finished = pyqtSignal(int, float)     # 画像数, 所要秒数
+
+    def __init__(self, workers: int = DEFAULT_SCAN_WORKERS):
+        super().__init__()
+        self.workers = workers
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._found = []
+        self._directories = 0
+        self._files = 0
+        self._result = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(DELIVERY_INTERVAL_MS)
+        self._timer.timeout.connect(self._deliver)
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def scan(self, root: str, max_depth: Optional[int] = None,
+             exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS):
+        """
+        フォルダツリーのスキャンを開始
+
+        Args:
+            root: 起点フォルダ
+            max_depth: 走査する深さ（Noneは無制限）
+            exclude_patterns: 除外するフォルダ名・ファイル名のパターン
+        """
+        self.cancel()
+        self._generation += 1
+        generation = self._generation
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
+        with self._lock:
+            self._found = []
+            self._directories = 0
+            self._files = 0
+            self._result = None
+
+        scanner = ParallelScanner(max_depth, exclude_patterns, workers=self.workers)
+
+        def on_batch(images):
+            with self._lock:
+                if generation == self._generation:
+                    self._found.extend(images)
+                    self._directories += 1
+                    self._files += len(images)
+
+        def run():
+            try:
+                result = scanner.scan(root, on_batch, cancel_event)
+            except Exception as e:
+                logging.error(f"ライブラリスキャンエラー: {e}")
+                result = None
+            with self._lock:
+                if generation == self._generation:
+                    self._result = result or False
+
+        self._thread = threading.Thread(target=run, daemon=True, name="library-scanner")
+        self._thread.start()
+        self._timer.start()
+
+    def cancel(self):
+        """実行中のスキャンを打ち切る（通知済みのパスはそのまま）"""
+        self._cancel_event.set()
+        self._timer.stop()
+        self._generation += 1
+
+    def _deliver(self):
+        """溜まった画像パスをGUIスレッドで通知"""
+        with self._lock:
+            found, self._found = self._found, []
+            directories, files, result = self._directories, self._files, self._result
+        if found:
+            self.files_found.emit(found)
+            self.progress.emit(directories, files)
+        if result is not None:
+            self._timer.stop()
+            if result is False:
+                self.finished.emit(files, 0.0)
+            elif not result.cancelled:
+                self.finished.emit(result.files, result.elapsed)
+
+
+# グローバルライブラリスキャナー
+_library_scanner = None
+
+def get_library_scanner() -> LibraryScanner:
+    """グローバルライブラリスキャナー取得"""
+    global _library_scanner
+    if _library_scanner is None:
+        _library_scanner = LibraryScanner()
+    return _library_scanner
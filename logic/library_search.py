@@ -0,0 +1,125 @@
+"""
+ライブラリ検索 - PhotoMap Explorer
+
+検索式を写真インデックスへのクエリに変換してバックグラウンドで実行し、
+一致したパスをページ単位でGUIへ届ける（最初のページは全件の取得を待たずに表示できる）
+"""
+
+import logging
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from domain.services.query_service import PhotoQuery
+from infrastructure.photo_index import get_photo_index
+
+# 1回の通知で届けるパス数（最初のページは画面を埋める程度で小さめ）
+FIRST_PAGE_SIZE = 200
+PAGE_SIZE = 2000
+
+
+class _SearchSignals(QObject):
+    """検索タスクの通知"""
+    page_ready = pyqtSignal(int, list, float)  # generation, パス, 検索開始からの秒数
+    finished = pyqtSignal(int, int, float)     # generation, 一致数, 所要秒数
+    failed = pyqtSignal(int, str)              # generation, エラーメッセージ
+
+
+class _SearchTask(QRunnable):
+    """インデックスを検索するタスク"""
+
+    def __init__(self, generation: int, query: PhotoQuery, index, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.query = query
+        self.index = index
+        self.cancel_event = cancel_event
+        self.signals = _SearchSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        matched = 0
+        try:
+            where, parameters = self.query.to_sql()
+            pages = self.index.iter_paths(where, parameters, FIRST_PAGE_SIZE)
+            # 最初のページだけ小さく取り、以降はまとめて届ける
+            first = next(pages, [])
+            if first:
+                matched += len(first)
+                self.signals.page_ready.emit(self.generation, first, time.perf_counter() - start)
+            batch = []
+            for page in pages:
+                if self.cancel_event.is_set():
+                    pages.close()
+                    return
+                batch.extend(page)
+                if len(batch) >= PAGE_SIZE:
+                    matched += len(batch)
+                    self.signals.page_ready.emit(self.generation, batch, time.perf_counter() - start)
+                    batch = []
+            if batch:
+                matched += len(batch)
+                self.signals.page_ready.emit(self.generation, batch, time.perf_counter() - start)
+        except Exception as e:
+            logging.error(f"ライブラリ検索エラー: {e}")
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, matched, time.perf_counter() - start)
+
+
+class LibrarySearch(QObject):
+    """
+    ライブラリ検索の管理
+
+    新しい検索を開始すると実行中の検索結果は破棄する
+    """
+
+    results_found = pyqtSignal(list, float)  # 一致したパス, 検索開始からの秒数
+    finished = pyqtSignal(int, float)        # 一致数, 所要秒数
+    failed = pyqtSignal(str)                 # エラーメッセージ
+
+    def __init__(self, index=None):
+        super().__init__()
+        self.index = index if index is not None else get_photo_index()
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def search(self, query: PhotoQuery):
+        """検索を開始（書式エラーは PhotoQuery の作成時に QueryError として送出される）"""
+        self.cancel()
+        self._cancel_event = threading.Event()
+        task = _SearchTask(self._generation, query, self.index, self._cancel_event)
+        task.signals.page_ready.connect(self._on_page_ready)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._pool.start(task)
+
+    def cancel(self):
+        self._cancel_event.set()
+        self._generation += 1
+
+    def _on_page_ready(self, generation, paths, elapsed):
+        if generation == self._generation:
+            self.results_found.emit(paths, elapsed)
+
+    def _on_finished(self, generation, matched, elapsed):
+        if generation == self._generation:
+            self.finished.emit(matched, elapsed)
+
+    def _on_failed(self, generation, message):
+        if generation == self._generation:
+            self.failed.emit(message)
+
+
+# グローバルライブラリ検索
+_library_search = None
+
+def get_library_search() -> LibrarySearch:
+    """グローバルライブラリ検索取得"""
+    global _library_search
+    if _library_search is None:
+        _library_search = LibrarySearch()
+    return _library_search
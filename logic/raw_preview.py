@@ -0,0 +1,246 @@
+"""
+RAW埋め込みプレビュー - PhotoMap Explorer
+
+CR2 / NEF / ARW / DNG はTIFF構造のコンテナで、フルサイズに近い
+JPEGプレビューを内包している。IFDチェーン（SubIFDを含む）を辿って
+最大の埋め込みJPEGの位置だけを特定し、そのバイト列のみを読み出す。
+センサーデータ（CFA・ロスレスJPEG）は読み込まない。
+"""
+
+import os
+import struct
+from typing import List, Optional
+
+from utils.constants import RAW_IMAGE_EXTENSIONS
+
+# TIFFタグ
+_TAG_NEW_SUBFILE_TYPE = 0x00FE
+_TAG_COMPRESSION = 0x0103
+_TAG_PHOTOMETRIC = 0x0106
+_TAG_STRIP_OFFSETS = 0x0111
+_TAG_ORIENTATION = 0x0112
+_TAG_STRIP_BYTE_COUNTS = 0x0117
+_TAG_SUB_IFDS = 0x014A
+_TAG_JPEG_OFFSET = 0x0201
+_TAG_JPEG_LENGTH = 0x0202
+
+# 型ID -> (バイト数, struct書式)
+_TYPE_FORMATS = {
+    1: (1, 'B'), 3: (2, 'H'), 4: (4, 'I'), 7: (1, 'B'), 13: (4, 'I'), 16: (8, 'Q'),
+}
+
+# CFA・LinearRaw（センサーデータ）のPhotometricInterpretation
+_SENSOR_PHOTOMETRICS = {32803, 34892}
+
+# JPEGとして扱う圧縮方式（旧JPEG・JPEG）
+_JPEG_COMPRESSIONS = {6, 7}
+
+# 解析の安全上限
+_MAX_IFDS = 64
+_MAX_ENTRIES = 1024
+
+# ロスレスJPEG（SOF3）等を除外するため、ヘッダ走査で読むバイト数
+_JPEG_HEADER_SCAN = 64 * 1024
+
+
+class EmbeddedPreview:
+    """埋め込みJPEGプレビューの位置情報"""
+
+    __slots__ = ('offset', 'length', 'width', 'height')
+
+    def __init__(self, offset: int, length: int, width: int = 0, height: int = 0):
+        self.offset = offset
+        self.length = length
+        self.width = width
+        self.height = height
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+
+class RawPreviewInfo:
+    """RAWファイルの解析結果"""
+
+    __slots__ = ('previews', 'orientation')
+
+    def __init__(self, previews: List[EmbeddedPreview], orientation: int = 1):
+        self.previews = previews
+        self.orientation = orientation
+
+    @property
+    def largest(self) -> Optional[EmbeddedPreview]:
+        """最大のプレビュー（画素数優先、同じならバイト数）"""
+        if not self.previews:
+            return None
+        return max(self.previews, key=lambda p: (p.pixels, p.length))
+
+
+def is_raw_file(path: str) -> bool:
+    """RAWファイルかどうかを拡張子で判定"""
+    return os.path.splitext(path)[1].lower() in RAW_IMAGE_EXTENSIONS
+
+
+def parse_raw_file(path: str) -> Optional[RawPreviewInfo]:
+    """
+    RAWファイルのIFDを解析して埋め込みJPEGを列挙
+
+    Returns:
+        RawPreviewInfo: 解析結果（TIFF構造でない場合はNone）
+    """
+    try:
+        with open(path, 'rb') as f:
+            return _parse(f, os.fstat(f.fileno()).st_size)
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+def read_embedded_jpeg(path: str):
+    """
+    最大の埋め込みJPEGのバイト列とOrientationを取得
+
+    Returns:
+        tuple: (bytes, orientation)。プレビューがない場合は (None, 1)
+    """
+    try:
+        with open(path, 'rb') as f:
+            info = _parse(f, os.fstat(f.fileno()).st_size)
+            if info is None or info.largest is None:
+                return None, 1
+            preview = info.largest
+            f.seek(preview.offset)
+            return f.read(preview.length), info.orientation
+    except (OSError, struct.error, ValueError):
+        return None, 1
+
+
+def _parse(f, file_size: int) -> Optional[RawPreviewInfo]:
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+    if header[:2] == b'II':
+        endian = '<'
+    elif header[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+    magic, first_ifd = struct.unpack(endian + 'HI', header[2:8])
+    if magic != 42:
+        return None
+
+    previews = []
+    orientation = 1
+    visited = set()
+    queue = [(first_ifd, True)]  # (IFDオフセット, 次IFDを辿るか)
+
+    while queue and len(visited) < _MAX_IFDS:
+        offset, follow_next = queue.pop(0)
+        if offset <= 0 or offset >= file_size or offset in visited:
+            continue
+        visited.add(offset)
+
+        tags, next_ifd = _read_ifd(f, endian, offset, file_size)
+
+        if offset == first_ifd and _TAG_ORIENTATION in tags:
+            orientation = tags[_TAG_ORIENTATION][0]
+
+        for sub_ifd in tags.get(_TAG_SUB_IFDS, ()):
+            queue.append((sub_ifd, False))
+
+        for preview in _previews_in_ifd(tags, file_size):
+            if _probe_jpeg(f, preview):
+                previews.append(preview)
+
+        if follow_next and next_ifd:
+            queue.append((next_ifd, True))
+
+    return RawPreviewInfo(previews, orientation)
+
+
+def _read_ifd(f, endian: str, offset: int, file_size: int):
+    """IFDを読み込み、{タグ: 値リスト} と次IFDオフセットを返す"""
+    f.seek(offset)
+    count_data = f.read(2)
+    if len(count_data) < 2:
+        return {}, 0
+    (count,) = struct.unpack(endian + 'H', count_data)
+    count = min(count, _MAX_ENTRIES)
+    entries = f.read(count * 12)
+    next_data = f.read(4)
+    next_ifd = struct.unpack(endian + 'I', next_data)[0] if len(next_data) == 4 else 0
+
+    tags = {}
+    for i in range(len(entries) // 12):
+        tag, type_id, value_count, value_offset = struct.unpack(
+            endian + 'HHII', entries[i * 12:(i + 1) * 12])
+        if type_id not in _TYPE_FORMATS or value_count == 0 or value_count > 4096:
+            continue
+        size, fmt = _TYPE_FORMATS[type_id]
+        total = size * value_count
+        if total <= 4:
+            raw = entries[i * 12 + 8:i * 12 + 8 + total]
+        else:
+            if value_offset + total > file_size:
+                continue
+            position = f.tell()
+            f.seek(value_offset)
+            raw = f.read(total)
+            f.seek(position)
+        if len(raw) < total:
+            continue
+        tags[tag] = list(struct.unpack(endian + fmt * value_count, raw))
+    return tags, next_ifd
+
+
+def _previews_in_ifd(tags, file_size: int):
+    """IFD内のJPEGプレビュー候補を列挙"""
+    candidates = []
+
+    # JPEGInterchangeFormat（NEF・ARW・CR2のサムネイル等）
+    if _TAG_JPEG_OFFSET in tags and _TAG_JPEG_LENGTH in tags:
+        candidates.append(EmbeddedPreview(tags[_TAG_JPEG_OFFSET][0], tags[_TAG_JPEG_LENGTH][0]))
+
+    # 単一ストリップのJPEG（CR2のIFD0、DNGのプレビューIFD等）
+    compression = tags.get(_TAG_COMPRESSION, [0])[0]
+    photometric = tags.get(_TAG_PHOTOMETRIC, [0])[0]
+    offsets = tags.get(_TAG_STRIP_OFFSETS, [])
+    lengths = tags.get(_TAG_STRIP_BYTE_COUNTS, [])
+    if (compression in _JPEG_COMPRESSIONS and photometric not in _SENSOR_PHOTOMETRICS
+            and len(offsets) == 1 and len(lengths) == 1):
+        candidates.append(EmbeddedPreview(offsets[0], lengths[0]))
+
+    return [p for p in candidates
+            if p.length > 0 and p.offset > 0 and p.offset + p.length <= file_size]
+
+
+def _probe_jpeg(f, preview: EmbeddedPreview) -> bool:
+    """
+    JPEGヘッダを走査し、通常のJPEG（SOF0/1/2）なら寸法を設定してTrue
+
+    ロスレスJPEG（SOF3、センサーデータ）や壊れたデータはFalse
+    """
+    f.seek(preview.offset)
+    data = f.read(min(preview.length, _JPEG_HEADER_SCAN))
+    if data[:2] != b'\xff\xd8':
+        return False
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return False
+        marker = data[position + 1]
+        if marker == 0xFF:  # パディング
+            position += 1
+            continue
+        (segment_length,) = struct.unpack('>H', data[position + 2:position + 4])
+        if marker in (0xC0, 0xC1, 0xC2):
+            if position + 9 > len(data):
+                return False
+            height, width = struct.unpack('>HH', data[position + 5:position + 9])
+            preview.width, preview.height = width, height
+            return width > 0 and height > 0
+        if 0xC3 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return False  # ロスレス・算術符号化など（Qtでデコード不可）
+        if marker == 0xDA:  # SOFより先にスキャン開始
+            return False
+        position += 2 + segment_length
+    return False
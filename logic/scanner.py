@@ -0,0 +1,214 @@
+"""
+並列ディレクトリスキャナー - PhotoMap Explorer
+
+os.scandir によるフォルダツリーの再帰走査を複数スレッドで行う
+ネットワークファイルシステムでは1回の scandir の待ち時間が支配的なため、
+複数フォルダを同時に読むことで全体の所要時間を短縮する
+
+- 各ワーカーは自分の両端キューにサブフォルダを積み、末尾から取り出す（深さ優先）
+- 自分のキューが空になったら他のワーカーのキューの先頭から奪う（ワークスティーリング）
+- 見つかった画像はフォルダ単位のバッチでコールバックへ渡す（全件の完了を待たない）
+
+PyQtに依存しないため、GUIなしの環境からも利用できる
+"""
+
+import fnmatch
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+from utils.constants import IMAGE_EXTENSIONS
+from utils.profiler import span, traced
+
+DEFAULT_SCAN_WORKERS = 8
+
+# 既定の除外パターン（フォルダ名・ファイル名に対する fnmatch）
+DEFAULT_EXCLUDE_PATTERNS = (
+    '.*', '__pycache__', '@eaDir', '#recycle', '$RECYCLE.BIN', 'System Volume Information',
+)
+
+
+class ScanResult:
+    """スキャン結果の集計"""
+
+    __slots__ = ('directories', 'files', 'errors', 'elapsed', 'cancelled')
+
+    def __init__(self):
+        self.directories = 0
+        self.files = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+
+
+class ParallelScanner:
+    """
+    ワークスティーリング方式の並列フォルダスキャナー
+
+    Args:
+        max_depth: 走査する深さ（0はルート直下のみ、Noneは無制限）
+        exclude_patterns: 除外するフォルダ名・ファイル名のパターン
+        extensions: 対象とする拡張子（小文字、ドット付き）
+        workers: ワーカースレッド数
+        follow_symlinks: シンボリックリンク先のフォルダも辿るか
+    """
+
+    def __init__(self, max_depth: Optional[int] = None,
+                 exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS,
+                 extensions: Iterable[str] = IMAGE_EXTENSIONS,
+                 workers: int = DEFAULT_SCAN_WORKERS,
+                 follow_symlinks: bool = False):
+        self.max_depth = max_depth
+        self.exclude_patterns = tuple(pattern for pattern in exclude_patterns if pattern)
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.workers = max(1, int(workers))
+        self.follow_symlinks = follow_symlinks
+
+    def _excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude_patterns)
+
+    @traced("scan.tree", "scan")
+    def scan(self, root: str, on_batch: Callable[[List[str]], None],
+             cancel_event: threading.Event = None) -> ScanResult:
+        """
+        フォルダツリーを走査
+
+        Args:
+            root: 起点フォルダ
+            on_batch: フォルダごとの画像パスのリストを受け取るコールバック
+                      （ワーカースレッドから呼ばれる）
+            cancel_event: セットされたら走査を打ち切る
+
+        Returns:
+            ScanResult: 集計結果
+        """
+        result = ScanResult()
+        start = time.perf_counter()
+        cancel_event = cancel_event or threading.Event()
+
+        queues = [deque() for _ in range(self.workers)]
+        condition = threading.Condition()
+        state = {'pending': 1}  # キュー内と処理中のフォルダ数
+        queues[0].append((os.path.abspath(root), 0))
+        visited = set()  # シンボリックリンクを辿る場合の循環防止
+        counters_lock = threading.Lock()
+
+        def take(worker_id: int):
+            """自分のキュー末尾、なければ他のキュー先頭からフォルダを取得"""
+            own = queues[worker_id]
+            try:
+                return own.pop()
+            except IndexError:
+                pass
+            victims = list(range(self.workers))
+            random.shuffle(victims)
+            for victim in victims:
+                if victim == worker_id:
+                    continue
+                try:
+                    return queues[victim].popleft()
+                except IndexError:
+                    continue
+            return None
+
+        def publish(worker_id: int, subdirectories: List[str], depth: int):
+            """サブフォルダをキューへ追加（他のワーカーに取られる前に未処理数へ加算しておく）"""
+            if not subdirectories:
+                return
+            with condition:
+                state['pending'] += len(subdirectories)
+                queues[worker_id].extend((subdirectory, depth + 1) for subdirectory in subdirectories)
+                condition.notify_all()
+
+        def finish_one():
+            with condition:
+                state['pending'] -= 1
+                if state['pending'] == 0:
+                    condition.notify_all()
+
+        def worker(worker_id: int):
+            while True:
+                if cancel_event.is_set():
+                    with condition:
+                        condition.notify_all()
+                    return
+                item = take(worker_id)
+                if item is None:
+                    with condition:
+                        if state['pending'] == 0:
+                            return
+                        condition.wait(0.05)
+                    continue
+
+                directory, depth = item
+                with span("scan.folder", "scan", path=directory):
+                    subdirectories, images, failed = self._scan_one(directory, depth, visited, counters_lock)
+                publish(worker_id, subdirectories, depth)
+                with counters_lock:
+                    result.directories += 1
+                    result.files += len(images)
+                    result.errors += failed
+                if images and not cancel_event.is_set():
+                    on_batch(images)
+                finish_one()
+
+        threads = [threading.Thread(target=worker, args=(worker_id,), daemon=True,
+                                    name=f"scanner-{worker_id}")
+                   for worker_id in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        result.cancelled = cancel_event.is_set()
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _scan_one(self, directory: str, depth: int, visited: set, lock: threading.Lock):
+        """1フォルダを読み、(サブフォルダ, 画像パス, エラー数) を返す"""
+        subdirectories = []
+        images = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if self._excluded(name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                            if self.max_depth is not None and depth >= self.max_depth:
+                                continue
+                            if self.follow_symlinks:
+                                key = os.path.realpath(entry.path)
+                                with lock:
+                                    if key in visited:
+                                        continue
+                                    visited.add(key)
+                            subdirectories.append(entry.path)
+                        elif name.lower().endswith(self.extensions) and entry.is_file():
+                            images.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            return subdirectories, images, 1
+        images.sort(key=str.lower)
+        return subdirectories, images, 0
+
+
+def scan_images(root: str, max_depth: Optional[int] = None,
+                exclude_patterns: Iterable[str] = DEFAULT_EXCLUDE_PATTERNS,
+                workers: int = DEFAULT_SCAN_WORKERS) -> List[str]:
+    """フォルダツリー内の画像パスを並列走査で取得（パス順にソート）"""
+    found = []
+    lock = threading.Lock()
+
+    def collect(batch):
+        with lock:
+            found.extend(batch)
+
+    ParallelScanner(max_depth, exclude_patterns, workers=workers).scan(root, collect)
+    found.sort(key=lambda path: path.lower())
+    return found
@@ -0,0 +1,119 @@
+"""
+類似画像検索の実行 - PhotoMap Explorer
+
+類似画像インデックスの読み込み（保存済みの全特徴ベクトル、10万枚で約40MB）と
+未計算の写真の特徴ベクトルの計算（サムネイルの作成を含む）をバックグラウンドで行い、
+検索結果をGUIへ届ける
+"""
+
+import logging
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from domain.services.similarity_service import DEFAULT_NEIGHBORS, compute_features, get_similarity_index
+from logic.thumbnail_cache import get_thumbnail_cache
+
+
+class _SimilaritySignals(QObject):
+    """類似画像検索タスクの通知"""
+    finished = pyqtSignal(int, str, list, int, float)  # generation, 検索元, (類似度, パス), 検索対象数, 検索ms
+    failed = pyqtSignal(int, str)                      # generation, エラーメッセージ
+
+
+class _WarmTask(QRunnable):
+    """類似画像インデックスを読み込むだけのタスク"""
+
+    def run(self):
+        try:
+            get_similarity_index()
+        except Exception as e:
+            logging.error(f"類似画像インデックス読み込みエラー: {e}")
+
+
+class _SimilarityTask(QRunnable):
+    """指定画像に似た写真を検索するタスク"""
+
+    def __init__(self, generation: int, path: str, k: int, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.path = path
+        self.k = k
+        self.cancel_event = cancel_event
+        self.signals = _SimilaritySignals()
+
+    def run(self):
+        try:
+            similarity_index = get_similarity_index()
+            vector = similarity_index.vector(self.path)
+            if vector is None:
+                # 未計算なら検索元の1枚だけここで計算（インデックスへの保存は特徴ベクトルインデクサーが行う）
+                vector = compute_features(get_thumbnail_cache().get_or_create(self.path))
+                if vector is None:
+                    self.signals.failed.emit(self.generation, "画像の特徴を計算できませんでした")
+                    return
+            if self.cancel_event.is_set():
+                return
+            start = time.perf_counter()
+            results = similarity_index.search(vector, self.k, exclude=self.path)
+            elapsed = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            logging.error(f"類似画像検索エラー: {e}")
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        self.signals.finished.emit(self.generation, self.path, results, len(similarity_index), elapsed)
+
+
+class SimilaritySearch(QObject):
+    """
+    類似画像検索の管理
+
+    新しい検索を開始すると実行中の検索結果は破棄する
+    """
+
+    finished = pyqtSignal(str, list, int, float)  # 検索元, (類似度, パス), 検索対象数, 検索ms
+    failed = pyqtSignal(str)                      # エラーメッセージ
+
+    def __init__(self):
+        super().__init__()
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def warm(self):
+        """類似画像インデックスを先に読み込んでおく（最初の検索を待たせない）"""
+        self._pool.start(_WarmTask())
+
+    def search(self, path: str, k: int = DEFAULT_NEIGHBORS):
+        """指定画像に似た写真の検索を開始"""
+        self.cancel()
+        self._cancel_event = threading.Event()
+        task = _SimilarityTask(self._generation, path, k, self._cancel_event)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._pool.start(task)
+
+    def cancel(self):
+        self._cancel_event.set()
+        self._generation += 1
+
+    def _on_finished(self, generation, path, results, total, elapsed):
+        if generation == self._generation:
+            self.finished.emit(path, results, total, elapsed)
+
+    def _on_failed(self, generation, message):
+        if generation == self._generation:
+            self.failed.emit(message)
+
+
+# グローバル類似画像検索
+_similarity_search = None
+
+def get_similarity_search() -> SimilaritySearch:
+    """グローバル類似画像検索取得"""
+    global _similarity_search
+    if _similarity_search is None:
+        _similarity_search = SimilaritySearch()
+    return _similarity_search
@@ -0,0 +1,95 @@
+"""
+並べ替えキーの読み込み - PhotoMap Explorer
+
+表示中の写真の並べ替えキー（撮影日時・サイズ・緯度経度・ファイル名の自然順位）を
+バックグラウンドで作成する。インデックスからは必要な列だけを取得し Photo を組み立てないため、
+10万枚でもGUIスレッドを止めずに並べ替えを切り替えられる
+"""
+
+import logging
+import threading
+from typing import List
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from domain.services.sort_service import SORT_COLUMNS, SortKeys
+from infrastructure.photo_index import get_photo_index
+
+
+class _SortKeysSignals(QObject):
+    """並べ替えキー作成タスクの通知"""
+    finished = pyqtSignal(int, list)  # generation, SortKeys のリスト
+
+
+class _SortKeysTask(QRunnable):
+    """写真の集合ごとに並べ替えキーを作成するタスク"""
+
+    def __init__(self, generation: int, path_sets: List[List[str]], index, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.path_sets = path_sets
+        self.index = index
+        self.cancel_event = cancel_event
+        self.signals = _SortKeysSignals()
+
+    def run(self):
+        built = []
+        try:
+            for paths in self.path_sets:
+                if self.cancel_event.is_set():
+                    return
+                # 同じ写真の集合（フォルダ表示のサムネイルとフォルダ内容リストなど）は1回だけ作成
+                if any(keys.covers(paths) for keys in built):
+                    continue
+                built.append(SortKeys.from_values(paths, self.index.columns_values(paths, SORT_COLUMNS)))
+        except Exception as e:
+            logging.error(f"並べ替えキー作成エラー: {e}")
+            return
+        if not self.cancel_event.is_set():
+            self.signals.finished.emit(self.generation, built)
+
+
+class SortKeyLoader(QObject):
+    """
+    並べ替えキーの読み込み管理
+
+    新しい読み込みを開始すると実行中の読み込み結果は破棄する
+    """
+
+    keys_ready = pyqtSignal(list)  # SortKeys のリスト
+
+    def __init__(self, index=None):
+        super().__init__()
+        self.index = index if index is not None else get_photo_index()
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def load(self, path_sets: List[List[str]]):
+        """写真の集合（パスのリスト）ごとの並べ替えキーの作成を開始"""
+        self.cancel()
+        self._cancel_event = threading.Event()
+        task = _SortKeysTask(self._generation, [list(paths) for paths in path_sets], self.index,
+                             self._cancel_event)
+        task.signals.finished.connect(self._on_finished)
+        self._pool.start(task)
+
+    def cancel(self):
+        self._cancel_event.set()
+        self._generation += 1
+
+    def _on_finished(self, generation, keys):
+        if generation == self._generation:
+            self.keys_ready.emit(keys)
+
+
+# グローバル並べ替えキー読み込み
+_sort_key_loader = None
+
+def get_sort_key_loader() -> SortKeyLoader:
+    """グローバル並べ替えキー読み込み取得"""
+    global _sort_key_loader
+    if _sort_key_loader is None:
+        _sort_key_loader = SortKeyLoader()
+    return _sort_key_loader
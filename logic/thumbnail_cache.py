@@ -0,0 +1,115 @@
+"""
+サムネイルディスクキャッシュ - PhotoMap Explorer
+
+縮小デコードしたサムネイルを settings/thumbnails 以下に保存し、
+次回以降は元画像をデコードせずに読み込む
+
+キーは (絶対パス, サイズ, 更新日時) のハッシュのため、ファイルが変更されると
+自動的に別エントリとなる（古いエントリは参照されなくなるだけ）
+
+QtGui（QImage）のみを使用し、ウィジェットなしの環境からも利用できる
+"""
+
+import hashlib
+import logging
+import os
+from typing import Optional
+
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+
+from logic.image_cache import decode_image
+from utils.profiler import span
+
+# キャッシュするサムネイルの最大辺（px）。表示サイズ（最大192px）より大きめにしておく
+THUMBNAIL_EDGE = 256
+THUMBNAIL_QUALITY = 85
+
+
+class ThumbnailCache:
+    """サムネイルのディスクキャッシュ"""
+
+    def __init__(self, cache_dir: str, edge: int = THUMBNAIL_EDGE):
+        self.cache_dir = cache_dir
+        self.edge = edge
+
+    def cache_path(self, path: str, stat: os.stat_result = None) -> Optional[str]:
+        """キャッシュファイルのパス（拡張子なし）。元ファイルにアクセスできなければNone"""
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return None
+        key = f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{self.edge}"
+        digest = hashlib.blake2b(key.encode('utf-8', 'surrogateescape'), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest[2:])
+
+    def load(self, path: str) -> Optional[QImage]:
+        """キャッシュ済みのサムネイルを読み込む（なければNone）"""
+        base = self.cache_path(path)
+        if base is None:
+            return None
+        for extension in ('.jpg', '.png'):
+            if os.path.exists(base + extension):
+                image = QImage(base + extension)
+                if not image.isNull():
+                    return image
+        return None
+
+    def contains(self, path: str) -> bool:
+        base = self.cache_path(path)
+        return base is not None and (os.path.exists(base + '.jpg') or os.path.exists(base + '.png'))
+
+    def store(self, path: str, image: QImage) -> bool:
+        """サムネイルを保存（透過ありはPNG、それ以外はJPEG）"""
+        base = self.cache_path(path)
+        if base is None or image.isNull():
+            return False
+        try:
+            os.makedirs(os.path.dirname(base), exist_ok=True)
+            if image.hasAlphaChannel():
+                target, file_format, quality = base + '.png', 'PNG', -1
+            else:
+                target, file_format, quality = base + '.jpg', 'JPG', THUMBNAIL_QUALITY
+            # 途中で中断されても壊れたファイルが残らないよう一時ファイル経由で置き換え
+            temporary = f"{target}.{os.getpid()}.tmp"
+            if not image.save(temporary, file_format, quality):
+                return False
+            os.replace(temporary, target)
+            return True
+        except OSError as e:
+            logging.debug(f"サムネイル保存エラー ({path}): {e}")
+            return False
+
+    def get_or_create(self, path: str) -> QImage:
+        """
+        サムネイルを取得（キャッシュになければ縮小デコードして保存）
+
+        ワーカースレッド・ワーカープロセスから呼び出し可能
+        """
+        with span("thumbnail.get_or_create", "thumbnail", path=path) as current:
+            image = self.load(path)
+            if image is not None:
+                current.annotate(cached=True)
+                return image
+            image = decode_image(path, QSize(self.edge, self.edge))
+            if not image.isNull():
+                self.store(path, image)
+            current.annotate(cached=False)
+            return image
+
+
+def get_thumbnail_cache_dir() -> str:
+    """サムネイルキャッシュフォルダ（テーマ設定と同じsettingsフォルダ）"""
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(app_dir, "settings", "thumbnails")
+
+
+# グローバルサムネイルキャッシュ
+_thumbnail_cache = None
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """グローバルサムネイルキャッシュ取得"""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache(get_thumbnail_cache_dir())
+    return _thumbnail_cache
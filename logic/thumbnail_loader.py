@@ -0,0 +1,117 @@
+"""
+サムネイル読み込みサービス - PhotoMap Explorer
+
+サムネイルビューやフォルダ選択ダイアログなど複数の画面からの読み込み要求を
+1つのスレッドプールで処理する（画面ごとにプールを持つとデコードが同時に走りすぎる）
+
+- 読み込みはディスクキャッシュ経由（2回目以降はデコードしない）
+- 後から要求されたもの（＝今見えている項目）ほど優先して読み込む
+- 要求元ごとに取り消せる（フォルダ移動時に未着手の要求を捨てる）
+"""
+
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from logic.thumbnail_cache import get_thumbnail_cache
+
+
+class _ThumbnailSignals(QObject):
+    """サムネイル読み込み完了通知"""
+    finished = pyqtSignal(int, str, QImage)  # generation, path, image
+
+
+class _ThumbnailTask(QRunnable):
+    """サムネイル読み込みタスク（取り消し済みなら何もしない）"""
+
+    def __init__(self, generation: int, path: str, cache, cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.path = path
+        self.cache = cache
+        self.cancel_event = cancel_event
+        self.signals = _ThumbnailSignals()
+
+    def run(self):
+        if self.cancel_event.is_set():
+            return
+        try:
+            image = self.cache.get_or_create(self.path)
+        except Exception:
+            image = QImage()
+        self.signals.finished.emit(self.generation, self.path, image)
+
+
+class ThumbnailLoader(QObject):
+    """共有のサムネイル読み込みプール"""
+
+    def __init__(self, max_threads: int = None, cache=None):
+        super().__init__()
+        self.cache = cache or get_thumbnail_cache()
+        self._priority = 0
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or max(2, QThreadPool.globalInstance().maxThreadCount() // 2))
+
+    def start(self, task: _ThumbnailTask):
+        # 後から要求されたものほど優先度を高くする
+        self._priority += 1
+        self._pool.start(task, self._priority)
+
+    def requests(self, parent=None) -> "ThumbnailRequests":
+        """要求元ごとの受付窓口を作成"""
+        return ThumbnailRequests(self, parent)
+
+
+class ThumbnailRequests(QObject):
+    """
+    要求元1つ分のサムネイル要求
+
+    同じパスの重複要求はまとめ、cancel() で未着手の要求をまとめて取り消す
+    """
+
+    # サムネイル準備完了（path, QImage。読み込めなかった場合は null の QImage）
+    loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, loader: ThumbnailLoader, parent=None):
+        super().__init__(parent)
+        self._loader = loader
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._pending = set()
+
+    def request(self, path: str):
+        """読み込みを要求（読み込み中なら何もしない）"""
+        if path in self._pending:
+            return
+        self._pending.add(path)
+        task = _ThumbnailTask(self._generation, path, self._loader.cache, self._cancel_event)
+        task.signals.finished.connect(self._on_finished)
+        self._loader.start(task)
+
+    def is_pending(self, path: str) -> bool:
+        return path in self._pending
+
+    def cancel(self):
+        """未着手の要求を取り消し、実行中の結果も通知しない"""
+        self._cancel_event.set()
+        self._cancel_event = threading.Event()
+        self._generation += 1
+        self._pending.clear()
+
+    def _on_finished(self, generation: int, path: str, image: QImage):
+        if generation != self._generation:
+            return
+        self._pending.discard(path)
+        self.loaded.emit(path, image)
+
+
+# グローバルサムネイル読み込みサービス
+_thumbnail_loader = None
+
+def get_thumbnail_loader() -> ThumbnailLoader:
+    """グローバルサムネイル読み込みサービス取得"""
+    global _thumbnail_loader
+    if _thumbnail_loader is None:
+        _thumbnail_loader = ThumbnailLoader()
+    return _thumbnail_loader
@@ -1,8 +1,17 @@
+import time
+
+# 起動プロファイルの基準時刻（他のモジュールを読み込む前）
+_START_TIME = time.perf_counter()
+
+import argparse
 import sys
 import os
-from PyQt5.QtCore import Qt, QCoreApplication
-from PyQt5.QtWidgets import QApplication
-from presentation.views.functional_new_main_view import FunctionalNewMainWindow
+
+# 既定の起動プロファイル出力先
+DEFAULT_STARTUP_PROFILE = "startup_profile.txt"
+
+# 既定のUI停止レポート出力先
+DEFAULT_STALL_REPORT = "stall_report.txt"
 
 def setup_qt_environment():
     """Qt環境の設定"""
@@ -29,14 +38,74 @@ def setup_qt_environment():
     if os.path.exists(qt5_locales_path):
         os.environ['QTWEBENGINE_LOCALES_PATH'] = qt5_locales_path
 
-if __name__ == "__main__":
+def parse_arguments(argv):
+    """コマンドライン引数の解析（Qtの引数はそのまま残す）"""
+    parser = argparse.ArgumentParser(prog="photomap-explorer", description="PhotoMap Explorer")
+    parser.add_argument("--startup-profile", nargs="?", const=DEFAULT_STARTUP_PROFILE, metavar="PATH",
+                        help=f"モジュール読み込み時間と最初の描画までの時間を書き出す（既定: {DEFAULT_STARTUP_PROFILE}）")
+    parser.add_argument("--stall-report", nargs="?", const=DEFAULT_STALL_REPORT, metavar="PATH",
+                        help=f"UI停止（イベントループの詰まり）を監視し、終了時に停止箇所の集計を書き出す（既定: {DEFAULT_STALL_REPORT}）")
+    return parser.parse_known_args(argv)
+
+
+def main(argv=None):
+    """アプリケーションを起動（photomap-explorer index <root> は画面なしでインデックスを作成）"""
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1 and argv[1] == "index":
+        from logic.headless_indexer import main as index_main
+        return index_main(argv[2:])
+    
+    arguments, qt_arguments = parse_arguments(argv[1:])
+    
+    profile = None
+    if arguments.startup_profile:
+        from utils.startup_profile import StartupProfile
+        profile = StartupProfile(_START_TIME)
+        profile.install()
+    
+    # Qtとメインウィンドウは必要になってから読み込む（重いモジュールは各画面で初回使用時に読み込む）
+    from PyQt5.QtCore import Qt, QCoreApplication
+    from PyQt5.QtWidgets import QApplication
+    
     # Setup Qt environment
     setup_qt_environment()
     
     # Fix Qt WebEngine OpenGL context sharing warning
     QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     
-    app = QApplication(sys.argv)
+    app = QApplication(argv[:1] + qt_arguments)
+    if profile:
+        profile.mark("QApplication 作成")
+    
+    from presentation.views.functional_new_main_view import FunctionalNewMainWindow
+    if profile:
+        profile.mark("メインウィンドウのモジュール読み込み")
     window = FunctionalNewMainWindow()
+    if profile:
+        profile.mark("メインウィンドウ作成")
+        
+        def report_startup():
+            profile.mark_first_paint()
+            profile.uninstall()
+            profile.write(arguments.startup_profile)
+            print(f"最初の描画まで {profile.first_paint * 1000:.1f} ms（詳細: {arguments.startup_profile}）", flush=True)
+        
+        window.first_painted.connect(report_startup)
+    
+    if arguments.stall_report:
+        from utils.stall_detector import get_stall_detector
+        detector = get_stall_detector()
+        detector.start()
+        
+        def report_stalls():
+            detector.stop()
+            detector.write(arguments.stall_report)
+            print(f"UI停止 {len(detector.stalls)} 回（詳細: {arguments.stall_report}）", flush=True)
+        
+        app.aboutToQuit.connect(report_stalls)
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+PhotoMap Explorer 処理時間ベンチマーク
+
+tests/performance/test_performance.py の実行用（引数も同じ）
+    python performance_test.py --count 500 --size 4000x3000
+"""
+
+import sys
+
+from tests.performance.test_performance import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,12 +5,15 @@
 """
 
 from .theme_manager import ThemeManager, ThemeMode, get_theme_manager
+from .stylesheet_compiler import StylesheetCompiler, get_stylesheet_compiler
 from .theme_mixin import ThemeAwareMixin, ThemedWidget, apply_theme_to_widget, get_themed_style, get_themed_color
 
 __all__ = [
     'ThemeManager',
     'ThemeMode', 
     'get_theme_manager',
+    'StylesheetCompiler',
+    'get_stylesheet_compiler',
     'ThemeAwareMixin',
     'ThemedWidget',
     'apply_theme_to_widget',
@@ -0,0 +1,110 @@
+"""
+アプリケーションスタイルシート - PhotoMap Explorer
+
+ThemeManager のテンプレートからアプリケーション全体のQSSを1つに組み立て、
+QApplication.setStyleSheet で1回だけ適用する
+（ウィジェットごとに setStyleSheet・polish し直すとテーマ切り替えがウィジェット数に比例して重くなる）
+
+- 汎用コンポーネント（button, group_box など）はその型の全ウィジェットに適用
+- それ以外のコンポーネント（maximize_button, title_label など）は
+  register_theme_component で付けた動的プロパティのセレクタに限定
+- 組み立てたQSSはテーマごとにキャッシュ（テンプレートは実行中に変わらない）
+"""
+
+import re
+from typing import Dict, Optional
+
+from PyQt5.QtWidgets import QApplication
+
+from utils.profiler import traced
+
+from .theme_manager import ThemeManager, ThemeMode, get_theme_manager
+
+# コンポーネント名を保持する動的プロパティ
+THEME_COMPONENT_PROPERTY = "themeComponent"
+
+# 型セレクタのまま全体に適用するコンポーネント（この順で先に出力）
+GLOBAL_COMPONENTS = ('application', 'main_window', 'group_box', 'button', 'list_widget')
+
+# セレクタ（"{" の前）
+_SELECTOR_PATTERN = re.compile(r'([^{}]+)\{')
+# 先頭の型名（"QPushButton:hover" の "QPushButton"）
+_TYPE_PATTERN = re.compile(r'^(\s*[A-Za-z_][\w]*)')
+
+
+def scope_stylesheet(stylesheet: str, component: str) -> str:
+    """
+    各ルールのセレクタを指定コンポーネントのウィジェットに限定
+
+    "QPushButton:hover" -> 'QPushButton[themeComponent="maximize_button"]:hover'
+    子孫セレクタは先頭（祖先側）を限定する
+    """
+    attribute = f'[{THEME_COMPONENT_PROPERTY}="{component}"]'
+
+    def scope(match):
+        selectors = [_TYPE_PATTERN.sub(lambda type_match: type_match.group(1) + attribute, selector, count=1)
+                     for selector in match.group(1).split(',')]
+        return ','.join(selectors) + '{'
+
+    return _SELECTOR_PATTERN.sub(scope, stylesheet)
+
+
+class StylesheetCompiler:
+    """テーマごとのアプリケーションQSSの組み立てと適用"""
+
+    def __init__(self, theme_manager: ThemeManager = None):
+        self.theme_manager = theme_manager or get_theme_manager()
+        self._compiled: Dict[ThemeMode, str] = {}
+
+    def compile(self, theme: ThemeMode = None) -> str:
+        """テーマのアプリケーションQSS（キャッシュ済みならそれを返す）"""
+        theme = theme or self.theme_manager.get_current_theme()
+        stylesheet = self._compiled.get(theme)
+        if stylesheet is None:
+            stylesheet = self._build(theme)
+            self._compiled[theme] = stylesheet
+        return stylesheet
+
+    def _build(self, theme: ThemeMode) -> str:
+        components = list(self.theme_manager.get_theme_data(theme)["styles"])
+        ordered = [name for name in GLOBAL_COMPONENTS if name in components]
+        ordered += [name for name in components if name not in GLOBAL_COMPONENTS]
+        parts = []
+        for name in ordered:
+            style = self.theme_manager.get_style(name, theme).strip()
+            if name not in GLOBAL_COMPONENTS:
+                style = scope_stylesheet(style, name)
+            parts.append(f"/* {name} */\n{style}")
+        return "\n".join(parts) + "\n"
+
+    def invalidate(self):
+        """キャッシュを破棄（テンプレートを変更した場合）"""
+        self._compiled.clear()
+
+    @traced("theme.apply_stylesheet", "theme")
+    def apply(self, theme: ThemeMode = None, application: Optional[QApplication] = None) -> bool:
+        """
+        アプリケーションへ適用（同じQSSが適用済みなら何もしない）
+
+        Returns:
+            bool: 適用した場合True
+        """
+        application = application or QApplication.instance()
+        if application is None:
+            return False
+        stylesheet = self.compile(theme)
+        if application.styleSheet() == stylesheet:
+            return False
+        application.setStyleSheet(stylesheet)
+        return True
+
+
+# グローバルスタイルシートコンパイラー
+_stylesheet_compiler = None
+
+def get_stylesheet_compiler() -> StylesheetCompiler:
+    """グローバルスタイルシートコンパイラー取得"""
+    global _stylesheet_compiler
+    if _stylesheet_compiler is None:
+        _stylesheet_compiler = StylesheetCompiler()
+    return _stylesheet_compiler
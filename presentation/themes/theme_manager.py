@@ -19,6 +19,53 @@ class ThemeMode(Enum):
     AUTO = "auto"  # システム設定に従う
 
 
+# テーマ共通のHTMLテンプレート（マップ表示の案内画面）
+# {色名} はテーマ読み込み時に解決し、{{項目}} は表示のたびに render_html の引数で埋める
+_HTML_TEMPLATES = {
+    "map_gps": """
+<html>
+<body style="font-family: Arial, sans-serif; text-align: center; padding: 20px; margin: 0; background-color: {background}; color: {foreground};">
+    <div style="background: {group_bg}; border: 2px solid {accent}; border-radius: 10px; padding: 20px; max-width: 400px; margin: 0 auto;">
+        <h3 style="color: {accent}; margin-top: 0;">📍 GPS座標情報</h3>
+        <p style="margin: 10px 0;"><strong>緯度:</strong> {{latitude:.6f}}</p>
+        <p style="margin: 10px 0;"><strong>経度:</strong> {{longitude:.6f}}</p>
+        <p style="margin: 10px 0; color: {muted};"><strong>画像:</strong> {{name}}</p>
+        <div style="margin-top: 15px; padding: 10px; background: {secondary}; border-radius: 5px;">
+            <small style="color: {muted};">{{note}}</small>
+        </div>
+    </div>
+</body>
+</html>
+    """,
+    "map_no_gps": """
+<html>
+<body style="font-family: Arial, sans-serif; text-align: center; padding: 50px; margin: 0; background-color: {background}; color: {foreground};">
+    <div style="background: {group_bg}; border: 2px solid {warning}; border-radius: 10px; padding: 30px; max-width: 400px; margin: 0 auto;">
+        <h3 style="color: {warning}; margin-top: 0;">📍 GPS情報なし</h3>
+        <p style="color: {muted}; margin: 15px 0;">この画像にはGPS座標が含まれていません。</p>
+        <div style="margin-top: 20px; padding: 10px; background: {secondary}; border-radius: 5px;">
+            <small style="color: {muted};">位置情報付きの画像を選択してください</small>
+        </div>
+    </div>
+</body>
+</html>
+    """,
+    "map_initial": """
+<html>
+<body style="font-family: Arial, sans-serif; text-align: center; padding: 50px; margin: 0; background-color: {background}; color: {foreground};">
+    <div style="background: {group_bg}; border: 2px solid {info}; border-radius: 10px; padding: 30px; max-width: 400px; margin: 0 auto;">
+        <h3 style="color: {info}; margin-top: 0;">🗺️ マップビュー</h3>
+        <p style="color: {muted}; margin: 15px 0;">GPS情報付きの画像を選択すると、ここに地図が表示されます。</p>
+        <div style="margin-top: 20px; padding: 10px; background: {secondary}; border-radius: 5px;">
+            <small style="color: {muted};">位置情報付きの画像を選択してください</small>
+        </div>
+    </div>
+</body>
+</html>
+    """,
+}
+
+
 class ThemeManager(QObject):
     """
     テーマ管理クラス
@@ -41,8 +88,13 @@ class ThemeManager(QObject):
             ThemeMode.DARK: self._create_dark_theme()
         }
         
+        # 色を埋め込み済みのスタイル・HTMLテンプレート（テーマごとに読み込み時に1回だけ計算）
+        self._resolved: Dict[ThemeMode, Dict[str, Dict[str, str]]] = {}
+        self.invalidate_cache()
+        
         # 設定読み込み
         self._load_settings()
+        self._bind_current_theme()
     
     def _get_settings_path(self) -> str:
         """設定ファイルパス取得"""
@@ -148,7 +200,7 @@ QLabel {{
 }}
                 """,
                 "list_widget": """
-QListWidget {{
+QListWidget, QListView[themeComponent="list_widget"] {{
     background-color: {background};
     color: {foreground};
     border: 1px solid {border};
@@ -156,14 +208,14 @@ QListWidget {{
     selection-background-color: {selection};
     alternate-background-color: {secondary};
 }}
-QListWidget::item {{
+QListWidget::item, QListView[themeComponent="list_widget"]::item {{
     padding: 5px;
     border-bottom: 1px solid {border};
 }}
-QListWidget::item:hover {{
+QListWidget::item:hover, QListView[themeComponent="list_widget"]::item:hover {{
     background-color: {hover};
 }}
-QListWidget::item:selected {{
+QListWidget::item:selected, QListView[themeComponent="list_widget"]::item:selected {{
     background-color: {selection};
     color: {foreground};
 }}
@@ -172,6 +224,64 @@ QListWidget::item:selected {{
 QWidget {{
     background-color: {background};
     color: {foreground};
+}}
+                """,
+                "application": """
+QWidget {{
+    background-color: {background};
+    color: {foreground};
+}}
+QStatusBar {{
+    background-color: {background};
+    color: {foreground};
+    border: none;
+    border-top: 1px solid {border};
+}}
+QStatusBar::item {{
+    border: none;
+}}
+QSplitter::handle {{
+    background-color: {border};
+}}
+QSplitter::handle:horizontal {{
+    width: 3px;
+}}
+QSplitter::handle:vertical {{
+    height: 3px;
+}}
+                """,
+                "address_button": """
+QPushButton {{
+    border: 2px solid {border};
+    background-color: {button_bg};
+    color: {foreground};
+    padding: 4px 12px;
+    margin: 1px;
+    border-radius: 5px;
+    min-height: 18px;
+    max-height: 22px;
+    font-weight: 500;
+}}
+QPushButton:hover {{
+    background-color: {hover};
+    border-color: {accent};
+}}
+QPushButton:pressed {{
+    background-color: {selection};
+    border-color: {accent};
+}}
+                """,
+                "title_label": """
+QLabel {{
+    font-weight: normal;
+    color: {muted};
+    font-size: 11px;
+}}
+                """,
+                "error_label": """
+QLabel {{
+    color: {error};
+    padding: 20px;
 }}
                 """
             }
@@ -275,7 +385,7 @@ QLabel {{
 }}
                 """,
                 "list_widget": """
-QListWidget {{
+QListWidget, QListView[themeComponent="list_widget"] {{
     background-color: {background};
     color: {foreground};
     border: 1px solid {border};
@@ -283,15 +393,15 @@ QListWidget {{
     selection-background-color: {selection};
     alternate-background-color: {secondary};
 }}
-QListWidget::item {{
+QListWidget::item, QListView[themeComponent="list_widget"]::item {{
     padding: 5px;
     border-bottom: 1px solid {border};
     color: {foreground};
 }}
-QListWidget::item:hover {{
+QListWidget::item:hover, QListView[themeComponent="list_widget"]::item:hover {{
     background-color: {hover};
 }}
-QListWidget::item:selected {{
+QListWidget::item:selected, QListView[themeComponent="list_widget"]::item:selected {{
     background-color: {selection};
     color: white;
 }}
@@ -300,6 +410,64 @@ QListWidget::item:selected {{
 QWidget {{
     background-color: {background};
     color: {foreground};
+}}
+                """,
+                "application": """
+QWidget {{
+    background-color: {background};
+    color: {foreground};
+}}
+QStatusBar {{
+    background-color: {background};
+    color: {foreground};
+    border: none;
+    border-top: 1px solid {border};
+}}
+QStatusBar::item {{
+    border: none;
+}}
+QSplitter::handle {{
+    background-color: {border};
+}}
+QSplitter::handle:horizontal {{
+    width: 3px;
+}}
+QSplitter::handle:vertical {{
+    height: 3px;
+}}
+                """,
+                "address_button": """
+QPushButton {{
+    border: 2px solid {border};
+    background-color: {button_bg};
+    color: {foreground};
+    padding: 4px 12px;
+    margin: 1px;
+    border-radius: 5px;
+    min-height: 18px;
+    max-height: 22px;
+    font-weight: 500;
+}}
+QPushButton:hover {{
+    background-color: {hover};
+    border-color: {accent};
+}}
+QPushButton:pressed {{
+    background-color: {selection};
+    border-color: {accent};
+}}
+                """,
+                "title_label": """
+QLabel {{
+    font-weight: normal;
+    color: {muted};
+    font-size: 11px;
+}}
+                """,
+                "error_label": """
+QLabel {{
+    color: {error};
+    padding: 20px;
 }}
                 """
             }
@@ -313,6 +481,7 @@ QWidget {{
         """テーマを設定"""
         if theme != self.current_theme:
             self.current_theme = theme
+            self._bind_current_theme()
             self._save_settings()
             self.theme_changed.emit(theme.value)
     
@@ -328,23 +497,51 @@ QWidget {{
         theme = theme or self.current_theme
         return self.themes.get(theme, self.themes[ThemeMode.LIGHT])
     
-    def get_style(self, component: str, theme: ThemeMode = None) -> str:
-        """コンポーネントのスタイル取得"""
-        theme_data = self.get_theme_data(theme)
-        style_template = theme_data["styles"].get(component, "")
+    def invalidate_cache(self):
+        """解決済みのスタイル・HTMLテンプレートを作り直す（テーマ定義を変更した場合）"""
+        self._resolved = {theme: self._resolve_theme(theme_data) for theme, theme_data in self.themes.items()}
+        if hasattr(self, '_current'):
+            self._bind_current_theme()
+    
+    def _resolve_theme(self, theme_data: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+        """テーマの色をスタイル・HTMLテンプレートへ埋め込む"""
         colors = theme_data["colors"]
-        
-        # カラー変数を置換
-        try:
-            return style_template.format(**colors)
-        except KeyError as e:
-            print(f"テーマスタイル警告: {component} で未定義カラー {e}")
-            return style_template
+        resolved = {"colors": dict(colors), "styles": {}, "html": {}}
+        for kind, templates in (("styles", theme_data["styles"]), ("html", _HTML_TEMPLATES)):
+            for name, template in templates.items():
+                try:
+                    resolved[kind][name] = template.format(**colors)
+                except KeyError as e:
+                    print(f"テーマスタイル警告: {name} で未定義カラー {e}")
+                    resolved[kind][name] = template
+        return resolved
+    
+    def _bind_current_theme(self):
+        """現在のテーマの解決済みテーブルを参照に束ねる（テーマ変更時のみ）"""
+        self._current = self._resolved.get(self.current_theme, self._resolved[ThemeMode.LIGHT])
+    
+    def _resolved_for(self, theme: ThemeMode = None) -> Dict[str, Dict[str, str]]:
+        if theme is None:
+            return self._current
+        return self._resolved.get(theme, self._resolved[ThemeMode.LIGHT])
+    
+    def get_style(self, component: str, theme: ThemeMode = None) -> str:
+        """コンポーネントのスタイル取得（色は埋め込み済み）"""
+        return self._resolved_for(theme)["styles"].get(component, "")
     
     def get_color(self, color_name: str, theme: ThemeMode = None) -> str:
         """カラー値取得"""
-        theme_data = self.get_theme_data(theme)
-        return theme_data["colors"].get(color_name, "#000000")
+        return self._resolved_for(theme)["colors"].get(color_name, "#000000")
+    
+    def render_html(self, template_name: str, **fields) -> str:
+        """
+        HTMLテンプレートを描画（テーマの色は埋め込み済みで、表示ごとの項目だけを埋める）
+        
+        Args:
+            template_name: テンプレート名（map_gps, map_no_gps, map_initial）
+            fields: テンプレートの項目（文字列はHTMLエスケープ済みで渡す）
+        """
+        return self._current["html"][template_name].format(**fields)
     
     def _load_settings(self):
         """設定読み込み"""
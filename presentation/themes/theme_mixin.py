@@ -6,6 +6,7 @@
 
 from PyQt5.QtCore import QObject
 from .theme_manager import get_theme_manager, ThemeMode
+from .stylesheet_compiler import THEME_COMPONENT_PROPERTY
 
 
 class ThemeAwareMixin:
@@ -23,8 +24,13 @@ class ThemeAwareMixin:
         self.theme_manager.theme_changed.connect(self.on_theme_changed)
     
     def register_theme_component(self, widget, component_type="widget"):
-        """テーマコンポーネントを登録"""
+        """
+        テーマコンポーネントを登録
+
+        アプリケーションQSSのコンポーネント別ルールが効くよう動的プロパティを付ける
+        """
         self.theme_components.append((widget, component_type))
+        widget.setProperty(THEME_COMPONENT_PROPERTY, component_type)
     
     def apply_theme(self):
         """テーマを適用"""
@@ -46,6 +52,10 @@ class ThemeAwareMixin:
     def get_theme_style(self, style_key: str) -> str:
         """テーマスタイルを取得"""
         return self.theme_manager.get_style(style_key)
+    
+    def render_theme_html(self, template_name: str, **fields) -> str:
+        """テーマのHTMLテンプレートを描画"""
+        return self.theme_manager.render_html(template_name, **fields)
 
 
 # ダミー関数（互換性のため）
@@ -5,11 +5,13 @@
 v2.1.0: ダークモード・ライトモード切り替え対応
 """
 
+import html
 import os
 from pathlib import Path
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QSplitter, QWidget, 
                             QStatusBar, QHBoxLayout, QPushButton, QLabel,
-                            QGroupBox, QFileDialog, QMessageBox, QListWidget, QListWidgetItem, QLineEdit, QApplication)
+                            QGroupBox, QFileDialog, QMessageBox, QLineEdit, QApplication,
+                            QDoubleSpinBox, QSpinBox, QComboBox, QMenu, QAction)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon
 
@@ -19,6 +21,18 @@ from ui.controls import create_controls
 # テーマシステム
 from presentation.themes import ThemeAwareMixin, get_theme_manager, ThemeMode
 
+# 対応画像拡張子（RAW含む）
+from utils.constants import IMAGE_EXTENSIONS
+
+# ライブラリ表示の既定除外パターン
+from logic.scanner import DEFAULT_EXCLUDE_PATTERNS
+
+# 処理区間の計測（無効時はほぼ負荷なし）
+from utils.profiler import traced
+
+# ライブラリ・検索結果の表示完了時に自動で並べ替える最大件数（超える場合は並べ替えの操作時のみ）
+AUTO_SORT_LIMIT = 50000
+
 
 class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
     """
@@ -28,6 +42,9 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
     v2.1.0: ダークモード・テーマ切り替え対応
     """
     
+    # 最初の描画の完了（起動プロファイルと、表示後に回した初期化の開始に使う）
+    first_painted = pyqtSignal()
+    
     def __init__(self):
         QMainWindow.__init__(self)
         ThemeAwareMixin.__init__(self)
@@ -47,6 +64,10 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         self.maximize_container = None
         self.original_preview_parent = None
         self.original_map_parent = None
+        self.compare_view = None
+        self.slideshow_view = None
+        self.slideshow_interval = 3.0  # スライドショー間隔（秒）
+        self._pre_slideshow_window_state = None
         
         # コンポーネント参照
         self.thumbnail_list = None
@@ -64,12 +85,20 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # 初期フォルダ設定
         self._load_initial_folder()
         
-        # 初期マップ画面表示
-        self._show_initial_map_screen()
+        # 初期マップ画面表示と類似画像インデックスの読み込み（重いため最初の描画の後）
+        self._first_painted = False
+        self.first_painted.connect(self._show_initial_map_screen, Qt.QueuedConnection)
+        self.first_painted.connect(self._warm_similarity_index, Qt.QueuedConnection)
         
         # ステータス表示
         self.show_status_message("新UI (Clean Architecture) で起動しました")
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_painted:
+            self._first_painted = True
+            self.first_painted.emit()
+    
     def show_status_message(self, message, timeout=0):
         """ステータスバーにメッセージを表示"""
         try:
@@ -122,9 +151,30 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         self.theme_toggle_btn.clicked.connect(self._toggle_theme)
         toolbar_layout.addWidget(self.theme_toggle_btn)
         
+        # デバッグメニュー（処理区間のトレース記録・保存）
+        self.debug_btn = QPushButton("🐞")
+        self.debug_btn.setMaximumHeight(30)
+        self.debug_btn.setMaximumWidth(40)
+        self.debug_btn.setToolTip("デバッグ（処理時間のトレース）")
+        debug_menu = QMenu(self.debug_btn)
+        self.trace_action = debug_menu.addAction("トレースを記録")
+        self.trace_action.setCheckable(True)
+        self.trace_action.toggled.connect(self._set_tracing)
+        debug_menu.addAction("トレースを保存…", self._save_trace)
+        debug_menu.addAction("トレースを消去", self._clear_trace)
+        debug_menu.addSeparator()
+        self.stall_action = debug_menu.addAction("UI停止を監視")
+        self.stall_action.setCheckable(True)
+        self.stall_action.toggled.connect(self._set_stall_monitoring)
+        debug_menu.addAction("UI停止レポートを保存…", self._save_stall_report)
+        debug_menu.aboutToShow.connect(self._update_debug_menu)
+        self.debug_btn.setMenu(debug_menu)
+        toolbar_layout.addWidget(self.debug_btn)
+        
         # テーマコンポーネント登録
         self.register_theme_component(folder_btn, "button")
         self.register_theme_component(self.theme_toggle_btn, "button")
+        self.register_theme_component(self.debug_btn, "button")
         self.register_theme_component(parent_button, "button")  # 親フォルダボタンも登録
         
         # アドレスバーとツールバーの参照保存（後でテーマ適用）
@@ -161,6 +211,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         
         # ステータスバー
         self.statusBar().showMessage("準備完了")
+        self._setup_library_statistics()
         
         # スプリッターサイズ調整
         self.main_splitter.setSizes([600, 800])
@@ -173,6 +224,28 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         from PyQt5.QtCore import QTimer
         QTimer.singleShot(100, self._apply_delayed_theme)
     
+    def _setup_library_statistics(self):
+        """ステータスバーにライブラリ統計を常時表示（インデックスの差分更新に追従）"""
+        try:
+            from domain.services.statistics_service import get_statistics_service, format_statistics
+            self.library_stats_label = QLabel()
+            self.statusBar().addPermanentWidget(self.library_stats_label)
+            statistics_service = get_statistics_service()
+            statistics_service.statistics_changed.connect(self._on_library_statistics_changed)
+            self.library_stats_label.setText(format_statistics(statistics_service.snapshot()))
+            from logic.library_indexer import get_library_indexer
+            get_library_indexer().finished.connect(self._on_index_updated)
+        except Exception as e:
+            self.library_stats_label = None
+            import logging
+            logging.error(f"ライブラリ統計初期化エラー: {e}")
+    
+    def _on_library_statistics_changed(self, statistics):
+        """ライブラリ統計の更新"""
+        if self.library_stats_label:
+            from domain.services.statistics_service import format_statistics
+            self.library_stats_label.setText(format_statistics(statistics))
+    
     def _create_left_panel(self):
         """左パネル作成"""
         panel = QWidget()
@@ -182,13 +255,20 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         folder_group = QGroupBox("📁 フォルダ内容")
         folder_layout = QVBoxLayout(folder_group)
         
-        # フォルダ内容リスト（ツリー表示廃止）
-        self.folder_content_list = QListWidget()
+        # フォルダ内容リスト（モデル/ビュー。一覧はバックグラウンドで取得）
+        from ui.folder_content_view import create_folder_content_view
+        self.folder_content_list = create_folder_content_view(
+            self._on_folder_item_clicked, self._on_folder_item_double_clicked)
         self.folder_content_list.setMinimumHeight(150)
+        self.folder_content_list.listing_finished.connect(self._on_folder_listing_finished)
+        self.folder_content_list.images_listed.connect(self._on_folder_images_listed)
         
-        # クリック・ダブルクリックイベント
-        self.folder_content_list.itemClicked.connect(self._on_folder_item_clicked)
-        self.folder_content_list.itemDoubleClicked.connect(self._on_folder_item_double_clicked)
+        # フォルダ内の名前で絞り込み
+        self.folder_filter_edit = QLineEdit()
+        self.folder_filter_edit.setPlaceholderText("🔍 フォルダ内を絞り込み")
+        self.folder_filter_edit.setClearButtonEnabled(True)
+        self.folder_filter_edit.textChanged.connect(self.folder_content_list.set_name_filter)
+        folder_layout.addWidget(self.folder_filter_edit)
         
         folder_layout.addWidget(self.folder_content_list)
         layout.addWidget(folder_group)
@@ -196,14 +276,71 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # サムネイルパネル
         thumbnail_group = QGroupBox("🖼️ サムネイル")
         thumbnail_layout = QVBoxLayout(thumbnail_group)
-        
+
+        # 検索フィルターバー（インデックス登録済みの全写真が対象）
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText('🔍 検索（例: camera:"X100V" date:2024-05..2024-06 iso>1600）')
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.setToolTip(
+            "camera:名前  date:2024-05..2024-06  date>=2024  iso>1600  f<=2.8  focal:35..50\n"
+            "shutter<1/250  size>5MB  bbox:南,西,北,東  gps:yes/no  ext:jpg,heic  in:フォルダ\n"
+            "フィールド名なしの語はファイル名、先頭の - は否定")
+        self.filter_edit.returnPressed.connect(self._apply_filter)
+        self.filter_edit.textChanged.connect(self._on_filter_text_changed)
+
+        # 並べ替え（フォルダ内容リストとサムネイルで共通の順序）
+        from domain.services.sort_modes import SORT_MODES, SORT_NAME
+        self.sort_mode = SORT_NAME
+        self.sort_descending = False
+        self._sort_keys = []
+        self.sort_combo = QComboBox()
+        for mode, label in SORT_MODES.items():
+            self.sort_combo.addItem(label, mode)
+        self.sort_combo.setToolTip("並べ替え（距離は選択中の写真の撮影地から）")
+        self.sort_combo.currentIndexChanged.connect(self._on_sort_mode_changed)
+        self.sort_order_btn = QPushButton("↑")
+        self.sort_order_btn.setCheckable(True)
+        self.sort_order_btn.setMaximumWidth(30)
+        self.sort_order_btn.setToolTip("昇順・降順の切り替え")
+        self.sort_order_btn.toggled.connect(self._on_sort_order_toggled)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.filter_edit, 1)
+        filter_layout.addWidget(self.sort_combo)
+        filter_layout.addWidget(self.sort_order_btn)
+        thumbnail_layout.addLayout(filter_layout)
+
+        # ライブラリ表示（サブフォルダを含めて再帰表示）の切り替えと走査条件
+        library_layout = QHBoxLayout()
+        self.library_btn = QPushButton("📚 ライブラリ")
+        self.library_btn.setCheckable(True)
+        self.library_btn.setToolTip("現在のフォルダ以下のすべての画像を表示")
+        self.library_btn.toggled.connect(self._on_library_mode_toggled)
+        library_layout.addWidget(self.library_btn)
+
+        self.library_depth_label = QLabel("深さ")
+        self.library_depth_spin = QSpinBox()
+        self.library_depth_spin.setRange(0, 64)
+        self.library_depth_spin.setSpecialValueText("無制限")
+        self.library_depth_spin.setToolTip("サブフォルダを辿る深さ（0は無制限）")
+        self.library_exclude_edit = QLineEdit(", ".join(DEFAULT_EXCLUDE_PATTERNS))
+        self.library_exclude_edit.setToolTip("除外するフォルダ名・ファイル名のパターン（カンマ区切り）")
+        self.library_exclude_edit.editingFinished.connect(self._rescan_library)
+        self.library_depth_spin.valueChanged.connect(self._rescan_library)
+        library_layout.addWidget(self.library_depth_label)
+        library_layout.addWidget(self.library_depth_spin)
+        library_layout.addWidget(self.library_exclude_edit, 1)
+        thumbnail_layout.addLayout(library_layout)
+        self._set_library_options_visible(False)
+
         try:
-            from ui.thumbnail_list import create_thumbnail_list
-            self.thumbnail_list = create_thumbnail_list(self._on_image_selected)
+            from ui.thumbnail_view import create_thumbnail_view
+            self.thumbnail_list = create_thumbnail_view(self._on_image_selected)
             thumbnail_layout.addWidget(self.thumbnail_list)
+            self._setup_timeline(thumbnail_layout)
         except Exception as e:
             error_label = QLabel(f"サムネイルエラー: {e}")
-            error_label.setStyleSheet("color: red;")
+            self.register_theme_component(error_label, "error_label")
             thumbnail_layout.addWidget(error_label)
         
         # サムネイル関連の参照を保存（テーマ適用用）
@@ -223,12 +360,26 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         self.status_info.setMaximumHeight(180)
         
         status_layout.addWidget(self.status_info)
+        
+        # ヒストグラム（プレビュー用にデコード済みの画像から計算）
+        self.histogram_view = None
+        try:
+            from ui.histogram_view import create_histogram_view
+            self.histogram_view = create_histogram_view()
+            status_layout.addWidget(self.histogram_view)
+        except Exception as e:
+            import logging
+            logging.warning(f"ヒストグラム表示を初期化できません: {e}")
+        
         layout.addWidget(status_group)
         
         # テーマコンポーネント登録
         self.register_theme_component(folder_group, "group_box")
         self.register_theme_component(self.folder_content_list, "list_widget")
         self.register_theme_component(thumbnail_group, "group_box")
+        self.register_theme_component(self.library_btn, "button")
+        self.register_theme_component(self.filter_edit, "input")
+        self.register_theme_component(self.sort_order_btn, "button")
         self.register_theme_component(status_group, "group_box")
         self.register_theme_component(self.status_info, "status_info")
         self.register_theme_component(panel, "panel")  # 左パネル全体
@@ -252,10 +403,42 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # プレビューヘッダー（タイトル + 最大化ボタン）
         preview_header = QHBoxLayout()
         preview_title = QLabel("画像プレビュー")
-        preview_title.setStyleSheet("font-weight: normal; color: #666; font-size: 11px;")
+        self.register_theme_component(preview_title, "title_label")
         preview_header.addWidget(preview_title)
         preview_header.addStretch()  # 右寄せ
         
+        # スライドショー間隔と開始ボタン
+        self.slideshow_interval_spin = QDoubleSpinBox()
+        self.slideshow_interval_spin.setRange(0.5, 60.0)
+        self.slideshow_interval_spin.setSingleStep(0.5)
+        self.slideshow_interval_spin.setDecimals(1)
+        self.slideshow_interval_spin.setSuffix(" 秒")
+        self.slideshow_interval_spin.setValue(self.slideshow_interval)
+        self.slideshow_interval_spin.setMaximumWidth(70)
+        self.slideshow_interval_spin.setToolTip("スライドショーの表示間隔")
+        self.slideshow_interval_spin.valueChanged.connect(self._on_slideshow_interval_changed)
+        preview_header.addWidget(self.slideshow_interval_spin)
+        
+        self.slideshow_btn = QPushButton("▶")
+        self.slideshow_btn.setToolTip("全画面スライドショー（Escで終了、Spaceで一時停止）")
+        self.slideshow_btn.setMaximumSize(28, 28)
+        self.slideshow_btn.clicked.connect(self.start_slideshow)
+        preview_header.addWidget(self.slideshow_btn)
+        
+        # 比較ボタン（Ctrlクリックで複数選択した画像を並べて表示）
+        self.compare_btn = QPushButton("⧉")
+        self.compare_btn.setToolTip("選択した画像を並べて比較（Ctrl+クリックで2〜4枚選択）")
+        self.compare_btn.setMaximumSize(28, 28)
+        self.compare_btn.clicked.connect(self.toggle_compare)
+        preview_header.addWidget(self.compare_btn)
+        
+        # 類似画像ボタン（選択中の画像に見た目が近い写真を表示）
+        self.similar_btn = QPushButton("≈")
+        self.similar_btn.setToolTip("選択中の画像に似た写真を表示")
+        self.similar_btn.setMaximumSize(28, 28)
+        self.similar_btn.clicked.connect(self.show_similar_images)
+        preview_header.addWidget(self.similar_btn)
+        
         # 最大化ボタン（改良版）
         self.maximize_image_btn = QPushButton("⛶")
         self.maximize_image_btn.setToolTip("画像を最大化表示（ダブルクリックでも可能）")
@@ -284,7 +467,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             preview_layout.addWidget(self.preview_panel)
         except Exception as e:
             error_label = QLabel(f"プレビューエラー: {e}")
-            error_label.setStyleSheet("color: red; padding: 20px;")
+            self.register_theme_component(error_label, "error_label")
             preview_layout.addWidget(error_label)
         
         self.right_splitter.addWidget(preview_group)
@@ -297,10 +480,23 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # マップヘッダー（タイトル + 最大化ボタン）
         map_header = QHBoxLayout()
         map_title = QLabel("撮影場所マップ")
-        map_title.setStyleSheet("font-weight: normal; color: #666; font-size: 11px;")
+        self.register_theme_component(map_title, "title_label")
         map_header.addWidget(map_title)
         map_header.addStretch()  # 右寄せ
         
+        # 撮影地点のエクスポート（検索中は検索結果、それ以外は表示中のフォルダ）
+        self.export_btn = QPushButton("📤")
+        self.export_btn.setToolTip("撮影地点を GeoJSON / GPX / KML へエクスポート")
+        self.export_btn.setMaximumSize(28, 28)
+        export_menu = QMenu(self.export_btn)
+        self._export_separator = export_menu.addSeparator()
+        self.export_track_action = export_menu.addAction("撮影順の軌跡を含める")
+        self.export_track_action.setCheckable(True)
+        # 形式の一覧は初めて開いたときに追加（エクスポート処理を起動時に読み込まない）
+        export_menu.aboutToShow.connect(self._populate_export_menu)
+        self.export_btn.setMenu(export_menu)
+        map_header.addWidget(self.export_btn)
+        
         # 最大化ボタン（改良版）
         self.maximize_map_btn = QPushButton("⛶")
         self.maximize_map_btn.setToolTip("マップを最大化表示（ダブルクリックでも可能）")
@@ -329,7 +525,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             map_layout.addWidget(self.map_panel)
         except Exception as e:
             error_label = QLabel(f"マップエラー: {e}")
-            error_label.setStyleSheet("color: red; padding: 20px;")
+            self.register_theme_component(error_label, "error_label")
             map_layout.addWidget(error_label)
         
         self.right_splitter.addWidget(map_group)
@@ -340,6 +536,10 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # テーマコンポーネント登録
         self.register_theme_component(preview_group, "group_box")
         self.register_theme_component(self.maximize_image_btn, "maximize_button")
+        self.register_theme_component(self.compare_btn, "maximize_button")
+        self.register_theme_component(self.similar_btn, "maximize_button")
+        self.register_theme_component(self.export_btn, "maximize_button")
+        self.register_theme_component(self.slideshow_btn, "maximize_button")
         self.register_theme_component(map_group, "group_box")
         self.register_theme_component(self.maximize_map_btn, "maximize_button")
         self.register_theme_component(panel, "panel")  # 右パネル全体
@@ -388,6 +588,203 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         else:
             self._maximize_preview()
     
+    def toggle_compare(self):
+        """比較表示の切り替え"""
+        if self.maximized_state == 'compare':
+            self.restore_normal_view()
+        else:
+            self._show_compare_view()
+    
+    def show_similar_images(self):
+        """選択中の画像に見た目が近い写真をサムネイルに表示（特徴ベクトルのk近傍検索）"""
+        if not self.selected_image or self.thumbnail_list is None:
+            self.show_status_message("≈ 類似画像を探すには画像を選択してください")
+            return
+        try:
+            # インデックスの読み込みと未計算の特徴ベクトルの計算はバックグラウンド
+            search = self._similarity_search()
+            search.search(self.selected_image)
+            self.show_status_message(f"≈ 類似画像を検索中: {os.path.basename(self.selected_image)}")
+        except Exception as e:
+            import logging
+            logging.error(f"類似画像検索エラー: {e}")
+            self.show_status_message(f"❌ 類似画像検索エラー: {e}")
+    
+    def _similarity_search(self):
+        from logic.similarity_search import get_similarity_search
+        search = get_similarity_search()
+        if not getattr(self, '_similarity_search_connected', False):
+            search.finished.connect(self._on_similar_images_found)
+            search.failed.connect(lambda message: self.show_status_message(f"❌ 類似画像検索エラー: {message}"))
+            self._similarity_search_connected = True
+        return search
+    
+    def _warm_similarity_index(self):
+        """類似画像インデックスをバックグラウンドで読み込んでおく"""
+        try:
+            self._similarity_search().warm()
+        except Exception as e:
+            import logging
+            logging.error(f"類似画像インデックス読み込み開始エラー: {e}")
+    
+    def _on_similar_images_found(self, path, results, total, elapsed):
+        """類似画像の検索結果をサムネイルに表示"""
+        if not total:
+            self.show_status_message("≈ 特徴ベクトルを計算中です。しばらくしてから再度お試しください")
+            return
+        if self.library_btn.isChecked():
+            from logic.library_scanner import get_library_scanner
+            get_library_scanner().cancel()
+        self._cancel_filter()
+        self.thumbnail_list.set_paths([path] + [similar for _, similar in results])
+        self.show_status_message(f"≈ 類似画像: {len(results)}枚（{total:,}枚から{elapsed:.0f}ms）")
+    
+    def _populate_export_menu(self):
+        """エクスポートメニューへ形式を追加（初回のみ）"""
+        menu = self.export_btn.menu()
+        if menu.actions()[0] is not self._export_separator:
+            return
+        from logic.geo_export import FORMATS
+        for export_format, (label, _) in FORMATS.items():
+            action = QAction(f"{label}…", menu)
+            action.triggered.connect(lambda _, export_format=export_format: self.export_locations(export_format))
+            menu.insertAction(self._export_separator, action)
+
+    def _update_debug_menu(self):
+        """デバッグメニューの表示を記録状態に合わせる（環境変数で開始した場合を含む）"""
+        from utils.profiler import get_tracer
+        tracer = get_tracer()
+        self.trace_action.blockSignals(True)
+        self.trace_action.setChecked(tracer.enabled)
+        self.trace_action.blockSignals(False)
+        self.trace_action.setText(f"トレースを記録（{len(tracer):,} 件）")
+        # UI停止の監視は起動オプション（--stall-report）で開始している場合がある
+        from utils.stall_detector import get_stall_detector
+        detector = get_stall_detector()
+        self.stall_action.blockSignals(True)
+        self.stall_action.setChecked(detector.is_running())
+        self.stall_action.blockSignals(False)
+        self.stall_action.setText(f"UI停止を監視（{len(detector.stalls):,} 回）")
+
+    def _set_tracing(self, enabled):
+        """トレース記録の開始・停止"""
+        from utils.profiler import get_tracer
+        tracer = get_tracer()
+        if enabled:
+            tracer.start()
+            self.show_status_message("🐞 トレース記録を開始しました")
+        else:
+            tracer.stop()
+            self.show_status_message(f"🐞 トレース記録を停止しました（{len(tracer):,} 件）")
+
+    def _clear_trace(self):
+        from utils.profiler import get_tracer
+        get_tracer().clear()
+        self.show_status_message("🐞 トレースを消去しました")
+
+    def _save_trace(self):
+        """記録したトレースをChromeトレース形式（chrome://tracing / Perfetto）で保存"""
+        from utils.profiler import get_tracer
+        tracer = get_tracer()
+        if not len(tracer):
+            self.show_status_message("🐞 保存するトレースがありません（メニューから記録を開始してください）")
+            return
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "トレースを保存", os.path.join(os.path.expanduser("~"), "photomap_trace.json"),
+            "Chrome トレース (*.json)")
+        if not output_path:
+            return
+        try:
+            count = tracer.dump(output_path)
+            self.show_status_message(f"🐞 トレースを保存しました: {output_path}（{count:,} 件）")
+        except OSError as e:
+            self.show_status_message(f"❌ トレース保存エラー: {e}")
+            import logging
+            logging.error(f"トレース保存エラー: {e}")
+
+    def _set_stall_monitoring(self, enabled):
+        """UI停止の監視の開始・停止"""
+        from utils.stall_detector import get_stall_detector
+        detector = get_stall_detector()
+        if enabled:
+            detector.stall_detected.connect(self._on_stall_detected)
+            detector.start()
+            self.show_status_message("🐞 UI停止の監視を開始しました")
+        else:
+            detector.stop()
+            detector.stall_detected.disconnect(self._on_stall_detected)
+            self.show_status_message(f"🐞 UI停止の監視を停止しました（{len(detector.stalls):,} 回）")
+
+    def _on_stall_detected(self, stall):
+        self.show_status_message(f"🐞 UI停止 {stall.describe()}")
+
+    def _save_stall_report(self):
+        """UI停止の集計レポートを保存"""
+        from utils.stall_detector import get_stall_detector
+        detector = get_stall_detector()
+        if not detector.beats:
+            self.show_status_message("🐞 UI停止の記録がありません（メニューから監視を開始してください）")
+            return
+        output_path, _ = QFileDialog.getSaveFileName(
+            self, "UI停止レポートを保存", os.path.join(os.path.expanduser("~"), "stall_report.txt"),
+            "テキスト (*.txt)")
+        if not output_path:
+            return
+        try:
+            detector.write(output_path)
+            self.show_status_message(f"🐞 UI停止レポートを保存しました: {output_path}")
+        except OSError as e:
+            self.show_status_message(f"❌ UI停止レポート保存エラー: {e}")
+            import logging
+            logging.error(f"UI停止レポート保存エラー: {e}")
+
+    def export_locations(self, export_format):
+        """撮影地点をファイルへエクスポート（バックグラウンドで書き出し）"""
+        if getattr(self, '_export_task', None) is not None:
+            self.show_status_message("📤 エクスポート中です")
+            return
+        query_text = self.filter_edit.text().strip()
+        if not query_text and not self.current_folder:
+            self.show_status_message("📤 エクスポートするフォルダを開くか、検索式を入力してください")
+            return
+        try:
+            from PyQt5.QtCore import QThreadPool
+            from logic.geo_export import FORMATS, GeoExportTask
+            label, extension = FORMATS[export_format]
+            base_name = os.path.basename(self.current_folder or "") or "photos"
+            output_path, _ = QFileDialog.getSaveFileName(
+                self, f"{label}へエクスポート", os.path.join(os.path.expanduser("~"), base_name + extension),
+                f"{label} (*{extension})")
+            if not output_path:
+                return
+            # 検索中はインデックス全体への検索結果、それ以外は表示中のフォルダ（ライブラリ表示ならサブフォルダも）
+            options = {'export_format': export_format, 'track': self.export_track_action.isChecked()}
+            if query_text:
+                options['query_text'] = query_text
+            else:
+                options['directory'] = self.current_folder
+                options['recursive'] = self.library_btn.isChecked()
+            task = GeoExportTask(output_path, **options)
+            task.signals.progress.connect(
+                lambda written: self.show_status_message(f"📤 エクスポート中: {written:,}地点"))
+            task.signals.finished.connect(self._on_export_finished)
+            task.signals.failed.connect(self._on_export_failed)
+            self._export_task = task
+            QThreadPool.globalInstance().start(task)
+            self.show_status_message(f"📤 エクスポート中: {output_path}")
+        except Exception as e:
+            import logging
+            logging.error(f"エクスポート開始エラー: {e}")
+            self.show_status_message(f"❌ エクスポートエラー: {e}")
+
+    def _on_export_finished(self, written, output_path, elapsed):
+        self._export_task = None
+        self.show_status_message(f"📤 {written:,}地点をエクスポートしました（{elapsed:.1f}秒）: {output_path}")
+
+    def _on_export_failed(self, message):
+        self._export_task = None
+        self.show_status_message(f"❌ エクスポートエラー: {message}")
+
     def toggle_map_maximize(self):
         """マップ最大化の切り替え"""
         if self.maximized_state == 'map':
@@ -416,6 +813,89 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         # 最大化状態での画像表示更新
         self._refresh_maximized_content()
     
+    def _get_selected_image_paths(self):
+        """サムネイルで複数選択されている画像パスを取得"""
+        if not self.thumbnail_list:
+            return []
+        return self.thumbnail_list.selected_paths()
+    
+    def _show_compare_view(self):
+        """選択画像を最大化エリアで並べて比較表示"""
+        paths = self._get_selected_image_paths()
+        if len(paths) < 2:
+            self.show_status_message("⧉ 比較するには Ctrl+クリックで画像を2〜4枚選択してください")
+            return
+        
+        if self.maximized_state is not None:
+            self.restore_normal_view()
+        
+        if self.compare_view is None:
+            from ui.compare_view import create_compare_view
+            self.compare_view = create_compare_view()
+        
+        self.compare_view.set_images(paths)
+        self.maximized_content_layout.addWidget(self.compare_view)
+        self.compare_view.show()
+        
+        # UIの切り替え
+        self.main_splitter.hide()
+        self.maximize_container.show()
+        
+        self.maximized_state = 'compare'
+        
+        shown = len(self.compare_view.image_paths)
+        if len(paths) > shown:
+            self.show_status_message(f"⧉ 比較表示: 先頭{shown}枚を表示（選択 {len(paths)}枚）")
+        else:
+            self.show_status_message(f"⧉ 比較表示: {shown}枚")
+    
+    def start_slideshow(self):
+        """現在のフォルダの画像で全画面スライドショーを開始"""
+        if not self.current_images:
+            self.show_status_message("▶ スライドショーする画像がありません")
+            return
+        
+        if self.maximized_state is not None:
+            self.restore_normal_view()
+        
+        if self.slideshow_view is None:
+            from ui.slideshow import create_slideshow_view
+            self.slideshow_view = create_slideshow_view()
+            self.slideshow_view.finished.connect(self.restore_normal_view)
+            self.slideshow_view.slide_shown.connect(self._on_slide_shown)
+        
+        # 選択中の画像から開始
+        start_index = 0
+        if self.selected_image in self.current_images:
+            start_index = self.current_images.index(self.selected_image)
+        
+        self.maximized_content_layout.addWidget(self.slideshow_view)
+        self.slideshow_view.show()
+        
+        # UIの切り替え（最大化コンテナを全画面で使用）
+        self.main_splitter.hide()
+        self.maximize_container.show()
+        self._pre_slideshow_window_state = self.windowState()
+        self.showFullScreen()
+        
+        self.maximized_state = 'slideshow'
+        self.slideshow_view.start(self.current_images, start_index, int(self.slideshow_interval * 1000))
+    
+    def _on_slideshow_interval_changed(self, value):
+        """スライドショー間隔の変更"""
+        self.slideshow_interval = value
+        if self.slideshow_view is not None:
+            self.slideshow_view.set_interval(int(value * 1000))
+    
+    def _on_slide_shown(self, index, path, decode_ms, headroom_ms):
+        """スライド表示ごとにデコード余裕時間を報告"""
+        self.selected_image = path
+        mark = "⚠️" if headroom_ms < 0 else "▶"
+        self.show_status_message(
+            f"{mark} {index + 1}/{len(self.current_images)} {os.path.basename(path)}"
+            f" | デコード {decode_ms:.0f}ms, 余裕 {headroom_ms:.0f}ms"
+        )
+    
     def _maximize_map(self):
         """マップを最大化"""
         if not self.map_panel:
@@ -439,6 +919,8 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
     
     def restore_normal_view(self):
         """通常表示に復元"""
+        summary_message = None
+        
         if self.maximized_state == 'image' and self.preview_panel:
             # プレビューパネルを元の場所に戻す
             self.maximized_content_layout.removeWidget(self.preview_panel)
@@ -448,6 +930,26 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             # マップパネルを元の場所に戻す
             self.maximized_content_layout.removeWidget(self.map_panel)
             self.original_map_parent.layout().addWidget(self.map_panel)
+            
+        elif self.maximized_state == 'compare' and self.compare_view:
+            # 比較ビューを外す（ビューと画像キャッシュは次回用に保持）
+            self.maximized_content_layout.removeWidget(self.compare_view)
+            self.compare_view.hide()
+            
+        elif self.maximized_state == 'slideshow' and self.slideshow_view:
+            # スライドショーを停止して計測結果を報告
+            self.slideshow_view.stop()
+            summary = self.slideshow_view.summary()
+            self.maximized_content_layout.removeWidget(self.slideshow_view)
+            self.slideshow_view.hide()
+            if self._pre_slideshow_window_state is not None:
+                self.setWindowState(self._pre_slideshow_window_state)
+                self._pre_slideshow_window_state = None
+            if summary['slides']:
+                summary_message = (
+                    f"▶ スライドショー終了: {summary['slides']}枚, 最大デコード {summary['max_decode_ms']:.0f}ms,"
+                    f" 最小余裕 {summary['min_headroom_ms']:.0f}ms, 遅延 {summary['late']}回"
+                )
         
         # UIの切り替え
         self.maximize_container.hide()
@@ -457,6 +959,9 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         
         # 通常表示での内容更新
         self._refresh_normal_content()
+        
+        if summary_message:
+            self.show_status_message(summary_message)
     
     def _refresh_maximized_content(self):
         """最大化状態でのコンテンツ更新"""
@@ -538,174 +1043,396 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             folder_path = os.path.normpath(folder_path)
             self.current_folder = folder_path
             
-            # アドレスバーを更新（パス正規化後）
+            # アドレスバーを更新（パス正規化後。変わった区切りのボタンだけが書き換わる）
             if self.address_bar:
-                # 一度クリアしてから再設定することで正しい分解を保証
-                self.address_bar.setText("")
                 self.address_bar.setText(folder_path)
             
-            # 画像ファイル検索（サムネイル処理用にフィルタリング）
-            # フォルダ選択ダイアログでは全ファイル表示、ここで画像のみ抽出
-            image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'}
-            image_files = []
-            
-            folder = Path(folder_path)
-            for file_path in folder.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() in image_extensions:
-                    image_files.append(str(file_path))
-            
-            self.current_images = image_files
-            
-            # フォルダ内容表示を更新（修正版）
+            # 画像の一覧はフォルダ内容リストのバックグラウンド取得から受け取る
+            # （取得した分から順にサムネイルへ追加し、取得完了時に並べ替えとインデックス登録）
+            self.current_images = []
             self._update_folder_content(folder_path)
             
-            # サムネイル更新（修正版）
-            thumbnail_list = self.thumbnail_list
-            
-            # サムネイルリストの参照が失われている場合、再取得を試行
-            if thumbnail_list is None:
-                try:
-                    from ui.thumbnail_list import ThumbnailListWidget
-                    thumbnail_widgets = self.findChildren(ThumbnailListWidget)
-                    if thumbnail_widgets:
-                        thumbnail_list = thumbnail_widgets[0]
-                        self.thumbnail_list = thumbnail_list  # 参照を修復
-                except Exception:
-                    pass
-            
-            if thumbnail_list is not None:
-                thumbnail_list.clear()
-                
-                # 画像ファイルを一つずつ追加
-                added_count = 0
-                for image_path in image_files[:50]:  # 最初の50枚まで
-                    try:
-                        # ThumbnailListWidgetの場合
-                        if hasattr(thumbnail_list, 'add_thumbnail'):
-                            success = thumbnail_list.add_thumbnail(image_path)
-                            if success:
-                                added_count += 1
-                        else:
-                            # レガシー関数の場合
-                            from ui.thumbnail_list import add_thumbnail
-                            add_thumbnail(thumbnail_list, image_path)
-                            added_count += 1
-                    except Exception as e:
-                        # エラーログを適切に処理（標準出力ではなくログへ）
-                        import logging
-                        logging.warning(f"サムネイル追加エラー({image_path}): {e}")
-                        continue
-                
-                # 追加結果を表示
-                self.show_status_message(f"📁 {len(image_files)}枚発見、{added_count}枚のサムネイル表示: {folder_path}")
-            else:
-                self.show_status_message(f"📁 {len(image_files)}枚の画像を読み込みました: {folder_path}")
+            # サムネイル更新（仮想化ビューのため全件を渡しても表示中の分しか読み込まない）
+            self._cancel_filter()
+            if self.library_btn.isChecked():
+                self._rescan_library()
+            elif self.thumbnail_list is not None:
+                self.thumbnail_list.clear()
+            self.show_status_message(f"📁 フォルダを読み込み中: {folder_path}")
             
         except Exception as e:
             QMessageBox.warning(self, "エラー", f"フォルダ読み込みエラー: {e}")
             self.show_status_message(f"❌ フォルダ読み込みエラー: {e}")
-    
-    def _update_folder_content(self, folder_path):
-        """フォルダ内容を更新表示"""
+
+    def _apply_filter(self):
+        """検索式でインデックスを検索し、一致した写真を順次サムネイルへ表示"""
+        text = self.filter_edit.text().strip()
+        if not text:
+            self._clear_filter()
+            return
+        if self.thumbnail_list is None:
+            return
         try:
-            # フォルダ内容リストの参照を確認・取得
-            folder_content_list = self.folder_content_list
-            
-            # もしNoneの場合、UIから直接取得を試行
-            if folder_content_list is None:
-                # 親ウィンドウから QListWidget を検索
-                try:
-                    list_widgets = self.findChildren(QListWidget)
-                    if list_widgets:
-                        folder_content_list = list_widgets[0]  # まず最初のQListWidgetを使用
-                        self.folder_content_list = folder_content_list  # 参照を修復
-                    else:
-                        return
-                except Exception:
-                    return
-            
-            if folder_content_list is None:
-                return
-            
-            # QListWidgetのclearを安全に実行
+            from domain.services.query_service import PhotoQuery, QueryError
+            from logic.library_search import get_library_search
             try:
-                folder_content_list.clear()
-            except Exception:
+                query = PhotoQuery(text)
+            except QueryError as e:
+                self.show_status_message(f"❌ 検索式エラー: {e}")
                 return
-            
-            if not folder_path or not os.path.exists(folder_path):
+            from logic.library_scanner import get_library_scanner
+            get_library_scanner().cancel()
+            search = get_library_search()
+            if not getattr(self, '_library_search_connected', False):
+                search.results_found.connect(self._on_search_results)
+                search.finished.connect(self._on_search_finished)
+                search.failed.connect(self._on_search_failed)
+                self._library_search_connected = True
+            self.thumbnail_list.clear()
+            search.search(query)
+            self.show_status_message(f"🔍 検索中: {text}")
+        except Exception as e:
+            import logging
+            logging.error(f"検索開始エラー: {e}")
+            self.show_status_message(f"❌ 検索エラー: {e}")
+
+    def _on_filter_text_changed(self, text):
+        """検索式が消去されたら元の表示に戻す"""
+        if not text.strip():
+            self._clear_filter()
+
+    def _cancel_filter(self):
+        """実行中の検索を打ち切り、検索式を消去（表示は戻さない）"""
+        if getattr(self, '_library_search_connected', False):
+            from logic.library_search import get_library_search
+            get_library_search().cancel()
+        if self.filter_edit.text():
+            self.filter_edit.blockSignals(True)
+            self.filter_edit.clear()
+            self.filter_edit.blockSignals(False)
+
+    def _clear_filter(self):
+        """検索を解除してフォルダ（またはライブラリ）の表示に戻す"""
+        self._cancel_filter()
+        if self.library_btn.isChecked():
+            self._rescan_library()
+        elif self.thumbnail_list is not None:
+            self.thumbnail_list.set_paths(self.current_images)
+
+    def _on_search_results(self, paths, elapsed):
+        """検索結果のページを追加"""
+        first_page = self.thumbnail_list.count() == 0
+        self.thumbnail_list.append_paths(paths)
+        if first_page:
+            self.show_status_message(f"🔍 検索中: {len(paths):,}件〜（最初の結果 {elapsed * 1000:.0f} ms）")
+
+    def _on_search_finished(self, matched, elapsed):
+        if matched <= AUTO_SORT_LIMIT:
+            self._apply_sort()
+        self.show_status_message(f"🔍 {matched:,}件一致（{elapsed * 1000:.0f} ms）: {self.filter_edit.text().strip()}")
+
+    def _on_search_failed(self, message):
+        self.show_status_message(f"❌ 検索エラー: {message}")
+
+    def _cached_sort_keys(self, paths):
+        """表示中の写真の並べ替えキー（作成済みのものがなければ None）"""
+        for keys in self._sort_keys:
+            if keys.covers(paths):
+                return keys
+        return None
+
+    def _load_sort_keys(self, path_sets):
+        """
+        並べ替えキーをバックグラウンドで作成し、届いたら並べ替えをやり直す
+
+        サムネイル（ライブラリ・検索結果）・タイムラインの絞り込み前・フォルダ内容リストの集合を保持する
+        """
+        from logic.sort_key_loader import get_sort_key_loader
+        loader = get_sort_key_loader()
+        if not getattr(self, '_sort_key_loader_connected', False):
+            loader.keys_ready.connect(self._on_sort_keys_ready)
+            self._sort_key_loader_connected = True
+        loader.load(path_sets)
+
+    def _on_sort_keys_ready(self, keys):
+        self._sort_keys = (keys + self._sort_keys)[:3]
+        self._apply_sort(notify=False)
+
+    def _sort_reference_point(self):
+        """距離順の基準地点（選択中の写真の撮影地）"""
+        if not self.selected_image:
+            return None
+        photo = self._get_photo_metadata(self.selected_image)
+        if photo is None or not photo.has_gps_data:
+            return None
+        return photo.latitude, photo.longitude
+
+    def _sorted_paths(self, paths):
+        """現在の並べ替え方法で整列したパスのリスト（並べ替えキーは作成済みであること）"""
+        from domain.services.sort_service import SORT_DISTANCE, SORT_NAME
+        mode = self.sort_mode
+        point = self._sort_reference_point() if mode == SORT_DISTANCE else None
+        if mode == SORT_DISTANCE and point is None:
+            mode = SORT_NAME
+        return self._cached_sort_keys(paths).sorted_paths(mode, self.sort_descending, point)
+
+    def _apply_sort(self, notify=True):
+        """
+        サムネイルとフォルダ内容リストを現在の並べ替え方法で並べ直す（argsortのみ）
+
+        並べ替えキーがまだない写真の集合があれば、キーをバックグラウンドで作成してから並べ直す
+        """
+        try:
+            from domain.services.sort_service import SORT_DISTANCE
+            if self.sort_mode == SORT_DISTANCE and self._sort_reference_point() is None:
+                if notify:
+                    self.show_status_message("📍 距離順にはGPS情報のある写真を選択してください")
                 return
-            
-            folder = Path(folder_path)
-            
-            # 親フォルダへのリンク（ルートでない場合）
-            if folder.parent != folder:
-                parent_item = QListWidgetItem("📁 .. (親フォルダ)")
-                parent_item.setData(Qt.UserRole, str(folder.parent))
-                parent_item.setToolTip(str(folder.parent))
-                try:
-                    folder_content_list.addItem(parent_item)
-                except Exception:
-                    pass
-            
-            # フォルダとファイルを取得
-            items = []
-            added_items = 0
-            
-            try:
-                for item_path in folder.iterdir():
-                    if item_path.is_dir():
-                        # フォルダ
-                        folder_item = QListWidgetItem(f"📁 {item_path.name}")
-                        folder_item.setData(Qt.UserRole, str(item_path))
-                        folder_item.setToolTip(str(item_path))
-                        items.append((folder_item, 0))  # フォルダは先頭
-                    elif item_path.is_file():
-                        # ファイル（画像ファイルを優先表示）
-                        file_ext = item_path.suffix.lower()
-                        if file_ext in {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'}:
-                            file_item = QListWidgetItem(f"🖼️ {item_path.name}")
-                            file_item.setData(Qt.UserRole, str(item_path))
-                            file_item.setToolTip(str(item_path))
-                            items.append((file_item, 1))  # 画像ファイルは2番目
-                        else:
-                            file_item = QListWidgetItem(f"📄 {item_path.name}")
-                            file_item.setData(Qt.UserRole, str(item_path))
-                            file_item.setToolTip(str(item_path))
-                            items.append((file_item, 2))  # その他ファイルは最後
-            
-            except PermissionError:
-                error_item = QListWidgetItem("❌ アクセス権限がありません")
-                try:
-                    folder_content_list.addItem(error_item)
-                except Exception:
-                    pass
+            thumbnail_paths = self.thumbnail_list.paths() if self.thumbnail_list is not None else []
+            base_paths = getattr(self, '_timeline_base_paths', None)
+            path_sets = [paths for paths in (thumbnail_paths, base_paths, self.current_images) if paths]
+            missing = [paths for paths in path_sets if self._cached_sort_keys(paths) is None]
+            if missing:
+                self._load_sort_keys(missing)
                 return
-            
-            # ソートして追加（フォルダ→画像→その他ファイル）
-            items.sort(key=lambda x: (x[1], x[0].text()))
-            
-            for item, _ in items:
-                try:
-                    folder_content_list.addItem(item)
-                except Exception:
-                    pass
-            
-            # ステータス更新
-            folder_count = len([i for i, t in items if t == 0])
-            image_count = len([i for i, t in items if t == 1])
-            other_count = len([i for i, t in items if t == 2])
-            
-            self.show_status_message(
-                f"📁 フォルダ: {folder_count}, 🖼️ 画像: {image_count}, 📄 その他: {other_count}"
-            )
-            
+            if thumbnail_paths:
+                self.thumbnail_list.reorder_paths(self._sorted_paths(thumbnail_paths))
+            if base_paths:
+                self._timeline_base_paths = self._sorted_paths(base_paths)
+            if self.current_images:
+                self.current_images = self._sorted_paths(self.current_images)
+                self._sync_folder_list_order()
+        except Exception as e:
+            import logging
+            logging.error(f"並べ替えエラー: {e}")
+            self.show_status_message(f"❌ 並べ替えエラー: {e}")
+
+    def _sync_folder_list_order(self):
+        """フォルダ内容リストの画像項目をサムネイルと同じ順序に並べ直す"""
+        positions = {path: position for position, path in enumerate(self.current_images)}
+        self.folder_content_list.set_image_order(positions)
+
+    def _on_sort_mode_changed(self, index):
+        self.sort_mode = self.sort_combo.itemData(index)
+        self._apply_sort()
+
+    def _on_sort_order_toggled(self, checked):
+        self.sort_descending = checked
+        self.sort_order_btn.setText("↓" if checked else "↑")
+        self._apply_sort()
+
+    def _on_index_updated(self, indexed):
+        """インデックス登録の完了後、撮影日時・サイズ・距離の並べ替えを最新のメタデータでやり直す"""
+        from domain.services.sort_modes import SORT_NAME
+        if not indexed:
+            return
+        self._sort_keys = []
+        if self.sort_mode != SORT_NAME:
+            self._apply_sort()
+
+    def _setup_timeline(self, thumbnail_layout):
+        """撮影日タイムライン（サムネイルに表示中の写真の撮影日ごとの枚数）"""
+        self.timeline_view = None
+        self._timeline_base_paths = None  # タイムラインで絞り込む前のサムネイル
+        self._timeline_filtering = False
+        # 集計（NumPy）の読み込みは起動を遅らせないよう最初の描画の後
+        self._timeline_layout = QHBoxLayout()
+        thumbnail_layout.addLayout(self._timeline_layout)
+        self.first_painted.connect(self._build_timeline, Qt.QueuedConnection)
+
+    def _build_timeline(self):
+        """タイムラインの作成とサムネイル・集計サービスへの接続"""
+        try:
+            from domain.services.timeline_service import GRANULARITIES, GRANULARITY_MONTH, get_timeline_service
+            from ui.timeline_view import create_timeline_view
+            self.timeline_view = create_timeline_view()
+            self.timeline_granularity_combo = QComboBox()
+            for granularity, label in GRANULARITIES.items():
+                self.timeline_granularity_combo.addItem(label, granularity)
+            self.timeline_granularity_combo.setCurrentIndex(list(GRANULARITIES).index(GRANULARITY_MONTH))
+            self.timeline_granularity_combo.setToolTip("タイムラインの集計単位")
+            self.timeline_granularity_combo.currentIndexChanged.connect(self._refresh_timeline)
+
+            self._timeline_layout.addWidget(self.timeline_granularity_combo, 0, Qt.AlignTop)
+            self._timeline_layout.addWidget(self.timeline_view, 1)
+
+            # サムネイルの内容（フォルダ・ライブラリのスキャン・検索結果）に追従
+            timeline_service = get_timeline_service()
+            model = self.thumbnail_list.thumbnail_model
+            model.modelReset.connect(self._on_thumbnails_reset)
+            model.rowsInserted.connect(self._on_thumbnails_inserted)
+            timeline_service.timeline_changed.connect(self._refresh_timeline)
+            self.timeline_view.range_selected.connect(self._apply_timeline_filter)
+            self.timeline_view.selection_cleared.connect(self._clear_timeline_filter)
+            if self.thumbnail_list.count():
+                self._on_thumbnails_reset()
+        except Exception as e:
+            import logging
+            logging.error(f"タイムライン初期化エラー: {e}")
+
+    def _on_thumbnails_reset(self):
+        if self.timeline_view is None or self._timeline_filtering:
+            return
+        from domain.services.timeline_service import get_timeline_service
+        self._timeline_base_paths = None
+        self.timeline_view.clear_selection()
+        get_timeline_service().set_paths(self.thumbnail_list.paths())
+
+    def _on_thumbnails_inserted(self, parent, first, last):
+        if self.timeline_view is None:
+            return
+        from domain.services.timeline_service import get_timeline_service
+        paths = self.thumbnail_list.thumbnail_model.paths()[first:last + 1]
+        if self._timeline_base_paths is not None:
+            self._timeline_base_paths.extend(paths)
+        get_timeline_service().add_paths(paths)
+
+    def _refresh_timeline(self, *args):
+        """タイムラインの再描画（集計は日数に比例、写真の枚数には依存しない）"""
+        if self.timeline_view is None:
+            return
+        from domain.services.timeline_service import get_timeline_service
+        granularity = self.timeline_granularity_combo.currentData()
+        first_bucket, counts = get_timeline_service().counts(granularity)
+        self.timeline_view.set_counts(first_bucket, counts, granularity)
+
+    def _apply_timeline_filter(self, start, end, label):
+        """タイムラインでクリックした期間の写真だけをサムネイルに表示"""
+        from domain.services.timeline_service import get_timeline_service
+        if self._timeline_base_paths is None:
+            self._timeline_base_paths = self.thumbnail_list.paths()
+        paths = get_timeline_service().paths_between(start, end)
+        # 並べ替え済みの表示順を保つ
+        selected = set(paths)
+        paths = [path for path in self._timeline_base_paths if path in selected]
+        self._timeline_filtering = True
+        try:
+            self.thumbnail_list.set_paths(paths)
+        finally:
+            self._timeline_filtering = False
+        self.show_status_message(f"📅 {label}: {len(paths):,}枚")
+
+    def _clear_timeline_filter(self):
+        """タイムラインの絞り込みを解除"""
+        if self._timeline_base_paths is None:
+            return
+        paths, self._timeline_base_paths = self._timeline_base_paths, None
+        self._timeline_filtering = True
+        try:
+            self.thumbnail_list.set_paths(paths)
+        finally:
+            self._timeline_filtering = False
+        self.show_status_message(f"📅 絞り込み解除: {len(paths):,}枚")
+
+    def _set_library_options_visible(self, visible):
+        """ライブラリ表示の走査条件の表示切り替え"""
+        self.library_depth_label.setVisible(visible)
+        self.library_depth_spin.setVisible(visible)
+        self.library_exclude_edit.setVisible(visible)
+
+    def _on_library_mode_toggled(self, checked):
+        """ライブラリ表示（サブフォルダを含む再帰表示）の切り替え"""
+        self._set_library_options_visible(checked)
+        if checked:
+            self._rescan_library()
+            return
+        from logic.library_scanner import get_library_scanner
+        get_library_scanner().cancel()
+        self._cancel_filter()
+        if self.thumbnail_list is not None:
+            self.thumbnail_list.set_paths(self.current_images)
+        self.show_status_message(f"📁 {len(self.current_images)}枚の画像を表示: {self.current_folder or ''}")
+
+    def _rescan_library(self):
+        """現在のフォルダ以下を並列スキャンし、見つかった順にサムネイルへ追加"""
+        if not self.library_btn.isChecked() or not self.current_folder or self.thumbnail_list is None:
+            return
+        try:
+            from logic.library_scanner import get_library_scanner
+            scanner = get_library_scanner()
+            if not getattr(self, '_library_scanner_connected', False):
+                scanner.files_found.connect(self.thumbnail_list.append_paths)
+                scanner.progress.connect(self._on_library_scan_progress)
+                scanner.finished.connect(self._on_library_scan_finished)
+                self._library_scanner_connected = True
+            self._cancel_filter()
+            depth = self.library_depth_spin.value() or None
+            patterns = [pattern.strip() for pattern in self.library_exclude_edit.text().split(",")]
+            self.thumbnail_list.clear()
+            scanner.scan(self.current_folder, depth, [pattern for pattern in patterns if pattern])
+            self.show_status_message(f"📚 ライブラリをスキャン中: {self.current_folder}")
+        except Exception as e:
+            import logging
+            logging.error(f"ライブラリスキャン開始エラー: {e}")
+            self.show_status_message(f"❌ ライブラリスキャンエラー: {e}")
+
+    def _on_library_scan_progress(self, directories, files):
+        """ライブラリスキャンの進捗表示"""
+        self.show_status_message(f"📚 スキャン中: {files:,}枚 / {directories:,}フォルダ")
+
+    def _on_library_scan_finished(self, files, elapsed):
+        """ライブラリスキャン完了（メタデータはバックグラウンドでインデックスへ登録）"""
+        if files <= AUTO_SORT_LIMIT:
+            self._apply_sort()
+        self.show_status_message(f"📚 ライブラリ: {files:,}枚（{elapsed:.1f}秒）: {self.current_folder}")
+        try:
+            from logic.library_indexer import get_library_indexer
+            get_library_indexer().index_paths(self.thumbnail_list.paths())
+            from logic.feature_indexer import get_feature_indexer
+            get_feature_indexer().index_paths(self.thumbnail_list.paths())
+        except Exception as e:
+            import logging
+            logging.error(f"インデックス登録開始エラー: {e}")
+
+    def _update_folder_content(self, folder_path):
+        """フォルダ内容を更新表示（一覧の取得はバックグラウンド、件数は取得完了時に表示）"""
+        try:
+            self.folder_filter_edit.clear()
+            self.folder_content_list.set_folder(folder_path)
         except Exception as e:
             self.show_status_message(f"❌ フォルダ内容表示エラー: {e}")
             # エラーログを適切に処理
             import logging
             logging.error(f"フォルダ内容表示詳細エラー: {e}")
-    
+
+    def _thumbnails_show_folder(self):
+        """サムネイルが現在のフォルダの画像を表示しているか（ライブラリ表示・検索中でない）"""
+        return (self.thumbnail_list is not None and not self.library_btn.isChecked()
+                and not self.filter_edit.text().strip())
+
+    def _on_folder_images_listed(self, paths):
+        """フォルダ内容の取得途中に見つかった画像をサムネイルへ追加"""
+        self.current_images.extend(paths)
+        if self._thumbnails_show_folder():
+            self.thumbnail_list.append_paths(paths)
+
+    def _on_folder_listing_finished(self):
+        """フォルダ内容の取得完了（並べ替え・インデックス登録と種別ごとの件数の表示）"""
+        from ui.folder_content_view import KIND_FOLDER, KIND_IMAGE, KIND_OTHER
+        from domain.services.sort_modes import SORT_NAME
+        # 取得順に追加した画像をまずフォルダ内容リストと同じ自然順に並べ、
+        # 他の並べ替え方法はキーをバックグラウンドで作成してから適用する
+        self.current_images = self.folder_content_list.image_paths()
+        if self._thumbnails_show_folder() and self.thumbnail_list.count() == len(self.current_images):
+            self.thumbnail_list.reorder_paths(self.current_images)
+        if self.sort_mode != SORT_NAME or self.sort_descending:
+            self._apply_sort(notify=False)
+
+        # メタデータをバックグラウンドでインデックスへ登録（変更のないファイルは読み直さない）
+        try:
+            from logic.library_indexer import get_library_indexer
+            get_library_indexer().index_paths(self.current_images, self.current_folder)
+            from logic.feature_indexer import get_feature_indexer
+            get_feature_indexer().index_paths(self.current_images)
+        except Exception as e:
+            import logging
+            logging.error(f"インデックス登録開始エラー: {e}")
+
+        counts = self.folder_content_list.counts()
+        self.show_status_message(
+            f"📁 フォルダ: {counts[KIND_FOLDER]}, 🖼️ 画像: {counts[KIND_IMAGE]}, 📄 その他: {counts[KIND_OTHER]}"
+        )
+
     def _on_folder_changed(self, folder_path):
         """フォルダ変更時の処理"""
         self._load_folder(folder_path)
@@ -751,34 +1478,27 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             import traceback
             logging.error(traceback.format_exc())
     
+    @traced("preview.display_image", "preview")
     def _display_image(self, image_path):
-        """画像表示"""
+        """
+        画像表示
+        
+        デコード済みならそのまま表示する。未デコードならキャッシュ済みサムネイルで
+        プレビューとヒストグラムを先に出し、バックグラウンドのデコード完了後に差し替える
+        """
         try:
             # プレビュー表示
             if self.preview_panel:
-                from PyQt5.QtGui import QPixmap
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    if hasattr(self.preview_panel, 'set_image'):
-                        # ImagePreviewViewの場合
-                        self.preview_panel.set_image(pixmap)
-                    elif hasattr(self.preview_panel, 'setPixmap'):
-                        # QLabel等の場合
-                        scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                        self.preview_panel.setPixmap(scaled_pixmap)
-                    elif hasattr(self.preview_panel, 'update_image'):
-                        # カスタム関数の場合
-                        self.preview_panel.update_image(image_path)
-                    
-                    self.show_status_message(f"🖼️ プレビュー表示成功: {os.path.basename(image_path)}")
-                else:
-                    self.show_status_message("❌ 画像読み込み失敗")
+                self._request_preview(image_path)
+            
+            # メタデータはここで1回だけ取得し、詳細情報とマップで共有
+            photo = self._get_photo_metadata(image_path)
             
             # 詳細情報表示
-            self._update_image_status(image_path)
+            self._update_image_status(image_path, photo)
             
             # GPS情報取得してマップ表示
-            self._update_map(image_path)
+            self._update_map(image_path, photo)
             
         except Exception as e:
             self.show_status_message(f"❌ 画像表示エラー: {e}")
@@ -788,19 +1508,148 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             import traceback
             logging.error(traceback.format_exc())
     
-    def _update_map(self, image_path):
+    def _request_preview(self, image_path):
+        """
+        プレビューの表示要求
+
+        デコード済みならそのまま表示し、未デコードなら仮表示のうえバックグラウンドでデコードする
+        （完了は _on_preview_decoded で受け取る。GUIスレッドでは元画像をデコードしない）
+        """
+        from logic.image_cache import get_image_cache
+        image_cache = get_image_cache()
+        image = image_cache.get(image_path)
+        if image is not None:
+            self._show_preview(image_path, image)
+            return
+        self._show_preview_placeholder(image_path)
+        if not getattr(self, '_preview_decode_connected', False):
+            image_cache.image_ready.connect(self._on_preview_decoded)
+            self._preview_decode_connected = True
+        image_cache.request(image_path)
+
+    def _show_preview(self, image_path, image):
+        """デコード済み画像をプレビューへ表示し、ヒストグラムを更新"""
+        from PyQt5.QtGui import QPixmap
+        pixmap = QPixmap() if image.isNull() else QPixmap.fromImage(image)
+        if pixmap.isNull():
+            self.show_status_message("❌ 画像読み込み失敗")
+            return
+        self._set_preview_pixmap(image_path, pixmap, image)
+        
+        # ヒストグラム（デコード済みバッファから計算、再デコードなし）
+        self._update_histogram(image_path, image)
+        
+        self.show_status_message(f"🖼️ プレビュー表示成功: {os.path.basename(image_path)}")
+    
+    def _set_preview_pixmap(self, image_path, pixmap, image=None):
+        """プレビューパネルへ画像を設定（最大化状態対応）"""
+        if hasattr(self.preview_panel, 'set_image'):
+            # ImagePreviewViewの場合
+            self.preview_panel.set_image(pixmap, image)
+        elif hasattr(self.preview_panel, 'setPixmap'):
+            # QLabel等の場合 - 最大化状態に応じてサイズを調整
+            if self.maximized_state == 'image':
+                # 最大化時はより大きくスケール
+                available_size = self.maximize_container.size()
+                max_width = max(800, available_size.width() - 50)
+                max_height = max(600, available_size.height() - 100)
+                scaled_pixmap = pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            else:
+                # 通常時
+                scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.preview_panel.setPixmap(scaled_pixmap)
+        elif hasattr(self.preview_panel, 'update_image'):
+            # カスタム関数の場合
+            self.preview_panel.update_image(image_path)
+    
+    def _show_preview_placeholder(self, image_path):
+        """デコード完了までの仮表示（キャッシュ済みサムネイルから。ヒストグラムは間引き計算の暫定値）"""
+        from logic.thumbnail_cache import get_thumbnail_cache
+        thumbnail = get_thumbnail_cache().load(image_path)
+        from PyQt5.QtGui import QPixmap
+        if thumbnail is None:
+            # 前の写真のプレビューとヒストグラムを残さない
+            if hasattr(self.preview_panel, 'set_image'):
+                self.preview_panel.set_image(QPixmap())
+            elif hasattr(self.preview_panel, 'clear'):
+                self.preview_panel.clear()
+            if self.histogram_view:
+                self.histogram_view.set_histogram(None)
+            self.show_status_message(f"⏳ プレビュー読み込み中: {os.path.basename(image_path)}")
+            return
+        self._set_preview_pixmap(image_path, QPixmap.fromImage(thumbnail), thumbnail)
+        if self.histogram_view:
+            try:
+                # 暫定値はキャッシュしない（デコード完了後にフル画像から計算し直す）
+                from logic.histogram import compute_histogram
+                self.histogram_view.set_histogram(compute_histogram(thumbnail))
+            except Exception as e:
+                import logging
+                logging.error(f"ヒストグラム計算エラー: {e}")
+        self.show_status_message(f"⏳ プレビュー読み込み中: {os.path.basename(image_path)}")
+    
+    def _on_preview_decoded(self, image_path, image):
+        """プレビューのデコード完了（選択中の画像のみ表示を差し替え）"""
+        if image_path != self.selected_image or not self.preview_panel:
+            return
+        try:
+            self._show_preview(image_path, image)
+        except Exception as e:
+            import logging
+            logging.error(f"プレビュー表示エラー: {e}")
+    
+    def _get_photo_metadata(self, image_path):
+        """
+        写真のメタデータを取得
+        
+        インデックス登録済みで変更がなければEXIFを読み直さない。
+        未登録・変更ありの場合は読み込んでインデックスへ登録する
+        """
+        from infrastructure.exif_reader import read_photo
+        from infrastructure.photo_index import get_photo_index
+        try:
+            index = get_photo_index()
+            photo = index.get(image_path)
+            stat = os.stat(image_path)
+            if photo is not None and (photo.file_size, photo.modified_time) == (stat.st_size, stat.st_mtime):
+                return photo
+            photo = read_photo(image_path)
+            if photo is not None:
+                index.upsert([photo])
+            return photo
+        except Exception as e:
+            import logging
+            logging.error(f"メタデータ取得エラー: {e}")
+            return read_photo(image_path)
+    
+    def _update_histogram(self, image_path, image):
+        """ヒストグラム表示を更新（ファイル単位でキャッシュ）"""
+        if not self.histogram_view:
+            return
+        try:
+            from logic.histogram import get_histogram_cache
+            data = get_histogram_cache().get_or_compute(image_path, image)
+            self.histogram_view.set_histogram(data)
+        except Exception as e:
+            self.histogram_view.set_histogram(None)
+            import logging
+            logging.error(f"ヒストグラム計算エラー: {e}")
+    
+    @traced("map.update", "map")
+    def _update_map(self, image_path, photo=None):
         """GPS情報を取得してマップを更新"""
         try:
             if not self.map_panel:
                 self.show_status_message("📍 マップパネルが利用できません")
                 return
             
-            # GPS情報抽出
-            from logic.image_utils import extract_gps_coords
-            gps_info = extract_gps_coords(image_path)
+            # GPS情報抽出（読み込み済みのメタデータがあれば再解析しない）
+            if photo is None:
+                from infrastructure.exif_reader import read_photo
+                photo = read_photo(image_path)
             
-            if gps_info and "latitude" in gps_info and "longitude" in gps_info:
-                lat, lon = gps_info["latitude"], gps_info["longitude"]
+            if photo is not None and photo.has_gps_data:
+                lat, lon = photo.latitude, photo.longitude
                 
                 # マップ更新
                 if hasattr(self.map_panel, 'update_location'):
@@ -811,21 +1660,9 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
                         self.show_status_message("📍 マップ更新に失敗")
                 elif hasattr(self.map_panel, 'view'):
                     # HTMLベースのマップ表示
-                    gps_html = f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; text-align: center; padding: 20px; margin: 0; background-color: {self.get_theme_color('background')}; color: {self.get_theme_color('foreground')};">
-                        <div style="background: {self.get_theme_color('group_bg')}; border: 2px solid {self.get_theme_color('accent')}; border-radius: 10px; padding: 20px; max-width: 400px; margin: 0 auto;">
-                            <h3 style="color: {self.get_theme_color('accent')}; margin-top: 0;">📍 GPS座標情報</h3>
-                            <p style="margin: 10px 0;"><strong>緯度:</strong> {lat:.6f}</p>
-                            <p style="margin: 10px 0;"><strong>経度:</strong> {lon:.6f}</p>
-                            <p style="margin: 10px 0; color: {self.get_theme_color('muted')};"><strong>画像:</strong> {os.path.basename(image_path)}</p>
-                            <div style="margin-top: 15px; padding: 10px; background: {self.get_theme_color('secondary')}; border-radius: 5px;">
-                                <small style="color: {self.get_theme_color('muted')};">GPS座標が含まれています</small>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                    """
+                    gps_html = self.render_theme_html(
+                        "map_gps", latitude=lat, longitude=lon,
+                        name=html.escape(os.path.basename(image_path)), note="GPS座標が含まれています")
                     self.map_panel.view.setHtml(gps_html)
                     # HTMLの強制更新
                     self.map_panel.view.update()
@@ -836,19 +1673,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             else:
                 # GPS情報なしの場合
                 if hasattr(self.map_panel, 'view'):
-                    no_gps_html = f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px; margin: 0; background-color: {self.get_theme_color('background')}; color: {self.get_theme_color('foreground')};">
-                        <div style="background: {self.get_theme_color('group_bg')}; border: 2px solid {self.get_theme_color('warning')}; border-radius: 10px; padding: 30px; max-width: 400px; margin: 0 auto;">
-                            <h3 style="color: {self.get_theme_color('warning')}; margin-top: 0;">📍 GPS情報なし</h3>
-                            <p style="color: {self.get_theme_color('muted')}; margin: 15px 0;">この画像にはGPS座標が含まれていません。</p>
-                            <div style="margin-top: 20px; padding: 10px; background: {self.get_theme_color('secondary')}; border-radius: 5px;">
-                                <small style="color: {self.get_theme_color('muted')};">位置情報付きの画像を選択してください</small>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                    """
+                    no_gps_html = self.render_theme_html("map_no_gps")
                     self.map_panel.view.setHtml(no_gps_html)
                     # HTMLの強制更新
                     self.map_panel.view.update()
@@ -866,29 +1691,8 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             if not self.preview_panel or not image_path:
                 return
             
-            from PyQt5.QtGui import QPixmap
-            pixmap = QPixmap(image_path)
-            if not pixmap.isNull():
-                if hasattr(self.preview_panel, 'set_image'):
-                    # ImagePreviewViewの場合
-                    self.preview_panel.set_image(pixmap)
-                elif hasattr(self.preview_panel, 'setPixmap'):
-                    # QLabel等の場合 - 最大化状態に応じてサイズを調整
-                    if self.maximized_state == 'image':
-                        # 最大化時はより大きくスケール
-                        available_size = self.maximize_container.size()
-                        max_width = max(800, available_size.width() - 50)
-                        max_height = max(600, available_size.height() - 100)
-                        scaled_pixmap = pixmap.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    else:
-                        # 通常時
-                        scaled_pixmap = pixmap.scaled(400, 400, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.preview_panel.setPixmap(scaled_pixmap)
-                elif hasattr(self.preview_panel, 'update_image'):
-                    # カスタム関数の場合
-                    self.preview_panel.update_image(image_path)
-                
-                self.show_status_message(f"🖼️ プレビュー更新: {os.path.basename(image_path)}")
+            # デコード済みなら即座に、未デコードならサムネイルを仮表示してバックグラウンドでデコード
+            self._request_preview(image_path)
             
         except Exception as e:
             self.show_status_message(f"❌ プレビュー更新エラー: {e}")
@@ -901,12 +1705,11 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             if not self.map_panel or not image_path:
                 return
             
-            # GPS情報抽出
-            from logic.image_utils import extract_gps_coords
-            gps_info = extract_gps_coords(image_path)
+            # GPS情報（インデックス登録済みならEXIFを読み直さない）
+            photo = self._get_photo_metadata(image_path)
             
-            if gps_info and "latitude" in gps_info and "longitude" in gps_info:
-                lat, lon = gps_info["latitude"], gps_info["longitude"]
+            if photo is not None and photo.has_gps_data:
+                lat, lon = photo.latitude, photo.longitude
                 
                 # マップパネルのupdate_locationメソッドを使用
                 if hasattr(self.map_panel, 'update_location'):
@@ -917,21 +1720,10 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
                         self.show_status_message("📍 マップ更新に失敗しました")
                 elif hasattr(self.map_panel, 'view'):
                     # 最大化状態でも同じHTML表示を使用
-                    html_content = f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; text-align: center; padding: 20px; margin: 0; background-color: {self.get_theme_color('background')}; color: {self.get_theme_color('foreground')};">
-                        <div style="background: {self.get_theme_color('group_bg')}; border: 2px solid {self.get_theme_color('accent')}; border-radius: 10px; padding: 20px; max-width: 400px; margin: 0 auto;">
-                            <h3 style="color: {self.get_theme_color('accent')}; margin-top: 0;">📍 GPS座標情報</h3>
-                            <p style="margin: 10px 0;"><strong>緯度:</strong> {lat:.6f}</p>
-                            <p style="margin: 10px 0;"><strong>経度:</strong> {lon:.6f}</p>
-                            <p style="margin: 10px 0; color: {self.get_theme_color('muted')};"><strong>画像:</strong> {os.path.basename(image_path)}</p>
-                            <div style="margin-top: 15px; padding: 10px; background: {self.get_theme_color('secondary')}; border-radius: 5px;">
-                                <small style="color: {self.get_theme_color('muted')};">{"最大化表示中" if self.maximized_state == 'map' else "GPS座標が含まれています"}</small>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                    """
+                    html_content = self.render_theme_html(
+                        "map_gps", latitude=lat, longitude=lon,
+                        name=html.escape(os.path.basename(image_path)),
+                        note="最大化表示中" if self.maximized_state == 'map' else "GPS座標が含まれています")
                     self.map_panel.view.setHtml(html_content)
                     self.show_status_message(f"📍 マップ表示: {lat:.6f}, {lon:.6f}")
                 else:
@@ -939,19 +1731,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             else:
                 # GPS情報がない場合
                 if hasattr(self.map_panel, 'view'):
-                    self.map_panel.view.setHtml(f"""
-                    <html>
-                    <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px; margin: 0; background-color: {self.get_theme_color('background')}; color: {self.get_theme_color('foreground')};">
-                        <div style="background: {self.get_theme_color('group_bg')}; border: 2px solid {self.get_theme_color('warning')}; border-radius: 10px; padding: 30px; max-width: 400px; margin: 0 auto;">
-                            <h3 style="color: {self.get_theme_color('warning')}; margin-top: 0;">📍 GPS情報なし</h3>
-                            <p style="color: {self.get_theme_color('muted')}; margin: 15px 0;">この画像にはGPS座標が含まれていません。</p>
-                            <div style="margin-top: 20px; padding: 10px; background: {self.get_theme_color('secondary')}; border-radius: 5px;">
-                                <small style="color: {self.get_theme_color('muted')};">位置情報付きの画像を選択してください</small>
-                            </div>
-                        </div>
-                    </body>
-                    </html>
-                    """)
+                    self.map_panel.view.setHtml(self.render_theme_html("map_no_gps"))
                 self.show_status_message("📍 GPS情報が見つかりません")
                 
         except Exception as e:
@@ -959,10 +1739,10 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             import logging
             logging.error(f"マップ更新詳細エラー: {e}")
     
-    def _on_folder_item_clicked(self, item):
+    def _on_folder_item_clicked(self, index):
         """フォルダ項目クリック時の処理"""
         try:
-            item_path = item.data(Qt.UserRole)
+            item_path = index.data(Qt.UserRole)
             if not item_path:
                 return
             
@@ -972,10 +1752,10 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         except Exception as e:
             self.show_status_message(f"❌ 項目選択エラー: {e}")
     
-    def _on_folder_item_double_clicked(self, item):
+    def _on_folder_item_double_clicked(self, index):
         """フォルダ項目ダブルクリック時の処理"""
         try:
-            item_path = item.data(Qt.UserRole)
+            item_path = index.data(Qt.UserRole)
             if not item_path or not os.path.exists(item_path):
                 self.show_status_message("❌ パスが見つかりません")
                 return
@@ -987,7 +1767,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             elif os.path.isfile(item_path):
                 # ファイルの場合：画像なら表示
                 file_ext = Path(item_path).suffix.lower()
-                if file_ext in {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'}:
+                if file_ext in IMAGE_EXTENSIONS:
                     self.selected_image = item_path
                     self._display_image(item_path)
                     self.show_status_message(f"🖼️ 画像表示: {os.path.basename(item_path)}")
@@ -1040,93 +1820,60 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
             QMessageBox.warning(self, "エラー", f"親フォルダ移動エラー: {e}")
             self.show_status_message(f"❌ 親フォルダ移動エラー: {e}")
     
-    def _update_image_status(self, image_path):
+    def _update_image_status(self, image_path, photo=None):
         """画像の詳細情報を更新表示"""
         try:
             if not hasattr(self, 'status_info') or not self.status_info:
                 return
             
-            # 基本情報を取得
-            filename = os.path.basename(image_path)
-            file_size = os.path.getsize(image_path)
-            file_size_mb = file_size / (1024 * 1024)
-            
-            # EXIF情報を取得
-            from logic.image_utils import extract_image_info
-            image_info = extract_image_info(image_path)
-            
-            # GPS情報を取得
-            from logic.image_utils import extract_gps_coords
-            gps_info = extract_gps_coords(image_path)
+            # メタデータを取得（EXIF・GPSを1回の解析で数値として取得）
+            if photo is None:
+                from infrastructure.exif_reader import read_photo
+                photo = read_photo(image_path)
+            if photo is None:
+                raise OSError(f"ファイルにアクセスできません: {image_path}")
             
             # ステータス文字列を構築
             status_lines = []
-            status_lines.append(f"📄 <b>{filename}</b>")
+            status_lines.append(f"📄 <b>{photo.file_name}</b>")
             
             # ファイルサイズ
+            file_size_mb = photo.file_size / (1024 * 1024)
             if file_size_mb >= 1:
                 status_lines.append(f"📦 <b>サイズ:</b> {file_size_mb:.1f} MB")
             else:
-                status_lines.append(f"📦 <b>サイズ:</b> {file_size // 1024} KB")
+                status_lines.append(f"📦 <b>サイズ:</b> {photo.file_size // 1024} KB")
             
             # 解像度
-            if image_info.get('width') and image_info.get('height'):
-                width, height = image_info['width'], image_info['height']
-                megapixels = (width * height) / 1000000
-                status_lines.append(f"🖼️ <b>解像度:</b> {width} × {height} ({megapixels:.1f}MP)")
+            if photo.width and photo.height:
+                status_lines.append(f"🖼️ <b>解像度:</b> {photo.width} × {photo.height} ({photo.megapixels:.1f}MP)")
             
             # 撮影日時
-            if image_info.get('datetime') and image_info['datetime'].strip():
-                datetime_str = image_info['datetime'].strip()
-                try:
-                    # 日時フォーマットを整形
-                    if ':' in datetime_str and ' ' in datetime_str:
-                        date_part, time_part = datetime_str.split(' ', 1)
-                        formatted_datetime = f"{date_part.replace(':', '/')} {time_part}"
-                        status_lines.append(f"📅 <b>撮影日時:</b> {formatted_datetime}")
-                    else:
-                        status_lines.append(f"📅 <b>撮影日時:</b> {datetime_str}")
-                except:
-                    status_lines.append(f"📅 <b>撮影日時:</b> {datetime_str}")
+            if photo.taken_text:
+                status_lines.append(f"📅 <b>撮影日時:</b> {photo.taken_text}")
             
             # カメラ情報
-            if image_info.get('camera') and image_info['camera'].strip():
-                status_lines.append(f"📷 <b>カメラ:</b> {image_info['camera'].strip()}")
+            if photo.camera:
+                status_lines.append(f"📷 <b>カメラ:</b> {photo.camera}")
             
             # 撮影設定
             shooting_settings = []
-            
-            # シャッタースピード
-            if image_info.get('shutter') and image_info['shutter'].strip():
-                shutter_str = image_info['shutter'].strip()
-                shooting_settings.append(f"シャッター: {shutter_str}")
-            
-            # 絞り値
-            if image_info.get('aperture') and image_info['aperture'].strip():
-                shooting_settings.append(f"絞り: {image_info['aperture'].strip()}")
-            elif image_info.get('絞り値') and image_info['絞り値'].strip():
-                shooting_settings.append(f"絞り: {image_info['絞り値'].strip()}")
-            
-            # ISO感度
-            if image_info.get('iso') and image_info['iso'].strip():
-                shooting_settings.append(f"ISO: {image_info['iso'].strip()}")
-            elif image_info.get('ISO感度') and image_info['ISO感度'].strip():
-                shooting_settings.append(f"ISO: {image_info['ISO感度'].strip()}")
-            
-            # 焦点距離
-            if image_info.get('focal_length') and image_info['focal_length'].strip():
-                shooting_settings.append(f"焦点距離: {image_info['focal_length'].strip()}")
-            elif image_info.get('焦点距離') and image_info['焦点距離'].strip():
-                shooting_settings.append(f"焦点距離: {image_info['焦点距離'].strip()}")
+            if photo.shutter_text:
+                shooting_settings.append(f"シャッター: {photo.shutter_text}")
+            if photo.aperture_text:
+                shooting_settings.append(f"絞り: {photo.aperture_text}")
+            if photo.iso_text:
+                shooting_settings.append(f"ISO: {photo.iso_text}")
+            if photo.focal_length_text:
+                shooting_settings.append(f"焦点距離: {photo.focal_length_text}")
             
             # 撮影設定を1行にまとめて表示
             if shooting_settings:
                 status_lines.append(f"⚙️ <b>設定:</b> {' | '.join(shooting_settings)}")
             
             # GPS情報
-            if gps_info and 'latitude' in gps_info and 'longitude' in gps_info:
-                lat, lon = gps_info['latitude'], gps_info['longitude']
-                status_lines.append(f"🌍 <b>GPS:</b> {lat:.6f}, {lon:.6f}")
+            if photo.has_gps_data:
+                status_lines.append(f"🌍 <b>GPS:</b> {photo.latitude:.6f}, {photo.longitude:.6f}")
             else:
                 status_lines.append(f"🌍 <b>GPS:</b> 位置情報なし")
             
@@ -1152,24 +1899,17 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         except Exception:
             pass
     
+    @traced("theme.toggle", "theme")
     def _toggle_theme(self):
         """テーマ切り替え"""
         try:
+            # スタイルの適用は theme_changed シグナル経由（_apply_custom_theme）で1回だけ行う
             self.theme_manager.toggle_theme()
             self._update_theme_button()
             
-            # 手動テーマスタイル適用（サムネイル、アドレスバーなど）
-            current_theme = self.theme_manager.get_current_theme()
-            self._apply_manual_theme_styles(current_theme)
-            
             # 現在のマップ表示を再描画（GPS情報なし画面を含む）
             self._refresh_map_display()
             
-            # サムネイルエリアの強制更新
-            if hasattr(self, 'thumbnail_list') and self.thumbnail_list:
-                self.thumbnail_list.update()
-                self.thumbnail_list.repaint()
-            
             self.show_status_message(f"🎨 テーマ切り替え: {self.theme_manager.get_current_theme().value}モード")
         except Exception as e:
             self.show_status_message(f"❌ テーマ切り替えエラー: {e}")
@@ -1192,19 +1932,7 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         """起動時の初期マップ画面を表示"""
         try:
             if hasattr(self.map_panel, 'view'):
-                initial_html = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px; margin: 0; background-color: {self.get_theme_color('background')}; color: {self.get_theme_color('foreground')};">
-                    <div style="background: {self.get_theme_color('group_bg')}; border: 2px solid {self.get_theme_color('info')}; border-radius: 10px; padding: 30px; max-width: 400px; margin: 0 auto;">
-                        <h3 style="color: {self.get_theme_color('info')}; margin-top: 0;">🗺️ マップビュー</h3>
-                        <p style="color: {self.get_theme_color('muted')}; margin: 15px 0;">GPS情報付きの画像を選択すると、ここに地図が表示されます。</p>
-                        <div style="margin-top: 20px; padding: 10px; background: {self.get_theme_color('secondary')}; border-radius: 5px;">
-                            <small style="color: {self.get_theme_color('muted')};">位置情報付きの画像を選択してください</small>
-                        </div>
-                    </div>
-                </body>
-                </html>
-                """
+                initial_html = self.render_theme_html("map_initial")
                 self.map_panel.view.setHtml(initial_html)
                 # HTMLの強制更新
                 self.map_panel.view.update()
@@ -1233,8 +1961,8 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         テーマを適用するための遅延実行メソッド
         """
         try:
-            current_theme = self.theme_manager.get_current_theme()
-            self._apply_manual_theme_styles(current_theme)
+            from presentation.themes import get_stylesheet_compiler
+            get_stylesheet_compiler().apply()
         except Exception as e:
             print(f"遅延テーマ適用エラー: {e}")
     
@@ -1245,19 +1973,12 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
         ThemeAwareMixinのオーバーライドメソッド
         """
         try:
-            # メインウィンドウのスタイル適用
-            main_style = self.get_theme_style("main_window")
-            if main_style:
-                self.setStyleSheet(main_style)
-            
             # タイトルバー色の変更（Windows固有）
             self._apply_titlebar_theme(theme)
             
-            # 個別のスタイル設定が必要な要素
-            self._apply_manual_theme_styles(theme)
-            
-            # 全体的な強制更新（重要：最後に実行）
-            self._force_global_theme_refresh()
+            # アプリケーション全体のQSSを1回で適用（テーマごとにコンパイル済みのものを再利用）
+            from presentation.themes import get_stylesheet_compiler
+            get_stylesheet_compiler().apply(theme)
             
         except Exception as e:
             print(f"カスタムテーマ適用エラー: {e}")
@@ -1295,395 +2016,6 @@ class FunctionalNewMainWindow(QMainWindow, ThemeAwareMixin):
                 except Exception as api_error:
                     print(f"Windows API タイトルバー変更エラー: {api_error}")
                     
-            # フォールバック: パレット変更
-            from PyQt5.QtGui import QPalette, QColor
-            
-            # ダークモードの場合
-            if theme == ThemeMode.DARK:
-                # ウィンドウの背景色を暗くして、タイトルバーも影響を受けやすくする
-                palette = self.palette()
-                bg_color = self.get_theme_color("background")
-                fg_color = self.get_theme_color("foreground")
-                
-                # パレットの色を変更
-                palette.setColor(QPalette.Window, QColor(bg_color))
-                palette.setColor(QPalette.WindowText, QColor(fg_color))
-                palette.setColor(QPalette.Base, QColor(bg_color))
-                palette.setColor(QPalette.Text, QColor(fg_color))
-                
-                self.setPalette(palette)
-                
-                # メインウィンドウのスタイルシート
-                self.setStyleSheet(f"""
-                    QMainWindow {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                        border: 1px solid #404040;
-                    }}
-                    QMenuBar {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                        border: none;
-                    }}
-                """)
-            else:
-                # ライトモードではデフォルトパレットを復元
-                self.setPalette(self.style().standardPalette())
-                self.setStyleSheet("")  # スタイルシートをクリア
-                
         except Exception as e:
             print(f"タイトルバーテーマ適用エラー: {e}")
     
-    def _apply_manual_theme_styles(self, theme: ThemeMode):
-        """
-        手動でスタイルを適用する必要がある要素の処理
-        """
-        try:
-            bg_color = self.get_theme_color("background")
-            fg_color = self.get_theme_color("foreground")
-            border_color = self.get_theme_color("border")
-            button_bg = self.get_theme_color("button_bg")
-            
-            # 0. メインウィンドウ全体とステータスバーのテーマ適用
-            try:
-                # メインウィンドウ自体のスタイル設定
-                main_window_style = f"""
-                    QMainWindow {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                    }}
-                """
-                self.setStyleSheet(main_window_style)
-                
-                # ステータスバーのテーマ適用
-                if hasattr(self, 'statusBar') and self.statusBar():
-                    status_bar = self.statusBar()
-                    status_bar.setStyleSheet(f"""
-                        QStatusBar {{
-                            background-color: {bg_color};
-                            color: {fg_color};
-                            border: none;
-                            border-top: 1px solid {border_color};
-                        }}
-                        QStatusBar::item {{
-                            border: none;
-                        }}
-                    """)
-                    # ステータスバー内のラベルも更新
-                    for label in status_bar.findChildren(QLabel):
-                        label.setStyleSheet(f"color: {fg_color}; background-color: {bg_color};")
-                        
-            except Exception as e:
-                print(f"メインウィンドウ・ステータスバーテーマ適用エラー: {e}")
-
-            # 1. ボタン類の一括スタイル適用
-            buttons = self.findChildren(QPushButton)
-            for btn in buttons:
-                if btn != self.theme_toggle_btn:  # テーマ切り替えボタン以外
-                    btn.setStyleSheet(f"""
-                        QPushButton {{
-                            background-color: {button_bg};
-                            color: {fg_color};
-                            border: 1px solid {border_color};
-                            border-radius: 4px;
-                            padding: 4px 8px;
-                            font-size: 11px;
-                        }}
-                        QPushButton:hover {{
-                            background-color: {self.get_theme_color("button_hover")};
-                            border-color: {self.get_theme_color("accent")};
-                        }}
-                    """)
-                    # 強制スタイル更新
-                    btn.style().unpolish(btn)
-                    btn.style().polish(btn)
-            
-            # 1-2. すべてのQGroupBoxを更新
-            group_boxes = self.findChildren(QGroupBox)
-            for group_box in group_boxes:
-                group_box.setStyleSheet(f"""
-                    QGroupBox {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                        border: 2px solid {border_color};
-                        border-radius: 5px;
-                        margin-top: 10px;
-                        padding-top: 10px;
-                    }}
-                    QGroupBox::title {{
-                        subcontrol-origin: margin;
-                        left: 10px;
-                        padding: 0 5px 0 5px;
-                        color: {fg_color};
-                    }}
-                """)
-            
-            # 2. サムネイルエリアの手動適用
-            if hasattr(self, 'thumbnail_list') and self.thumbnail_list:
-                # サムネイルリスト自体
-                thumbnail_style = f"""
-                    QWidget {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                        border: 1px solid {border_color};
-                    }}
-                    QScrollArea {{
-                        background-color: {bg_color};
-                        border: none;
-                    }}
-                    QScrollArea > QWidget > QWidget {{
-                        background-color: {bg_color};
-                    }}
-                """
-                self.thumbnail_list.setStyleSheet(thumbnail_style)
-                
-                # サムネイルリスト内の子ウィジェットを再帰的に適用
-                self._apply_recursive_theme(self.thumbnail_list, bg_color, fg_color)
-            
-            # 3. プレビューエリアとマップエリアの余白
-            # プレビューパネルとその親を含む全体
-            if hasattr(self, 'preview_panel') and self.preview_panel:
-                self._apply_panel_theme_recursive(self.preview_panel, bg_color)
-            
-            # マップパネルとその親を含む全体
-            if hasattr(self, 'map_panel') and self.map_panel:
-                self._apply_panel_theme_recursive(self.map_panel, bg_color)
-                
-            # 4. 右スプリッター全体の背景
-            if hasattr(self, 'right_splitter'):
-                self.right_splitter.setStyleSheet(f"QSplitter {{ background-color: {bg_color}; }}")
-                
-            # 5. メインスプリッター全体の背景
-            if hasattr(self, 'main_splitter'):
-                self.main_splitter.setStyleSheet(f"QSplitter {{ background-color: {bg_color}; }}")
-                
-            # 6. 左パネル全体の背景
-            if hasattr(self, 'left_panel') and self.left_panel:
-                self.left_panel.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                    }}
-                """)
-                # 左パネルの強制更新
-                self.left_panel.update()
-                self.left_panel.repaint()
-                
-            # 7. 最大化コンテナの背景（画像ビュー全画面表示）
-            if hasattr(self, 'maximize_container') and self.maximize_container:
-                self.maximize_container.setStyleSheet(f"""
-                    QWidget {{
-                        background-color: {bg_color};
-                        color: {fg_color};
-                    }}
-                """)
-                # 最大化コンテナの子要素も更新
-                if hasattr(self, 'maximized_content_area') and self.maximized_content_area:
-                    self.maximized_content_area.setStyleSheet(f"""
-                        QWidget {{
-                            background-color: {bg_color};
-                            color: {fg_color};
-                        }}
-                    """)
-                # 強制更新
-                self.maximize_container.update()
-                self.maximize_container.repaint()
-                
-            # 8. 中央コンテンツエリア全体（スプリッター等）の背景
-            try:
-                # メインスプリッターの背景
-                if hasattr(self, 'main_splitter') and self.main_splitter:
-                    self.main_splitter.setStyleSheet(f"""
-                        QSplitter {{
-                            background-color: {bg_color};
-                            border: none;
-                        }}
-                        QSplitter::handle {{
-                            background-color: {border_color};
-                        }}
-                        QSplitter::handle:horizontal {{
-                            width: 3px;
-                        }}
-                        QSplitter::handle:vertical {{
-                            height: 3px;
-                        }}
-                    """)
-                
-                # 右パネルスプリッター
-                if hasattr(self, 'right_splitter') and self.right_splitter:
-                    self.right_splitter.setStyleSheet(f"""
-                        QSplitter {{
-                            background-color: {bg_color};
-                            border: none;
-                        }}
-                        QSplitter::handle {{
-                            background-color: {border_color};
-                        }}
-                        QSplitter::handle:vertical {{
-                            height: 3px;
-                        }}
-                    """)
-                
-                # 中央ウィジェット全体
-                central_widget = self.centralWidget()
-                if central_widget:
-                    central_widget.setStyleSheet(f"""
-                        QWidget {{
-                            background-color: {bg_color};
-                            color: {fg_color};
-                        }}
-                    """)
-                    
-            except Exception as e:
-                print(f"中央エリアテーマ適用エラー: {e}")
-            
-            # 追加のテーマスタイル適用
-            self._apply_additional_theme_styles()
-            
-        except Exception as e:
-            print(f"手動テーマスタイル適用エラー: {e}")
-    
-    def _apply_recursive_theme(self, widget, bg_color, fg_color):
-        """ウィジェットとその子要素に再帰的にテーマ適用"""
-        try:
-            # 現在のウィジェットに適用
-            current_style = widget.styleSheet()
-            if not current_style or "background-color" not in current_style:
-                widget.setStyleSheet(f"background-color: {bg_color}; color: {fg_color};")
-            
-            # 子要素に再帰適用
-            for child in widget.findChildren(QWidget):
-                if not child.styleSheet() or "background-color" not in child.styleSheet():
-                    child.setStyleSheet(f"background-color: {bg_color}; color: {fg_color};")
-        except Exception as e:
-            print(f"再帰テーマ適用エラー: {e}")
-    
-    def _apply_panel_theme_recursive(self, panel, bg_color):
-        """パネルとその親階層に再帰的に背景色適用"""
-        try:
-            # パネル自体
-            if panel:
-                current = panel
-                # 3階層上まで遡って背景色を適用
-                for _ in range(3):
-                    if current:
-                        parent = current.parent()
-                        if parent and hasattr(parent, 'setStyleSheet'):
-                            parent.setStyleSheet(f"background-color: {bg_color};")
-                            current = parent
-                        else:
-                            break
-        except Exception as e:
-            print(f"パネルテーマ適用エラー: {e}")
-    
-    def _apply_additional_theme_styles(self):
-        """追加のテーマスタイル適用"""
-        try:
-            # 4. プレビューとマップのタイトルラベル
-            title_color = self.get_theme_color("muted")
-            title_style = f"font-weight: normal; color: {title_color}; font-size: 11px;"
-            
-            # プレビュータイトル
-            preview_titles = self.findChildren(QLabel)
-            for label in preview_titles:
-                if label.text() in ["画像プレビュー", "撮影場所マップ"]:
-                    label.setStyleSheet(title_style)
-            
-            # 5. QGroupBoxのタイトル色を適用
-            fg_color = self.get_theme_color("foreground")
-            bg_color = self.get_theme_color("background")
-            border_color = self.get_theme_color("border")
-            
-            group_boxes = self.findChildren(QGroupBox)
-            for group_box in group_boxes:
-                if group_box.title() in ["🖼️ プレビュー", "🗺️ マップ"]:
-                    group_box.setStyleSheet(f"""
-                        QGroupBox {{ 
-                            font-size: 12px; 
-                            font-weight: bold; 
-                            color: {fg_color};
-                            background-color: {bg_color};
-                            border: 2px solid {border_color};
-                            border-radius: 5px;
-                            margin-top: 1ex;
-                        }}
-                        QGroupBox::title {{
-                            subcontrol-origin: margin;
-                            left: 10px;
-                            padding: 0 5px 0 5px;
-                            color: {fg_color};
-                            background-color: {bg_color};
-                        }}
-                    """)
-            
-            # 6. エラーラベルのカラー統一
-            error_color = self.get_theme_color("error")
-            error_labels = self.findChildren(QLabel)
-            for label in error_labels:
-                if "エラー" in label.text() or "error" in label.text().lower():
-                    current_style = label.styleSheet()
-                    if "color:" in current_style:
-                        # 既存のcolorを新しい色に置換
-                        import re
-                        new_style = re.sub(r'color:\s*[^;]+;', f'color: {error_color};', current_style)
-                        label.setStyleSheet(new_style)
-                    else:
-                        # colorが設定されていない場合は追加
-                        label.setStyleSheet(f"{current_style} color: {error_color};")
-                        
-        except Exception as e:
-            print(f"追加テーマスタイル適用エラー: {e}")
-    
-    def _force_global_theme_refresh(self):
-        """全体的なテーマ強制更新"""
-        try:
-            # メインウィンドウ全体の強制更新
-            self.update()
-            self.repaint()
-            
-            # ステータスバーの強制更新（特別処理）
-            if hasattr(self, 'statusBar') and self.statusBar():
-                status_bar = self.statusBar()
-                status_bar.update()
-                status_bar.repaint()
-                # ステータスバー内の全ラベルを強制更新
-                for label in status_bar.findChildren(QLabel):
-                    label.update()
-                    label.repaint()
-            
-            # 中央ウィジェットの強制更新
-            central_widget = self.centralWidget()
-            if central_widget:
-                central_widget.update()
-                central_widget.repaint()
-                # 中央ウィジェットの子要素も強制更新
-                for child in central_widget.findChildren(QWidget):
-                    child.update()
-            
-            # 主要スプリッターの強制更新
-            if hasattr(self, 'main_splitter') and self.main_splitter:
-                self.main_splitter.update()
-                self.main_splitter.repaint()
-                
-            if hasattr(self, 'right_splitter') and self.right_splitter:
-                self.right_splitter.update()
-                self.right_splitter.repaint()
-                
-            # すべての子ウィジェットの強制スタイル更新
-            all_widgets = self.findChildren(QWidget)
-            for widget in all_widgets:
-                try:
-                    widget.style().unpolish(widget)
-                    widget.style().polish(widget)
-                    widget.update()
-                    widget.repaint()
-                except:
-                    pass  # エラーは無視
-                    
-            # 最終的な全体更新
-            QApplication.instance().processEvents()
-            self.update()
-            self.repaint()
-                    
-        except Exception as e:
-            print(f"全体テーマ強制更新エラー: {e}")
@@ -60,6 +60,8 @@ setup(
     entry_points={
         "console_scripts": [
             "photomap-explorer=main:main",
+            "photomap-export=logic.geo_export:main",
+            "photomap-index=logic.headless_indexer:main",
         ],
     },
     package_data={
@@ -0,0 +1,234 @@
+"""
+ベンチマーク用の合成写真フォルダ - PhotoMap Explorer
+
+同じ引数なら毎回同じ内容のフォルダツリーを作成する（乱数は seed で固定）
+- JPEG: EXIF に撮影日時・カメラ（Make/Model）・GPS（一部の写真のみ）を書き込む
+- PNG / BMP / GIF: EXIFなし（一定間隔で混ぜる）
+- 年/イベント/（一部）サブフォルダの入れ子構造と、画像以外のファイル
+
+EXIF は外部ライブラリを使わず、TIFF構造を組み立てて APP1 セグメントとして
+Qt が書き出した JPEG の先頭に挿入する（GIF も Qt に書き出し機能がないため自前で書く）
+"""
+
+import os
+import random
+import struct
+from typing import Dict, List, Tuple
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt5.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+# 既定の構成
+DEFAULT_COUNT = 200
+DEFAULT_SIZE = (1600, 1200)
+DEFAULT_SEED = 20240601
+
+# 1イベントフォルダあたりの画像数
+IMAGES_PER_FOLDER = 25
+
+# この間隔ごとに JPEG 以外の形式を混ぜる（PNG, BMP, GIF の順）
+OTHER_FORMAT_INTERVAL = 10
+OTHER_FORMATS = ('png', 'bmp', 'gif')
+
+# GPS を付ける JPEG の割合
+GPS_RATIO = 0.7
+
+# JPEG 以外の画像の最大辺（BMP が大きくなりすぎないように）
+OTHER_MAX_EDGE = 800
+
+JPEG_QUALITY = 90
+
+CAMERAS = (("Canon", "Canon EOS R5"), ("NIKON CORPORATION", "NIKON Z 6_2"),
+           ("SONY", "ILCE-7M4"), ("FUJIFILM", "X-T5"), ("Apple", "iPhone 15 Pro"))
+
+# 撮影地（緯度, 経度）。各地点の周辺に散らす
+LOCATIONS = ((35.6586, 139.7454), (34.9671, 135.7727), (43.0687, 141.3508),
+             (26.2124, 127.6809), (48.8584, 2.2945), (40.6892, -74.0445))
+
+# EXIF（TIFF）の型
+_BYTE, _ASCII, _SHORT, _LONG, _RATIONAL = 1, 2, 3, 4, 5
+
+
+def _ascii(tag: int, text: str):
+    payload = text.encode('ascii') + b'\0'
+    return tag, _ASCII, len(payload), payload
+
+
+def _rationals(tag: int, values: List[Tuple[int, int]]):
+    return tag, _RATIONAL, len(values), b''.join(struct.pack('<II', *value) for value in values)
+
+
+def _ifd(entries, offset: int) -> bytes:
+    """IFD1つ分（offset は TIFF ヘッダ先頭からの位置）。4バイトを超える値は IFD の直後に置く"""
+    entries = sorted(entries)
+    data_offset = offset + 2 + 12 * len(entries) + 4
+    body, data = b'', b''
+    for tag, value_type, count, payload in entries:
+        if len(payload) <= 4:
+            value = payload.ljust(4, b'\0')
+        else:
+            value = struct.pack('<I', data_offset + len(data))
+            data += payload + (b'\0' if len(payload) % 2 else b'')
+        body += struct.pack('<HHI', tag, value_type, count) + value
+    return struct.pack('<H', len(entries)) + body + struct.pack('<I', 0) + data
+
+
+def _dms(value: float) -> List[Tuple[int, int]]:
+    value = abs(value)
+    degrees = int(value)
+    minutes = int((value - degrees) * 60)
+    seconds = round(((value - degrees) * 60 - minutes) * 60 * 1000)
+    return [(degrees, 1), (minutes, 1), (seconds, 1000)]
+
+
+def build_exif(taken_at: str, make: str, model: str, gps: Tuple[float, float] = None) -> bytes:
+    """
+    APP1 セグメント（マーカー込み）を作成
+
+    Args:
+        taken_at: "YYYY:MM:DD HH:MM:SS"
+        gps: (緯度, 経度) または None
+    """
+    exif_entries = [_ascii(0x9003, taken_at), _ascii(0x9004, taken_at)]
+    gps_entries = []
+    if gps is not None:
+        latitude, longitude = gps
+        gps_entries = [
+            (0x0000, _BYTE, 4, bytes((2, 3, 0, 0))),
+            _ascii(0x0001, 'N' if latitude >= 0 else 'S'),
+            _rationals(0x0002, _dms(latitude)),
+            _ascii(0x0003, 'E' if longitude >= 0 else 'W'),
+            _rationals(0x0004, _dms(longitude)),
+        ]
+
+    def ifd0(exif_offset: int, gps_offset: int) -> bytes:
+        entries = [_ascii(0x010F, make), _ascii(0x0110, model), _ascii(0x0132, taken_at),
+                   (0x0112, _SHORT, 1, struct.pack('<H', 1)),
+                   (0x8769, _LONG, 1, struct.pack('<I', exif_offset))]
+        if gps_entries:
+            entries.append((0x8825, _LONG, 1, struct.pack('<I', gps_offset)))
+        return _ifd(entries, 8)
+
+    # IFD0 の大きさはポインタの値に依存しないので、仮の値で長さを求めてから配置する
+    exif_offset = 8 + len(ifd0(0, 0))
+    exif_ifd = _ifd(exif_entries, exif_offset)
+    gps_offset = exif_offset + len(exif_ifd)
+    tiff = b'II*\0' + struct.pack('<I', 8) + ifd0(exif_offset, gps_offset) + exif_ifd
+    if gps_entries:
+        tiff += _ifd(gps_entries, gps_offset)
+    payload = b'Exif\0\0' + tiff
+    return b'\xff\xe1' + struct.pack('>H', len(payload) + 2) + payload
+
+
+def render_image(width: int, height: int, rng: random.Random) -> QImage:
+    """グラデーションに図形を重ねた画像（単色より実際の写真に近い圧縮率・デコード時間になる）"""
+    image = QImage(width, height, QImage.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor.fromHsv(rng.randrange(360), 120, 230))
+    gradient.setColorAt(1, QColor.fromHsv(rng.randrange(360), 200, 90))
+    painter.fillRect(image.rect(), gradient)
+    painter.setPen(Qt.NoPen)
+    for _ in range(40):
+        painter.setBrush(QColor.fromHsv(rng.randrange(360), rng.randrange(60, 255),
+                                        rng.randrange(60, 255), rng.randrange(80, 220)))
+        edge = rng.randrange(max(8, min(width, height) // 12), max(16, min(width, height) // 3))
+        painter.drawEllipse(rng.randrange(width), rng.randrange(height), edge, edge)
+    painter.end()
+    return image
+
+
+def _encode(image: QImage, image_format: str, quality: int = -1) -> bytes:
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    if not image.save(buffer, image_format, quality):
+        raise OSError(f"{image_format} の書き出しに失敗しました")
+    buffer.close()
+    return bytes(data)
+
+
+def encode_gif(width: int, height: int, rng: random.Random) -> bytes:
+    """
+    128色の非圧縮GIF
+
+    LZW の符号長が8ビットのまま増えないよう100画素ごとにクリアコードを入れる
+    （符号がちょうど1バイトになるため、画素の並びがそのままデータになる）
+    """
+    palette = b''.join(bytes(((index * 2) % 256, (255 - index * 2) % 256, (index * 37 + 64) % 256))
+                       for index in range(128))
+    shift = rng.randrange(128)
+    pixels = b''.join(bytes(((x // 16 + y // 16 + shift) % 128) for x in range(width)) for y in range(height))
+    stream = bytearray()
+    for start in range(0, len(pixels), 100):
+        stream.append(0x80)  # クリアコード
+        stream += pixels[start:start + 100]
+    stream.append(0x81)  # 終了コード
+    blocks = b''.join(bytes((len(stream[start:start + 255]),)) + bytes(stream[start:start + 255])
+                      for start in range(0, len(stream), 255))
+    return (b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF6, 0, 0) + palette
+            + b',' + struct.pack('<HHHHB', 0, 0, width, height, 0) + bytes((7,)) + blocks + b'\0;')
+
+
+def generate_corpus(root: str, count: int = DEFAULT_COUNT, size: Tuple[int, int] = DEFAULT_SIZE,
+                    seed: int = DEFAULT_SEED) -> Dict[str, int]:
+    """
+    合成写真フォルダを作成
+
+    Args:
+        root: 作成先（空のフォルダ、または存在しないパス）
+        count: 画像の枚数（JPEG 以外も含む）
+        size: JPEG の (幅, 高さ)
+        seed: 乱数の種
+
+    Returns:
+        Dict[str, int]: 形式ごとの枚数、GPS付きの枚数、フォルダ数
+    """
+    rng = random.Random(seed)
+    width, height = size
+    scale = min(1.0, OTHER_MAX_EDGE / max(width, height))
+    other_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    summary = {'jpeg': 0, 'png': 0, 'bmp': 0, 'gif': 0, 'gps': 0, 'folders': 0}
+    folders = set()
+
+    for index in range(count):
+        event = index // IMAGES_PER_FOLDER
+        folder = os.path.join(root, str(2021 + event % 3), f"event_{event:03d}")
+        if event % 4 == 3 and index % 2:
+            folder = os.path.join(folder, "selects")
+        if folder not in folders:
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, "notes.txt"), 'w', encoding='utf-8') as stream:
+                stream.write("ベンチマーク用の画像以外のファイル\n")
+            folders.add(folder)
+
+        if index % OTHER_FORMAT_INTERVAL == OTHER_FORMAT_INTERVAL - 1:
+            image_format = OTHER_FORMATS[(index // OTHER_FORMAT_INTERVAL) % len(OTHER_FORMATS)]
+            path = os.path.join(folder, f"IMG_{index:05d}.{image_format}")
+            if image_format == 'gif':
+                data = encode_gif(*other_size, rng)
+            else:
+                data = _encode(render_image(*other_size, rng), image_format)
+            with open(path, 'wb') as stream:
+                stream.write(data)
+            summary[image_format] += 1
+            continue
+
+        make, model = CAMERAS[rng.randrange(len(CAMERAS))]
+        day = index // 40
+        taken_at = (f"{2021 + event % 3}:{1 + day // 28 % 12:02d}:{1 + day % 28:02d} "
+                    f"{8 + index % 12:02d}:{index * 7 % 60:02d}:{index * 13 % 60:02d}")
+        gps = None
+        if rng.random() < GPS_RATIO:
+            latitude, longitude = LOCATIONS[event % len(LOCATIONS)]
+            gps = (latitude + rng.uniform(-0.05, 0.05), longitude + rng.uniform(-0.05, 0.05))
+            summary['gps'] += 1
+        jpeg = _encode(render_image(width, height, rng), 'JPG', JPEG_QUALITY)
+        # SOI の直後に EXIF を挿入
+        data = jpeg[:2] + build_exif(taken_at, make, model, gps) + jpeg[2:]
+        with open(os.path.join(folder, f"IMG_{index:05d}.jpg"), 'wb') as stream:
+            stream.write(data)
+        summary['jpeg'] += 1
+
+    summary['folders'] = len(folders)
+    return summary
@@ -0,0 +1,353 @@
+"""
+処理時間のベンチマーク - PhotoMap Explorer
+
+合成写真フォルダ（synthetic_corpus）を作成し、主な処理の所要時間を計測する
+- フォルダ走査（ParallelScanner）
+- メタデータ読み込み（read_photo）
+- サムネイル作成（ディスクキャッシュなし）とキャッシュからの読み込み
+- プレビューのデコード（DecodedImageCache、メモリキャッシュなし）
+- マップ更新（MapPanel.update_location）
+
+結果は tests/performance/results に JSON で保存し、baseline.json と比較する
+    python tests/performance/test_performance.py --count 500 --size 4000x3000
+    python tests/performance/test_performance.py --update-baseline   # 現在の結果をベースラインにする
+
+pytest では小さなフォルダで一通り動くことだけを確認する
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from tests.performance.synthetic_corpus import (DEFAULT_COUNT, DEFAULT_SEED, DEFAULT_SIZE,  # noqa: E402
+                                                generate_corpus)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BASELINE_NAME = "baseline.json"
+LATEST_NAME = "latest.json"
+
+# フォルダ走査の繰り返し回数（中央値を採用。他の処理はキャッシュの影響を避けるため1回）
+SCAN_REPEAT = 3
+
+# プレビューのデコード・マップ更新を計測する枚数の上限
+PREVIEW_LIMIT = 30
+MAP_LIMIT = 20
+
+# ベースラインより この割合を超えて遅ければ「悪化」とする
+REGRESSION_THRESHOLD = 0.2
+
+
+def _application() -> QApplication:
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def _result(seconds: float, items: int, **details) -> dict:
+    result = {"seconds": seconds, "items": items,
+              "ms_per_item": seconds * 1000 / items if items else 0.0}
+    result.update(details)
+    return result
+
+
+@contextlib.contextmanager
+def _working_directory(path: str):
+    """作業フォルダを一時的に変更（地図HTMLはカレントフォルダへ書き出されるため）"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_scan(root: str) -> Tuple[dict, List[str]]:
+    from logic.scanner import ParallelScanner
+    timings, paths = [], []
+    for _ in range(SCAN_REPEAT):
+        found = []
+        start = time.perf_counter()
+        ParallelScanner().scan(root, found.extend)
+        timings.append(time.perf_counter() - start)
+        paths = found
+    paths.sort()
+    return _result(statistics.median(timings), len(paths), runs=timings), paths
+
+
+def bench_metadata(paths: List[str]) -> Tuple[dict, list]:
+    from infrastructure.exif_reader import read_photo
+    start = time.perf_counter()
+    photos = [read_photo(path) for path in paths]
+    seconds = time.perf_counter() - start
+    gps = sum(1 for photo in photos if photo is not None and photo.has_gps_data)
+    return _result(seconds, len(paths), with_gps=gps), photos
+
+
+def bench_thumbnails(paths: List[str], cache_dir: str) -> Tuple[dict, dict]:
+    from logic.thumbnail_cache import ThumbnailCache
+    cache = ThumbnailCache(cache_dir)
+    start = time.perf_counter()
+    failed = sum(1 for path in paths if cache.get_or_create(path).isNull())
+    cold = time.perf_counter() - start
+
+    cache = ThumbnailCache(cache_dir)
+    start = time.perf_counter()
+    for path in paths:
+        cache.get_or_create(path)
+    warm = time.perf_counter() - start
+    return _result(cold, len(paths), failed=failed), _result(warm, len(paths))
+
+
+def bench_preview(paths: List[str]) -> dict:
+    from logic.image_cache import DecodedImageCache
+    cache = DecodedImageCache()
+    targets = paths[:PREVIEW_LIMIT]
+    start = time.perf_counter()
+    pixels = 0
+    for path in targets:
+        image = cache.load(path)
+        pixels += image.width() * image.height()
+    seconds = time.perf_counter() - start
+    return _result(seconds, len(targets), megapixels=round(pixels / 1e6, 2))
+
+
+def bench_map(photos: list, work_dir: str) -> dict:
+    from ui.map_panel import MapPanel
+    application = _application()
+    targets = [photo for photo in photos if photo is not None and photo.has_gps_data][:MAP_LIMIT]
+    panel = MapPanel()
+    with _working_directory(work_dir):
+        panel._ensure_view()
+        start = time.perf_counter()
+        for photo in targets:
+            panel.update_location(photo.latitude, photo.longitude)
+            application.processEvents()
+        seconds = time.perf_counter() - start
+    panel.deleteLater()
+    return _result(seconds, len(targets), view="webengine" if panel.use_webengine else "simple")
+
+
+def run_benchmarks(corpus_root: str) -> Dict[str, dict]:
+    """
+    合成フォルダに対して各処理を計測
+
+    Returns:
+        Dict[str, dict]: 処理名 → {seconds, items, ms_per_item, ...}
+    """
+    _application()
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="photomap_bench_")
+    try:
+        results["folder_scan"], paths = bench_scan(corpus_root)
+        results["metadata"], photos = bench_metadata(paths)
+        results["thumbnail_generate"], results["thumbnail_cached"] = bench_thumbnails(
+            paths, os.path.join(work_dir, "thumbnails"))
+        results["preview_decode"] = bench_preview(paths)
+        results["map_update"] = bench_map(photos, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_info() -> dict:
+    return {"platform": platform.platform(), "python": platform.python_version(), "qt": QT_VERSION_STR,
+            "pyqt": PYQT_VERSION_STR, "cpu_count": os.cpu_count(), "revision": _git_revision()}
+
+
+def compare_with_baseline(results: Dict[str, dict], baseline: Optional[dict],
+                          threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """
+    ベースラインとの比較（1件あたりの時間で比べる）
+
+    Returns:
+        List[dict]: {name, baseline_ms, current_ms, ratio, status}
+                    status は "悪化" / "改善" / "同等" / "新規"
+    """
+    previous = (baseline or {}).get("results", {})
+    rows = []
+    for name, result in results.items():
+        current = result["ms_per_item"]
+        reference = previous.get(name, {}).get("ms_per_item")
+        if not reference:
+            rows.append({"name": name, "baseline_ms": None, "current_ms": current, "ratio": None,
+                         "status": "新規"})
+            continue
+        ratio = current / reference
+        status = "悪化" if ratio > 1 + threshold else "改善" if ratio < 1 - threshold else "同等"
+        rows.append({"name": name, "baseline_ms": reference, "current_ms": current, "ratio": ratio,
+                     "status": status})
+    return rows
+
+
+def load_baseline(results_dir: str = RESULTS_DIR) -> Optional[dict]:
+    path = os.path.join(results_dir, BASELINE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def save_results(report: dict, results_dir: str = RESULTS_DIR, update_baseline: bool = False) -> str:
+    """結果を日時付きのファイルと latest.json へ保存（指定時はベースラインも更新）"""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    names = [path, os.path.join(results_dir, LATEST_NAME)]
+    if update_baseline:
+        names.append(os.path.join(results_dir, BASELINE_NAME))
+    for name in names:
+        with open(name, 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, ensure_ascii=False, indent=2)
+    return path
+
+
+def build_report(config: dict, results: Dict[str, dict], baseline: Optional[dict],
+                 threshold: float = REGRESSION_THRESHOLD) -> dict:
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "config": config,
+        "environment": environment_info(),
+        "results": results,
+        "baseline": {"created": baseline.get("created"), "config_matches": baseline.get("config") == config,
+                     "revision": baseline.get("environment", {}).get("revision")} if baseline else None,
+        "comparison": compare_with_baseline(results, baseline, threshold),
+    }
+
+
+def format_report(report: dict) -> str:
+    config = report["config"]
+    lines = [f"合成フォルダ: {config['count']:,}枚 {config['width']}x{config['height']} (seed {config['seed']})"]
+    if report["baseline"] is None:
+        lines.append("ベースライン: なし（--update-baseline で作成）")
+    else:
+        note = "" if report["baseline"]["config_matches"] else "（構成が異なるため参考値）"
+        lines.append(f"ベースライン: {report['baseline']['created']}{note}")
+    lines.append(f"{'処理':<20} {'件数':>6} {'合計(ms)':>10} {'1件(ms)':>9} {'基準(ms)':>9} {'比':>6}  判定")
+    for row in report["comparison"]:
+        result = report["results"][row["name"]]
+        baseline_ms = f"{row['baseline_ms']:.2f}" if row["baseline_ms"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        lines.append(f"{row['name']:<20} {result['items']:>6} {result['seconds'] * 1000:>10.1f} "
+                     f"{row['current_ms']:>9.2f} {baseline_ms:>9} {ratio:>6}  {row['status']}")
+    return "\n".join(lines)
+
+
+def run_suite(count: int = DEFAULT_COUNT, size: Tuple[int, int] = DEFAULT_SIZE, seed: int = DEFAULT_SEED,
+              corpus_root: str = None, results_dir: str = RESULTS_DIR, update_baseline: bool = False,
+              threshold: float = REGRESSION_THRESHOLD) -> Tuple[dict, str]:
+    """
+    合成フォルダの作成から計測・保存までを実行
+
+    Args:
+        corpus_root: 合成フォルダの作成先（省略時は一時フォルダに作成して最後に削除）
+
+    Returns:
+        Tuple[dict, str]: (レポート, 保存したファイルのパス)
+    """
+    _application()
+    config = {"count": count, "width": size[0], "height": size[1], "seed": seed}
+    temporary = corpus_root is None
+    corpus_root = corpus_root or tempfile.mkdtemp(prefix="photomap_corpus_")
+    try:
+        if not os.listdir(corpus_root):
+            config["corpus"] = generate_corpus(corpus_root, count, size, seed)
+        results = run_benchmarks(corpus_root)
+    finally:
+        if temporary:
+            shutil.rmtree(corpus_root, ignore_errors=True)
+    report = build_report(config, results, load_baseline(results_dir), threshold)
+    return report, save_results(report, results_dir, update_baseline)
+
+
+def test_synthetic_corpus_is_reproducible(tmp_path):
+    from infrastructure.exif_reader import read_photo
+    _application()
+    first = generate_corpus(str(tmp_path / "a"), 12, (320, 240), seed=1)
+    second = generate_corpus(str(tmp_path / "b"), 12, (320, 240), seed=1)
+    assert first == second
+    assert first["jpeg"] == 11 and first["png"] == 1
+
+    relative = os.path.join("2021", "event_000", "IMG_00000.jpg")
+    with open(tmp_path / "a" / relative, 'rb') as a, open(tmp_path / "b" / relative, 'rb') as b:
+        assert a.read() == b.read()
+    photos = [read_photo(str(path)) for path in (tmp_path / "a").rglob("*.jpg")]
+    assert len(photos) == first["jpeg"]
+    assert all(photo.taken_at is not None and photo.camera for photo in photos)
+    assert sum(1 for photo in photos if photo.has_gps_data) == first["gps"]
+
+
+def test_suite_writes_results_and_compares_with_baseline(tmp_path):
+    results_dir = str(tmp_path / "results")
+    report, path = run_suite(count=20, size=(320, 240), results_dir=results_dir, update_baseline=True)
+    assert report["baseline"] is None
+    assert {row["status"] for row in report["comparison"]} == {"新規"}
+    assert report["results"]["folder_scan"]["items"] == 20
+    assert report["results"]["thumbnail_generate"]["failed"] == 0
+
+    report, path = run_suite(count=20, size=(320, 240), results_dir=results_dir)
+    assert report["baseline"]["config_matches"]
+    assert all(row["ratio"] is not None for row in report["comparison"])
+    with open(path, encoding='utf-8') as stream:
+        assert json.load(stream)["results"].keys() == report["results"].keys()
+    assert os.path.exists(os.path.join(results_dir, LATEST_NAME))
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"metadata": {"ms_per_item": 1.0}, "preview_decode": {"ms_per_item": 10.0}}}
+    results = {"metadata": _result(0.15, 100), "preview_decode": _result(0.1, 20), "map_update": _result(1, 1)}
+    statuses = {row["name"]: row["status"] for row in compare_with_baseline(results, baseline)}
+    assert statuses == {"metadata": "悪化", "preview_decode": "改善", "map_update": "新規"}
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="PhotoMap Explorer の処理時間ベンチマーク")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help=f"画像の枚数（既定: {DEFAULT_COUNT}）")
+    parser.add_argument("--size", type=_parse_size, default=DEFAULT_SIZE,
+                        help=f"JPEG の大きさ 幅x高さ（既定: {DEFAULT_SIZE[0]}x{DEFAULT_SIZE[1]}）")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="合成フォルダの乱数の種")
+    parser.add_argument("--corpus", help="合成フォルダの作成先（空なら作成、既存なら再利用。省略時は一時フォルダ）")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"悪化とみなす割合（既定: {REGRESSION_THRESHOLD}）")
+    parser.add_argument("--update-baseline", action="store_true", help="今回の結果をベースラインとして保存")
+    parser.add_argument("--fail-on-regression", action="store_true", help="悪化があれば終了コード1")
+    arguments = parser.parse_args(argv)
+
+    if arguments.corpus:
+        os.makedirs(arguments.corpus, exist_ok=True)
+    report, path = run_suite(arguments.count, arguments.size, arguments.seed, arguments.corpus,
+                             update_baseline=arguments.update_baseline, threshold=arguments.threshold)
+    print(format_report(report))
+    print(f"結果: {path}")
+    regressed = any(row["status"] == "悪化" for row in report["comparison"])
+    return 1 if regressed and arguments.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
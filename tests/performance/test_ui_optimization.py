@@ -0,0 +1,149 @@
+"""
+テーマ切り替えのベンチマーク - PhotoMap Explorer
+
+ウィジェット数を変えて、テーマ切り替え1回の所要時間を比較する
+- 従来方式: findChildren で全ボタン・グループボックスへ setStyleSheet + unpolish/polish、
+  全ウィジェットを repaint して processEvents
+- 現行方式: テーマごとにコンパイル済みのアプリケーションQSSを QApplication.setStyleSheet で1回適用
+
+pytest で実行するほか、直接実行すると結果の表を出力する:
+    python tests/performance/test_ui_optimization.py
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from PyQt5.QtCore import QEvent  # noqa: E402
+from PyQt5.QtWidgets import (QApplication, QGroupBox, QLabel, QPushButton, QVBoxLayout,  # noqa: E402
+                             QWidget, QGridLayout)
+
+from presentation.themes.stylesheet_compiler import StylesheetCompiler  # noqa: E402
+from presentation.themes.theme_manager import ThemeManager, ThemeMode  # noqa: E402
+
+WIDGET_COUNTS = (100, 500, 2000)
+REPEAT = 3
+
+
+def _application() -> QApplication:
+    return QApplication.instance() or QApplication(sys.argv[:1])
+
+
+def _build_window(widget_count: int) -> QWidget:
+    """ボタン・ラベル・グループボックスを widget_count 個ほど並べたウィンドウ"""
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    per_group = 20
+    for group_index in range(max(1, widget_count // per_group)):
+        group = QGroupBox(f"グループ {group_index}")
+        group.setProperty("themeComponent", "group_box")
+        grid = QGridLayout(group)
+        for index in range(per_group // 2):
+            button = QPushButton(f"ボタン {index}")
+            if index % 3 == 0:
+                button.setProperty("themeComponent", "maximize_button")
+            grid.addWidget(button, index, 0)
+            grid.addWidget(QLabel(f"ラベル {index}"), index, 1)
+        layout.addWidget(group)
+    window.resize(800, 600)
+    window.show()
+    _application().processEvents()
+    return window
+
+
+def _dispose(window: QWidget):
+    """ウィンドウを破棄（残っていると以降のアプリケーションQSSの適用対象に含まれる）"""
+    window.close()
+    window.deleteLater()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def _legacy_toggle(window: QWidget, theme_manager: ThemeManager, theme: ThemeMode):
+    """従来方式のテーマ適用（ウィジェットごとの再設定と同期再描画）"""
+    colors = theme_manager.get_theme_data(theme)["colors"]
+    for button in window.findChildren(QPushButton):
+        button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {colors['button_bg']};
+                color: {colors['foreground']};
+                border: 1px solid {colors['border']};
+            }}
+            QPushButton:hover {{
+                background-color: {colors['button_hover']};
+            }}
+        """)
+        button.style().unpolish(button)
+        button.style().polish(button)
+    for group in window.findChildren(QGroupBox):
+        group.setStyleSheet(f"QGroupBox {{ background-color: {colors['background']}; "
+                            f"color: {colors['foreground']}; border: 2px solid {colors['border']}; }}")
+    for widget in window.findChildren(QWidget):
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+        widget.update()
+        widget.repaint()
+    _application().processEvents()
+
+
+def _compiled_toggle(window: QWidget, compiler: StylesheetCompiler, theme: ThemeMode):
+    """現行方式のテーマ適用"""
+    compiler.apply(theme)
+    _application().processEvents()
+
+
+def _measure(toggle, window, argument) -> float:
+    """ライト→ダークの切り替え1回あたりの平均秒数"""
+    elapsed = 0.0
+    for _ in range(REPEAT):
+        for theme in (ThemeMode.DARK, ThemeMode.LIGHT):
+            start = time.perf_counter()
+            toggle(window, argument, theme)
+            elapsed += time.perf_counter() - start
+    return elapsed / (REPEAT * 2)
+
+
+def run_benchmark(widget_counts=WIDGET_COUNTS):
+    """
+    Returns:
+        List[Tuple[int, float, float]]: (ウィジェット数, 従来方式の秒数, 現行方式の秒数)
+    """
+    application = _application()
+    theme_manager = ThemeManager()
+    compiler = StylesheetCompiler(theme_manager)
+    results = []
+    for widget_count in widget_counts:
+        application.setStyleSheet("")
+        window = _build_window(widget_count)
+        total = len(window.findChildren(QWidget))
+        legacy = _measure(_legacy_toggle, window, theme_manager)
+        _dispose(window)
+
+        window = _build_window(widget_count)
+        compiled = _measure(_compiled_toggle, window, compiler)
+        _dispose(window)
+        application.setStyleSheet("")
+        results.append((total, legacy, compiled))
+    return results
+
+
+def test_compiled_stylesheet_is_cached():
+    _application()
+    compiler = StylesheetCompiler(ThemeManager())
+    dark = compiler.compile(ThemeMode.DARK)
+    assert compiler.compile(ThemeMode.DARK) is dark
+    assert compiler.compile(ThemeMode.LIGHT) != dark
+    assert 'QPushButton[themeComponent="maximize_button"]' in dark
+
+
+def test_compiled_toggle_is_faster_than_widget_walk():
+    for _, legacy, compiled in run_benchmark((500,)):
+        assert compiled < legacy
+
+
+if __name__ == "__main__":
+    print(f"{'ウィジェット数':>12} {'従来方式(ms)':>14} {'現行方式(ms)':>14}")
+    for widget_count, legacy, compiled in run_benchmark():
+        print(f"{widget_count:>12,} {legacy * 1000:>14.1f} {compiled * 1000:>14.1f}")
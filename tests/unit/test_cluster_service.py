@@ -0,0 +1,199 @@
+"""
+時空間クラスタリングのテスト - PhotoMap Explorer
+
+格子による近傍探索とUnion-Findの結果が総当たりのDBSCANと一致すること、
+追加分だけの再計算（update）が全件の再計算（fit）と一致することを確認する
+境界点は複数のクラスタに接する場合の所属が処理順で異なりうるため、
+接しているコア点のクラスタのいずれかであることだけを確認する
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from domain.models.photo_collection import PhotoCollection  # noqa: E402
+from domain.services.cluster_service import EARTH_RADIUS_M, SpatioTemporalClusterer  # noqa: E402
+
+EPS_METERS = 500.0
+EPS_SECONDS = 3 * 3600
+MIN_SAMPLES = 3
+BASE_TIME = 1700000000.0
+
+
+def _random_photos(seed: int, count: int = 240):
+    """数か所の撮影地の周辺に散らばった写真（GPS・撮影日時のない写真を含む）"""
+    rng = random.Random(seed)
+    centers = [(35.68, 139.76), (35.69, 139.70), (34.70, 135.50), (-33.87, 151.21), (0.0, 179.999)]
+    photos = []
+    for i in range(count):
+        latitude, longitude = rng.choice(centers)
+        latitude += rng.gauss(0, 0.006)
+        longitude += rng.gauss(0, 0.006)
+        if longitude > 180:
+            longitude -= 360
+        taken_at = BASE_TIME + rng.choice((0, 1, 5)) * 86400 + rng.uniform(0, 8 * 3600)
+        kind = rng.random()
+        if kind < 0.05:
+            latitude = longitude = None
+        elif kind < 0.08:
+            taken_at = None
+        photos.append(Photo(f"/lib/IMG_{i:04d}.jpg", latitude=latitude, longitude=longitude,
+                            taken_at=taken_at))
+    return photos
+
+
+def _brute_force(photos, eps_meters=EPS_METERS, eps_seconds=EPS_SECONDS, min_samples=MIN_SAMPLES):
+    """
+    総当たりのDBSCAN
+
+    Returns:
+        (コア点のマスク, 近傍行列, コア点ごとの連結成分番号（コア以外は-1）)
+    """
+    count = len(photos)
+    latitude = np.array([np.nan if p.latitude is None else p.latitude for p in photos])
+    longitude = np.array([np.nan if p.longitude is None else p.longitude for p in photos])
+    times = np.array([np.nan if p.taken_at is None else p.taken_at for p in photos])
+    valid = ~(np.isnan(latitude) | np.isnan(longitude))
+    if eps_seconds is not None:
+        valid &= ~np.isnan(times)
+
+    # 大円距離（haversine）
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    a = (np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+         + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2)
+    distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    with np.errstate(invalid='ignore'):
+        near = distance <= eps_meters
+        if eps_seconds is not None:
+            near &= np.abs(times[:, None] - times[None, :]) <= eps_seconds
+    near &= valid[:, None] & valid[None, :]
+
+    core = near.sum(axis=1) >= min_samples
+    component = np.full(count, -1)
+    for seed in np.flatnonzero(core):
+        if component[seed] >= 0:
+            continue
+        component[seed] = seed
+        stack = [seed]
+        while stack:
+            row = stack.pop()
+            for other in np.flatnonzero(near[row] & core):
+                if component[other] < 0:
+                    component[other] = seed
+                    stack.append(other)
+    return core, near, component
+
+
+def _assert_same_clustering(labels, photos, **params):
+    """ラベルが総当たりのDBSCANと同じクラスタ分けであることを確認"""
+    core, near, component = _brute_force(photos, **params)
+    assert len(labels) == len(photos)
+
+    # コア点: 連結成分とクラスタ番号が1対1に対応する
+    pairs = set(zip(component[core].tolist(), labels[core].tolist()))
+    assert len(pairs) == len({c for c, _ in pairs}) == len({label for _, label in pairs})
+    assert (labels[core] >= 0).all()
+
+    # コア以外: 近傍にコア点があればそのいずれかのクラスタ、なければノイズ
+    label_of_component = dict(pairs)
+    for row in np.flatnonzero(~core):
+        candidates = {label_of_component[c] for c in component[near[row] & core].tolist()}
+        if candidates:
+            assert labels[row] in candidates, row
+        else:
+            assert labels[row] == -1, row
+    return len(pairs)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("eps_seconds", [EPS_SECONDS, None])
+def test_fit_matches_brute_force(seed, eps_seconds):
+    photos = _random_photos(seed)
+    collection = PhotoCollection.from_photos(photos)
+    labels = SpatioTemporalClusterer(EPS_METERS, eps_seconds, MIN_SAMPLES).fit(collection)
+    cluster_count = _assert_same_clustering(labels, photos, eps_seconds=eps_seconds)
+    assert cluster_count > 1
+    # 番号は大きいクラスタから振られる
+    sizes = np.bincount(labels[labels >= 0])
+    assert (np.diff(sizes) <= 0).all()
+
+
+@pytest.mark.parametrize("seed", [4, 5])
+def test_update_in_batches_matches_full_fit(seed):
+    photos = _random_photos(seed)
+    half = len(photos) // 2
+
+    collection = PhotoCollection.from_photos(photos[:half])
+    clusterer = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES)
+    clusterer.fit(collection)
+    collection.extend(photos[half:])
+    incremental = clusterer.update(collection)
+
+    full = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES).fit(
+        PhotoCollection.from_photos(photos))
+    assert _assert_same_clustering(incremental, photos) == _assert_same_clustering(full, photos)
+    # ノイズは処理順に依存しない
+    assert ((incremental == -1) == (full == -1)).all()
+
+
+def _line(prefix, start_longitude, count, step=0.003, latitude=35.0):
+    """東西に並んだ写真（経度0.003度 ≒ 270m 間隔）"""
+    return [Photo(f"/lib/{prefix}_{i}.jpg", latitude=latitude, longitude=start_longitude + i * step,
+                  taken_at=BASE_TIME + i * 60)
+            for i in range(count)]
+
+
+def test_update_merges_clusters_joined_by_new_points():
+    # 約1.6km離れた2つのクラスタを、後から追加した点がつなぐ
+    west = _line("west", 139.000, 4)
+    east = _line("east", 139.027, 4)
+    bridge = _line("bridge", 139.012, 5)
+
+    collection = PhotoCollection.from_photos(west + east)
+    clusterer = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES)
+    before = clusterer.fit(collection)
+    assert len(set(before.tolist())) == 2
+    assert (before >= 0).all()
+
+    collection.extend(bridge)
+    after = clusterer.update(collection)
+    assert (after == 0).all()
+
+    photos = west + east + bridge
+    full = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES).fit(
+        PhotoCollection.from_photos(photos))
+    assert (full == after).all()
+    assert _assert_same_clustering(after, photos) == 1
+
+
+def test_update_promotes_existing_border_and_noise_points():
+    # 最初は点が足りずノイズ、追加で既存点がコアになりクラスタができる
+    first = _line("first", 139.0, 2)
+    collection = PhotoCollection.from_photos(first)
+    clusterer = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES)
+    assert (clusterer.fit(collection) == -1).all()
+
+    later = [Photo("/lib/later.jpg", latitude=35.0, longitude=139.0015, taken_at=BASE_TIME + 30)]
+    collection.extend(later)
+    labels = clusterer.update(collection)
+    assert labels.tolist() == [0, 0, 0]
+    assert [rows.tolist() for rows in clusterer.clusters()] == [[0, 1, 2]]
+    _assert_same_clustering(labels, first + later)
+
+
+def test_time_gap_separates_same_place():
+    same_place = _line("day1", 139.0, 3) + [
+        Photo(f"/lib/day2_{i}.jpg", latitude=35.0, longitude=139.0 + i * 0.003,
+              taken_at=BASE_TIME + 86400 + i * 60) for i in range(3)]
+    collection = PhotoCollection.from_photos(same_place)
+    labels = SpatioTemporalClusterer(EPS_METERS, EPS_SECONDS, MIN_SAMPLES).fit(collection)
+    assert labels[:3].tolist() == [labels[0]] * 3
+    assert labels[3:].tolist() == [labels[3]] * 3
+    assert labels[0] != labels[3]
+    assert (SpatioTemporalClusterer(EPS_METERS, None, MIN_SAMPLES).fit(collection) == 0).all()
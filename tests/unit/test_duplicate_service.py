@@ -0,0 +1,144 @@
+"""
+重複写真検出のテスト - PhotoMap Explorer
+
+完全一致の段階的な絞り込み（サイズ → 先頭64KB → 残り）とハードリンクのまとめ方、
+知覚ハッシュのBK木の検索結果が総当たりと一致することを確認する
+"""
+
+import os
+import random
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.services import duplicate_service  # noqa: E402
+from domain.services.duplicate_service import (HEAD_BYTES, BKTree, PerceptualIndex,  # noqa: E402
+                                               find_exact_duplicates, hamming_distance)
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+LARGE = HEAD_BYTES * 3
+
+
+def _write(path, data):
+    with open(path, 'wb') as stream:
+        stream.write(data)
+    return str(path)
+
+
+@pytest.fixture
+def digests(monkeypatch):
+    """先頭・残りのハッシュを計算したパスを記録"""
+    calls = {'head': [], 'tail': []}
+    head, tail = duplicate_service._head_digest, duplicate_service._tail_digest
+
+    def head_digest(path, size):
+        calls['head'].append(os.path.basename(path))
+        return head(path, size)
+
+    def tail_digest(path):
+        calls['tail'].append(os.path.basename(path))
+        return tail(path)
+
+    monkeypatch.setattr(duplicate_service, '_head_digest', head_digest)
+    monkeypatch.setattr(duplicate_service, '_tail_digest', tail_digest)
+    return calls
+
+
+def test_tiers_read_only_remaining_candidates(tmp_path, digests):
+    body = bytes(random.Random(1).randrange(256) for _ in range(LARGE))
+    a = _write(tmp_path / "a.jpg", body)
+    b = _write(tmp_path / "b.jpg", body)
+    # 先頭64KBは同じで末尾だけ違う
+    _write(tmp_path / "c.jpg", body[:-1] + bytes((body[-1] ^ 1,)))
+    # サイズは同じで先頭が違う
+    _write(tmp_path / "d.jpg", bytes((body[0] ^ 1,)) + body[1:])
+    # サイズが違う
+    _write(tmp_path / "e.jpg", body + b'\0')
+
+    groups = find_exact_duplicates(sorted(str(path) for path in tmp_path.iterdir()))
+
+    assert groups == [[a, b]]
+    assert sorted(digests['head']) == ["a.jpg", "b.jpg", "c.jpg", "d.jpg"]
+    assert sorted(digests['tail']) == ["a.jpg", "b.jpg", "c.jpg"]
+
+
+def test_small_files_are_decided_by_head(tmp_path, digests):
+    a = _write(tmp_path / "a.png", b'small')
+    b = _write(tmp_path / "b.png", b'small')
+    _write(tmp_path / "empty1.png", b'')
+    _write(tmp_path / "empty2.png", b'')
+
+    assert find_exact_duplicates([a, b, str(tmp_path / "empty1.png"), str(tmp_path / "empty2.png")]) == [[a, b]]
+    assert digests['tail'] == []
+
+
+def test_hard_links_are_read_once(tmp_path, digests):
+    body = b'x' * LARGE
+    a = _write(tmp_path / "a.jpg", body)
+    copy = _write(tmp_path / "b.jpg", body)
+    link = str(tmp_path / "a_link.jpg")
+    os.link(a, link)
+    # ハードリンクだけの重複
+    lonely = _write(tmp_path / "lonely.jpg", b'y' * 10)
+    lonely_link = str(tmp_path / "lonely_link.jpg")
+    os.link(lonely, lonely_link)
+
+    groups = find_exact_duplicates([a, copy, link, lonely, lonely_link])
+
+    assert groups == [sorted([a, copy, link]), sorted([lonely, lonely_link])]
+    assert sorted(digests['head']) == ["a.jpg", "b.jpg"]
+
+
+def test_bktree_search_matches_brute_force():
+    rng = random.Random(7)
+    base = [rng.getrandbits(64) for _ in range(20)]
+    # 基準のハッシュから数ビットだけ変えた近傍と、同じハッシュの重複
+    values = base + [value ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for value in base] + base[:3]
+    tree = BKTree()
+    for item, value in enumerate(values):
+        tree.add(value, item)
+    assert len(tree) == len(values)
+
+    for query in base[:10] + [rng.getrandbits(64) for _ in range(5)]:
+        for max_distance in (0, 2, 6, 20):
+            results = tree.search(query, max_distance)
+            expected = sorted((hamming_distance(query, value), item) for item, value in enumerate(values)
+                              if hamming_distance(query, value) <= max_distance)
+            assert sorted(results) == expected
+            assert [distance for distance, _ in results] == sorted(distance for distance, _ in results)
+
+
+def test_bktree_search_empty():
+    assert BKTree().search(0, 64) == []
+
+
+def test_perceptual_index_skips_removed_and_replaced_hashes():
+    index = PerceptualIndex()
+    index.add_many([("a", 0b0000), ("b", 0b0001), ("c", 0b0111)])
+    index.remove(["b"])
+    index.add_hash("c", 0b0011)
+    assert index.search(0, 2) == [(0, "a"), (2, "c")]
+    assert index.groups(2) == [["a", "c"]]
+
+
+def test_perceptual_hashes_round_trip(tmp_path):
+    db_path = str(tmp_path / "index.db")
+    # 知覚ハッシュの列がない古いデータベース
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE features (path TEXT PRIMARY KEY, modified_time REAL NOT NULL, "
+                       "vector BLOB NOT NULL)")
+    connection.execute("INSERT INTO features VALUES ('/old.jpg', 1.0, x'00')")
+    connection.commit()
+    connection.close()
+
+    index = PhotoIndex(db_path)
+    high = (1 << 64) - 2
+    index.upsert_features([("/a.jpg", 1.0, b'\0', high, 5), ("/b.jpg", 1.0, b'\0', 3, (1 << 63) + 1)])
+    assert sorted(index.perceptual_hashes('dhash')) == [("/a.jpg", high), ("/b.jpg", 3)]
+    assert sorted(index.perceptual_hashes('phash')) == [("/a.jpg", 5), ("/b.jpg", (1 << 63) + 1)]
+    with pytest.raises(ValueError):
+        index.perceptual_hashes('vector')
+    index.close()
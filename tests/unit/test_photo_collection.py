@@ -0,0 +1,118 @@
+"""
+列指向写真コレクションのテスト - PhotoMap Explorer
+
+追加・列の参照・行の取り出し（select）と、行を除いたコレクションの作成、空の場合を確認する
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from domain.models.photo_collection import PhotoCollection  # noqa: E402
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+PHOTOS = [
+    Photo("/lib/a/IMG_0001.jpg", file_size=100, modified_time=10.0, taken_at=1700000000.0,
+          latitude=35.0, longitude=139.0, width=4000, height=3000, camera="Canon EOS R5",
+          iso=100, f_number=2.8, exposure_time=0.004, focal_length=35.0),
+    Photo("/lib/a/IMG_0002.JPG", file_size=200, modified_time=20.0, camera="Canon EOS R5"),
+    Photo("/lib/b/写真.png", file_size=300, modified_time=30.0, taken_at=1700000100.0,
+          latitude=-33.9, longitude=151.2, camera="iPhone 15"),
+    Photo("/lib/b/sub/DSC_9.heic", file_size=400, modified_time=40.0, taken_at=1700000050.0),
+]
+
+
+@pytest.fixture
+def collection():
+    return PhotoCollection.from_photos(PHOTOS, name="test")
+
+
+def _same_photo(actual: Photo, expected: Photo):
+    assert actual.file_path == expected.file_path
+    assert actual.file_size == expected.file_size
+    assert actual.modified_time == expected.modified_time
+    assert actual.taken_at == expected.taken_at
+    assert actual.latitude == expected.latitude
+    assert actual.longitude == expected.longitude
+    assert actual.camera == expected.camera
+    assert actual.iso == expected.iso
+    assert actual.f_number == pytest.approx(expected.f_number)
+    assert actual.exposure_time == pytest.approx(expected.exposure_time)
+    assert actual.focal_length == pytest.approx(expected.focal_length)
+
+
+def test_append_round_trips_photos(collection):
+    assert len(collection) == len(PHOTOS)
+    for row, photo in enumerate(PHOTOS):
+        _same_photo(collection.photo(row), photo)
+    assert collection.paths() == [photo.file_path for photo in PHOTOS]
+    assert collection.index_of("/lib/b/写真.png") == 2
+    assert "/lib/missing.jpg" not in collection
+
+
+def test_append_grows_past_initial_capacity():
+    photos = [Photo(f"/lib/IMG_{i:05d}.jpg", file_size=i) for i in range(2500)]
+    collection = PhotoCollection.from_photos(photos)
+    collection.shrink_to_fit()
+    assert len(collection) == 2500
+    assert collection.column('file_size').tolist() == list(range(2500))
+    assert collection.path(2499) == "/lib/IMG_02499.jpg"
+
+
+def test_column_is_read_only_view_with_missing_values(collection):
+    taken_at = collection.column('taken_at')
+    assert len(taken_at) == len(PHOTOS)
+    assert np.isnan(taken_at[1])
+    assert collection.gps_mask().tolist() == [True, False, True, False]
+    with pytest.raises(ValueError):
+        taken_at[0] = 0.0
+
+
+def test_select_by_rows_and_mask(collection):
+    subset = collection.select([3, 0])
+    assert subset.paths() == [PHOTOS[3].file_path, PHOTOS[0].file_path]
+    _same_photo(subset.photo(1), PHOTOS[0])
+
+    canon = collection.select(collection.camera_mask("canon"), name="canon")
+    assert canon.name == "canon"
+    assert canon.paths() == [PHOTOS[0].file_path, PHOTOS[1].file_path]
+    # 取り出したコレクションにもそのまま追加できる
+    canon.append(PHOTOS[2])
+    assert canon.paths()[-1] == PHOTOS[2].file_path
+    assert canon.camera(2) == "iPhone 15"
+
+
+def test_select_empty(collection):
+    for rows in ([], np.array([], dtype=np.int64), np.zeros(len(collection), dtype=bool)):
+        subset = collection.select(rows)
+        assert len(subset) == 0
+        assert subset.paths() == []
+        assert len(subset.column('taken_at')) == 0
+    empty = PhotoCollection()
+    assert len(empty.select([])) == 0
+    assert empty.name_mask("img").tolist() == []
+
+
+def test_remove_rows_with_inverted_mask(collection):
+    remaining = collection.select(~collection.directory_mask("/lib/b"))
+    assert remaining.paths() == [PHOTOS[0].file_path, PHOTOS[1].file_path]
+    assert remaining.index_of(PHOTOS[2].file_path) is None
+    assert remaining.extension_mask([".jpg"]).tolist() == [True, True]
+
+
+def test_index_collection_reflects_removed_photos(tmp_path):
+    index = PhotoIndex(str(tmp_path / "index.db"))
+    try:
+        index.upsert(PHOTOS)
+        index.remove([PHOTOS[1].file_path])
+        collection = index.collection()
+        assert sorted(collection.paths()) == sorted(photo.file_path for photo in PHOTOS
+                                                    if photo is not PHOTOS[1])
+        assert len(index.collection(directory="/lib/missing")) == 0
+    finally:
+        index.close()
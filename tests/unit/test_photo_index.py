@@ -0,0 +1,61 @@
+"""
+写真インデックスのテスト - PhotoMap Explorer
+
+複数スレッドから書き込んでも変更通知がコミット順に届くことを確認する
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+PATH = "/lib/a.jpg"
+
+
+def test_notifications_follow_commit_order():
+    index = PhotoIndex()
+    events = []
+
+    def listener(added, updated, removed):
+        # 配信中に他のスレッドの書き込みが割り込む余地を作る
+        time.sleep(0.0005)
+        events.extend(('added', None, photo.file_size) for photo in added)
+        events.extend(('updated', old.file_size, new.file_size) for old, new in updated)
+        events.extend(('removed', photo.file_size, None) for photo in removed)
+
+    index.add_listener(listener)
+
+    def writer(worker):
+        for step in range(50):
+            if step % 10 == 9:
+                index.remove([PATH])
+            else:
+                index.upsert([Photo(PATH, file_size=worker * 1000 + step)])
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 各通知の変更前の値は直前の通知の変更後の値と一致する（古い値で新しい値を上書きしない）
+    current = None
+    for kind, before, after in events:
+        assert before == current, (kind, before, after)
+        current = after
+    photo = index.get(PATH)
+    assert current == (photo.file_size if photo is not None else None)
+
+
+def test_listener_may_read_the_index():
+    index = PhotoIndex()
+    seen = []
+    index.add_listener(lambda added, updated, removed: seen.append(index.count()))
+    index.upsert([Photo(PATH, file_size=1)])
+    index.remove([PATH])
+    assert seen == [1, 0]
@@ -0,0 +1,139 @@
+"""
+写真検索クエリのテスト - PhotoMap Explorer
+
+同じ検索式の SQL（PhotoIndex）とマスク（PhotoCollection）の結果が一致することを確認する
+"""
+
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo, timestamp_from_exif  # noqa: E402
+from domain.services.query_service import PhotoQuery, QueryError, _parse_date, _parse_number, parse_query  # noqa: E402
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+PHOTOS = [
+    Photo("/lib/2024/a.jpg", file_size=5 * 1024 ** 2, taken_at=timestamp_from_exif("2024:12:31 12:00:00"),
+          latitude=35.0, longitude=139.0, camera="FUJIFILM X100V", iso=200, exposure_time=1 / 500),
+    Photo("/lib/2024/sub/b.jpg", file_size=1024 ** 2, taken_at=timestamp_from_exif("2025:01:01 00:00:00"),
+          latitude=10.0, longitude=179.5, camera="Canon EOS R5", iso=3200, exposure_time=1 / 60),
+    Photo("/lib/2024x/c.png", file_size=2048, latitude=10.0, longitude=-179.5),
+    Photo("/lib/2023/d.jpg", file_size=3 * 1024 ** 2, taken_at=timestamp_from_exif("2023:11:30 08:00:00"),
+          camera="Canon EOS R5"),
+]
+
+
+@pytest.fixture(scope="module")
+def sources():
+    index = PhotoIndex()
+    index.upsert(PHOTOS)
+    return index, index.collection()
+
+
+def _names(paths):
+    return {os.path.basename(path) for path in paths}
+
+
+def _sql_names(index, query):
+    return _names(path for page in index.iter_paths(*query.to_sql()) for path in page)
+
+
+def _mask_names(collection, query):
+    return _names(collection.paths(np.flatnonzero(query.mask(collection)).tolist()))
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("date:2024-12", {"a.jpg"}),
+    ("date:2024-12..2025-01", {"a.jpg", "b.jpg"}),
+    ("date:2025", {"b.jpg"}),
+    ("date<2025", {"a.jpg", "d.jpg"}),
+    ("date>=2024-12-31", {"a.jpg", "b.jpg"}),
+    ("-date:2024", {"b.jpg", "c.png", "d.jpg"}),
+    ("iso>1000", {"b.jpg"}),
+    ("-iso>1000", {"a.jpg", "c.png", "d.jpg"}),
+    ("shutter<1/250s", {"a.jpg"}),
+    ("shutter<1/250", {"a.jpg"}),
+    ("shutter>=0.01s", {"b.jpg"}),
+    ("size>2MB", {"a.jpg", "d.jpg"}),
+    ("in:/lib/2024", {"a.jpg", "b.jpg"}),
+    ("-in:/lib/2024", {"c.png", "d.jpg"}),
+    ("bbox:0,179,20,-179", {"b.jpg", "c.png"}),
+    ("bbox:30,130,40,140", {"a.jpg"}),
+    ("gps:no", {"d.jpg"}),
+    ("camera:canon -ext:png", {"b.jpg", "d.jpg"}),
+    ("name:b", {"b.jpg"}),
+])
+def test_sql_and_mask_agree(sources, text, expected):
+    index, collection = sources
+    query = PhotoQuery(text)
+    assert _sql_names(index, query) == expected
+    assert _mask_names(collection, query) == expected
+
+
+def test_month_rolls_over_to_next_year():
+    start, end = _parse_date("2024-12")
+    assert end - start == 31 * 86400
+    assert _parse_date("2025")[0] == end
+    assert _parse_date("2024-11")[1] == start
+    with pytest.raises(QueryError):
+        _parse_date("2024-13")
+
+
+def test_parse_query_terms():
+    terms = parse_query('-camera:"X 100" iso>=800 IMG_')
+    assert [(term.field, term.operator, term.value, term.negated) for term in terms] == [
+        ("camera", ":", "X 100", True), ("iso", ">=", "800", False), ("name", ":", "IMG_", False)]
+    with pytest.raises(QueryError):
+        PhotoQuery("shutter<1/0s")
+    with pytest.raises(QueryError):
+        PhotoQuery("color:red")
+
+
+@pytest.mark.parametrize("text", ["iso:", "camera:", 'camera:""', "-date>=", "size> 5MB", "iso: 800"])
+def test_field_without_value_is_rejected(text):
+    with pytest.raises(QueryError):
+        parse_query(text)
+
+
+def test_quoted_field_like_word_is_file_name():
+    assert [(term.field, term.value) for term in parse_query('"iso:"')] == [("name", "iso:")]
+
+
+@pytest.mark.parametrize("text, column, expected", [
+    ("f/2.8", "f_number", 2.8), ("f2.8", "f_number", 2.8), ("2.8", "f_number", 2.8),
+    ("35mm", "focal_length", 35.0), ("35 mm", "focal_length", 35.0), ("35", "focal_length", 35.0),
+    ("1/250s", "exposure_time", 1 / 250), ("0.5 s", "exposure_time", 0.5), ("30", "exposure_time", 30.0),
+    ("5mb", "file_size", 5 * 1024 ** 2), ("800", "iso", 800.0),
+])
+def test_parse_number_units(text, column, expected):
+    assert _parse_number(text, column) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text, column", [
+    ("ff/2.8", "f_number"), ("f//2.8", "f_number"), ("2.8mm", "f_number"), ("f/2.8", "focal_length"),
+    ("35mmm", "focal_length"), ("35ms", "focal_length"), ("0.5ss", "exposure_time"),
+    ("1/250ms", "exposure_time"), ("s", "exposure_time"), ("35s", "iso"), ("f800", "iso"),
+])
+def test_parse_number_rejects_malformed_units(text, column):
+    with pytest.raises(QueryError):
+        _parse_number(text, column)
+
+
+@pytest.mark.parametrize("directory, expected", [
+    ("/photos/2024", True), ("/photos/2024/sub", True), ("/photos/2024x", False), ("/photos/2023", False),
+    ("C:\\Photos\\2024", False), ("D:\\Photos\\2024\\sub", True), ("D:\\Photos\\2024\\", True),
+    ("D:\\Photos\\2024x", False),
+])
+def test_folder_prefix_ranges_for_both_separators(directory, expected):
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE photos (directory TEXT)")
+    connection.execute("INSERT INTO photos VALUES (?)", (directory,))
+    target = "D:\\Photos\\2024" if "\\" in directory else "/photos/2024"
+    where, parameters = PhotoQuery(f'in:"{target}"').to_sql()
+    count = connection.execute(f"SELECT COUNT(*) FROM photos WHERE {where}", parameters).fetchone()[0]
+    assert bool(count) == expected
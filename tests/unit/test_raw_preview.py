@@ -0,0 +1,150 @@
+"""
+RAW埋め込みプレビュー解析のテスト - PhotoMap Explorer
+
+合成したTIFF構造（リトルエンディアン）で IFD の辿り方と安全上限を確認する
+"""
+
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from logic.raw_preview import _MAX_ENTRIES, _MAX_IFDS, parse_raw_file, read_embedded_jpeg  # noqa: E402
+
+_SHORT, _LONG = 3, 4
+
+
+def _jpeg(width: int, height: int, sof: int = 0xC0) -> bytes:
+    """ヘッダだけのJPEG（APP0 → SOF → EOI）"""
+    app0 = b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\0' + bytes(9)
+    frame = b'\xff' + bytes((sof,)) + struct.pack('>HBHHB', 11, 8, height, width, 1) + bytes((1, 0x11, 0))
+    return b'\xff\xd8' + app0 + frame + b'\xff\xd9'
+
+
+class _Tiff:
+    """オフセットを手で組み立てる小さなTIFF"""
+
+    def __init__(self):
+        self.data = bytearray(b'II*\0' + struct.pack('<I', 0))
+
+    def add(self, blob: bytes) -> int:
+        if len(self.data) % 2:
+            self.data.append(0)
+        offset = len(self.data)
+        self.data += blob
+        return offset
+
+    def ifd(self, entries, next_ifd: int = 0) -> int:
+        """entries: [(タグ, 型, 値のリスト)]。4バイトを超える値は先に書き出して参照する"""
+        packed = []
+        for tag, value_type, values in sorted(entries):
+            raw = struct.pack('<' + ('H' if value_type == _SHORT else 'I') * len(values), *values)
+            value = raw.ljust(4, b'\0') if len(raw) <= 4 else struct.pack('<I', self.add(raw))
+            packed.append(struct.pack('<HHI', tag, value_type, len(values)) + value)
+        return self.add(struct.pack('<H', len(packed)) + b''.join(packed) + struct.pack('<I', next_ifd))
+
+    def link(self, ifd_offset: int, next_ifd: int):
+        """IFDの次IFDオフセットを書き換え（循環するチェーンの作成用）"""
+        (count,) = struct.unpack_from('<H', self.data, ifd_offset)
+        struct.pack_into('<I', self.data, ifd_offset + 2 + 12 * count, next_ifd)
+
+    def save(self, path, first_ifd: int) -> str:
+        struct.pack_into('<I', self.data, 4, first_ifd)
+        with open(path, 'wb') as stream:
+            stream.write(self.data)
+        return str(path)
+
+
+def _strip(offset: int, length: int, compression: int = 6, photometric: int = 6):
+    return [(0x0103, _SHORT, [compression]), (0x0106, _SHORT, [photometric]),
+            (0x0111, _LONG, [offset]), (0x0117, _LONG, [length])]
+
+
+def test_ifd0_jpeg_strip_and_orientation(tmp_path):
+    tiff = _Tiff()
+    jpeg = _jpeg(320, 240)
+    offset = tiff.add(jpeg)
+    path = tiff.save(tmp_path / "a.cr2", tiff.ifd(_strip(offset, len(jpeg)) + [(0x0112, _SHORT, [6])]))
+
+    info = parse_raw_file(path)
+    assert (info.largest.width, info.largest.height, info.orientation) == (320, 240, 6)
+    assert read_embedded_jpeg(path) == (jpeg, 6)
+
+
+def test_largest_preview_from_sub_ifd_and_lossless_strip_rejected(tmp_path):
+    tiff = _Tiff()
+    thumbnail, preview, lossless = _jpeg(160, 120), _jpeg(1600, 1200), _jpeg(6000, 4000, sof=0xC3)
+    thumbnail_offset, preview_offset, lossless_offset = tiff.add(thumbnail), tiff.add(preview), tiff.add(lossless)
+    # 圧縮方式7・Photometric 6 の単一ストリップでも、SOF3 ならデコード不可として除外される
+    sub_preview = tiff.ifd(_strip(preview_offset, len(preview), compression=7))
+    sub_lossless = tiff.ifd(_strip(lossless_offset, len(lossless), compression=7))
+    ifd0 = tiff.ifd([(0x0201, _LONG, [thumbnail_offset]), (0x0202, _LONG, [len(thumbnail)]),
+                     (0x014A, _LONG, [sub_preview, sub_lossless])])
+    path = tiff.save(tmp_path / "b.nef", ifd0)
+
+    info = parse_raw_file(path)
+    assert sorted((p.width, p.height) for p in info.previews) == [(160, 120), (1600, 1200)]
+    assert read_embedded_jpeg(path)[0] == preview
+
+
+def test_only_lossless_or_sensor_data(tmp_path):
+    tiff = _Tiff()
+    lossless = _jpeg(6000, 4000, sof=0xC3)
+    offset = tiff.add(lossless)
+    cfa = tiff.ifd(_strip(offset, len(lossless), photometric=32803))
+    path = tiff.save(tmp_path / "c.dng", tiff.ifd(_strip(offset, len(lossless), compression=7), next_ifd=cfa))
+
+    assert parse_raw_file(path).previews == []
+    assert read_embedded_jpeg(path) == (None, 1)
+
+
+def test_looping_and_overlong_ifd_chains_terminate(tmp_path):
+    tiff = _Tiff()
+    jpeg = _jpeg(64, 48)
+    offset = tiff.add(jpeg)
+    entries = [(0x0201, _LONG, [offset]), (0x0202, _LONG, [len(jpeg)])]
+
+    first = tiff.ifd(entries)
+    second = tiff.ifd(entries, next_ifd=first)
+    tiff.link(first, second)
+    assert len(parse_raw_file(tiff.save(tmp_path / "loop.arw", first)).previews) == 2
+
+    tiff = _Tiff()
+    offset = tiff.add(jpeg)
+    entries = [(0x0201, _LONG, [offset]), (0x0202, _LONG, [len(jpeg)])]
+    chain = 0
+    for _ in range(_MAX_IFDS + 20):
+        chain = tiff.ifd(entries, next_ifd=chain)
+    assert len(parse_raw_file(tiff.save(tmp_path / "long.arw", chain)).previews) == _MAX_IFDS
+
+
+def test_out_of_bounds_and_truncated_data(tmp_path):
+    tiff = _Tiff()
+    jpeg = _jpeg(320, 240)
+    offset = tiff.add(jpeg)
+    ifd0 = tiff.ifd([
+        (0x0201, _LONG, [offset]), (0x0202, _LONG, [len(jpeg) + 10 ** 6]),   # ファイル末尾を超える長さ
+        (0x014A, _LONG, [10 ** 9, 0, offset + 1]),                          # 範囲外・0・壊れたIFD
+    ], next_ifd=10 ** 9)
+    path = tiff.save(tmp_path / "bounds.cr2", ifd0)
+    assert parse_raw_file(path).previews == []
+
+    # エントリ数が上限を超え、途中で切れているIFD
+    tiff = _Tiff()
+    offset = tiff.add(jpeg)
+    ifd0 = tiff.ifd(_strip(offset, len(jpeg)))
+    struct.pack_into('<H', tiff.data, ifd0, 0xFFFF)
+    path = tiff.save(tmp_path / "entries.cr2", ifd0)
+    assert 0xFFFF > _MAX_ENTRIES
+    info = parse_raw_file(path)
+    assert [(p.width, p.height) for p in info.previews] == [(320, 240)]
+
+    data = bytearray(open(path, 'rb').read())
+    truncated = tmp_path / "truncated.cr2"
+    truncated.write_bytes(bytes(data[:ifd0 + 8]))
+    assert parse_raw_file(str(truncated)).previews == []
+    (tmp_path / "empty.cr2").write_bytes(b'II*\0')
+    assert parse_raw_file(str(tmp_path / "empty.cr2")) is None
+    (tmp_path / "text.cr2").write_bytes(b'not a tiff file')
+    assert read_embedded_jpeg(str(tmp_path / "text.cr2")) == (None, 1)
@@ -0,0 +1,133 @@
+"""
+並列フォルダスキャナーのテスト - PhotoMap Explorer
+
+ワークスティーリングによる並列走査の結果が os.walk による逐次走査と一致することを、
+入れ子のフォルダ・除外パターン・深さ制限の組み合わせで確認する
+"""
+
+import fnmatch
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from logic.scanner import DEFAULT_EXCLUDE_PATTERNS, ParallelScanner, scan_images  # noqa: E402
+from utils.constants import IMAGE_EXTENSIONS  # noqa: E402
+
+TREE = [
+    "top.jpg", "TOP2.JPG", "notes.txt",
+    "2024/a.jpg", "2024/b.png", "2024/readme.md",
+    "2024/05/c.jpeg", "2024/05/day1/d.jpg", "2024/05/day1/deep/e.jpg", "2024/05/day1/deep/deeper/f.jpg",
+    "2023/g.jpg", "2023/raw/h.jpg",
+    ".hidden/i.jpg", "2024/.thumbs/j.jpg", "@eaDir/k.jpg", "2023/@eaDir/l.jpg",
+    "2023/._m.jpg", "2023/skip_me/n.jpg", "2023/keep/skip_me.jpg",
+    "empty/nothing/.keep",
+]
+# 多数のフォルダでワーカー間の奪い合いを起こす
+TREE += [f"many/{i:02d}/{j}/p{j}.jpg" for i in range(30) for j in range(3)]
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    root = tmp_path_factory.mktemp("photos")
+    for relative in TREE:
+        path = root.joinpath(*relative.split("/"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+    return str(root)
+
+
+def _walk(root, max_depth=None, exclude_patterns=DEFAULT_EXCLUDE_PATTERNS):
+    """os.walk による逐次走査（期待値）"""
+    def excluded(name):
+        return any(fnmatch.fnmatch(name, pattern) for pattern in exclude_patterns)
+
+    found = []
+    for directory, dirnames, filenames in os.walk(root):
+        relative = os.path.relpath(directory, root)
+        depth = 0 if relative == os.curdir else len(relative.split(os.sep))
+        dirnames[:] = [] if max_depth is not None and depth >= max_depth else [
+            name for name in dirnames if not excluded(name)]
+        found.extend(os.path.join(directory, name) for name in filenames
+                     if not excluded(name) and name.lower().endswith(tuple(IMAGE_EXTENSIONS)))
+    return sorted(found, key=str.lower)
+
+
+def _scan(root, **options):
+    batches = []
+    lock = threading.Lock()
+
+    def collect(batch):
+        with lock:
+            batches.append(list(batch))
+
+    result = ParallelScanner(**options).scan(root, collect)
+    return result, batches
+
+
+@pytest.mark.parametrize("workers", [1, 4, 16])
+@pytest.mark.parametrize("max_depth", [None, 0, 1, 3])
+@pytest.mark.parametrize("exclude_patterns", [DEFAULT_EXCLUDE_PATTERNS, ("skip_*", "2023"), ()])
+def test_scan_matches_os_walk(tree, workers, max_depth, exclude_patterns):
+    result, batches = _scan(tree, max_depth=max_depth, exclude_patterns=exclude_patterns, workers=workers)
+    expected = _walk(tree, max_depth, exclude_patterns)
+    found = sorted((path for batch in batches for path in batch), key=str.lower)
+    assert found == expected
+    assert result.files == len(expected)
+    assert result.errors == 0 and not result.cancelled
+    assert scan_images(tree, max_depth, exclude_patterns, workers) == expected
+
+
+def test_batches_are_per_folder_and_sorted(tree):
+    result, batches = _scan(tree, workers=8)
+    folders = [os.path.dirname(batch[0]) for batch in batches]
+    assert len(folders) == len(set(folders))
+    for batch in batches:
+        assert {os.path.dirname(path) for path in batch} == {os.path.dirname(batch[0])}
+        assert batch == sorted(batch, key=str.lower)
+    # 画像のないフォルダも数えるがバッチは渡さない
+    walked = 0
+    for _, dirnames, _ in os.walk(tree):
+        walked += 1
+        dirnames[:] = [name for name in dirnames
+                       if not any(fnmatch.fnmatch(name, pattern) for pattern in DEFAULT_EXCLUDE_PATTERNS)]
+    assert len(batches) < walked
+    assert result.directories == walked
+
+
+def test_missing_root_counts_error(tmp_path):
+    result, batches = _scan(str(tmp_path / "missing"))
+    assert batches == []
+    assert result.errors == 1 and result.directories == 1
+
+
+def test_cancel_stops_scan(tree):
+    cancel_event = threading.Event()
+    batches = []
+
+    def collect(batch):
+        batches.append(batch)
+        cancel_event.set()
+
+    result = ParallelScanner(workers=1).scan(tree, collect, cancel_event)
+    assert result.cancelled
+    assert len(batches) == 1
+    assert result.files < len(_walk(tree))
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlink is not available")
+def test_follow_symlinks_does_not_loop(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "x.jpg").write_bytes(b"x")
+    try:
+        os.symlink(tmp_path / "a", tmp_path / "a" / "b" / "loop", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlink is not permitted")
+    root = str(tmp_path)
+    assert scan_images(root) == [os.path.join(root, "a", "b", "x.jpg")]
+    result, batches = _scan(root, follow_symlinks=True, workers=4)
+    found = [path for batch in batches for path in batch]
+    assert len(found) == len({os.path.realpath(path) for path in found}) == 1
@@ -0,0 +1,136 @@
+"""
+類似画像検索のテスト - PhotoMap Explorer
+
+特徴ベクトルの性質、k近傍検索の結果が総当たりと一致すること、
+写真インデックスの変更（削除・内容の変更）への追従を確認する
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from domain.services import similarity_service  # noqa: E402
+from domain.services.similarity_service import (COLOR_WEIGHT, FEATURE_DIM, SimilarityIndex,  # noqa: E402
+                                                compute_features)
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+
+def _image(color, stripe=None):
+    """単色（stripe を指定すると縦縞入り）の画像"""
+    image = QImage(128, 96, QImage.Format_RGB32)
+    image.fill(QColor(color))
+    if stripe is not None:
+        painter = QPainter(image)
+        for x in range(0, 128, 16):
+            painter.fillRect(x, 0, 8, 96, QColor(stripe))
+        painter.end()
+    return image
+
+
+def _random_vectors(count, seed=3):
+    vectors = np.random.default_rng(seed).normal(size=(count, FEATURE_DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _brute_force(vectors, paths, query, k, exclude=None):
+    scores = vectors @ query
+    rows = [row for row in np.argsort(-scores, kind='stable') if paths[row] != exclude][:k]
+    return [paths[row] for row in rows]
+
+
+def test_compute_features_shape_and_norm():
+    assert compute_features(QImage()) is None
+    vector = compute_features(_image(Qt.red, Qt.blue))
+    assert vector.dtype == np.float32 and vector.shape == (FEATURE_DIM,)
+    assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-4)
+    # ほぼ単色の画像は構図成分が0（色成分だけが残る）
+    flat = compute_features(_image(Qt.red))
+    assert np.linalg.norm(flat) == pytest.approx(COLOR_WEIGHT, abs=1e-4)
+
+
+def test_compute_features_ranks_similar_images_higher():
+    query = compute_features(_image("#c03030", "#3030c0"))
+    near = compute_features(_image("#c83232", "#3232c8"))
+    far = compute_features(_image("#30c030"))
+    assert float(query @ near) > float(query @ far)
+
+
+def test_search_matches_brute_force():
+    vectors = _random_vectors(300)
+    paths = [f"/lib/{row:03d}.jpg" for row in range(len(vectors))]
+    index = SimilarityIndex()
+    index.add_many(zip(paths, vectors))
+    assert len(index) == len(paths)
+
+    for query_row in (0, 17, 299):
+        query = vectors[query_row]
+        for k in (1, 10, 500):
+            results = index.search(query, k)
+            assert [path for _, path in results] == _brute_force(vectors, paths, query, k)
+            scores = [score for score, _ in results]
+            assert scores == sorted(scores, reverse=True)
+        excluded = index.search(query, 10, exclude=paths[query_row])
+        assert paths[query_row] not in [path for _, path in excluded]
+        assert [path for _, path in excluded] == _brute_force(vectors, paths, query, 10, paths[query_row])
+
+
+def test_search_edge_cases():
+    index = SimilarityIndex()
+    vector = _random_vectors(1)[0]
+    assert index.search(vector) == []
+    index.add("/only.jpg", vector)
+    assert index.search(vector, exclude="/only.jpg") == []
+    assert [path for _, path in index.search(vector, 5)] == ["/only.jpg"]
+
+
+def test_remove_and_replace():
+    vectors = _random_vectors(50)
+    paths = [f"/lib/{row:02d}.jpg" for row in range(len(vectors))]
+    index = SimilarityIndex()
+    index.add_many(zip(paths, vectors))
+
+    removed = {paths[0], paths[10], paths[49]}
+    index.remove(removed | {"/unknown.jpg"})
+    kept = [row for row, path in enumerate(paths) if path not in removed]
+    assert len(index) == len(kept)
+    assert all(path not in index for path in removed)
+    query = vectors[5]
+    assert ([path for _, path in index.search(query, 20)]
+            == _brute_force(vectors[kept], [paths[row] for row in kept], query, 20))
+
+    # 置き換えたベクトルで検索される
+    index.add(paths[5], -query)
+    assert len(index) == len(kept)
+    assert index.search(query, 1)[0][1] != paths[5]
+    np.testing.assert_array_equal(index.vector(paths[5]), -query)
+
+
+def test_follows_index_changes():
+    vectors = _random_vectors(3)
+    photo_index = PhotoIndex()
+    photos = [Photo(f"/lib/{name}.jpg", file_size=100, modified_time=1.0) for name in "abc"]
+    photo_index.upsert(photos)
+    similarity_index = SimilarityIndex()
+    similarity_index.add_many((photo.file_path, vector) for photo, vector in zip(photos, vectors))
+    photo_index.add_listener(lambda added, updated, removed: similarity_service._follow_changes(
+        similarity_index, photo_index, updated, removed))
+
+    # 内容が変わった写真の古いベクトルは破棄、新しい内容で計算済みなら置き換え
+    photo_index.upsert_features([("/lib/b.jpg", 2.0, vectors[0].tobytes(), None, None)])
+    photo_index.upsert([Photo("/lib/a.jpg", file_size=120, modified_time=2.0),
+                        Photo("/lib/b.jpg", file_size=100, modified_time=2.0),
+                        Photo("/lib/c.jpg", file_size=100, modified_time=1.0, camera="X100V")])
+    assert "/lib/a.jpg" not in similarity_index
+    np.testing.assert_array_equal(similarity_index.vector("/lib/b.jpg"), vectors[0])
+    # メタデータだけの更新ではベクトルを残す
+    np.testing.assert_array_equal(similarity_index.vector("/lib/c.jpg"), vectors[2])
+
+    photo_index.remove(["/lib/c.jpg"])
+    assert "/lib/c.jpg" not in similarity_index
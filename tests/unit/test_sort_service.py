@@ -0,0 +1,61 @@
+"""
+写真の並べ替えキーのテスト - PhotoMap Explorer
+
+インデックスの列だけから作ったキー（from_values）が Photo から作ったキーと同じ順序になることを確認する
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from domain.services.sort_service import (SORT_COLUMNS, SORT_DISTANCE, SORT_MODES, SORT_NAME, SORT_SIZE,  # noqa: E402
+                                          SortKeys)
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+PHOTOS = [
+    Photo("/lib/IMG_10.jpg", file_size=300, taken_at=1700000300.0, latitude=35.0, longitude=139.0),
+    Photo("/lib/IMG_2.jpg", file_size=100, taken_at=1700000100.0),
+    Photo("/lib/img_3.png", file_size=200, latitude=34.0, longitude=135.0),
+    Photo("/lib/IMG_1.jpg", file_size=200, taken_at=1700000200.0, latitude=43.0, longitude=141.0),
+]
+# インデックス未登録の写真
+UNINDEXED = "/lib/IMG_0.jpg"
+
+
+@pytest.fixture(scope="module")
+def keys():
+    index = PhotoIndex()
+    index.upsert(PHOTOS)
+    paths = [photo.file_path for photo in PHOTOS] + [UNINDEXED]
+    from_photos = SortKeys(paths, index.get_many(paths))
+    from_values = SortKeys.from_values(paths, index.columns_values(paths, SORT_COLUMNS))
+    return from_photos, from_values
+
+
+@pytest.mark.parametrize("mode", list(SORT_MODES))
+@pytest.mark.parametrize("descending", [False, True])
+def test_from_values_matches_photos(keys, mode, descending):
+    from_photos, from_values = keys
+    point = (35.0, 139.0) if mode == SORT_DISTANCE else None
+    assert (from_values.sorted_paths(mode, descending, point)
+            == from_photos.sorted_paths(mode, descending, point))
+
+
+def test_name_order_is_natural(keys):
+    names = [os.path.basename(path) for path in keys[1].sorted_paths(SORT_NAME)]
+    assert names == ["IMG_0.jpg", "IMG_1.jpg", "IMG_2.jpg", "img_3.png", "IMG_10.jpg"]
+
+
+def test_missing_values_sort_last(keys):
+    _, from_values = keys
+    for descending in (False, True):
+        assert from_values.sorted_paths(SORT_SIZE, descending)[-1] == UNINDEXED
+
+
+def test_columns_values_rejects_unknown_column():
+    with pytest.raises(ValueError):
+        PhotoIndex().columns_values(["/lib/a.jpg"], ["path; DROP TABLE photos"])
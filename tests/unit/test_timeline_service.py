@@ -0,0 +1,41 @@
+"""
+撮影日タイムラインのテスト - PhotoMap Explorer
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from domain.models.photo import Photo  # noqa: E402
+from domain.services.timeline_service import GRANULARITY_DAY, TimelineService  # noqa: E402
+from infrastructure.photo_index import PhotoIndex  # noqa: E402
+
+DAY = 86400
+
+
+def _photo(path, day=None):
+    photo = Photo(path, file_size=1, modified_time=1.0)
+    photo.taken_at = None if day is None else day * DAY + 3600
+    return photo
+
+
+def test_removed_photos_are_dropped_from_counts_and_ranges():
+    index = PhotoIndex()
+    index.upsert([_photo("/a.jpg", 10), _photo("/b.jpg", 10), _photo("/c.jpg", 12), _photo("/d.jpg")])
+    timeline = TimelineService(index)
+    timeline.set_paths(["/a.jpg", "/b.jpg", "/c.jpg", "/d.jpg"])
+    assert timeline.total == 4 and timeline.undated == 1
+
+    index.remove(["/b.jpg", "/d.jpg"])
+    assert timeline.total == 2
+    assert timeline.undated == 0
+    first, counts = timeline.counts(GRANULARITY_DAY)
+    assert first == 10 and counts.tolist() == [1, 0, 1]
+    assert timeline.paths_between(0, 100 * DAY) == ["/a.jpg", "/c.jpg"]
+
+    # 削除後に再び追加された写真は新しい行として数える
+    index.upsert([_photo("/b.jpg", 11)])
+    timeline.add_paths(["/b.jpg"])
+    assert timeline.total == 3
+    assert timeline.paths_between(11 * DAY, 12 * DAY) == ["/b.jpg"]
@@ -0,0 +1,168 @@
+"""
+比較表示ビュー
+
+複数選択した画像（2〜4枚）を並べて表示：
+- ズーム・パン（スクロール位置）を全ビューで同期
+- デコード済み画像キャッシュを共有し、比較対象の切り替え時に再デコードしない
+- 未デコードの画像はバックグラウンドで読み込み、GUIスレッドをブロックしない
+"""
+
+import os
+from typing import List
+
+from PyQt5.QtWidgets import QWidget, QGridLayout, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QImage
+
+from ui.image_preview import ImagePreviewView
+from logic.image_cache import get_image_cache
+
+
+class _CompareCell(QWidget):
+    """比較表示の1セル（ファイル名ラベル + プレビュー）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+
+        self.caption = QLabel()
+        self.caption.setAlignment(Qt.AlignCenter)
+        self.caption.setMaximumHeight(20)
+        layout.addWidget(self.caption)
+
+        self.view = ImagePreviewView()
+        layout.addWidget(self.view, 1)
+
+    def show_loading(self, path):
+        self.path = path
+        self.caption.setText(f"⏳ {os.path.basename(path)}")
+        self.view.set_image(QPixmap())
+
+    def show_image(self, image: QImage):
+        self.caption.setText(os.path.basename(self.path))
+        self.view.set_image(QPixmap.fromImage(image), image)
+
+    def show_error(self):
+        self.caption.setText(f"❌ {os.path.basename(self.path)}")
+
+
+class CompareView(QWidget):
+    """
+    並列比較ビュー
+
+    ImagePreviewViewを最大4つ保持し、表示対象の切り替え時も再利用する
+    """
+
+    MAX_IMAGES = 4
+
+    def __init__(self, image_cache=None, parent=None):
+        super().__init__(parent)
+        self.image_cache = image_cache or get_image_cache()
+        self.image_paths: List[str] = []
+        self._syncing = False
+
+        self._grid = QGridLayout(self)
+        self._grid.setContentsMargins(0, 0, 0, 0)
+        self._grid.setSpacing(4)
+
+        # セルは使い回す（ビュー生成コストと再レイアウトを避ける）
+        self._cells = []
+        for _ in range(self.MAX_IMAGES):
+            cell = _CompareCell(self)
+            cell.hide()
+            view = cell.view
+            view.zoom_changed.connect(lambda factor, v=view: self._sync_zoom(v, factor))
+            view.horizontalScrollBar().valueChanged.connect(
+                lambda _value, v=view: self._sync_scroll(v))
+            view.verticalScrollBar().valueChanged.connect(
+                lambda _value, v=view: self._sync_scroll(v))
+            self._cells.append(cell)
+
+        self.image_cache.image_ready.connect(self._on_image_ready)
+
+    def set_images(self, image_paths):
+        """比較対象の画像を設定（先頭から最大4枚）"""
+        self.image_paths = list(image_paths)[:self.MAX_IMAGES]
+        count = len(self.image_paths)
+
+        # 2枚・3枚は横並び、4枚は2×2
+        columns = 2 if count == 4 else max(count, 1)
+        for cell in self._cells:
+            self._grid.removeWidget(cell)
+            cell.hide()
+
+        for index, path in enumerate(self.image_paths):
+            cell = self._cells[index]
+            self._grid.addWidget(cell, index // columns, index % columns)
+            cell.show()
+
+            image = self.image_cache.get(path)
+            if image is not None:
+                cell.path = path
+                cell.show_image(image)
+            else:
+                cell.show_loading(path)
+                self.image_cache.request(path)
+
+    def _active_views(self):
+        return [cell.view for cell in self._cells[:len(self.image_paths)]]
+
+    def _on_image_ready(self, path, image):
+        """キャッシュからのデコード完了通知"""
+        for cell in self._cells[:len(self.image_paths)]:
+            if cell.path == path:
+                if image.isNull():
+                    cell.show_error()
+                else:
+                    cell.show_image(image)
+
+    def _sync_zoom(self, source, factor):
+        """ズーム倍率を他のビューに反映"""
+        if self._syncing:
+            return
+        self._syncing = True
+        try:
+            for view in self._active_views():
+                if view is not source:
+                    view.apply_zoom(factor)
+        finally:
+            self._syncing = False
+        # ズーム後のスクロール位置も揃える
+        self._sync_scroll(source)
+
+    def _sync_scroll(self, source):
+        """スクロール位置を相対値（0.0〜1.0）で他のビューに反映"""
+        if self._syncing:
+            return
+        self._syncing = True
+        try:
+            h_ratio = _scroll_ratio(source.horizontalScrollBar())
+            v_ratio = _scroll_ratio(source.verticalScrollBar())
+            for view in self._active_views():
+                if view is not source:
+                    _set_scroll_ratio(view.horizontalScrollBar(), h_ratio)
+                    _set_scroll_ratio(view.verticalScrollBar(), v_ratio)
+        finally:
+            self._syncing = False
+
+
+def _scroll_ratio(scroll_bar):
+    span = scroll_bar.maximum() - scroll_bar.minimum()
+    if span <= 0:
+        return 0.5
+    return (scroll_bar.value() - scroll_bar.minimum()) / span
+
+
+def _set_scroll_ratio(scroll_bar, ratio):
+    span = scroll_bar.maximum() - scroll_bar.minimum()
+    if span > 0:
+        scroll_bar.setValue(scroll_bar.minimum() + round(span * ratio))
+
+
+def create_compare_view(image_cache=None):
+    """比較表示ビューを作成して返す関数"""
+    return CompareView(image_cache)
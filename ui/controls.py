@@ -1,10 +1,14 @@
 from PyQt5.QtWidgets import (QLineEdit, QPushButton, QHBoxLayout, QWidget, 
                             QFrame)
 from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QFontMetrics
 from presentation.themes.theme_mixin import ThemeAwareMixin
 import os
 
+# ブレッドクラムボタンの文字以外の幅（左右パディング12px・枠2px・余白1px）
+BUTTON_CHROME_WIDTH = 2 * (12 + 2 + 1)
+ELLIPSIS_WIDTH = 30
+
 
 class GIMPAddressBar(QWidget, ThemeAwareMixin):
     """
@@ -59,6 +63,27 @@ class GIMPAddressBar(QWidget, ThemeAwareMixin):
         edit_font.setPointSize(12)  # フォントサイズも調整
         self.edit_button.setFont(edit_font)
         
+        # ブレッドクラムボタンのプール（パスが変わっても作り直さない）
+        self._button_font = QFont()
+        self._button_font.setPointSize(10)  # 30px高さに適したサイズ
+        self._button_font.setWeight(QFont.Medium)
+        self._font_metrics = QFontMetrics(self._button_font)
+        self._width_cache = {}
+        self._button_pool = []
+        self._segments = []
+        self._first_visible = None
+        
+        # 隠されたパス部分への「...」ボタン（先頭に1つだけ）
+        self.ellipsis_button = QPushButton("...")
+        self.ellipsis_button.setFixedSize(ELLIPSIS_WIDTH, 22)
+        self.ellipsis_button.setToolTip("隠されたパス部分をクリックして表示")
+        self.ellipsis_button.setVisible(False)
+        self.ellipsis_button.clicked.connect(
+            lambda checked: self._on_button_clicked(self.ellipsis_button.property('path')))
+        self.register_theme_component(self.ellipsis_button, "address_button")
+        self.breadcrumb_layout.addWidget(self.ellipsis_button)
+        self.breadcrumb_layout.addStretch()  # 右端のスペーサー
+        
         # レイアウト追加
         self.layout.addWidget(self.breadcrumb_widget, 1)  # 拡張可能
         self.layout.addWidget(self.text_edit, 1)    # 編集モード時
@@ -69,6 +94,8 @@ class GIMPAddressBar(QWidget, ThemeAwareMixin):
     
     def setText(self, path):
         """パスを設定（外部から呼び出し可能）"""
+        if path == self.current_path and self._segments:
+            return
         self.current_path = path
         if self.is_edit_mode:
             self.text_edit.setText(path)
@@ -79,21 +106,8 @@ class GIMPAddressBar(QWidget, ThemeAwareMixin):
         """現在のパスを取得"""
         return self.current_path
     
-    def _update_breadcrumb(self, path):
-        """ブレッドクラム表示を更新（カレント側優先表示）"""
-        # 既存のボタンをクリア
-        for i in reversed(range(self.breadcrumb_layout.count())):
-            item = self.breadcrumb_layout.takeAt(i)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        # 空のパスの場合は全ドライブ表示（Windows）
-        if not path:
-            if os.name == 'nt':  # Windows
-                self._show_all_drives()
-            return
-        
-        # パスを分割（正規化してから処理）
+    def _split_path(self, path):
+        """パスを (表示名, 移動先パス) の区切りへ分解"""
         path = os.path.normpath(path)
         parts = []
         
@@ -114,10 +128,8 @@ class GIMPAddressBar(QWidget, ThemeAwareMixin):
             if path.startswith('/'):
                 parts.insert(0, '/')
         
-        # ボタンを作成（まずは全て作成）
-        all_buttons = []
+        segments = []
         current_path = ""
-        
         for i, part in enumerate(parts):
             if not part and i != 0:  # 空の部分をスキップ（ルート以外）
                 continue
@@ -137,190 +149,108 @@ class GIMPAddressBar(QWidget, ThemeAwareMixin):
                     current_path = '/'
                 else:
                     current_path = os.path.join(current_path, part)
-            
-            # ボタン作成
-            button = QPushButton(part if part else '/')
-            button.setProperty('path', current_path)
-            button.clicked.connect(lambda checked, p=current_path: self._on_button_clicked(p))
-            
-            # フォント設定（30px高さに適したサイズ）
-            font = QFont()
-            font.setPointSize(10)  # 30px高さに適したサイズ
-            font.setWeight(QFont.Medium)
-            button.setFont(font)
-            
-            # スタイル設定（区切り文字なしで枠を強化、統一性重視）
-            button.setStyleSheet(self._get_button_style())
-            
-            all_buttons.append(button)
+            segments.append((part if part else '/', current_path))
+        return segments
+    
+    def _update_breadcrumb(self, path):
+        """
+        ブレッドクラム表示を更新（カレント側優先表示）
+        
+        ボタンは作り直さずプールから再利用し、表示名・移動先が変わった区切りだけを書き換える
+        """
+        if not path:
+            # 空のパスの場合は全ドライブ表示（Windows）
+            segments = self._drive_segments() if os.name == 'nt' else []
+        else:
+            segments = self._split_path(path)
         
-        # 利用可能な幅を計算してボタンを配置
-        self._layout_buttons_with_priority(all_buttons)
+        for index, (label, segment_path) in enumerate(segments):
+            button = self._breadcrumb_button(index)
+            if button.text() != label:
+                button.setText(label)
+            if button.property('path') != segment_path:
+                button.setProperty('path', segment_path)
+        self._segments = segments
+        self._first_visible = None
+        self._layout_buttons_with_priority()
+    
+    def _breadcrumb_button(self, index):
+        """プールの index 番目のボタン（足りなければ作成してレイアウトへ追加）"""
+        while len(self._button_pool) <= index:
+            button = QPushButton()
+            button.setFont(self._button_font)
+            button.setVisible(False)
+            button.clicked.connect(lambda checked, b=button: self._on_button_clicked(b.property('path')))
+            self.register_theme_component(button, "address_button")
+            # 末尾のスペーサーの手前に追加
+            self.breadcrumb_layout.insertWidget(self.breadcrumb_layout.count() - 1, button)
+            self._button_pool.append(button)
+        return self._button_pool[index]
+    
+    def _text_width(self, text):
+        """ボタンの表示幅（フォントメトリクスで測定し、表示名ごとにキャッシュ）"""
+        width = self._width_cache.get(text)
+        if width is None:
+            if hasattr(self._font_metrics, 'horizontalAdvance'):
+                text_width = self._font_metrics.horizontalAdvance(text)
+            else:
+                text_width = self._font_metrics.width(text)
+            width = text_width + BUTTON_CHROME_WIDTH + self.breadcrumb_layout.spacing()
+            self._width_cache[text] = width
+        return width
     
-    def _layout_buttons_with_priority(self, all_buttons):
+    def _layout_buttons_with_priority(self):
         """
-        カレント側（右側）を優先してボタンを配置
-        幅が足りない場合はルート側から順次隠す
+        カレント側（右側）を優先してボタンを表示
+        幅が足りない場合はルート側から順次隠す（表示範囲が変わった場合のみボタンを切り替え）
         """
-        if not all_buttons:
-            return
+        segments = self._segments
         
         # 利用可能な幅を取得
         available_width = self.breadcrumb_widget.width() - 20  # マージン考慮
         if available_width <= 0:
             available_width = 400  # 初期幅として仮定
         
-        # 各ボタンの推定幅を計算
-        button_widths = []
-        total_width = 0
-        
-        for button in all_buttons:
-            # ボタンのテキスト幅を推定
-            text = button.text()
-            estimated_width = len(text) * 8 + 24 + 2  # 文字幅 + パディング + マージン
-            button_widths.append(estimated_width)
-            total_width += estimated_width
-        
-        # 全てのボタンが収まる場合は全て表示
-        if total_width <= available_width:
-            for button in all_buttons:
-                self.breadcrumb_layout.addWidget(button)
-            # 右端にスペーサー追加
-            self.breadcrumb_layout.addStretch()
-            return
-        
-        # 幅が足りない場合：カレント側から優先して配置
-        # 「...」ボタンの幅も考慮
-        ellipsis_width = 30
+        # 後ろ（カレント側）から収まるところまで
+        first_visible = len(segments)
         used_width = 0
-        visible_buttons = []
-        
-        # 後ろ（カレント側）から順に追加していく
-        for i in reversed(range(len(all_buttons))):
-            button = all_buttons[i]
-            button_width = button_widths[i]
-            
-            # 「...」ボタンが必要な場合の幅も考慮
-            needed_width = used_width + button_width
-            if i > 0:  # まだルート側にボタンがある場合
+        ellipsis_width = ELLIPSIS_WIDTH + self.breadcrumb_layout.spacing()
+        for i in reversed(range(len(segments))):
+            needed_width = used_width + self._text_width(segments[i][0])
+            if i > 0:  # まだルート側にボタンがある場合は「...」の幅も考慮
                 needed_width += ellipsis_width
-            
-            if needed_width <= available_width:
-                visible_buttons.insert(0, button)  # 先頭に挿入（順序維持）
-                used_width += button_width
-            else:
+            if needed_width > available_width and first_visible < len(segments):
                 break
+            used_width = needed_width - (ellipsis_width if i > 0 else 0)
+            first_visible = i
         
-        # 隠されたボタンがある場合は「...」ボタンを追加
-        if len(visible_buttons) < len(all_buttons):
-            ellipsis_button = QPushButton("...")
-            ellipsis_button.setFixedSize(30, 22)
-            ellipsis_button.setToolTip("隠されたパス部分をクリックして表示")
-            
-            # 隠されたボタンの最後のパスにジャンプ
-            hidden_buttons = all_buttons[:len(all_buttons) - len(visible_buttons)]
-            if hidden_buttons:
-                last_hidden_path = hidden_buttons[-1].property('path')
-                ellipsis_button.clicked.connect(lambda checked, p=last_hidden_path: self._on_button_clicked(p))
-            
-            # スタイル設定
-            ellipsis_button.setStyleSheet(self._get_button_style())
-            self.breadcrumb_layout.addWidget(ellipsis_button)
-        
-        # 可視ボタンを追加
-        for button in visible_buttons:
-            self.breadcrumb_layout.addWidget(button)
-        
-        # 右端にスペーサー追加
-        self.breadcrumb_layout.addStretch()
-
-    def _get_button_style(self):
-        """テーマに応じたボタンスタイルを取得"""
-        try:
-            if hasattr(self, 'get_theme_color'):
-                # テーマカラーを取得
-                bg = self.get_theme_color('button_bg') or '#f0f0f0'
-                border = self.get_theme_color('border') or '#cccccc'
-                text = self.get_theme_color('foreground') or '#000000'
-                hover_bg = self.get_theme_color('hover') or '#e6f3ff'
-                selection = self.get_theme_color('selection') or '#cce8ff'
-                accent = self.get_theme_color('accent') or '#0078d4'
-            else:
-                # フォールバック値（ライトテーマ）
-                bg = '#f0f0f0'
-                border = '#cccccc'
-                text = '#000000'
-                hover_bg = '#e6f3ff'
-                selection = '#cce8ff'
-                accent = '#0078d4'
-        except:
-            # エラー時のフォールバック値
-            bg = '#f0f0f0'
-            border = '#cccccc'
-            text = '#000000'
-            hover_bg = '#e6f3ff'
-            selection = '#cce8ff'
-            accent = '#0078d4'
+        if first_visible == self._first_visible:
+            return
+        self._first_visible = first_visible
         
-        return f"""
-            QPushButton {{
-                border: 2px solid {border};
-                background-color: {bg};
-                color: {text};
-                padding: 4px 12px;
-                margin: 1px;
-                border-radius: 5px;
-                min-height: 18px;
-                max-height: 22px;
-                font-weight: 500;
-            }}
-            QPushButton:hover {{
-                background-color: {hover_bg};
-                border-color: {accent};
-            }}
-            QPushButton:pressed {{
-                background-color: {selection};
-                border-color: {accent};
-            }}
-        """
+        # 隠されたボタンがある場合は「...」ボタンで最後の隠れたパスへ移動
+        if first_visible > 0:
+            self.ellipsis_button.setProperty('path', segments[first_visible - 1][1])
+        self.ellipsis_button.setVisible(first_visible > 0)
+        for index, button in enumerate(self._button_pool):
+            button.setVisible(first_visible <= index < len(segments))
+    
+    def resizeEvent(self, event):
+        """幅の変更時は表示範囲だけを計算し直す"""
+        super().resizeEvent(event)
+        self._layout_buttons_with_priority()
     
-    def _show_all_drives(self):
-        """Windows全ドライブ表示"""
+    def _drive_segments(self):
+        """Windows全ドライブの区切り"""
         import string
         
         # 利用可能なドライブを検索
-        drives = []
+        segments = []
         for drive_letter in string.ascii_uppercase:
             drive_path = f"{drive_letter}:\\"
             if os.path.exists(drive_path):
-                drives.append(drive_path)
-        
-        # 各ドライブのボタンを作成
-        for drive in drives:
-            drive_name = drive.rstrip('\\')  # "C:" の形式
-            button = QPushButton(drive_name)
-            button.setProperty('path', drive)
-            button.clicked.connect(lambda checked, p=drive: self._on_button_clicked(p))
-            
-            # フォント設定
-            font = QFont()
-            font.setPointSize(10)
-            font.setWeight(QFont.Medium)
-            button.setFont(font)
-            
-            # スタイル設定
-            button.setStyleSheet(self._get_button_style())
-            
-            self.breadcrumb_layout.addWidget(button)
-        
-        # 右端にスペーサー追加
-        self.breadcrumb_layout.addStretch()
-    
-    def apply_theme(self):
-        """テーマ適用"""
-        super().apply_theme()
-        # 既存のボタンを再作成
-        self._update_breadcrumb(self.current_path)
+                segments.append((drive_path.rstrip('\\'), drive_path))  # "C:" の形式
+        return segments
     
     def _on_button_clicked(self, path):
         """ブレッドクラムボタンクリック処理"""
@@ -9,18 +9,125 @@
 - サムネイル表示対応
 """
 
+import logging
 import os
-import sys
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
                             QTreeView, QLabel, QLineEdit, QMessageBox,
-                            QFileSystemModel, QSplitter, QListWidget,
-                            QListWidgetItem, QAbstractItemView, QFrame,
-                            QHeaderView, QStyle, QToolButton, QComboBox)
-from PyQt5.QtCore import Qt, QDir, QModelIndex, QFileInfo, QSize, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QFont
+                            QFileSystemModel, QSplitter, QListView,
+                            QAbstractItemView, QFrame, QStyle, QToolButton)
+from PyQt5.QtCore import Qt, QDir, QModelIndex, QSize, QTimer, QAbstractListModel
+from PyQt5.QtGui import QImage, QPixmap, QFont
 
-from logic.image_utils import get_supported_extensions, create_image_preview
+from logic.thumbnail_loader import get_thumbnail_loader
+from utils.constants import IMAGE_EXTENSIONS
+
+# リストのアイコンサイズ（px）
+ICON_EDGE = 64
+
+# 読み込み済みサムネイルの表示更新をまとめる間隔（ms）
+THUMBNAIL_FLUSH_INTERVAL = 50
+
+
+def list_directory(directory: str) -> List[Tuple[str, str, bool]]:
+    """
+    ディレクトリ直下の項目（フォルダが先、名前順）
+
+    scandir の DirEntry が持つ種別情報を使い、項目ごとに stat しない
+
+    Returns:
+        List[Tuple[str, str, bool]]: (名前, パス, フォルダか)
+    """
+    items = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            items.append((entry.name, entry.path, is_dir))
+    items.sort(key=lambda item: (not item[2], item[0].lower()))
+    return items
+
+
+class _FolderEntryModel(QAbstractListModel):
+    """
+    ダイアログのファイル・フォルダ一覧のモデル
+
+    画像のサムネイルは描画される行の分だけ共有の読み込みサービスへ要求し、
+    読み込み完了の通知はまとめて表示へ反映する
+    """
+
+    def __init__(self, folder_icon, file_icon, parent=None):
+        super().__init__(parent)
+        self._items: List[Tuple[str, str, bool]] = []
+        self._rows = {}      # path -> row
+        self._pixmaps = {}   # path -> QPixmap（表示中のフォルダの分のみ）
+        self._failed = set()
+        self._changed_rows = set()
+        self._folder_icon = folder_icon
+        self._file_icon = file_icon
+        self._requests = get_thumbnail_loader().requests(self)
+        self._requests.loaded.connect(self._on_loaded)
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(THUMBNAIL_FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def set_items(self, items: List[Tuple[str, str, bool]]):
+        """内容を置き換え（前のフォルダの未着手のサムネイル読み込みは取り消す）"""
+        self.beginResetModel()
+        self._requests.cancel()
+        self._items = items
+        self._rows = {path: row for row, (_, path, _) in enumerate(items)}
+        self._pixmaps.clear()
+        self._failed.clear()
+        self._changed_rows.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        name, path, is_dir = self._items[index.row()]
+        if role == Qt.DisplayRole:
+            return name
+        if role == Qt.DecorationRole:
+            if is_dir:
+                return self._folder_icon
+            pixmap = self._pixmaps.get(path)
+            if pixmap is not None:
+                return pixmap
+            if path not in self._failed and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                self._requests.request(path)
+            return self._file_icon
+        if role == Qt.UserRole:
+            return path
+        if role == Qt.ToolTipRole:
+            return path
+        return None
+
+    def _on_loaded(self, path: str, image: QImage):
+        row = self._rows.get(path)
+        if row is None:
+            return
+        if image.isNull():
+            self._failed.add(path)
+            return
+        self._pixmaps[path] = QPixmap.fromImage(
+            image.scaled(ICON_EDGE, ICON_EDGE, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self._changed_rows.add(row)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        """読み込み済みの行をまとめて再描画"""
+        if not self._changed_rows:
+            return
+        rows, self._changed_rows = self._changed_rows, set()
+        self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)), [Qt.DecorationRole])
 
 
 class CustomFolderDialog(QDialog):
@@ -41,9 +148,6 @@ class CustomFolderDialog(QDialog):
         # 選択されたフォルダ
         self.selected_folder = None
         
-        # サポートされる画像拡張子
-        self.supported_extensions = get_supported_extensions()
-        
         # UI初期化
         self._setup_ui()
         self._connect_signals()
@@ -136,12 +240,17 @@ class CustomFolderDialog(QDialog):
     
     def _setup_file_list(self, splitter):
         """ファイル・フォルダリストを設定"""
-        # リストウィジェット
-        self.file_list = QListWidget()
-        self.file_list.setViewMode(QListWidget.IconMode)
-        self.file_list.setIconSize(QSize(64, 64))
-        self.file_list.setResizeMode(QListWidget.Adjust)
-        self.file_list.setMovement(QListWidget.Static)
+        # リストビュー（サムネイルは表示される項目の分だけ読み込む）
+        self.file_model = _FolderEntryModel(self.style().standardIcon(QStyle.SP_DirIcon),
+                                            self.style().standardIcon(QStyle.SP_FileIcon), self)
+        self.file_list = QListView()
+        self.file_list.setModel(self.file_model)
+        self.file_list.setViewMode(QListView.IconMode)
+        self.file_list.setIconSize(QSize(ICON_EDGE, ICON_EDGE))
+        self.file_list.setResizeMode(QListView.Adjust)
+        self.file_list.setMovement(QListView.Static)
+        self.file_list.setUniformItemSizes(True)
+        self.file_list.setLayoutMode(QListView.Batched)
         self.file_list.setSelectionMode(QAbstractItemView.SingleSelection)
         
         splitter.addWidget(self.file_list)
@@ -179,7 +288,7 @@ class CustomFolderDialog(QDialog):
         self.tree_view.clicked.connect(self._on_tree_clicked)
         
         # ファイルリスト
-        self.file_list.itemDoubleClicked.connect(self._on_file_double_clicked)
+        self.file_list.doubleClicked.connect(self._on_file_double_clicked)
         
         # ボタン
         self.cancel_button.clicked.connect(self.reject)
@@ -214,69 +323,13 @@ class CustomFolderDialog(QDialog):
     
     def _update_file_list(self):
         """ファイルリストを更新"""
-        self.file_list.clear()
-        
         try:
-            # ディレクトリの内容を取得
+            items = list_directory(self.current_directory)
+        except OSError as e:
+            logging.error(f"ファイルリスト更新エラー: {e}")
             items = []
-            for item_name in os.listdir(self.current_directory):
-                item_path = os.path.join(self.current_directory, item_name)
-                if os.path.exists(item_path):
-                    items.append((item_name, item_path))
-            
-            # ソート（フォルダが先、その後ファイル）
-            items.sort(key=lambda x: (not os.path.isdir(x[1]), x[0].lower()))
-            
-            # リストに追加
-            for item_name, item_path in items:
-                self._add_item_to_list(item_name, item_path)
-                
-        except Exception as e:
-            print(f"ファイルリスト更新エラー: {e}")
-    
-    def _add_item_to_list(self, name: str, path: str):
-        """リストにアイテムを追加"""
-        item = QListWidgetItem()
-        item.setText(name)
-        item.setData(Qt.UserRole, path)
-        
-        # アイコンを設定
-        if os.path.isdir(path):
-            # フォルダアイコン
-            icon = self.style().standardIcon(QStyle.SP_DirIcon)
-            item.setIcon(icon)
-        else:
-            # ファイルアイコン（画像の場合はサムネイル）
-            if self._is_image_file(path):
-                self._set_thumbnail_async(item, path)
-            else:
-                icon = self.style().standardIcon(QStyle.SP_FileIcon)
-                item.setIcon(icon)
-        
-        self.file_list.addItem(item)
-    
-    def _is_image_file(self, path: str) -> bool:
-        """画像ファイルかどうかを判定"""
-        _, ext = os.path.splitext(path)
-        return ext.lower() in self.supported_extensions
-    
-    def _set_thumbnail_async(self, item: QListWidgetItem, path: str):
-        """サムネイルを非同期で設定"""
-        # まずはデフォルトアイコンを設定
-        icon = self.style().standardIcon(QStyle.SP_FileIcon)
-        item.setIcon(icon)
-        
-        # タイマーで少し遅延してサムネイル読み込み
-        QTimer.singleShot(100, lambda: self._load_thumbnail(item, path))
-    
-    def _load_thumbnail(self, item: QListWidgetItem, path: str):
-        """サムネイルを読み込み"""
-        try:
-            pixmap = create_image_preview(path, 64)
-            if pixmap and not pixmap.isNull():
-                item.setIcon(QIcon(pixmap))
-        except Exception as e:
-            print(f"サムネイル読み込みエラー ({path}): {e}")
+        self.file_model.set_items(items)
+        self.file_list.scrollToTop()
     
     def _go_up(self):
         """上の階層に移動"""
@@ -296,10 +349,10 @@ class CustomFolderDialog(QDialog):
             path = self.tree_model.filePath(index)
             self._navigate_to_directory(path)
     
-    def _on_file_double_clicked(self, item: QListWidgetItem):
+    def _on_file_double_clicked(self, index: QModelIndex):
         """ファイルリストのアイテムがダブルクリックされた"""
-        path = item.data(Qt.UserRole)
-        if os.path.isdir(path):
+        path = index.data(Qt.UserRole)
+        if path and os.path.isdir(path):
             self._navigate_to_directory(path)
     
     def _select_current_folder(self):
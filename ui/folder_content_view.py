@@ -0,0 +1,411 @@
+"""
+フォルダ内容ビュー
+
+フォルダ直下の項目（フォルダ・画像・その他のファイル）をモデル/ビューで表示する
+QListWidgetItem を1件ずつ作らず、名前と種別のリストだけを保持するため
+10万件のフォルダでも一覧の構築は一瞬で済む
+
+- 一覧の取得（os.scandir）と並べ替えはバックグラウンドで行い、取得した分から順に追加する
+- 並び順（フォルダ→画像→その他）はソースモデル側で確定させ、プロキシは絞り込みだけを行う
+  （Pythonの lessThan を比較ごとに呼ぶと10万件の並べ替えに数秒かかる）
+- ツールチップ（パス・サイズ・更新日時）は表示されるときに生成する
+- 種別ごとの件数はモデルが追加時に数える
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from PyQt5.QtWidgets import QListView
+from PyQt5.QtCore import (Qt, QObject, QRunnable, QThreadPool, QAbstractListModel, QModelIndex,
+                          QSortFilterProxyModel, pyqtSignal)
+
+from domain.services.sort_modes import natural_key
+from utils.constants import IMAGE_EXTENSIONS
+from utils.profiler import traced
+
+# 項目の種別（並び順の優先度を兼ねる）
+KIND_PARENT = -1
+KIND_FOLDER = 0
+KIND_IMAGE = 1
+KIND_OTHER = 2
+KIND_ERROR = 3
+
+PathRole = Qt.UserRole
+KindRole = Qt.UserRole + 1
+
+# 取得途中の一覧をモデルへ渡す件数
+LISTING_BATCH_SIZE = 2000
+
+_LABEL_PREFIXES = {
+    KIND_PARENT: "📁 ",
+    KIND_FOLDER: "📁 ",
+    KIND_IMAGE: "🖼️ ",
+    KIND_OTHER: "📄 ",
+    KIND_ERROR: "❌ ",
+}
+
+PARENT_LABEL = ".. (親フォルダ)"
+PERMISSION_ERROR_LABEL = "アクセス権限がありません"
+
+
+def classify_entry(entry: os.DirEntry) -> Optional[int]:
+    """scandir の項目の種別（フォルダでもファイルでもない項目は None）"""
+    try:
+        if entry.is_dir():
+            return KIND_FOLDER
+        if not entry.is_file():
+            return None
+    except OSError:
+        return None
+    name = entry.name
+    dot = name.rfind('.')
+    return KIND_IMAGE if dot > 0 and name[dot:].lower() in IMAGE_EXTENSIONS else KIND_OTHER
+
+
+def _format_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class _ListingSignals(QObject):
+    """フォルダ一覧取得タスクの通知"""
+    batch = pyqtSignal(int, list, list)              # generation, 種別, 名前
+    finished = pyqtSignal(int, list, list, bool)     # generation, 並べ替え済みの種別, 名前, アクセス拒否
+
+
+class _ListingTask(QRunnable):
+    """フォルダ直下を列挙し、最後に表示順へ並べ替えるタスク"""
+
+    def __init__(self, generation: int, folder_path: str, image_positions: Dict[str, int],
+                 cancel_event: threading.Event):
+        super().__init__()
+        self.generation = generation
+        self.folder_path = folder_path
+        self.image_positions = image_positions
+        self.cancel_event = cancel_event
+        self.signals = _ListingSignals()
+
+    @traced("folder.list", "scan")
+    def run(self):
+        kinds, names = [], []
+        denied = False
+        emitted = 0
+        try:
+            with os.scandir(self.folder_path) as entries:
+                for entry in entries:
+                    if self.cancel_event.is_set():
+                        return
+                    kind = classify_entry(entry)
+                    if kind is None:
+                        continue
+                    kinds.append(kind)
+                    names.append(entry.name)
+                    if len(names) - emitted >= LISTING_BATCH_SIZE:
+                        self.signals.batch.emit(self.generation, kinds[emitted:], names[emitted:])
+                        emitted = len(names)
+        except PermissionError:
+            denied = True
+        except OSError:
+            pass
+        if self.cancel_event.is_set():
+            return
+        # 残りの項目も途中経過として渡す（画像のパスは全件バッチで届く）
+        if len(names) > emitted:
+            self.signals.batch.emit(self.generation, kinds[emitted:], names[emitted:])
+        # 画像はサムネイルと同じ順序、それ以外は自然順
+        positions = self.image_positions
+        unknown = len(positions)
+        prefix = os.path.join(self.folder_path, "")
+        keys = [(kind, positions.get(prefix + name, unknown) if kind == KIND_IMAGE else 0, natural_key(name), name)
+                for kind, name in zip(kinds, names)]
+        keys.sort()
+        self.signals.finished.emit(self.generation, [key[0] for key in keys], [key[3] for key in keys], denied)
+
+
+class FolderContentModel(QAbstractListModel):
+    """
+    フォルダ内容のモデル
+
+    行は（種別, 名前）の並列リスト。パス・表示名・ツールチップは要求されたときに組み立てる
+    """
+
+    # 一覧の取得完了
+    listing_finished = pyqtSignal()
+    # 取得した画像のパス（取得順、バッチごと）
+    images_listed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._folder_path = ""
+        self._kinds: List[int] = []
+        self._names: List[str] = []
+        self._counts = {KIND_FOLDER: 0, KIND_IMAGE: 0, KIND_OTHER: 0}
+        self._generation = 0
+        self._cancel_event = threading.Event()
+        self._loading = False
+        self._pending_positions = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    # 内容の設定
+
+    def set_folder(self, folder_path: str, image_positions: Dict[str, int] = None):
+        """
+        フォルダの一覧取得をバックグラウンドで開始
+
+        Args:
+            folder_path: 表示するフォルダ
+            image_positions: 画像パス -> サムネイルでの表示位置（画像項目の並び順）
+        """
+        self._cancel()
+        self.beginResetModel()
+        self._folder_path = folder_path or ""
+        self._kinds, self._names = self._header_rows()
+        self._counts = {KIND_FOLDER: 0, KIND_IMAGE: 0, KIND_OTHER: 0}
+        self.endResetModel()
+        if not self._folder_path or not os.path.isdir(self._folder_path):
+            return
+        self._loading = True
+        task = _ListingTask(self._generation, self._folder_path, dict(image_positions or {}), self._cancel_event)
+        task.signals.batch.connect(self._on_batch)
+        task.signals.finished.connect(self._on_finished)
+        self._pool.start(task)
+
+    def clear(self):
+        self.set_folder("")
+
+    def set_image_order(self, image_positions: Dict[str, int]):
+        """
+        画像項目だけをサムネイルと同じ順序に並べ直す
+
+        選択中の行は並べ替え後も同じ項目を指したままにする
+        """
+        if self._loading:
+            # 取得中の行はまだ表示順になっていないため、取得完了後に適用する
+            self._pending_positions = dict(image_positions)
+            return
+        rows = [row for row, kind in enumerate(self._kinds) if kind == KIND_IMAGE]
+        if not rows:
+            return
+        # 画像項目はフォルダ項目とその他のファイルの間に連続して並んでいる
+        first = rows[0]
+        unknown = len(image_positions)
+        order = sorted(rows, key=lambda row: (image_positions.get(self._path_of(row), unknown),
+                                              natural_key(self._names[row])))
+        self.layoutAboutToBeChanged.emit()
+        new_rows = {old_row: first + offset for offset, old_row in enumerate(order)}
+        self._names[first:first + len(order)] = [self._names[row] for row in order]
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_rows.get(index.row(), index.row())) for index in persistent])
+        self.layoutChanged.emit()
+
+    def _header_rows(self):
+        """先頭の固定行（親フォルダへのリンク）"""
+        if self._folder_path and os.path.dirname(self._folder_path) != self._folder_path:
+            return [KIND_PARENT], [PARENT_LABEL]
+        return [], []
+
+    def _cancel(self):
+        self._cancel_event.set()
+        self._cancel_event = threading.Event()
+        self._generation += 1
+        self._loading = False
+        self._pending_positions = None
+
+    def _on_batch(self, generation: int, kinds: list, names: list):
+        if generation != self._generation or not names:
+            return
+        first = len(self._names)
+        self.beginInsertRows(QModelIndex(), first, first + len(names) - 1)
+        self._kinds.extend(kinds)
+        self._names.extend(names)
+        self.endInsertRows()
+        for kind in kinds:
+            self._counts[kind] += 1
+        prefix = os.path.join(self._folder_path, "")
+        images = [prefix + name for kind, name in zip(kinds, names) if kind == KIND_IMAGE]
+        if images:
+            self.images_listed.emit(images)
+
+    def _on_finished(self, generation: int, kinds: list, names: list, denied: bool):
+        if generation != self._generation:
+            return
+        self._loading = False
+        header_kinds, header_names = self._header_rows()
+        if denied:
+            header_kinds.append(KIND_ERROR)
+            header_names.append(PERMISSION_ERROR_LABEL)
+        # 取得途中に追加した行を表示順の一覧で置き換える
+        self.beginResetModel()
+        self._kinds = header_kinds + kinds
+        self._names = header_names + names
+        self.endResetModel()
+        self._counts = {KIND_FOLDER: 0, KIND_IMAGE: 0, KIND_OTHER: 0}
+        for kind in kinds:
+            self._counts[kind] += 1
+        if self._pending_positions is not None:
+            positions, self._pending_positions = self._pending_positions, None
+            self.set_image_order(positions)
+        self.listing_finished.emit()
+
+    # 参照
+
+    def folder_path(self) -> str:
+        return self._folder_path
+
+    def is_loading(self) -> bool:
+        return self._loading
+
+    def counts(self) -> Dict[int, int]:
+        """種別ごとの件数 {KIND_FOLDER: n, KIND_IMAGE: n, KIND_OTHER: n}"""
+        return dict(self._counts)
+
+    def image_paths(self) -> List[str]:
+        """画像項目のパス（表示順）"""
+        prefix = os.path.join(self._folder_path, "")
+        return [prefix + name for kind, name in zip(self._kinds, self._names) if kind == KIND_IMAGE]
+
+    def name_at(self, row: int) -> str:
+        return self._names[row]
+
+    def kind_at(self, row: int) -> int:
+        return self._kinds[row]
+
+    def _path_of(self, row: int) -> Optional[str]:
+        kind = self._kinds[row]
+        if kind == KIND_PARENT:
+            return os.path.dirname(self._folder_path)
+        if kind == KIND_ERROR:
+            return None
+        return os.path.join(self._folder_path, self._names[row])
+
+    def _tooltip_of(self, row: int) -> Optional[str]:
+        path = self._path_of(row)
+        if path is None or self._kinds[row] in (KIND_PARENT, KIND_FOLDER):
+            return path
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        modified = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+        return f"{path}\n{_format_size(stat.st_size)} / {modified}"
+
+    # QAbstractListModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._names):
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return _LABEL_PREFIXES[self._kinds[row]] + self._names[row]
+        if role == PathRole:
+            return self._path_of(row)
+        if role == KindRole:
+            return self._kinds[row]
+        if role == Qt.ToolTipRole:
+            return self._tooltip_of(row)
+        return None
+
+
+class FolderContentFilterModel(QSortFilterProxyModel):
+    """
+    フォルダ内容の絞り込み（名前の部分一致、大文字小文字を区別しない）
+
+    親フォルダへのリンクとエラー行は常に表示する
+    並び順はソースモデルの順序のまま（sort は呼ばない）
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._name_filter = ""
+
+    def set_name_filter(self, text: str):
+        text = (text or "").strip().casefold()
+        if text == self._name_filter:
+            return
+        self._name_filter = text
+        self.invalidateFilter()
+
+    def name_filter(self) -> str:
+        return self._name_filter
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._name_filter:
+            return True
+        # data() を経由せずリストを直接参照（行数分呼ばれるため）
+        model = self.sourceModel()
+        if model.kind_at(source_row) in (KIND_PARENT, KIND_ERROR):
+            return True
+        return self._name_filter in model.name_at(source_row).casefold()
+
+
+class FolderContentView(QListView):
+    """
+    フォルダ内容の一覧ビュー
+
+    項目の高さを固定し、レイアウトをバッチ処理することで大量の行でも応答性を保つ
+    """
+
+    # 一覧の取得完了
+    listing_finished = pyqtSignal()
+    # 取得した画像のパス（取得順、バッチごと）
+    images_listed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.content_model = FolderContentModel(self)
+        self.filter_model = FolderContentFilterModel(self)
+        self.filter_model.setSourceModel(self.content_model)
+        self.setModel(self.filter_model)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(500)
+        self.content_model.listing_finished.connect(self.listing_finished)
+        self.content_model.images_listed.connect(self.images_listed)
+
+    def set_folder(self, folder_path: str, image_positions: Dict[str, int] = None):
+        self.content_model.set_folder(folder_path, image_positions)
+        self.scrollToTop()
+
+    def set_image_order(self, image_positions: Dict[str, int]):
+        self.content_model.set_image_order(image_positions)
+
+    def set_name_filter(self, text: str):
+        self.filter_model.set_name_filter(text)
+
+    def clear(self):
+        self.content_model.clear()
+
+    def counts(self) -> Dict[int, int]:
+        return self.content_model.counts()
+
+    def image_paths(self) -> List[str]:
+        return self.content_model.image_paths()
+
+    def count(self) -> int:
+        """表示中（絞り込み後）の行数"""
+        return self.filter_model.rowCount()
+
+
+def create_folder_content_view(clicked_callback=None, double_clicked_callback=None):
+    """
+    フォルダ内容ビューを作成して返す関数
+
+    Args:
+        clicked_callback: クリックされた行の QModelIndex を受け取るコールバック
+        double_clicked_callback: ダブルクリックされた行の QModelIndex を受け取るコールバック
+    """
+    view = FolderContentView()
+    if clicked_callback is not None:
+        view.clicked.connect(clicked_callback)
+    if double_clicked_callback is not None:
+        view.doubleClicked.connect(double_clicked_callback)
+    return view
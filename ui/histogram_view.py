@@ -0,0 +1,106 @@
+"""
+ヒストグラム表示ウィジェット
+
+RGB・輝度ヒストグラムと白飛び・黒つぶれの割合を表示する
+描画パスはデータ設定時に一度だけ構築し、paintEventでは描くだけにする
+NumPy はデータが設定されたときに読み込む（ウィジェットの作成は起動時に行われるため）
+"""
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QPainter, QPainterPath, QColor, QPen, QFont
+
+from presentation.themes.theme_mixin import ThemeAwareMixin
+
+
+class HistogramView(QWidget, ThemeAwareMixin):
+    """RGB・輝度ヒストグラム"""
+
+    _CHANNEL_COLORS = (
+        ('red', QColor(230, 60, 60, 110)),
+        ('green', QColor(60, 200, 60, 110)),
+        ('blue', QColor(60, 110, 240, 110)),
+    )
+
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent)
+        ThemeAwareMixin.__init__(self)
+        self.setMinimumHeight(70)
+        self.setMaximumHeight(90)
+        self._data = None
+        self._paths = {}  # 名前 -> 正規化座標(0..1)のQPainterPath
+
+    def set_histogram(self, data):
+        """ヒストグラムデータを設定（Noneでクリア）"""
+        self._data = data
+        self._paths = {}
+        if data is not None:
+            import numpy as np
+            # 上位の外れ値（真っ黒・真っ白の塊）で全体が潰れないよう99パーセンタイルで正規化
+            channels = [data.red, data.green, data.blue, data.luma]
+            peak = max(float(np.percentile(channel, 99)) for channel in channels)
+            peak = max(peak, 1.0)
+            for name in ('red', 'green', 'blue', 'luma'):
+                self._paths[name] = _build_path(getattr(data, name), peak)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        background = QColor(self.get_theme_color('secondary'))
+        foreground = QColor(self.get_theme_color('foreground'))
+        painter.fillRect(self.rect(), background)
+
+        if not self._paths:
+            painter.end()
+            return
+
+        text_height = 14
+        area = QRectF(4, 4, self.width() - 8, self.height() - 8 - text_height)
+
+        painter.save()
+        painter.translate(area.left(), area.top())
+        painter.scale(area.width(), area.height())
+        painter.setPen(Qt.NoPen)
+        for name, color in self._CHANNEL_COLORS:
+            painter.setBrush(color)
+            painter.drawPath(self._paths[name])
+        luma_pen = QPen(foreground)
+        luma_pen.setCosmetic(True)
+        painter.setPen(luma_pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(self._paths['luma'])
+        painter.restore()
+
+        font = QFont()
+        font.setPointSize(8)
+        painter.setFont(font)
+        painter.setPen(foreground)
+        text_rect = QRectF(4, self.height() - text_height - 2, self.width() - 8, text_height)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         f"黒つぶれ {self._data.shadow_clip:.1f}%")
+        painter.drawText(text_rect, Qt.AlignRight | Qt.AlignVCenter,
+                         f"白飛び {self._data.highlight_clip:.1f}%")
+        painter.end()
+
+    def _apply_custom_theme(self, theme):
+        self.update()
+
+
+def _build_path(counts, peak) -> QPainterPath:
+    """256ビンのカウントから 0..1 の正規化座標で塗りつぶしパスを作成"""
+    import numpy as np
+    heights = np.minimum(counts / peak, 1.0)
+    path = QPainterPath()
+    path.moveTo(0.0, 1.0)
+    last = len(heights) - 1
+    for index, value in enumerate(heights):
+        path.lineTo(index / last, 1.0 - float(value))
+    path.lineTo(1.0, 1.0)
+    path.closeSubpath()
+    return path
+
+
+def create_histogram_view():
+    """ヒストグラム表示ウィジェットを作成して返す関数"""
+    return HistogramView()
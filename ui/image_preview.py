@@ -1,12 +1,59 @@
+import math
+
 from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem
-from PyQt5.QtGui import QPixmap, QPainter
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap, QPainter, QImage
+from PyQt5.QtCore import Qt, pyqtSignal, QObject, QRunnable, QThreadPool
+
+# これ以下のサイズ（長辺px）になったらミップレベルの生成を止める
+MIP_MIN_EDGE = 256
+
+
+def build_mip_levels(image: QImage, min_edge: int = MIP_MIN_EDGE):
+    """
+    1/2ずつ縮小したミップレベルを生成（レベル0は含まない）
+
+    ワーカースレッドから呼び出し可能（QImageのみ使用）
+    """
+    levels = []
+    current = image
+    while max(current.width(), current.height()) // 2 >= min_edge:
+        current = current.scaled(max(1, current.width() // 2), max(1, current.height() // 2),
+                                 Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        levels.append(current)
+    return levels
+
+
+class _MipSignals(QObject):
+    """ミップ生成完了通知"""
+    finished = pyqtSignal(int, list)  # generation, levels
+
+
+class _MipTask(QRunnable):
+    """バックグラウンドでミップレベルを生成するタスク"""
+
+    def __init__(self, generation: int, image: QImage):
+        super().__init__()
+        self.generation = generation
+        self.image = image
+        self.signals = _MipSignals()
+
+    def run(self):
+        try:
+            levels = build_mip_levels(self.image)
+        except Exception:
+            levels = []
+        self.signals.finished.emit(self.generation, levels)
+
 
 class ImagePreviewView(QGraphicsView):
+    # ホイールズームの倍率通知（比較表示の同期用）
+    zoom_changed = pyqtSignal(float)
+
     def __init__(self):
         super().__init__()
         self.setScene(QGraphicsScene(self))
         self._pixmap_item = QGraphicsPixmapItem()
+        self._pixmap_item.setTransformationMode(Qt.SmoothTransformation)
         self.scene().addItem(self._pixmap_item)
 
         self._zoom_factor = 1.0
@@ -14,13 +61,85 @@ class ImagePreviewView(QGraphicsView):
         self.setRenderHint(QPainter.Antialiasing)
         self.setDragMode(QGraphicsView.ScrollHandDrag)
 
-    def set_image(self, pixmap: QPixmap):
-        """画像を設定し、表示領域にフィットさせる"""
+        # ミップマップ状態（レベル0 = 元画像）
+        self._mip_generation = 0
+        self._mip_images = []     # レベル1以降のQImage
+        self._mip_pixmaps = {}    # レベル -> QPixmap（表示時に遅延変換）
+        self._mip_level = 0
+        self._base_pixmap = QPixmap()
+
+    def set_image(self, pixmap: QPixmap, image: QImage = None):
+        """
+        画像を設定し、表示領域にフィットさせる
+
+        Args:
+            pixmap: 表示する画像
+            image: 同じ画像のQImage（あればミップ生成時の変換を省略）
+        """
         self._zoom_factor = 1.0
         self.resetTransform()
+        self._reset_mips(pixmap)
         self._pixmap_item.setPixmap(pixmap)
+        self.scene().setSceneRect(self._pixmap_item.sceneBoundingRect())
         self.fitInView(self._pixmap_item, Qt.KeepAspectRatio)
 
+        # 縮小表示になる大きな画像のみ、バックグラウンドでミップを生成
+        if not pixmap.isNull() and max(pixmap.width(), pixmap.height()) // 2 >= MIP_MIN_EDGE:
+            if image is None or image.isNull():
+                image = pixmap.toImage()
+            task = _MipTask(self._mip_generation, image)
+            task.signals.finished.connect(self._on_mips_ready)
+            QThreadPool.globalInstance().start(task)
+
+    def _reset_mips(self, pixmap: QPixmap):
+        """ミップ状態を破棄（生成中の結果も無効化）"""
+        self._mip_generation += 1
+        self._mip_images = []
+        self._mip_pixmaps = {0: pixmap}
+        self._mip_level = 0
+        self._base_pixmap = pixmap
+        self._pixmap_item.setScale(1.0)
+
+    def _on_mips_ready(self, generation, levels):
+        """ミップ生成完了（GUIスレッド）"""
+        if generation != self._mip_generation:
+            return  # 既に別の画像に切り替わっている
+        self._mip_images = levels
+        self._update_mip_level()
+
+    def _update_mip_level(self):
+        """現在の表示倍率に最も近い（画面解像度以上の）ミップレベルに切り替え"""
+        if self._base_pixmap.isNull() or not self._mip_images:
+            return
+        scale = self.transform().m11()
+        if scale <= 0:
+            return
+        level = int(math.floor(math.log2(1.0 / scale))) if scale < 1.0 else 0
+        level = max(0, min(level, len(self._mip_images)))
+        if level == self._mip_level:
+            return
+
+        pixmap = self._mip_pixmaps.get(level)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(self._mip_images[level - 1])
+            self._mip_pixmaps[level] = pixmap
+
+        # シーン座標上の大きさは元画像と同じに保つ
+        self._pixmap_item.setPixmap(pixmap)
+        self._pixmap_item.setScale(self._base_pixmap.width() / pixmap.width())
+        self._mip_level = level
+
+    def apply_zoom(self, factor: float):
+        """表示中心を基準にズーム（他ビューからの同期用、シグナルは発行しない）"""
+        if self._pixmap_item.pixmap().isNull():
+            return
+        anchor = self.transformationAnchor()
+        self.setTransformationAnchor(QGraphicsView.AnchorViewCenter)
+        self._zoom_factor *= factor
+        self.scale(factor, factor)
+        self.setTransformationAnchor(anchor)
+        self._update_mip_level()
+
     def wheelEvent(self, event):
         """マウスホイールでズームイン・ズームアウト"""
         if not self._pixmap_item.pixmap().isNull():
@@ -28,6 +147,8 @@ class ImagePreviewView(QGraphicsView):
             factor = 1.25 if zoom_in else 0.8
             self._zoom_factor *= factor
             self.scale(factor, factor)
+            self._update_mip_level()
+            self.zoom_changed.emit(factor)
 
 
 def create_image_preview():
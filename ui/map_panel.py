@@ -4,33 +4,53 @@ import os
 
 
 class MapPanel(QWidget):
+    """
+    マップパネル
+
+    地図ビュー（QtWebEngine）は view に最初にアクセスしたときに作成する
+    （QtWebEngine の読み込みと初期化は起動時間の大半を占めるため、ウィンドウの表示後に回す）
+    """
+
     def __init__(self):
         super().__init__()
-        self.view = None
-        self.setup_view()
+        self._view = None
+        self.use_webengine = False
+        self.setMinimumHeight(200)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(self.view)
+    
+    @property
+    def view(self):
+        """地図ビュー（未作成なら作成）"""
+        return self._ensure_view()
+    
+    def _ensure_view(self):
+        """地図ビューを作成（作成後は use_webengine が確定する）"""
+        if self._view is None:
+            self.setup_view()
+            self.layout().addWidget(self._view)
+        return self._view
     
     def setup_view(self):
         """マップビューのセットアップ（フォールバック対応）"""
         try:
             # 最初にQtWebEngineベースを試行
             from ui.map_view import create_map_view
-            self.view = create_map_view()
-            self.view.setMinimumHeight(200)
+            self._view = create_map_view()
+            self._view.setMinimumHeight(200)
             self.use_webengine = True
         except Exception as e:
             # QtWebEngineが利用できない場合はシンプルビューを使用
             print(f"QtWebEngine利用不可、シンプルビューを使用: {e}")
             from ui.simple_map_view import create_simple_map_view
-            self.view = create_simple_map_view()
-            self.view.setMinimumHeight(200)
+            self._view = create_simple_map_view()
+            self._view.setMinimumHeight(200)
             self.use_webengine = False
 
     def load_map(self, map_file):
         """地図ファイルを読み込み"""
+        self._ensure_view()
         if self.use_webengine and hasattr(self.view, 'load'):
             self.view.load(QUrl.fromLocalFile(map_file))
     
@@ -46,6 +66,7 @@ class MapPanel(QWidget):
             bool: 成功した場合True
         """
         try:
+            self._ensure_view()
             if self.use_webengine:
                 # QtWebEngineベースの処理
                 from logic.image_utils import generate_map_html
@@ -73,6 +94,7 @@ class MapPanel(QWidget):
     
     def _show_error_message(self, message):
         """エラーメッセージを表示"""
+        self._ensure_view()
         if self.use_webengine and hasattr(self.view, 'setHtml'):
             error_html = f"""
             <html>
@@ -90,6 +112,7 @@ class MapPanel(QWidget):
     
     def show_no_gps_message(self):
         """GPS情報がない場合のメッセージを表示"""
+        self._ensure_view()
         if self.use_webengine and hasattr(self.view, 'setHtml'):
             no_gps_html = """
             <html>
@@ -0,0 +1,281 @@
+"""
+スライドショービュー
+
+全画面で画像を一定間隔で切り替えて表示：
+- 表示中に次の画像を画面サイズへ縮小デコード（ダブルバッファ）
+- 次の画像が間に合わない場合はスキップせず、デコード完了まで表示を延長
+- スライドごとのデコード時間と余裕時間（間隔 - デコード時間）を計測
+
+キー操作: Esc 終了 / Space 一時停止 / ←→ 前後 / +- 間隔変更 / I 情報表示切替
+"""
+
+import os
+import time
+from typing import List
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, QSize, QRect, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QPainter, QColor, QFont
+
+from logic.image_cache import decode_image
+
+
+MIN_INTERVAL_MS = 500
+MAX_INTERVAL_MS = 60000
+INTERVAL_STEP_MS = 500
+
+
+class _SlideSignals(QObject):
+    """スライドデコード完了通知"""
+    finished = pyqtSignal(int, int, QImage, float)  # generation, index, image, decode_ms
+
+
+class _SlideDecodeTask(QRunnable):
+    """次スライドを画面サイズで縮小デコードするタスク"""
+
+    def __init__(self, generation: int, index: int, path: str, target_size: QSize):
+        super().__init__()
+        self.generation = generation
+        self.index = index
+        self.path = path
+        self.target_size = target_size
+        self.signals = _SlideSignals()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            image = decode_image(self.path, self.target_size)
+            # 縮小デコード非対応の形式は最終サイズへ縮小しておく
+            if not image.isNull() and (image.width() > self.target_size.width()
+                                       or image.height() > self.target_size.height()):
+                image = image.scaled(self.target_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        except Exception:
+            image = QImage()
+        decode_ms = (time.perf_counter() - start) * 1000
+        self.signals.finished.emit(self.generation, self.index, image, decode_ms)
+
+
+class SlideshowView(QWidget):
+    """
+    スライドショー表示ウィジェット
+
+    表示中のフロントバッファと、先読み中のバックバッファを持つ
+    """
+
+    # スライド表示通知（index, path, デコード時間ms, 余裕時間ms）
+    slide_shown = pyqtSignal(int, str, float, float)
+    # 終了要求（Escキー）
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+        self.image_paths: List[str] = []
+        self.current_index = 0
+        self.interval_ms = 3000
+        self.paused = False
+        self.show_info = True
+
+        self._generation = 0
+        self._front = QPixmap()
+        self._front_info = ""
+        self._back = None          # (index, QImage, decode_ms)
+        self._back_index = None    # デコード中または準備済みのインデックス
+        self._waiting = False      # 表示時刻に次の画像が間に合わなかった
+        self.stats = []            # [(path, decode_ms, headroom_ms)]
+        self.late_count = 0
+
+        # 専用プール（サムネイル等の処理に先読みを邪魔されない）
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_tick)
+
+    def start(self, image_paths, start_index: int = 0, interval_ms: int = None):
+        """スライドショーを開始"""
+        self.image_paths = list(image_paths)
+        if not self.image_paths:
+            return
+        if interval_ms is not None:
+            self.set_interval(interval_ms)
+        self.stats = []
+        self.late_count = 0
+        self.paused = False
+        self.setFocus()
+        self._restart_at(start_index % len(self.image_paths))
+
+    def stop(self):
+        """スライドショーを停止（実行中のデコード結果は破棄）"""
+        self._timer.stop()
+        self._generation += 1
+        self._back = None
+        self._back_index = None
+        self._waiting = False
+        self._front = QPixmap()
+
+    def set_interval(self, interval_ms: int):
+        """表示間隔を設定"""
+        self.interval_ms = max(MIN_INTERVAL_MS, min(MAX_INTERVAL_MS, int(interval_ms)))
+
+    def summary(self) -> dict:
+        """計測結果の集計"""
+        if not self.stats:
+            return {'slides': 0, 'late': self.late_count}
+        decode_times = [decode_ms for _, decode_ms, _ in self.stats]
+        headrooms = [headroom_ms for _, _, headroom_ms in self.stats]
+        return {
+            'slides': len(self.stats),
+            'late': self.late_count,
+            'max_decode_ms': max(decode_times),
+            'avg_decode_ms': sum(decode_times) / len(decode_times),
+            'min_headroom_ms': min(headrooms),
+        }
+
+    def _target_size(self) -> QSize:
+        """デコード先のサイズ（物理ピクセル）"""
+        ratio = self.devicePixelRatioF()
+        size = self.size()
+        if size.width() < 100 or size.height() < 100:
+            # 表示前は画面サイズを使用
+            screen = self.screen() if hasattr(self, 'screen') else None
+            if screen is not None:
+                size = screen.size()
+        return QSize(max(1, int(size.width() * ratio)), max(1, int(size.height() * ratio)))
+
+    def _restart_at(self, index: int):
+        """指定位置からパイプラインを再構築"""
+        self._timer.stop()
+        self._generation += 1
+        self._back = None
+        self._waiting = True  # 最初の1枚は準備でき次第表示
+        self.current_index = index
+        self._request_decode(index)
+
+    def _request_decode(self, index: int):
+        """バックバッファへのデコードを要求"""
+        self._back_index = index
+        task = _SlideDecodeTask(self._generation, index, self.image_paths[index], self._target_size())
+        task.signals.finished.connect(self._on_decoded)
+        self._pool.start(task)
+
+    def _next_index(self, index: int) -> int:
+        return (index + 1) % len(self.image_paths)
+
+    def _on_decoded(self, generation, index, image, decode_ms):
+        """デコード完了（GUIスレッド）"""
+        if generation != self._generation or index != self._back_index:
+            return
+        self._back = (index, image, decode_ms)
+        if self._waiting:
+            self._swap()
+
+    def _on_tick(self):
+        """表示時刻"""
+        if self.paused or not self.image_paths:
+            return
+        if self._back is not None:
+            self._swap()
+        else:
+            # 間に合わなかった：スキップせずデコード完了時に表示
+            self._waiting = True
+            self.late_count += 1
+
+    def _swap(self):
+        """バックバッファを表示し、次の画像の先読みを開始"""
+        index, image, decode_ms = self._back
+        self._back = None
+        self._waiting = False
+        self.current_index = index
+
+        path = self.image_paths[index]
+        self._front = QPixmap.fromImage(image) if not image.isNull() else QPixmap()
+        headroom_ms = self.interval_ms - decode_ms
+        self.stats.append((path, decode_ms, headroom_ms))
+        self._front_info = (f"{index + 1}/{len(self.image_paths)}  {os.path.basename(path)}  |  "
+                            f"デコード {decode_ms:.0f}ms / 間隔 {self.interval_ms}ms "
+                            f"(余裕 {headroom_ms:.0f}ms)")
+        self.update()
+        self.slide_shown.emit(index, path, decode_ms, headroom_ms)
+
+        # 表示時点から間隔を計測し、同時に次の画像をデコード
+        if len(self.image_paths) > 1:
+            self._request_decode(self._next_index(index))
+            if not self.paused:
+                self._timer.start(self.interval_ms)
+
+    def _step(self, offset: int):
+        """手動で前後のスライドへ移動"""
+        if not self.image_paths:
+            return
+        target = (self.current_index + offset) % len(self.image_paths)
+        if self._back is not None and self._back[0] == target:
+            self._swap()
+        elif self._back is None and self._back_index == target:
+            # 先読み中の画像をそのまま待つ
+            self._timer.stop()
+            self._waiting = True
+        else:
+            self._restart_at(target)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if not self._front.isNull():
+            ratio = self._front.devicePixelRatioF()
+            logical = self._front.size() / ratio
+            scaled = logical.scaled(self.size(), Qt.KeepAspectRatio)
+            rect = QRect(0, 0, scaled.width(), scaled.height())
+            rect.moveCenter(self.rect().center())
+            painter.drawPixmap(rect, self._front)
+
+        if self.show_info and self._front_info:
+            text = self._front_info
+            if self.paused:
+                text = "⏸ " + text
+            font = QFont()
+            font.setPointSize(10)
+            painter.setFont(font)
+            metrics = painter.fontMetrics()
+            box = metrics.boundingRect(text).adjusted(-8, -4, 8, 4)
+            box.moveBottomLeft(self.rect().bottomLeft())
+            box.translate(12, -12)
+            painter.fillRect(box, QColor(0, 0, 0, 160))
+            painter.setPen(QColor(230, 230, 230))
+            painter.drawText(box, Qt.AlignCenter, text)
+        painter.end()
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        if key == Qt.Key_Escape:
+            self.finished.emit()
+        elif key == Qt.Key_Space:
+            self.paused = not self.paused
+            if self.paused:
+                self._timer.stop()
+            elif self._back is not None:
+                self._swap()
+            else:
+                self._waiting = True
+            self.update()
+        elif key == Qt.Key_Right:
+            self._step(1)
+        elif key == Qt.Key_Left:
+            self._step(-1)
+        elif key in (Qt.Key_Plus, Qt.Key_Equal):
+            self.set_interval(self.interval_ms + INTERVAL_STEP_MS)
+        elif key == Qt.Key_Minus:
+            self.set_interval(self.interval_ms - INTERVAL_STEP_MS)
+        elif key == Qt.Key_I:
+            self.show_info = not self.show_info
+            self.update()
+        else:
+            super().keyPressEvent(event)
+
+
+def create_slideshow_view():
+    """スライドショービューを作成して返す関数"""
+    return SlideshowView()
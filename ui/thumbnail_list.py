@@ -1,10 +1,14 @@
-from PyQt5.QtWidgets import QListWidget, QListWidgetItem
+from PyQt5.QtWidgets import QListWidget, QListWidgetItem, QAbstractItemView
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtCore import QSize, Qt
 import os
+from logic.image_cache import decode_image
+from logic.raw_preview import is_raw_file
 
 def load_pixmap(image_path):
     """画像パスからQPixmapを生成して返すユーティリティ関数"""
+    if is_raw_file(image_path):
+        return QPixmap.fromImage(decode_image(image_path))
     return QPixmap(image_path)
 
 def create_thumbnail_list(thumbnail_clicked_callback):
@@ -17,6 +21,7 @@ def create_thumbnail_list(thumbnail_clicked_callback):
     thumbnail_list.setSpacing(8)  # アイコン間隔を調整
     thumbnail_list.setWordWrap(True)  # テキスト折り返し有効
     thumbnail_list.setUniformItemSizes(True)  # パフォーマンス向上
+    thumbnail_list.setSelectionMode(QAbstractItemView.ExtendedSelection)  # Ctrl/Shiftクリックで複数選択（比較表示用）
     thumbnail_list.itemClicked.connect(thumbnail_clicked_callback)  # クリック時のコールバックを接続
 
     return thumbnail_list
@@ -24,7 +29,11 @@ def create_thumbnail_list(thumbnail_clicked_callback):
 def add_thumbnail(thumbnail_list, image_path):
     """サムネイルをサムネイル一覧に追加"""
     try:
-        icon = QIcon(image_path)  # 画像をアイコンとして読み込み
+        if is_raw_file(image_path):
+            # RAWは埋め込みJPEGプレビューを縮小デコード
+            icon = QIcon(QPixmap.fromImage(decode_image(image_path, QSize(256, 256))))
+        else:
+            icon = QIcon(image_path)  # 画像をアイコンとして読み込み
         # ファイル名のみを表示（プラットフォーム対応）
         filename = os.path.basename(image_path)
         item = QListWidgetItem(icon, filename)
@@ -0,0 +1,231 @@
+"""
+仮想化サムネイルビュー
+
+QListWidgetのように全項目のウィジェット・アイコンを先に作らず、
+モデル（パスのリスト）だけを保持して、画面に描画される行のサムネイルだけを
+バックグラウンドで読み込む。数十万枚のフォルダやライブラリ全体でも追加は一瞬で済む
+
+- サムネイルはディスクキャッシュ経由（2回目以降はデコードしない）
+- 後から要求された（＝今見えている）行を優先して読み込む
+- 読み込んだQPixmapは件数上限付きのLRUで保持
+"""
+
+import os
+from collections import OrderedDict
+from typing import Iterable, List
+
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QColor
+
+from logic.thumbnail_loader import get_thumbnail_loader
+
+# メモリに保持するサムネイル数（画面数枚分）
+PIXMAP_CACHE_SIZE = 1500
+
+PathRole = Qt.UserRole
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    サムネイル一覧のモデル
+
+    行はファイルパス。DecorationRole が初めて要求された行だけ読み込みを開始する
+    """
+
+    # サムネイル準備完了（path, QImage）
+    thumbnail_loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, parent=None, loader=None):
+        super().__init__(parent)
+        self._paths: List[str] = []
+        self._rows = {}                 # path -> row
+        self._pixmaps = OrderedDict()   # path -> QPixmap（LRU）
+        self._failed = set()
+        self._placeholder = QPixmap(1, 1)
+        self._placeholder.fill(QColor(0, 0, 0, 0))
+
+        # 読み込みは共有のサービスへ要求（サムネイル間の優先度は要求順）
+        self._requests = (loader or get_thumbnail_loader()).requests(self)
+        self._requests.loaded.connect(self._on_loaded)
+
+    # 内容の設定
+
+    def set_paths(self, paths: Iterable[str]):
+        """内容を置き換え"""
+        self.beginResetModel()
+        self._requests.cancel()  # 未開始の読み込みは破棄
+        self._paths = list(paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self._failed.clear()
+        self.endResetModel()
+
+    def append_paths(self, paths: Iterable[str]):
+        """末尾に追加（スキャン結果のストリーミング用）"""
+        paths = [path for path in paths if path not in self._rows]
+        if not paths:
+            return
+        first = len(self._paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        self._paths.extend(paths)
+        for offset, path in enumerate(paths):
+            self._rows[path] = first + offset
+        self.endInsertRows()
+
+    def reorder(self, paths: Iterable[str]):
+        """
+        同じ写真の集合を別の順序に並べ替える
+
+        読み込み済みのサムネイルと選択状態はそのまま維持する
+        """
+        paths = list(paths)
+        if len(paths) != len(self._paths):
+            raise ValueError("並べ替え前後で写真の集合が異なります")
+        self.layoutAboutToBeChanged.emit()
+        old_paths = self._paths
+        self._paths = paths
+        self._rows = {path: row for row, path in enumerate(paths)}
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(self._rows[old_paths[index.row()]]) for index in persistent])
+        self.layoutChanged.emit()
+
+    def clear(self):
+        self.set_paths([])
+
+    def paths(self) -> List[str]:
+        return list(self._paths)
+
+    def path_at(self, row: int) -> str:
+        return self._paths[row]
+
+    def row_of(self, path: str) -> int:
+        return self._rows.get(path, -1)
+
+    # QAbstractListModel
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._paths):
+            return None
+        path = self._paths[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.DecorationRole:
+            pixmap = self._pixmaps.get(path)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(path)
+                return pixmap
+            self._request(path)
+            return self._placeholder
+        if role == PathRole:
+            return path
+        if role == Qt.ToolTipRole:
+            return path
+        return None
+
+    # 読み込み
+
+    def _request(self, path: str):
+        if path in self._failed:
+            return
+        # 後から要求された行（今表示されている行）ほど優先して読み込まれる
+        self._requests.request(path)
+
+    def _on_loaded(self, path: str, image: QImage):
+        if image.isNull():
+            self._failed.add(path)
+            return
+        self._pixmaps[path] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > PIXMAP_CACHE_SIZE:
+            self._pixmaps.popitem(last=False)
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+        self.thumbnail_loaded.emit(path, image)
+
+
+class ThumbnailView(QListView):
+    """
+    サムネイル一覧ビュー（IconMode）
+
+    項目サイズを固定し、レイアウトをバッチ処理することで大量の行でも応答性を保つ
+    """
+
+    # 画像選択通知（クリックされた行のパス）
+    image_clicked = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thumbnail_model = ThumbnailModel(self)
+        self.setModel(self.thumbnail_model)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setIconSize(QSize(128, 128))
+        self.setGridSize(QSize(150, 170))
+        self.setSpacing(8)
+        self.setWordWrap(True)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(500)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)  # Ctrl/Shiftクリックで複数選択（比較表示用）
+        self.clicked.connect(self._on_clicked)
+
+    def set_paths(self, paths: Iterable[str]):
+        self.thumbnail_model.set_paths(paths)
+        self.scrollToTop()
+
+    def append_paths(self, paths: Iterable[str]):
+        self.thumbnail_model.append_paths(paths)
+
+    def reorder_paths(self, paths: Iterable[str]):
+        self.thumbnail_model.reorder(paths)
+
+    def clear(self):
+        self.thumbnail_model.clear()
+
+    def paths(self) -> List[str]:
+        return self.thumbnail_model.paths()
+
+    def count(self) -> int:
+        return self.thumbnail_model.rowCount()
+
+    def selected_paths(self) -> List[str]:
+        """選択中のパス（表示順）"""
+        rows = sorted(index.row() for index in self.selectionModel().selectedIndexes())
+        return [self.thumbnail_model.path_at(row) for row in rows]
+
+    def select_path(self, path: str):
+        """指定パスの行を選択して表示"""
+        row = self.thumbnail_model.row_of(path)
+        if row >= 0:
+            index = self.thumbnail_model.index(row)
+            self.setCurrentIndex(index)
+            self.scrollTo(index)
+
+    def set_thumbnail_size(self, edge: int):
+        """表示サイズを変更"""
+        self.setIconSize(QSize(edge, edge))
+        self.setGridSize(QSize(edge + 22, edge + 42))
+
+    def _on_clicked(self, index):
+        path = index.data(PathRole)
+        if path:
+            self.image_clicked.emit(path)
+
+
+def create_thumbnail_view(thumbnail_clicked_callback=None):
+    """
+    仮想化サムネイルビューを作成して返す関数
+
+    Args:
+        thumbnail_clicked_callback: クリックされた行の QModelIndex を受け取るコールバック
+    """
+    view = ThumbnailView()
+    if thumbnail_clicked_callback is not None:
+        view.clicked.connect(thumbnail_clicked_callback)
+    return view
@@ -0,0 +1,169 @@
+"""
+撮影日タイムライン表示ウィジェット
+
+日・月・年ごとの枚数を棒グラフで表示し、クリックした期間で絞り込む
+棒の数が幅に収まらない場合は隣り合う期間をまとめて描くため、
+描画の手間は写真の枚数ではなくウィジェットの幅だけで決まる
+"""
+
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QToolTip
+from PyQt5.QtCore import Qt, QRectF, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QFont
+
+from domain.services.timeline_service import (
+    GRANULARITY_MONTH, bucket_bounds, bucket_label,
+)
+from presentation.themes.theme_mixin import ThemeAwareMixin
+
+# 棒1本の最小幅（px）
+MIN_BAR_WIDTH = 3
+
+
+class TimelineView(QWidget, ThemeAwareMixin):
+    """撮影日タイムライン"""
+
+    # 期間選択（開始epoch秒, 終了epoch秒, 表示ラベル）
+    range_selected = pyqtSignal(float, float, str)
+    # 選択解除
+    selection_cleared = pyqtSignal()
+
+    def __init__(self, parent=None):
+        QWidget.__init__(self, parent)
+        ThemeAwareMixin.__init__(self)
+        self.setMinimumHeight(40)
+        self.setMaximumHeight(56)
+        self.setMouseTracking(True)
+        self.granularity = GRANULARITY_MONTH
+        self._first_bucket = 0
+        self._counts = np.zeros(0, dtype=np.int64)
+        # 描画用（棒ごとの先頭の期間番号・期間数・枚数）
+        self._bar_starts = np.zeros(0, dtype=np.int64)
+        self._bar_spans = np.zeros(0, dtype=np.int64)
+        self._bar_counts = np.zeros(0, dtype=np.int64)
+        self._selected = None  # (開始期間番号, 期間数)
+
+    def set_counts(self, first_bucket: int, counts: np.ndarray, granularity: str):
+        """期間ごとの枚数を設定"""
+        if granularity != self.granularity:
+            self._selected = None
+        self.granularity = granularity
+        self._first_bucket = first_bucket
+        self._counts = counts
+        self._layout_bars()
+        self.update()
+
+    def clear_selection(self):
+        self._selected = None
+        self.update()
+
+    def _layout_bars(self):
+        """幅に収まるよう期間をまとめた棒を作る"""
+        count = len(self._counts)
+        max_bars = max(1, (self.width() - 8) // MIN_BAR_WIDTH)
+        span = max(1, -(-count // max_bars))
+        starts = np.arange(0, count, span)
+        if count:
+            self._bar_counts = np.add.reduceat(self._counts, starts)
+        else:
+            self._bar_counts = np.zeros(0, dtype=np.int64)
+        self._bar_starts = starts + self._first_bucket
+        self._bar_spans = np.minimum(span, count - starts)
+
+    def resizeEvent(self, event):
+        self._layout_bars()
+        super().resizeEvent(event)
+
+    def _bar_at(self, x: float) -> int:
+        bars = len(self._bar_counts)
+        if not bars:
+            return -1
+        bar = int((x - 4) / max(1.0, (self.width() - 8) / bars))
+        return bar if 0 <= bar < bars else -1
+
+    def _bar_label(self, bar: int) -> str:
+        start = int(self._bar_starts[bar])
+        label = bucket_label(start, self.granularity)
+        if self._bar_spans[bar] > 1:
+            label += f"〜{bucket_label(start + int(self._bar_spans[bar]) - 1, self.granularity)}"
+        return label
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        background = QColor(self.get_theme_color('secondary'))
+        foreground = QColor(self.get_theme_color('foreground'))
+        accent = QColor(self.get_theme_color('accent'))
+        painter.fillRect(self.rect(), background)
+
+        bars = len(self._bar_counts)
+        if not bars:
+            font = QFont()
+            font.setPointSize(8)
+            painter.setFont(font)
+            painter.setPen(foreground)
+            painter.drawText(self.rect(), Qt.AlignCenter, "撮影日のある写真はありません")
+            painter.end()
+            return
+
+        label_height = 12
+        area = QRectF(4, 2, self.width() - 8, self.height() - 4 - label_height)
+        peak = max(1, int(self._bar_counts.max()))
+        bar_width = area.width() / bars
+        bar_color = QColor(foreground)
+        bar_color.setAlpha(150)
+        heights = self._bar_counts / peak * area.height()
+        for bar in range(bars):
+            height = float(heights[bar])
+            if height <= 0:
+                continue
+            selected = (self._selected is not None
+                        and self._selected == (int(self._bar_starts[bar]), int(self._bar_spans[bar])))
+            painter.fillRect(QRectF(area.left() + bar * bar_width, area.bottom() - max(1.0, height),
+                                    max(1.0, bar_width - 1), max(1.0, height)),
+                             accent if selected else bar_color)
+
+        font = QFont()
+        font.setPointSize(7)
+        painter.setFont(font)
+        painter.setPen(foreground)
+        text_rect = QRectF(4, self.height() - label_height - 1, self.width() - 8, label_height)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         bucket_label(int(self._bar_starts[0]), self.granularity))
+        painter.drawText(text_rect, Qt.AlignRight | Qt.AlignVCenter,
+                         bucket_label(int(self._bar_starts[-1] + self._bar_spans[-1] - 1), self.granularity))
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        bar = self._bar_at(event.x())
+        if bar >= 0:
+            QToolTip.showText(event.globalPos(), f"{self._bar_label(bar)}: {int(self._bar_counts[bar]):,}枚", self)
+        else:
+            QToolTip.hideText()
+        super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return super().mousePressEvent(event)
+        bar = self._bar_at(event.x())
+        if bar < 0 or not self._bar_counts[bar]:
+            return
+        selection = (int(self._bar_starts[bar]), int(self._bar_spans[bar]))
+        if selection == self._selected:
+            # 選択中の棒をもう一度クリックで解除
+            self._selected = None
+            self.update()
+            self.selection_cleared.emit()
+            return
+        self._selected = selection
+        self.update()
+        start = bucket_bounds(selection[0], self.granularity)[0]
+        end = bucket_bounds(selection[0] + selection[1] - 1, self.granularity)[1]
+        self.range_selected.emit(start, end, self._bar_label(bar))
+
+    def _apply_custom_theme(self, theme):
+        self.update()
+
+
+def create_timeline_view():
+    """撮影日タイムライン表示ウィジェットを作成して返す関数"""
+    return TimelineView()
@@ -0,0 +1,14 @@
+"""
+定数定義 - PhotoMap Explorer
+
+アプリケーション全体で共有する定数
+"""
+
+# Qtの画像プラグインで直接デコードできる拡張子
+STANDARD_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'})
+
+# RAWファイル（TIFF構造、埋め込みJPEGプレビューで表示）
+RAW_IMAGE_EXTENSIONS = frozenset({'.cr2', '.nef', '.arw', '.dng'})
+
+# 画像として扱う全拡張子
+IMAGE_EXTENSIONS = STANDARD_IMAGE_EXTENSIONS | RAW_IMAGE_EXTENSIONS
@@ -0,0 +1,202 @@
+"""
+スパン計測（トレース） - PhotoMap Explorer
+
+クリック1回の処理がどこで時間を使ったかを、スレッドをまたいで記録する
+
+    from utils.profiler import span, traced
+
+    with span("thumbnail.decode", "thumbnail", path=path):
+        ...
+
+    @traced("map.update", "map")
+    def _update_map(self, ...):
+        ...
+
+- 無効時の span() は共有の何もしないオブジェクトを返すだけ、traced() は有効フラグを見て
+  元の関数をそのまま呼ぶだけなので、計測箇所を残したままでもほぼ負荷がない
+- 記録は上限付きのリングバッファ（古いものから捨てる）に溜め、
+  Chrome の trace_event 形式のJSON（chrome://tracing、Perfetto で表示可能）で書き出す
+- 環境変数 PHOTOMAP_TRACE=1 で起動時から記録、PHOTOMAP_TRACE=<ファイル> なら
+  終了時にそのファイルへ書き出す（画面のデバッグメニューからも開始・保存できる）
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# 記録を有効にする環境変数
+TRACE_ENV = "PHOTOMAP_TRACE"
+
+# リングバッファに保持するスパン数
+DEFAULT_BUFFER_SIZE = 200000
+
+
+class _NullSpan:
+    """無効時に返す何もしないスパン（全呼び出しで共有）"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def annotate(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """1区間の計測（終了時にリングバッファへ追加）"""
+
+    __slots__ = ('_tracer', '_name', '_category', '_args', '_start')
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self._args['error'] = exc_type.__name__
+        self._tracer._record(self._name, self._category, self._start, end - self._start, self._args)
+        return False
+
+    def annotate(self, **args):
+        """計測中に分かった情報（キャッシュ命中、画像サイズなど）を追加"""
+        self._args.update(args)
+
+
+class Tracer:
+    """スパンの記録とChromeトレース形式での書き出し"""
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, enabled: bool = False):
+        self.enabled = enabled
+        # deque.append はスレッドをまたいでも不可分なのでロック不要
+        self._events = deque(maxlen=buffer_size)
+        self._thread_names: Dict[int, str] = {}
+        self._origin = time.perf_counter_ns()
+
+    def start(self):
+        """記録を開始"""
+        self.enabled = True
+
+    def stop(self):
+        """記録を停止（記録済みのスパンは残す）"""
+        self.enabled = False
+
+    def clear(self):
+        """記録済みのスパンを破棄"""
+        self._events.clear()
+        self._thread_names.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def span(self, name: str, category: str = "app", **args):
+        """区間を計測するコンテキストマネージャー"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def _record(self, name: str, category: str, start: int, duration: int, args: dict):
+        thread_id = threading.get_ident()
+        if thread_id not in self._thread_names:
+            self._thread_names[thread_id] = threading.current_thread().name
+        self._events.append((name, category, start, duration, thread_id, args))
+
+    def to_chrome_trace(self) -> dict:
+        """Chrome の trace_event 形式（完了イベント "X" とスレッド名のメタデータ）"""
+        pid = os.getpid()
+        events: List[dict] = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                               "args": {"name": "PhotoMap Explorer"}}]
+        for thread_id, thread_name in list(self._thread_names.items()):
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+        for name, category, start, duration, thread_id, args in list(self._events):
+            event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": thread_id,
+                     "ts": (start - self._origin) / 1000, "dur": duration / 1000}
+            if args:
+                event["args"] = {key: value if isinstance(value, (int, float, bool)) else str(value)
+                                 for key, value in args.items()}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> int:
+        """
+        Chromeトレース形式のJSONを書き出す
+
+        Returns:
+            int: 書き出したスパン数
+        """
+        trace = self.to_chrome_trace()
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(trace, stream, ensure_ascii=False)
+        return sum(1 for event in trace["traceEvents"] if event["ph"] == "X")
+
+
+def _dump_at_exit(tracer: Tracer, path: str):
+    try:
+        count = tracer.dump(path)
+        print(f"トレースを書き出しました: {path}（{count:,} 件）")
+    except OSError as e:
+        print(f"トレース書き出しエラー: {e}")
+
+
+def _create_tracer() -> Tracer:
+    """環境変数の設定に従ってトレーサーを作成"""
+    setting = os.environ.get(TRACE_ENV, "").strip()
+    tracer = Tracer(enabled=bool(setting) and setting.lower() not in ("0", "false", "no"))
+    if tracer.enabled and setting.lower() not in ("1", "true", "yes"):
+        atexit.register(_dump_at_exit, tracer, os.path.abspath(setting))
+    return tracer
+
+
+# グローバルトレーサー
+_tracer = None
+
+def get_tracer() -> Tracer:
+    """グローバルトレーサー取得"""
+    global _tracer
+    if _tracer is None:
+        _tracer = _create_tracer()
+    return _tracer
+
+
+def span(name: str, category: str = "app", **args):
+    """グローバルトレーサーで区間を計測（無効時はほぼ負荷なし）"""
+    tracer = _tracer if _tracer is not None else get_tracer()
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = "app") -> Callable:
+    """関数全体を計測するデコレーター（name 省略時は関数の修飾名）"""
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer if _tracer is not None else get_tracer()
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with _Span(tracer, span_name, category, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
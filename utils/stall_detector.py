@@ -0,0 +1,270 @@
+"""
+UI停止（イベントループの詰まり）検出 - PhotoMap Explorer
+
+GUIスレッドの心拍タイマーと、別スレッドの監視を組み合わせて
+「どこでどれだけ画面が固まったか」を記録する
+
+- 心拍: 一定間隔の QTimer。予定より遅れた分をイベントループの遅延として記録
+- 監視スレッド: 心拍が途絶えている間、sys._current_frames() で
+  GUIスレッドのスタックを一定間隔で採取
+- 遅延がしきい値を超えたものを停止として記録し、最も多く採取されたスタックの
+  アプリケーション内で最も内側のフレームを「停止箇所」としてセッション全体で集計する
+"""
+
+import linecache
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# 心拍の間隔（ms）
+HEARTBEAT_INTERVAL_MS = 50
+
+# 停止とみなす遅延（ms）
+STALL_THRESHOLD_MS = 200
+
+# 停止中にスタックを採取する間隔（ms）
+SAMPLE_INTERVAL_MS = 20
+
+# 採取するスタックの深さ
+MAX_STACK_DEPTH = 40
+
+# 保持する停止・遅延の件数（古いものから捨てる）
+MAX_STALLS = 1000
+MAX_LATENCIES = 100000
+
+# レポートに載せる件数
+WORST_LOCATION_COUNT = 10
+WORST_STALL_COUNT = 5
+
+# 「アプリケーション内のフレーム」の判定に使うプロジェクトのフォルダ
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+Frame = Tuple[str, int, str]  # (ファイル, 行番号, 関数名)
+
+
+def _capture_stack(frame) -> Tuple[Frame, ...]:
+    """フレームから (ファイル, 行, 関数) の列を取り出す（外側→内側の順）"""
+    stack = []
+    while frame is not None and len(stack) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+def _is_project_frame(frame: Frame) -> bool:
+    filename = os.path.abspath(frame[0])
+    return filename.startswith(PROJECT_ROOT) and os.sep + "site-packages" + os.sep not in filename
+
+
+def _format_frame(frame: Frame) -> str:
+    filename, lineno, name = frame
+    if _is_project_frame(frame):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    return f"{filename}:{lineno} {name}"
+
+
+class Stall:
+    """1回の停止"""
+
+    __slots__ = ('started', 'duration', 'samples')
+
+    def __init__(self, started: float, duration: float, samples: List[Tuple[Frame, ...]]):
+        self.started = started      # セッション開始からの秒数
+        self.duration = duration    # 秒
+        self.samples = samples
+
+    def hot_stack(self) -> Tuple[Frame, ...]:
+        """最も多く採取されたスタック"""
+        if not self.samples:
+            return ()
+        return Counter(self.samples).most_common(1)[0][0]
+
+    def location(self) -> Optional[Frame]:
+        """停止箇所（最多スタックのアプリケーション内で最も内側のフレーム）"""
+        stack = self.hot_stack()
+        for frame in reversed(stack):
+            if _is_project_frame(frame):
+                return frame
+        return stack[-1] if stack else None
+
+    def describe(self) -> str:
+        location = self.location()
+        return f"{self.duration * 1000:.0f} ms: {_format_frame(location) if location else '不明'}"
+
+
+class StallDetector(QObject):
+    """
+    UI停止の検出器
+
+    start() はGUIスレッドから呼ぶ（呼んだスレッドを監視対象とする）
+    """
+
+    # 停止を検出（Stall）。監視スレッドから発行されGUIスレッドで受け取る
+    stall_detected = pyqtSignal(object)
+
+    def __init__(self, threshold_ms: int = STALL_THRESHOLD_MS, interval_ms: int = HEARTBEAT_INTERVAL_MS,
+                 sample_ms: int = SAMPLE_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.sample_interval = sample_ms / 1000
+        self.stalls = deque(maxlen=MAX_STALLS)
+        self.latencies = deque(maxlen=MAX_LATENCIES)
+        self.beats = 0
+        self._session_start = None
+        self._session_seconds = 0.0
+        self._resumed = 0.0
+        self._last_beat = 0.0
+        self._gui_thread = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._beat)
+
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """監視を開始（呼び出したスレッドのイベントループを監視）"""
+        if self.is_running():
+            return
+        now = time.perf_counter()
+        if self._session_start is None:
+            self._session_start = now
+        self._resumed = now
+        self._last_beat = now
+        self._gui_thread = threading.get_ident()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, args=(self._stop_event,), daemon=True,
+                                        name="stall-detector")
+        self._timer.start()
+        self._thread.start()
+
+    def stop(self):
+        """監視を停止（記録は残す）"""
+        if not self.is_running():
+            return
+        self._timer.stop()
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        self._session_seconds += time.perf_counter() - self._resumed
+
+    def clear(self):
+        with self._lock:
+            self.stalls.clear()
+            self.latencies.clear()
+            self.beats = 0
+
+    def _beat(self):
+        """心拍（GUIスレッド）。予定より遅れた分を遅延として記録"""
+        now = time.perf_counter()
+        self.latencies.append(max(0.0, now - self._last_beat - self.interval))
+        self.beats += 1
+        self._last_beat = now
+
+    def _watch(self, stop_event: threading.Event):
+        """監視スレッド。心拍が遅れている間GUIスレッドのスタックを採取し、再開したら停止として判定"""
+        stalled_since = None
+        samples = []
+        while not stop_event.wait(self.sample_interval):
+            last_beat = self._last_beat
+            if stalled_since is not None and last_beat != stalled_since:
+                # 心拍が再開した: 遅れがしきい値を超えていれば停止として記録
+                delay = last_beat - stalled_since - self.interval
+                if delay >= self.threshold:
+                    stall = Stall(stalled_since + self.interval - self._session_start, delay, samples)
+                    with self._lock:
+                        self.stalls.append(stall)
+                    self.stall_detected.emit(stall)
+                stalled_since = None
+                samples = []
+            if time.perf_counter() - last_beat > self.interval + self.sample_interval:
+                frame = sys._current_frames().get(self._gui_thread)
+                if frame is not None:
+                    stalled_since = last_beat
+                    samples.append(_capture_stack(frame))
+                del frame
+
+    def session_seconds(self) -> float:
+        if self.is_running():
+            return self._session_seconds + time.perf_counter() - self._resumed
+        return self._session_seconds
+
+    def worst_locations(self, count: int = WORST_LOCATION_COUNT) -> List[Tuple[Optional[Frame], int, float, float]]:
+        """
+        停止箇所ごとの集計（合計時間の長い順）
+
+        Returns:
+            List[Tuple]: (停止箇所, 回数, 合計秒数, 最大秒数)
+        """
+        with self._lock:
+            stalls = list(self.stalls)
+        totals: Dict[Optional[Frame], List[float]] = {}
+        for stall in stalls:
+            totals.setdefault(stall.location(), []).append(stall.duration)
+        rows = [(location, len(durations), sum(durations), max(durations))
+                for location, durations in totals.items()]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows[:count]
+
+    def format_report(self) -> str:
+        """セッションのレポート"""
+        with self._lock:
+            stalls = list(self.stalls)
+            latencies = sorted(self.latencies)
+        lines = ["PhotoMap Explorer UI停止レポート", ""]
+        lines.append(f"計測時間: {self.session_seconds():.1f} 秒 / 心拍 {self.beats:,} 回"
+                     f"（間隔 {self.interval * 1000:.0f} ms、しきい値 {self.threshold * 1000:.0f} ms）")
+        if latencies:
+            def percentile(ratio):
+                return latencies[min(len(latencies) - 1, int(len(latencies) * ratio))] * 1000
+            lines.append(f"イベントループ遅延: 中央値 {percentile(0.5):.1f} ms / 95% {percentile(0.95):.1f} ms"
+                         f" / 99% {percentile(0.99):.1f} ms / 最大 {latencies[-1] * 1000:.1f} ms")
+        lines.append(f"停止: {len(stalls):,} 回、合計 {sum(stall.duration for stall in stalls) * 1000:,.0f} ms")
+        if not stalls:
+            return "\n".join(lines) + "\n"
+
+        lines.append("")
+        lines.append(f"停止箇所（合計時間の長い順、上位 {WORST_LOCATION_COUNT} 件）")
+        lines.append(f"  {'合計 ms':>9} {'回数':>5} {'最大 ms':>9}  箇所")
+        for location, count, total, longest in self.worst_locations():
+            name = _format_frame(location) if location else "不明（スタック未採取）"
+            lines.append(f"  {total * 1000:>9.0f} {count:>5} {longest * 1000:>9.0f}  {name}")
+
+        lines.append("")
+        lines.append(f"長い停止（上位 {WORST_STALL_COUNT} 件、最も多く採取されたスタック）")
+        for stall in sorted(stalls, key=lambda stall: stall.duration, reverse=True)[:WORST_STALL_COUNT]:
+            lines.append("")
+            lines.append(f"  開始 {stall.started:.1f} 秒 / {stall.duration * 1000:.0f} ms / サンプル {len(stall.samples)} 件")
+            for filename, lineno, name in stall.hot_stack():
+                lines.append(f'    File "{filename}", line {lineno}, in {name}')
+                source = linecache.getline(filename, lineno).strip()
+                if source:
+                    lines.append(f"      {source}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """レポートをファイルへ書き出す"""
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(self.format_report())
+
+
+# グローバルUI停止検出器
+_stall_detector = None
+
+def get_stall_detector() -> StallDetector:
+    """グローバルUI停止検出器取得（GUIスレッドから呼ぶ）"""
+    global _stall_detector
+    if _stall_detector is None:
+        _stall_detector = StallDetector()
+    return _stall_detector
@@ -0,0 +1,147 @@
+"""
+起動プロファイル - PhotoMap Explorer
+
+main.py --startup-profile で使う計測
+- モジュールの読み込み時間（python -X importtime と同じ self / cumulative の形式）
+- 起動の各段階（QApplication 作成、メインウィンドウ作成など）と最初の描画までの時間
+
+読み込み時間は sys.meta_path の先頭に置いたファインダーで各モジュールの
+ローダーを包んで計測する（install() 以降に初めて読み込まれたモジュールが対象）
+"""
+
+import sys
+import time
+from typing import List, Optional, Tuple
+
+# 最初の描画までの目標時間（ms）
+FIRST_PAINT_TARGET_MS = 500
+
+# レポートの「重いモジュール」欄の件数
+SLOWEST_IMPORT_COUNT = 20
+
+
+class _TimingLoader:
+    """ローダーを包んでモジュールの作成・実行時間を計測"""
+
+    def __init__(self, loader, profile: "StartupProfile", name: str):
+        self._loader = loader
+        self._profile = profile
+        self._name = name
+
+    def create_module(self, spec):
+        self._profile._enter(self._name)
+        create_module = getattr(self._loader, 'create_module', None)
+        try:
+            return create_module(spec) if create_module is not None else None
+        except BaseException:
+            self._profile._exit(self._name)
+            raise
+
+    def exec_module(self, module):
+        # 実行中のモジュール自身からは元のローダーが見えるようにする（importlib.resources など）
+        module.__loader__ = self._loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self._loader
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profile._exit(self._name)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimingFinder:
+    """後続のファインダーで見つけたモジュールのローダーを計測用に包む"""
+
+    def __init__(self, profile: "StartupProfile"):
+        self._profile = profile
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            if loader is not None and hasattr(loader, 'exec_module'):
+                spec.loader = _TimingLoader(loader, self._profile, name)
+            return spec
+        return None
+
+
+class StartupProfile:
+    """起動時間の計測とレポート作成"""
+
+    def __init__(self, start: float = None):
+        self.start = start if start is not None else time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        # (深さ, 名前, 自身の秒数, 累積の秒数)。読み込みが終わった順
+        self.imports: List[Tuple[int, str, float, float]] = []
+        self.first_paint: Optional[float] = None
+        self._stack = []   # [名前, 開始時刻, 子の累積秒数]
+        self._finder = _ImportTimingFinder(self)
+
+    def install(self):
+        """以降のモジュール読み込みの計測を開始"""
+        if self._finder not in sys.meta_path:
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    def _enter(self, name: str):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self, name: str):
+        if not self._stack or self._stack[-1][0] != name:
+            return
+        _, started, children = self._stack.pop()
+        cumulative = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][2] += cumulative
+        self.imports.append((len(self._stack), name, cumulative - children, cumulative))
+
+    def mark(self, label: str):
+        """起動の段階を記録（開始からの経過時間）"""
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def mark_first_paint(self):
+        if self.first_paint is None:
+            self.first_paint = time.perf_counter() - self.start
+            self.mark("最初の描画")
+
+    def format_report(self) -> str:
+        """レポートの文字列"""
+        lines = ["PhotoMap Explorer 起動プロファイル", ""]
+        if self.first_paint is not None:
+            milliseconds = self.first_paint * 1000
+            verdict = "OK" if milliseconds <= FIRST_PAINT_TARGET_MS else "超過"
+            lines.append(f"最初の描画まで: {milliseconds:.1f} ms（目標 {FIRST_PAINT_TARGET_MS} ms 以内: {verdict}）")
+        else:
+            lines.append("最初の描画まで: 未計測")
+        lines.append("")
+        lines.append("段階（main.py 開始からの経過時間）")
+        for label, elapsed in self.marks:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {label}")
+
+        total = sum(cumulative for depth, _, _, cumulative in self.imports if depth == 0)
+        lines.append("")
+        lines.append(f"モジュール読み込み: {len(self.imports)} 件、合計 {total * 1000:.1f} ms")
+        lines.append(f"自身の時間が長いモジュール（上位 {SLOWEST_IMPORT_COUNT} 件）")
+        for _, name, own, cumulative in sorted(self.imports, key=lambda item: item[2],
+                                                reverse=True)[:SLOWEST_IMPORT_COUNT]:
+            lines.append(f"  {own * 1000:9.1f} ms  {name}（累積 {cumulative * 1000:.1f} ms）")
+
+        lines.append("")
+        lines.append("import time: self [us] | cumulative | imported package")
+        for depth, name, own, cumulative in self.imports:
+            lines.append(f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """レポートをファイルへ書き出す"""
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(self.format_report())